@@ -0,0 +1,102 @@
+from heapq import heappop, heappush
+from math import inf
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def min_cost_assignment(
+    candidates: Sequence[Sequence[Tuple[int, float]]], unassigned_cost: float
+) -> List[Optional[int]]:
+    """
+    assign rows to columns one to one so the total cost is as small as possible, this is the hungarian algorithm
+    in its shortest augmenting path form [jonker-volgenant] working on a sparse set of candidate columns for
+    each row. Each augmentation only explores rows and columns connected to the row being added through
+    candidates cheaper than leaving a row unassigned, so the work done is local to connected groups of
+    candidates and large sparse problems [e.g. tens of thousands of peaks] are fast
+
+    rows which can't be assigned or which would cost more to assign than to leave unassigned are left
+    unassigned at a cost of unassigned_cost, columns may always be left unassigned
+
+    :param candidates: for each row the (column, cost) pairs it can be assigned to, costs must be >= 0
+    :param unassigned_cost: the cost of leaving a row unassigned
+    :return: the column assigned to each row or None if the row wasn't assigned
+    """
+
+    num_rows = len(candidates)
+
+    # the potentials [dual variables] of the rows and columns, columns not in the dict have a potential of 0
+    row_potentials = [0.0] * num_rows
+    column_potentials: Dict[int, float] = {}
+
+    column_for_row: List[Optional[int]] = [None] * num_rows
+    row_for_column: Dict[int, int] = {}
+
+    # each row has a private dummy column, given a negative id, which represents it being unassigned
+    def edges(row):
+        yield from candidates[row]
+        yield -row - 1, unassigned_cost
+
+    for current_row in range(num_rows):
+
+        shortest_path_costs: Dict[int, float] = {}
+        path: Dict[int, int] = {}
+        scanned_rows = [current_row]
+        scanned_columns = []
+        scanned = set()
+        queue = []
+
+        row = current_row
+        min_value = 0.0
+        while True:
+            row_potential = row_potentials[row]
+            for column, cost in edges(row):
+                if column in scanned:
+                    continue
+
+                reduced_cost = (
+                    min_value
+                    + cost
+                    - row_potential
+                    - column_potentials.get(column, 0.0)
+                )
+                if reduced_cost < shortest_path_costs.get(column, inf):
+                    shortest_path_costs[column] = reduced_cost
+                    path[column] = row
+                    # on ties prefer free columns as they end the search
+                    is_assigned = column in row_for_column
+                    heappush(queue, (reduced_cost, is_assigned, column))
+
+            while True:
+                min_value, _, column = heappop(queue)
+                if column not in scanned and min_value == shortest_path_costs[column]:
+                    break
+
+            scanned.add(column)
+            scanned_columns.append(column)
+
+            if column not in row_for_column:
+                sink = column
+                break
+
+            row = row_for_column[column]
+            scanned_rows.append(row)
+
+        row_potentials[current_row] += min_value
+        for row in scanned_rows[1:]:
+            row_potentials[row] += min_value - shortest_path_costs[column_for_row[row]]
+        for column in scanned_columns:
+            column_potentials[column] = column_potentials.get(column, 0.0) - (
+                min_value - shortest_path_costs[column]
+            )
+
+        column = sink
+        while True:
+            row = path[column]
+            row_for_column[column] = row
+            column, column_for_row[row] = column_for_row[row], column
+            if row == current_row:
+                break
+
+    return [
+        column if column is not None and column >= 0 else None
+        for column in column_for_row
+    ]
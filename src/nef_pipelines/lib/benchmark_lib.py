@@ -0,0 +1,486 @@
+import json
+import logging
+import multiprocessing
+import platform
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from importlib.util import find_spec
+from math import exp
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from pynmrstar import Entry
+
+from nef_pipelines.lib.header_lib import create_header_frame
+from nef_pipelines.lib.isotope_lib import Isotope
+from nef_pipelines.lib.nef_frames_lib import SPECTRUM_FRAME_CATEGORY
+from nef_pipelines.lib.nef_lib import read_entry_from_file_or_exit_error
+from nef_pipelines.lib.peak_lib import peaks_to_frame
+from nef_pipelines.lib.sequence_lib import sequence_to_nef_frame, translate_3_to_1
+from nef_pipelines.lib.shift_lib import shifts_to_nef_frame
+from nef_pipelines.lib.structures import (
+    AtomLabel,
+    NewPeak,
+    Residue,
+    SequenceResidue,
+    ShiftData,
+    ShiftList,
+)
+from nef_pipelines.lib.util import (
+    _call_capturing_errors,
+    exit_error,
+    read_from_file_or_exit,
+)
+
+BASELINE_VERSION = 1
+
+# the fractional increase in time or peak memory from a baseline which is reported as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# changes in time smaller than this [in seconds] are timer noise and are never reported as regressions
+MINIMUM_TIME_CHANGE = 0.05
+
+RESIDUE_NAMES = (
+    "ALA ARG ASN ASP CYS GLN GLU GLY HIS ILE LEU LYS MET PHE SER THR TRP TYR VAL"
+).split()
+
+BENCHMARK_ENTRY_NAME = "benchmark"
+
+BENCHMARK_CHAIN = "A"
+
+RELAXATION_SERIES_NAME = "T1"
+
+SPECTROMETER_FREQUENCY = 600.0
+
+
+class SyntheticSizes(NamedTuple):
+    """
+    the size of a synthetic entry, the peaks are the number of peaks in each spectrum
+    """
+
+    residues: int
+    spectra: int
+    peaks: int
+
+
+class Benchmark(NamedTuple):
+    """
+    a pipeline to benchmark, the stages are nef command lines separated by | as used by nef run, they are
+    formatted with the names of the synthetic input files [sequence_file] and the spectra and timings of the
+    relaxation series [spectra, timings, series_name]. Benchmarks which don't read the synthetic entry start from
+    an entry containing only a header. If any of the required modules aren't installed the benchmark is skipped
+    """
+
+    name: str
+    stages: str
+    reads_entry: bool = True
+    requires: Tuple[str, ...] = ()
+
+
+class BenchmarkResult(NamedTuple):
+    """
+    the fastest time for each phase of a benchmark in seconds and the peak resident memory [RSS] of the process
+    running the benchmark in bytes [None if the platform doesn't report it]
+    """
+
+    parse: float
+    pipe: float
+    write: float
+    peak_rss: Optional[int] = None
+
+    @property
+    def total(self) -> float:
+        return self.parse + self.pipe + self.write
+
+
+class BenchmarkComparison(NamedTuple):
+    """
+    the ratios of the total time and peak memory of a benchmark to its baseline and whether they are regressions,
+    a benchmark in the baseline which failed or was skipped has no ratios, is a regression and has the reason
+    """
+
+    time_ratio: Optional[float]
+    rss_ratio: Optional[float]
+    is_regression: bool
+    failure: Optional[str] = None
+
+
+BENCHMARKS = (
+    Benchmark(
+        "import",
+        "fasta import sequence {sequence_file}",
+        reads_entry=False,
+    ),
+    Benchmark("unassign", "frames unassign"),
+    Benchmark("renumber", f"chains renumber {BENCHMARK_CHAIN} 100"),
+    Benchmark(
+        "series_build",
+        "series build --name {series_name} --experiment-type {series_name} --timings {timings} {spectra}",
+    ),
+    Benchmark(
+        "fit",
+        "series build --name {series_name} --experiment-type {series_name} --timings {timings} {spectra}"
+        " | fit exponential --cycles 10 {series_name}",
+        requires=("streamfitter",),
+    ),
+    Benchmark("save", "save -"),
+)
+
+
+def synthetic_entry(sizes: SyntheticSizes, seed: int = 42) -> Entry:
+    """
+    make a synthetic entry for benchmarking, it contains a header, a single chain of random residues, a shift list
+    with H and N shifts for each residue and a relaxation series of 15N HSQC spectra whose peak heights decay
+    exponentially. Peaks are assigned to the residues in turn so there is more than one peak per residue if there
+    are more peaks than residues. The same sizes and seed always give the same entry apart from the header
+
+    :param sizes: the number of residues, spectra and peaks per spectrum
+    :param seed: the seed for the random number generator
+    :return: the synthetic entry
+    """
+
+    rng = Random(seed)
+
+    residues = [
+        SequenceResidue(BENCHMARK_CHAIN, sequence_code, rng.choice(RESIDUE_NAMES))
+        for sequence_code in range(1, sizes.residues + 1)
+    ]
+
+    shifts = []
+    for sequence_residue in residues:
+        residue = Residue.from_sequence_residue(sequence_residue)
+        shifts.append(ShiftData(AtomLabel(residue, "H"), round(rng.gauss(8.2, 0.6), 3)))
+        shifts.append(
+            ShiftData(AtomLabel(residue, "N"), round(rng.gauss(120.0, 4.0), 3))
+        )
+
+    entry = Entry.from_scratch(BENCHMARK_ENTRY_NAME)
+    entry.add_saveframe(create_header_frame("nef_pipelines", "benchmark", "benchmark"))
+    entry.add_saveframe(sequence_to_nef_frame(residues))
+    entry.add_saveframe(shifts_to_nef_frame(ShiftList(shifts), "default"))
+
+    relaxation_rates = [rng.uniform(0.5, 2.0) for _ in residues]
+    peak_shifts = list(zip(shifts[::2], shifts[1::2]))
+
+    for spectrum_index, timing in enumerate(_synthetic_timings(sizes.spectra)):
+        peaks = []
+        for peak_index in range(sizes.peaks):
+            residue_index = peak_index % sizes.residues
+            height = 1e6 * exp(-relaxation_rates[residue_index] * timing)
+            peaks.append(
+                NewPeak(
+                    list(peak_shifts[residue_index]),
+                    id=peak_index + 1,
+                    height=round(height + rng.gauss(0.0, 1e3), 1),
+                    height_uncertainty=1e3,
+                )
+            )
+
+        dimensions = [{"axis_code": Isotope.H1}, {"axis_code": Isotope.N15}]
+        frame_code = _synthetic_spectrum_name(spectrum_index, sizes.spectra)
+        entry.add_saveframe(
+            peaks_to_frame(peaks, dimensions, SPECTROMETER_FREQUENCY, frame_code)
+        )
+
+    return entry
+
+
+def synthetic_sequence_fasta(sizes: SyntheticSizes, seed: int = 42) -> str:
+    """
+    the sequence of a synthetic entry as fasta with a NEF-Pipelines header giving the chain and its start
+
+    :param sizes: the sizes of the synthetic entry
+    :param seed: the seed used to make the synthetic entry
+    :return: the fasta text
+    """
+
+    rng = Random(seed)
+    residue_names = [rng.choice(RESIDUE_NAMES) for _ in range(sizes.residues)]
+
+    sequence = "".join(translate_3_to_1(residue_names))
+    lines = [sequence[i : i + 60] for i in range(0, len(sequence), 60)]
+
+    return "\n".join(
+        [f">{BENCHMARK_ENTRY_NAME} CHAIN: {BENCHMARK_CHAIN} | START: 1", *lines, ""]
+    )
+
+
+def _synthetic_timings(number_spectra: int) -> List[float]:
+    return [round(0.1 * (i + 1), 3) for i in range(number_spectra)]
+
+
+def _synthetic_spectrum_name(spectrum_index: int, number_spectra: int) -> str:
+
+    # zero padded to the same width so no spectrum name is contained in another [t1_1 in t1_10]
+    width = len(str(number_spectra))
+
+    return f"{RELAXATION_SERIES_NAME.lower()}_{spectrum_index + 1:0{width}d}"
+
+
+def run_benchmarks(
+    benchmarks: List[Benchmark], sizes: SyntheticSizes, repeats: int = 1, seed=42
+) -> Dict[str, Union[BenchmarkResult, str]]:
+    """
+    run benchmarks on a synthetic entry, each benchmark is run in a new process so its peak memory use is its own
+    and isn't hidden by earlier benchmarks or by making the synthetic input files, which are written once by the
+    calling process. Each repeat reads the entry from a file [the parse phase], runs the
+    stages of the pipeline in process as nef run does [the pipe phase] and converts the result to text [the
+    write phase] and the fastest time for each phase is kept. Note frames are parsed on demand so the time to
+    parse frames a pipeline changes is part of the pipe phase
+
+    :param benchmarks: the benchmarks to run
+    :param sizes: the size of the synthetic entry
+    :param repeats: the number of times to repeat each benchmark
+    :param seed: the seed for the synthetic entry
+    :return: the result for each benchmark or a message if it was skipped or failed
+    """
+
+    result = {}
+    with TemporaryDirectory() as directory:
+
+        input_files = _write_benchmark_inputs(Path(directory), sizes, seed)
+
+        for benchmark in benchmarks:
+
+            missing = [
+                module for module in benchmark.requires if find_spec(module) is None
+            ]
+            if missing:
+                result[benchmark.name] = (
+                    f"skipped, {', '.join(missing)} isn't installed"
+                )
+                continue
+
+            # spawn a clean interpreter so the peak memory doesn't include the parent process or earlier benchmarks
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                failed, outcome = executor.submit(
+                    _call_capturing_errors,
+                    _run_benchmark,
+                    (benchmark, input_files, sizes, repeats),
+                ).result()
+
+            result[benchmark.name] = f"failed, {outcome}" if failed else outcome
+
+    return result
+
+
+class BenchmarkInputs(NamedTuple):
+    """
+    the synthetic input files for benchmarks, the full synthetic entry, an entry containing only a header for
+    benchmarks which don't read the synthetic entry and the sequence of the synthetic entry as fasta
+    """
+
+    entry_file: Path
+    header_entry_file: Path
+    sequence_file: Path
+
+
+def _write_benchmark_inputs(
+    directory: Path, sizes: SyntheticSizes, seed: int
+) -> BenchmarkInputs:
+
+    result = BenchmarkInputs(
+        directory / f"{BENCHMARK_ENTRY_NAME}.nef",
+        directory / f"{BENCHMARK_ENTRY_NAME}_header.nef",
+        directory / f"{BENCHMARK_ENTRY_NAME}.fasta",
+    )
+
+    result.entry_file.write_text(str(synthetic_entry(sizes, seed)))
+
+    header_entry = Entry.from_scratch(BENCHMARK_ENTRY_NAME)
+    header_entry.add_saveframe(
+        create_header_frame("nef_pipelines", "benchmark", "benchmark")
+    )
+    result.header_entry_file.write_text(str(header_entry))
+
+    result.sequence_file.write_text(synthetic_sequence_fasta(sizes, seed))
+
+    return result
+
+
+def _run_benchmark(
+    benchmark: Benchmark,
+    input_files: BenchmarkInputs,
+    sizes: SyntheticSizes,
+    repeats: int,
+) -> BenchmarkResult:
+
+    command = _nef_command()
+
+    # the run plugin registers its command when imported so the nef app must exist first
+    from nef_pipelines.tools.run import parse_pipeline_stages, run_pipeline
+
+    entry_file = (
+        input_files.entry_file
+        if benchmark.reads_entry
+        else input_files.header_entry_file
+    )
+
+    stages = benchmark.stages.format(
+        sequence_file=input_files.sequence_file,
+        series_name=RELAXATION_SERIES_NAME,
+        spectra=" ".join(
+            f"{SPECTRUM_FRAME_CATEGORY}_{_synthetic_spectrum_name(i, sizes.spectra)}"
+            for i in range(sizes.spectra)
+        ),
+        timings=",".join(str(timing) for timing in _synthetic_timings(sizes.spectra)),
+    )
+    stages = parse_pipeline_stages([stages])
+
+    times = []
+    for _ in range(repeats):
+        start = perf_counter()
+        entry = read_entry_from_file_or_exit_error(entry_file)
+        parsed = perf_counter()
+        output = run_pipeline(command, "nef", stages, entry)
+        piped = perf_counter()
+        output.getvalue()
+        written = perf_counter()
+
+        times.append((parsed - start, piped - parsed, written - piped))
+
+    parse_time, pipe_time, write_time = [
+        min(phase_times) for phase_times in zip(*times)
+    ]
+
+    return BenchmarkResult(parse_time, pipe_time, write_time, _peak_rss())
+
+
+def _nef_command():
+
+    import typer
+
+    from nef_pipelines.main import PLUGINS, create_nef_app
+
+    # as in nef itself, stop pynmrstar warning about empty loops
+    logging.getLogger().setLevel(logging.ERROR)
+
+    nef_app = create_nef_app()
+
+    for module_name, _ in PLUGINS.values():
+        try:
+            import_module(module_name)
+        except Exception:
+            # plugins which can't be loaded are reported by nef itself, benchmarks using them fail
+            pass
+
+    return typer.main.get_command(nef_app.app)
+
+
+def _peak_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # linux reports kilobytes and macos bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def results_to_baseline(
+    results: Dict[str, Union[BenchmarkResult, str]], sizes: SyntheticSizes, repeats: int
+) -> Dict:
+    """
+    convert the results of benchmarks to a baseline which can be saved as json, skipped and failed benchmarks
+    aren't included
+
+    :param results: the benchmark results
+    :param sizes: the size of the synthetic entry used
+    :param repeats: the number of repeats used
+    :return: the baseline
+    """
+
+    return {
+        "version": BASELINE_VERSION,
+        "sizes": sizes._asdict(),
+        "repeats": repeats,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {
+            name: result._asdict()
+            for name, result in results.items()
+            if isinstance(result, BenchmarkResult)
+        },
+    }
+
+
+def read_baseline_or_exit_error(file_path: Path) -> Dict:
+    """
+    read a baseline saved as json or exit with an error
+
+    :param file_path: the baseline file
+    :return: the baseline
+    """
+
+    text = read_from_file_or_exit(file_path, "benchmark baseline")
+
+    try:
+        baseline = json.loads(text)
+    except json.JSONDecodeError as e:
+        exit_error(f"the benchmark baseline {file_path} isn't valid json: {e}", e)
+
+    if not isinstance(baseline, dict) or baseline.get("version") != BASELINE_VERSION:
+        msg = f"""
+            the file {file_path} isn't a version {BASELINE_VERSION} benchmark baseline, recreate it with
+            nef benchmark --save-baseline
+        """
+        exit_error(msg)
+
+    return baseline
+
+
+def compare_to_baseline(
+    results: Dict[str, Union[BenchmarkResult, str]],
+    baseline: Dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> Dict[str, BenchmarkComparison]:
+    """
+    compare benchmark results with a baseline, a benchmark has regressed if its total time or peak memory has
+    increased by more than the tolerance, increases in time of less than MINIMUM_TIME_CHANGE are ignored. A
+    benchmark in the baseline which now fails or is skipped is also a regression
+
+    :param results: the benchmark results
+    :param baseline: the baseline as read by read_baseline_or_exit_error
+    :param tolerance: the fractional increase counted as a regression
+    :return: comparisons for the benchmarks which were run and are in the baseline
+    """
+
+    result = {}
+    for name, benchmark_result in results.items():
+
+        if name not in baseline["results"]:
+            continue
+
+        if not isinstance(benchmark_result, BenchmarkResult):
+            result[name] = BenchmarkComparison(None, None, True, benchmark_result)
+            continue
+
+        baseline_result = BenchmarkResult(**baseline["results"][name])
+
+        time_ratio = _ratio(benchmark_result.total, baseline_result.total)
+        rss_ratio = _ratio(benchmark_result.peak_rss, baseline_result.peak_rss)
+
+        time_change = benchmark_result.total - baseline_result.total
+        slower = (
+            time_ratio is not None
+            and time_ratio > 1.0 + tolerance
+            and time_change > MINIMUM_TIME_CHANGE
+        )
+        larger = rss_ratio is not None and rss_ratio > 1.0 + tolerance
+
+        result[name] = BenchmarkComparison(time_ratio, rss_ratio, slower or larger)
+
+    return result
+
+
+def _ratio(value: Optional[float], baseline_value: Optional[float]) -> Optional[float]:
+    if value is None or not baseline_value:
+        return None
+    return value / baseline_value
@@ -1,11 +1,22 @@
+import functools
+import io
+import marshal
+import os
+import re
+import stat
+import struct
 import sys
+import weakref
 from argparse import Namespace
+from array import array
 from collections.abc import MutableMapping
 from enum import auto
-from fnmatch import fnmatch
+from fnmatch import translate
 from itertools import zip_longest
+from math import nan
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
 
 # from pandas import DataFrame
 from pynmrstar import Entry, Loop, Saveframe
@@ -36,6 +47,7 @@ DEFAULT_INCREMENT_END = ""
 NEF_TRUE = "true"
 NEF_FALSE = "false"
 NEF_NONE = "none"
+UNKNOWN = "?"
 
 NEF_CATEGORY_ATTR = "__NEF_CATEGORY__"
 NEF_MOLECULAR_SYSTEM = "nef_molecular_system"
@@ -44,9 +56,19 @@ NEF_METADATA = "nef_nmr_meta_data"
 UNUSED = "."
 UNDERSCORE = "_"
 
+NEF_NULLS = frozenset([UNUSED, UNKNOWN])
+
+NEF_STREAM_FORMAT_ENV = "NEF_PIPELINES_STREAM_FORMAT"
+BINARY_STREAM_MAGIC = b"\x00NEFPLS-BINARY\x00"
+BINARY_STREAM_VERSION = 1
+_BINARY_STREAM_LENGTH = struct.Struct("<Q")
+
 # this stops pynmrstar failing on empty strings
 STR_CONVERSION_DICT[""] = UNUSED
 
+# the number of compiled lists of frame selectors to keep
+SELECTOR_CACHE_SIZE = 256
+
 
 class BadNefFileException(Exception):
     """
@@ -98,50 +120,169 @@ POTENTIAL_TYPES_LOWER = ", ".join(
     [selector.lower() for selector in PotentialTypes.__members__]
 )
 
-# currently disabled as they add a dependency on pandas and numpy
-# def loop_to_dataframe(loop: Loop) -> DataFrame:
-#     """
-#     convert a pynmrstar Loop to a pandas DataFrame. Note the Loop category is
-#     saved in the dataframe's attrs['__NEF_CATEGORY__']
-#
-#     :param loop: the pynmrstar Loop
-#     :return: a pandas DataFrame
-#     """
-#     tags = loop.tags
-#     data = DataFrame()
-#
-#     # note this strips the preceding _
-#     data.attrs[NEF_CATEGORY_ATTR] = loop.category[1:]
-#
-#     for tag in tags:
-#         if tag != "index":
-#             data[tag] = loop.get_tag(tag)
-#
-#     return data
-#
-#
-# def dataframe_to_loop(frame: DataFrame, category: str = None) -> Loop:
-#     """
-#     convert a pandas DataFrame to a pynmrstar Loop
-#
-#     :param frame: the pandas DataFrame
-#     :param category: the star category note this will override any category stored in attrs
-#     :return: the new pynmrstar Loop
-#     """
-#     loop = Loop.from_scratch(category=category)
-#     loop_data = {}
-#     for column in frame.columns:
-#         loop.add_tag(column)
-#         loop_data[column] = list(frame[column])
-#
-#     loop.add_data(loop_data)
-#
-#     if NEF_CATEGORY_ATTR in frame.attrs and not category:
-#         loop.set_category(frame.attrs[NEF_CATEGORY_ATTR])
-#     elif category:
-#         loop.set_category(category)
-#
-#     return loop
+
+class StreamFormat(LowercaseStrEnum):
+    """
+    the formats nef commands can use to hand entries to each other through a pipe
+    """
+
+    TEXT = auto()
+    BINARY = auto()
+
+
+class DataFrameBackend(LowercaseStrEnum):
+    """
+    the type of storage used for the columns of a DataFrame, these match pandas' dtype_backend values
+    """
+
+    NUMPY_NULLABLE = "numpy_nullable"
+    PYARROW = auto()
+
+
+DATAFRAME_EXTRA = "nef_pipelines[dataframe]"
+
+
+def _import_pandas():
+    try:
+        import pandas
+    except ImportError as e:
+        msg = f"DataFrame support needs pandas, install it with pip install {DATAFRAME_EXTRA} [{e}]"
+        raise ImportError(msg) from e
+
+    return pandas
+
+
+def loop_to_dataframe(
+    loop: Loop,
+    convert: bool = True,
+    dtype_backend: DataFrameBackend = DataFrameBackend.NUMPY_NULLABLE,
+) -> "pandas.DataFrame":  # noqa: F821
+    """
+    convert a pynmrstar Loop to a pandas DataFrame. Note the Loop category is saved in the dataframe's
+    attrs['__NEF_CATEGORY__'] without its leading _
+
+    the type of each column is inferred once for the whole column [see LoopTable], columns of ints, floats and bools
+    get nullable dtypes with the NEF nulls . and ? as missing values, other columns are stored as python objects
+    so the strings in the loop are shared rather than copied. With the pyarrow backend all typed columns and columns
+    of strings are arrow backed
+
+    needs the optional dependencies from nef_pipelines[dataframe]
+
+    :param loop: the pynmrstar Loop
+    :param convert: infer the types of columns, if False all columns contain the loop's values unchanged
+    :param dtype_backend: the storage for typed columns numpy_nullable [default] or pyarrow
+    :return: a pandas DataFrame
+    """
+
+    pandas = _import_pandas()
+
+    table = LoopTable(loop, convert)
+
+    columns = {}
+    for tag in table.tags:
+        values = table.column(tag)
+        dtype = (
+            _column_dtype(pandas, values, dtype_backend)
+            if convert
+            else _dtype_for_type(pandas, str, dtype_backend)
+        )
+
+        if convert:
+            values = [None if value in NEF_NULLS else value for value in values]
+
+        columns[tag] = pandas.Series(values, dtype=dtype, copy=False)
+
+    result = pandas.DataFrame(columns, copy=False)
+
+    # note this strips the preceding _
+    result.attrs[NEF_CATEGORY_ATTR] = loop.category[1:]
+
+    return result
+
+
+def _column_dtype(pandas, values, dtype_backend):
+    types = {value.__class__ for value in values if value not in NEF_NULLS}
+
+    if types == {int, float}:
+        types = {float}
+
+    return (
+        _dtype_for_type(pandas, types.pop(), dtype_backend)
+        if len(types) == 1
+        else object
+    )
+
+
+def _dtype_for_type(pandas, value_type, dtype_backend):
+
+    if dtype_backend == DataFrameBackend.PYARROW:
+        import pyarrow
+
+        arrow_types = {
+            int: pyarrow.int64(),
+            float: pyarrow.float64(),
+            bool: pyarrow.bool_(),
+            str: pyarrow.string(),
+        }
+        result = (
+            pandas.ArrowDtype(arrow_types[value_type])
+            if value_type in arrow_types
+            else object
+        )
+    else:
+        numpy_nullable_types = {int: "Int64", float: "Float64", bool: "boolean"}
+        result = numpy_nullable_types.get(value_type, object)
+
+    return result
+
+
+def dataframe_to_loop(
+    frame: "pandas.DataFrame", category: str = None  # noqa: F821
+) -> Loop:
+    """
+    convert a pandas DataFrame to a pynmrstar Loop, missing values become . and bools become true and false
+
+    needs the optional dependencies from nef_pipelines[dataframe]
+
+    :param frame: the pandas DataFrame
+    :param category: the star category note this will override any category stored in attrs
+    :return: the new pynmrstar Loop
+    """
+
+    pandas = _import_pandas()
+
+    loop = Loop.from_scratch(category=category)
+    loop.add_tag([str(column) for column in frame.columns])
+
+    columns = [
+        [_dataframe_value_to_nef(pandas, value) for value in frame[column].tolist()]
+        for column in frame.columns
+    ]
+    loop.data = [list(row) for row in zip(*columns)]
+
+    if NEF_CATEGORY_ATTR in frame.attrs and not category:
+        loop.set_category(frame.attrs[NEF_CATEGORY_ATTR])
+    elif category:
+        loop.set_category(category)
+
+    return loop
+
+
+def _dataframe_value_to_nef(pandas, value):
+    if value.__class__ is str:
+        result = value
+    elif (
+        value is None
+        or value is pandas.NA
+        or (value.__class__ is float and value != value)
+    ):
+        result = UNUSED
+    elif value.__class__ is bool:
+        result = NEF_TRUE if value else NEF_FALSE
+    else:
+        result = str(value)
+
+    return result
 
 
 def get_frame_id(frame: Saveframe) -> str:
@@ -180,34 +321,515 @@ def select_frames_by_name(
     :return: a list or matching frames
     """
 
-    def match_frames(
-        frames: List[Saveframe], name_selectors: List[str]
-    ) -> Dict[Any, Saveframe]:
-        result = {}
+    def match_frames(frames, selectors: Pattern) -> List[Saveframe]:
 
-        for frame in frames:
-            for selector in name_selectors:
+        if isinstance(frames, Entry):
+            return get_entry_index(frames).select(selectors, categories=False)
 
-                if fnmatch(frame.name, selector):
-                    # frames aren't hashable and so can't be saved in a set
-                    # but names should be unique
-                    result[frame.name] = frame
+        # frames aren't hashable and so can't be saved in a set but names should be unique
+        result = {
+            frame.name: frame
+            for frame in frames
+            if selectors.match(os.path.normcase(frame.name))
+        }
 
-        return result
+        return list(result.values())
 
     if isinstance(name_selectors, str):
         name_selectors = [
             name_selectors,
         ]
+    name_selectors = tuple(name_selectors)
 
-    result = match_frames(frames, name_selectors)
+    result = match_frames(frames, compile_frame_selectors(name_selectors))
 
     if not exact and len(result) == 0:
+        result = match_frames(
+            frames, compile_frame_selectors(name_selectors, wildcard=True)
+        )
+
+    return tuple(result)
+
+
+@functools.lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def compile_frame_selectors(
+    selectors: Tuple[str, ...], wildcard: bool = False
+) -> Pattern:
+    """
+    compile frame selectors using fnmatch style wild cards into a single regular expression, the compiled
+    selectors are cached so repeated selections don't recompile them
+
+    :param selectors: the selectors
+    :param wildcard: surround each selector with * so it matches anywhere in a name
+    :return: a regular expression which matches names matched by any of the selectors, with re.match
+    """
+
+    if wildcard:
+        selectors = tuple(f"*{selector}*" for selector in selectors)
+
+    if not selectors:
+        # a regular expression that never matches
+        return re.compile(r"(?!)")
+
+    # fnmatch normalises the case of names and patterns for the os, so we do the same
+    return re.compile(
+        "|".join(translate(os.path.normcase(selector)) for selector in selectors)
+    )
+
+
+_FRAME_NAMES = attrgetter("name")
+_FRAME_CATEGORIES = attrgetter("category")
+
+
+class EntryIndex:
+    """
+    an index of the frames in an entry by name and category which also caches the results of selections. Before
+    each use the index checks whether frames have been added to or removed from the entry [via Entry.add_saveframe
+    and Entry.remove_saveframe] and if so rebuilds itself, frames added with add_saveframe update the index without
+    a rebuild. Renaming or recategorising a frame in the entry isn't detected, call invalidate after doing so
+
+    the index only keeps a weak reference to its entry, get_entry_index provides an index shared by all users of
+    an entry
+    """
+
+    def __init__(self, entry: Entry):
+        self._entry = weakref.ref(entry)
+        self._build()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __contains__(self, frame_name: str) -> bool:
+        return self.get(frame_name) is not None
+
+    @property
+    def frames(self) -> List[Saveframe]:
+        """
+        :return: the frames of the entry in order
+        """
+        self._update()
+        return list(self._frames)
+
+    def get(self, frame_name: str, default=None) -> Optional[Saveframe]:
+        """
+        get a frame by name
+
+        :param frame_name: the name of the frame
+        :param default: the value to return if there is no frame with the name
+        :return: the frame or the default
+        """
+        self._update()
+
+        frame = self._frames_by_name.get(frame_name)
+        if frame is not None and frame.name != frame_name:
+            self.invalidate()
+            frame = self._frames_by_name.get(frame_name)
+
+        return default if frame is None else frame
+
+    def frames_in_category(self, category: str) -> List[Saveframe]:
+        """
+        :param category: the category of the frames
+        :return: the frames with the category in entry order
+        """
+        self._update()
+        return list(self._frames_by_category.get(category, ()))
+
+    def select(
+        self, selectors: Pattern, names: bool = True, categories: bool = True
+    ) -> List[Saveframe]:
+        """
+        select the frames whose names or categories are matched by compiled selectors
+
+        :param selectors: the selectors compiled with compile_frame_selectors
+        :param names: select frames by name
+        :param categories: select frames by category
+        :return: the selected frames in entry order
+        """
+
+        self._update()
+
+        key = selectors, names, categories
+        if key not in self._selections:
+
+            selected_categories = {
+                category
+                for category in self._frames_by_category
+                if categories
+                and category is not None
+                and selectors.match(os.path.normcase(category))
+            }
+
+            self._selections[key] = [
+                frame
+                for frame, name, category in zip(
+                    self._frames, self._names, self._categories
+                )
+                if category in selected_categories
+                or (names and selectors.match(os.path.normcase(name)))
+            ]
+
+        return list(self._selections[key])
+
+    def add_saveframe(self, frame: Saveframe):
+        """
+        add a frame to the entry and the index
+
+        :param frame: the frame to add, its name must not already be in the entry
+        """
+
+        self._update()
+
+        if frame.name in self._frames_by_name:
+            raise ValueError(
+                f"Cannot add a saveframe with name '{frame.name}' since a saveframe with that name already exists "
+                f"in the entry."
+            )
+
+        # Entry.add_saveframe rebuilds its frame dictionary to check the name, the index makes that unnecessary
+        self._entry_or_raise().frame_list.append(frame)
+
+        self._names.append(frame.name)
+        self._categories.append(frame.category)
+        self._frames_by_name[frame.name] = frame
+        self._frames_by_category.setdefault(frame.category, []).append(frame)
+        self._selections.clear()
+
+    def invalidate(self):
+        """
+        rebuild the index, this is needed after frames in the entry are renamed or their categories changed
+        """
+        self._build()
+
+    def _entry_or_raise(self) -> Entry:
+        entry = self._entry()
+        if entry is None:
+            raise ValueError("the entry for this index no longer exists")
+        return entry
+
+    def _build(self):
+
+        self._frames = self._entry_or_raise().frame_list
+
+        self._names = list(map(_FRAME_NAMES, self._frames))
+        self._categories = list(map(_FRAME_CATEGORIES, self._frames))
+
+        self._frames_by_name = dict(zip(self._names, self._frames))
+        self._frames_by_category = {}
+        for frame, category in zip(self._frames, self._categories):
+            self._frames_by_category.setdefault(category, []).append(frame)
+
+        self._selections = {}
+
+    def _update(self):
+
+        frames = self._entry_or_raise().frame_list
+
+        # Entry.remove_saveframe replaces the frame list and Entry.add_saveframe appends to it
+        if frames is not self._frames or len(frames) != len(self._names):
+            self._build()
+
+
+_ENTRY_INDICES: Dict[int, EntryIndex] = {}
+
+
+def get_entry_index(entry: Entry) -> EntryIndex:
+    """
+    get the index of an entry shared by all its users, it is created on first use and discarded with the entry
+
+    :param entry: the entry
+    :return: the index of the entry
+    """
+
+    entry_id = id(entry)
+    index = _ENTRY_INDICES.get(entry_id)
+
+    if index is None:
+        index = EntryIndex(entry)
+        _ENTRY_INDICES[entry_id] = index
+        weakref.finalize(entry, _ENTRY_INDICES.pop, entry_id, None)
+
+    return index
+
+
+class EntryStream(io.StringIO):
+    """
+    an in memory text stream which can also carry a NEF entry, this is used to hand entries between the stages of
+    an in process pipeline [nef run] without serialising them. The entry is only converted to text if the stream
+    is read as text, as an output stream it collects the entry written by write_entry_to_stdout and any other text.
+    """
+
+    def __init__(self, entry: Optional[Entry] = None, text: str = ""):
+        super().__init__(text)
+        self.entry = entry
+        self._entry_is_text = entry is None
+
+    def isatty(self):
+        return False
+
+    def _entry_to_text(self):
+        if not self._entry_is_text:
+            self._entry_is_text = True
+
+            position = self.tell()
+            self.seek(0, io.SEEK_END)
+            super().write(f"{self.entry}\n")
+            self.seek(position)
+
+    def read(self, size=-1):
+        self._entry_to_text()
+        return super().read(size)
+
+    def readline(self, size=-1):
+        self._entry_to_text()
+        return super().readline(size)
+
+    def readlines(self, hint=-1):
+        self._entry_to_text()
+        return super().readlines(hint)
+
+    def __iter__(self):
+        self._entry_to_text()
+        return self
+
+    def __next__(self):
+        self._entry_to_text()
+        return super().__next__()
+
+    def getvalue(self):
+        self._entry_to_text()
+        return super().getvalue()
+
+    def write_entry(self, entry: Entry):
+        """
+        carry an entry in the stream without converting it to text, any entry already carried is converted to
+        text first so that streams containing multiple entries are preserved
+        :param entry: the entry
+        """
+        self._entry_to_text()
+        self.entry = entry
+        self._entry_is_text = False
+
+    def carries_only_entry(self) -> bool:
+        """
+        does the stream contain a single entry and no other text, if so the entry can be handed on directly
+        :return: True if the stream only carries an entry
+        """
+        return not self._entry_is_text and super().getvalue() == ""
+
+
+def entries_from_stdin_without_parsing_or_none() -> Optional[List[Entry]]:
+    """
+    if stdin carries entries which don't need to be parsed from STAR text return them. This is the case if stdin
+    is an EntryStream carrying an entry [we are a stage in an in process pipeline] or stdin is a pipe carrying
+    entries in the binary stream format
+
+    :return: a list of entries or None if stdin needs to be read as text
+    """
+    result = None
+    if isinstance(sys.stdin, EntryStream):
+        if sys.stdin.carries_only_entry():
+            result = [sys.stdin.entry]
+    elif not sys.stdin.isatty() and _stdin_starts_with_binary_stream_magic():
+        result = entries_from_binary_stream(sys.stdin.buffer.read())
+
+    if result is not None:
+        for entry in result:
+            entry.source = "-"
+
+    return result
+
+
+def entry_from_stdin_without_parsing_or_none() -> Optional[Entry]:
+    """
+    if stdin carries an entry which doesn't need to be parsed from STAR text return it [see
+    entries_from_stdin_without_parsing_or_none]
+
+    can throw a BadNefFileException if stdin carries more than one entry
+
+    :return: the entry or None if stdin needs to be read as text
+    """
+    entries = entries_from_stdin_without_parsing_or_none()
+
+    result = None
+    if entries is not None:
+        if len(entries) != 1:
+            raise BadNefFileException(
+                f"expected a single entry on stdin but got {len(entries)}"
+            )
+        result = entries[0]
+
+    return result
+
+
+def _binary_stream_requested() -> bool:
+    return os.environ.get(NEF_STREAM_FORMAT_ENV, "").lower() == StreamFormat.BINARY
+
+
+def _stdout_is_pipe() -> bool:
+    try:
+        result = stat.S_ISFIFO(os.fstat(sys.stdout.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        result = False
+
+    return result
+
+
+def _stdin_starts_with_binary_stream_magic() -> bool:
+
+    buffer = getattr(sys.stdin, "buffer", None)
+
+    start = b""
+    try:
+        if hasattr(buffer, "peek"):
+            start = buffer.peek(len(BINARY_STREAM_MAGIC))
+        elif buffer is not None and buffer.seekable():
+            position = buffer.tell()
+            start = buffer.read(len(BINARY_STREAM_MAGIC))
+            buffer.seek(position)
+    except (OSError, ValueError):
+        start = b""
+
+    return start[: len(BINARY_STREAM_MAGIC)] == BINARY_STREAM_MAGIC
+
+
+def _value_to_text(value: Any) -> str:
+    # matches the conversions pynmrstar makes when it writes values
+    if value.__class__ is str and value:
+        result = value
+    elif value in STR_CONVERSION_DICT and any(
+        isinstance(value, type(key)) for key in STR_CONVERSION_DICT
+    ):
+        result = STR_CONVERSION_DICT[value]
+    else:
+        result = str(value)
 
-        name_selectors = [f"*{selector}*" for selector in name_selectors]
-        result = match_frames(frames, name_selectors)
+    return result
+
+
+def entry_to_binary_stream(entry: Entry) -> bytes:
+    """
+    encode an entry in the binary stream format used to hand entries between nef commands connected by a pipe.
+    Values are stored as the strings pynmrstar would write and loops as columns of strings, so decoding gives
+    the same entry as parsing the entry's STAR text
+
+    :param entry: the entry to encode
+    :return: the encoded entry including the magic header and the length of the payload
+    """
+
+    frames = []
+    for frame in entry:
+        tags = [(name, _value_to_text(value)) for name, value in frame.tags]
+
+        loops = []
+        for loop in frame.loops:
+            columns = [
+                [_value_to_text(value) for value in column]
+                for column in zip(*loop.data)
+            ]
+            loops.append((loop.category, loop.tags, len(loop.data), columns))
+
+        frames.append((frame.name, frame.tag_prefix, tags, loops))
+
+    payload = marshal.dumps((BINARY_STREAM_VERSION, entry.entry_id, frames))
+
+    return BINARY_STREAM_MAGIC + _BINARY_STREAM_LENGTH.pack(len(payload)) + payload
+
+
+def entries_from_binary_stream(data: bytes) -> List[Entry]:
+    """
+    decode the entries in a binary stream, a stream can contain multiple entries each with its own header
+
+    can throw a BadNefFileException if the stream is truncated or not a binary stream
+
+    :param data: the bytes of the stream
+    :return: the entries in the stream
+    """
+
+    result = []
+
+    header_length = len(BINARY_STREAM_MAGIC) + _BINARY_STREAM_LENGTH.size
+
+    offset = 0
+    while offset < len(data):
+        header = data[offset : offset + header_length]
+        if len(header) != header_length or not header.startswith(BINARY_STREAM_MAGIC):
+            raise BadNefFileException(
+                f"bad binary nef stream, expected a header at byte {offset}"
+            )
+
+        (payload_length,) = _BINARY_STREAM_LENGTH.unpack(
+            header[len(BINARY_STREAM_MAGIC) :]
+        )
+        offset += header_length
 
-    return tuple(result.values())
+        payload = data[offset : offset + payload_length]
+        if len(payload) != payload_length:
+            raise BadNefFileException("bad binary nef stream, the stream is truncated")
+        offset += payload_length
+
+        version, entry_id, frames = marshal.loads(payload)
+        if version != BINARY_STREAM_VERSION:
+            msg = f"unsupported binary nef stream version {version} expected {BINARY_STREAM_VERSION}"
+            raise BadNefFileException(msg)
+
+        result.append(_entry_from_binary_frames(entry_id, frames))
+
+    return result
+
+
+def _entry_from_binary_frames(entry_id: str, frames: List[Tuple]) -> Entry:
+    entry = Entry.from_scratch(entry_id)
+
+    for name, tag_prefix, tags, loops in frames:
+        frame = Saveframe.from_scratch(name, tag_prefix)
+        for tag, value in tags:
+            frame.add_tag(tag, value)
+
+        for category, loop_tags, row_count, columns in loops:
+            loop = Loop.from_scratch(category)
+            loop.add_tag(loop_tags)
+            loop.data = (
+                [list(row) for row in zip(*columns)]
+                if columns
+                else [[] for _ in range(row_count)]
+            )
+            frame.add_loop(loop)
+
+        entry.add_saveframe(frame)
+
+    return entry
+
+
+def entries_are_written_as_text() -> bool:
+    """
+    will write_entry_to_stdout write entries as STAR text, it doesn't if stdout is an EntryStream or the binary
+    stream format has been requested and stdout is a pipe
+
+    :return: True if entries are written to stdout as text
+    """
+    return not isinstance(sys.stdout, EntryStream) and not (
+        _binary_stream_requested() and _stdout_is_pipe()
+    )
+
+
+def write_entry_to_stdout(entry: Entry):
+    """
+    write an entry to stdout, if stdout is an EntryStream [we are a stage in an in process pipeline] the entry
+    is handed on to the next stage without being serialised. If the binary stream format has been requested by
+    setting the environment variable NEF_PIPELINES_STREAM_FORMAT=binary and stdout is a pipe the entry is written
+    in the binary stream format, otherwise it is written as STAR text
+
+    :param entry: the entry to write
+    """
+    if isinstance(sys.stdout, EntryStream):
+        sys.stdout.write_entry(entry)
+    elif not entries_are_written_as_text():
+        sys.stdout.flush()
+        sys.stdout.buffer.write(entry_to_binary_stream(entry))
+        sys.stdout.buffer.flush()
+    else:
+        print(entry)
 
 
 # refactor to two functions one of which gets a TextIO
@@ -221,16 +843,12 @@ def create_entry_from_stdin() -> Optional[Entry]:
     """
 
     try:
-        entry = None
+        entry = entry_from_stdin_without_parsing_or_none()
+        if entry is not None:
+            return entry
+
         if not sys.stdin.isatty() or running_in_pycharm():
-            stdin_lines = sys.stdin.read()
-            if stdin_lines is None:
-                lines = ""
-            else:
-                lines = "".join(stdin_lines)
-
-            if len(lines.strip()) != 0:
-                entry = Entry.from_string(lines)
+            entry = _lazy_entry_from_lines(sys.stdin, "stdin")
     except ParsingError as e:
         raise BadNefFileException(str(e)) from e
 
@@ -240,6 +858,13 @@ def create_entry_from_stdin() -> Optional[Entry]:
     return entry
 
 
+def _lazy_entry_from_lines(lines, source: str) -> Optional[Entry]:
+    # avoid a circular import
+    from nef_pipelines.lib.nef_stream_lib import lazy_entry_from_lines
+
+    return lazy_entry_from_lines(lines, source)
+
+
 def read_file_or_exit(file_path: Path) -> List[str]:
     """
     read the contents of a file or exit with error
@@ -270,114 +895,355 @@ def read_entry_from_stdin_or_exit() -> Entry:
         exit_error("you appear to be reading from an empty stdin")
 
     try:
-        stdin_lines = sys.stdin.read()
-        if stdin_lines is None:
-            lines = [
-                "",
-            ]
-        lines = "".join(stdin_lines)
+        entry = entry_from_stdin_without_parsing_or_none()
+    except BadNefFileException as e:
+        exit_error(f"failed to read nef entry from stdin because: {e}", e)
+
+    if entry is not None:
+        return entry
+
+    try:
+        entry = _lazy_entry_from_lines(sys.stdin, "stdin")
     except IOError as e:
         exit_error(
             f"failed to read stdin because: {e}",
             e,
         )
-
-    if len(lines.strip()) == 0:
-        exit_error("stdin is empty")
-
-    try:
-        entry = Entry.from_string(lines)
-
-    except ParsingError as e:
+    except (BadNefFileException, ParsingError) as e:
         exit_error(
             f"failed to read nef entry from stdin because the NEF parser replied: {e}",
             e,
         )
 
+    if entry is None:
+        exit_error("stdin is empty")
+
     entry.source = "-"
 
     return entry
 
 
-class RowDict(MutableMapping):
-    def __init__(self, loop: Loop, row: int, convert: bool):
-        super().__init__()
-        self._data = row
+class LoopTable:
+    """
+    a columnar view of a pynmrstar Loop. Values are converted from strings a whole column at a time when the column
+    is first used, rather than every time a cell is read, and rows are light weight LoopRow views which share the
+    table's tag index. The conversions are the same as do_reasonable_type_conversions, nulls [. and ?] and values
+    which aren't strings are left unchanged
+
+    note: changes made to loop.data directly rather than through a LoopRow aren't seen in columns that have
+    already been converted
+    """
+
+    def __init__(self, loop: Loop, convert: bool = True):
+        """
+        :param loop: the Loop
+        :param convert: try to convert values to ints, floats or bools if possible [default is True]
+        """
+
+        if not isinstance(loop, Loop):
+            msg = f"""\
+                loop must be of type Loop you provided a {loop.__class__.__name__}"
+                value: {loop}
+            """
+            raise Exception(msg)
+
+        self.loop = loop
+        self.tags = loop.tags
+        self.tag_indices = {tag: index for index, tag in enumerate(self.tags)}
+
         self._convert = convert
-        self._tag_to_index = {tag: i for i, tag in enumerate(loop.tags)}
-        self._tag_types = {
-            tag: type(value) for tag, value in zip(loop.tags, self._data)
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.loop.data)
+
+    def __iter__(self) -> Iterator["LoopRow"]:
+        for row_index in range(len(self.loop.data)):
+            yield LoopRow(self, row_index)
+
+    def __getitem__(self, row_index: int) -> "LoopRow":
+        if not -len(self) <= row_index < len(self):
+            raise IndexError(f"row {row_index} is out of range for {len(self)} rows")
+
+        return LoopRow(self, row_index % len(self))
+
+    def column(self, tag: str) -> List[Any]:
+        """
+        the values in a column, converted if requested. The list is shared with the table, don't modify it
+
+        :param tag: the tag of the column
+        :return: the column's values
+        """
+        column = self._columns.get(tag)
+
+        if column is None:
+            index = self.tag_indices[tag]
+            column = [row[index] for row in self.loop.data]
+            if self._convert:
+                column = _convert_column(column)
+            self._columns[tag] = column
+
+        return column
+
+    def column_type(self, tag: str) -> Optional[type]:
+        """
+        the type of the non null values in a column
+
+        :param tag: the tag of the column
+        :return: the type or None if the column has values of more than one type or only contains nulls
+        """
+        types = {
+            value.__class__ for value in self.column(tag) if value not in NEF_NULLS
         }
 
+        return types.pop() if len(types) == 1 else None
+
+    def float_column(self, tag: str) -> array:
+        """
+        the values of a numeric column as an array of doubles, nulls become nan
+
+        can throw a ValueError if the column contains a value which isn't a number
+
+        :param tag: the tag of the column
+        :return: an array('d') of the column's values
+        """
+        return array(
+            "d",
+            [nan if value in NEF_NULLS else float(value) for value in self.column(tag)],
+        )
+
+    def _set_value(self, row_index: int, tag: str, value: Any):
+        index = self.tag_indices[tag]
+        row = self.loop.data[row_index]
+
+        # keep loops read from text as text
+        if isinstance(row[index], str) and not isinstance(value, str):
+            value = str(value)
+
+        row[index] = value
+
+        if tag in self._columns:
+            self._columns[tag][row_index] = (
+                do_reasonable_type_conversions(value) if self._convert else value
+            )
+
+
+class LoopRow(MutableMapping):
+    """
+    a view of a row of a LoopTable as a dictionary, values are read from the table's columns and are written back
+    to the loop, deleting a value sets it to UNUSED
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: LoopTable, index: int):
+        self._table = table
+        self._index = index
+
     def __len__(self):
-        return len(self._data)
+        return len(self._table.tags)
 
     def __iter__(self):
-        return iter(self._tag_to_index.keys())
+        return iter(self._table.tags)
 
-    def __delitem__(self, key):
-        self._data[self._tag_to_index[key]] = UNUSED
+    def __contains__(self, key):
+        return key in self._table.tag_indices
 
     def __getitem__(self, key):
-        index = self._tag_to_index[key]
-        value = self._data[index]
-        if self._convert:
-            value = do_reasonable_type_conversions(value)
-        return value
+        column = self._table._columns.get(key)
+        if column is None:
+            column = self._table.column(key)
+
+        return column[self._index]
 
     def __setitem__(self, key, value):
-        index = self._tag_to_index[key]
-        if self._tag_types[key] == str and not isinstance(value, str):
-            value = str(value)
-        self._data[index] = value
+        self._table._set_value(self._index, key, value)
+
+    def __delitem__(self, key):
+        self._table._set_value(self._index, key, UNUSED)
 
     def __repr__(self):
-        row = {key: self._data[index] for key, index in self._tag_to_index.items()}
-        return str(row)
+        row = self._table.loop.data[self._index]
+        return str({tag: row[index] for tag, index in self._table.tag_indices.items()})
 
     def __str__(self):
         return self.__repr__()
 
-    # def __getattribute__(self, item):
-    #     print(item)
-    #     try:
-    #         return self[item]
-    #     except Exception:
-    #         return object.__getattribute__(self, item)
-    #
-    # def __setattr__(self, item, value):
-    #     if hasattr(self, item):
-    #         self[item] = value
-    #     else:
-    #         return super().__setattr__(item, value)
-    #
-    # def __delattr__(self, key):
-    #     self.__delitem__(key)
-
-
-# TODO we should examine columns for types not individual rows entries
+
+class LoopBuilder:
+    """
+    collect the rows of a loop and install them in the loop in one step. Loop.add_data converts, checks and
+    copies its data on every call and looks up the tag of every value, so adding rows one at a time is slow for
+    large loops. Rows can be given as dictionaries keyed by tag [missing tags are left as None which is written
+    as .], as sequences of values in tag order or as columns
+
+    e.g.
+
+    builder = LoopBuilder("nef_sequence", ["index", "chain_code"])
+    builder.add_row({"index": 1, "chain_code": "A"})
+    builder.add_row([2, "A"])
+    loop = builder.build()
+    """
+
+    def __init__(
+        self, loop_or_category: Union[Loop, str], tags: Optional[List[str]] = None
+    ):
+        """
+        :param loop_or_category: the loop to add rows to or the category of a new loop
+        :param tags: tags to add to the loop, nested lists of tags are flattened
+        """
+
+        if isinstance(loop_or_category, Loop):
+            self.loop = loop_or_category
+        else:
+            self.loop = Loop.from_scratch(loop_or_category)
+
+        if tags:
+            self.loop.add_tag(tags)
+
+        self.tags = self.loop.tags
+        self.tag_indices = {tag: index for index, tag in enumerate(self.tags)}
+
+        self._rows = []
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add_row(self, row: Union[Dict[str, Any], List[Any], Tuple[Any, ...]]):
+        """
+        add a row to the loop
+
+        :param row: a dictionary of values keyed by tag or a sequence of values in tag order
+        """
+
+        if isinstance(row, dict):
+            values = [None] * len(self.tags)
+            tag_indices = self.tag_indices
+            for tag, value in row.items():
+                index = tag_indices.get(tag)
+                if index is None:
+                    index = self._tag_index_or_raise(tag)
+                values[index] = value
+        else:
+            if len(row) != len(self.tags):
+                msg = f"""\
+                    the row has {len(row)} values but the loop {self.loop.category} has {len(self.tags)} tags
+                    row: {row}
+                """
+                raise ValueError(msg)
+            values = list(row)
+
+        self._rows.append(values)
+
+    def add_rows(
+        self, rows: Iterable[Union[Dict[str, Any], List[Any], Tuple[Any, ...]]]
+    ):
+        """
+        add rows to the loop
+
+        :param rows: dictionaries of values keyed by tag or sequences of values in tag order
+        """
+        for row in rows:
+            self.add_row(row)
+
+    def add_columns(self, columns: Dict[str, List[Any]]):
+        """
+        add rows to the loop from columns of values, tags without a column are left as None
+
+        :param columns: lists of values keyed by tag, all the lists must be the same length
+        """
+
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            msg = f"""\
+                all the columns added to the loop {self.loop.category} must be the same length
+                the lengths were {', '.join([str(length) for length in sorted(lengths)])}
+            """
+            raise ValueError(msg)
+
+        num_rows = lengths.pop() if lengths else 0
+        column_indices = [self._tag_index_or_raise(tag) for tag in columns]
+
+        rows = [[None] * len(self.tags) for _ in range(num_rows)]
+        for index, values in zip(column_indices, columns.values()):
+            for row, value in zip(rows, values):
+                row[index] = value
+
+        self._rows.extend(rows)
+
+    def build(self) -> Loop:
+        """
+        install the collected rows in the loop, the builder can be reused to add more rows afterwards
+
+        :return: the loop
+        """
+
+        self.loop.data.extend(self._rows)
+        self._rows = []
+
+        return self.loop
+
+    def _tag_index_or_raise(self, tag: str) -> int:
+
+        # tags can be given with their category and in any case as for Loop.add_data
+        lower_case_tag = tag.lower().split(".")[-1]
+        for index, loop_tag in enumerate(self.tags):
+            if loop_tag.lower() == lower_case_tag:
+                return index
+
+        msg = f"""\
+            the tag {tag} isn't in the loop {self.loop.category}
+            the available tags are {', '.join(self.tags)}
+        """
+        raise ValueError(msg)
+
+
+def _convert_column(values: List[Any]) -> List[Any]:
+
+    result = None
+
+    # fast paths for the common cases of columns of integers [indices, ids etc] or floats [positions, heights etc]
+    # with nulls, anything else is converted a value at a time
+    if all(value.__class__ is str for value in values):
+        try:
+            result = [value if value in NEF_NULLS else int(value) for value in values]
+        except ValueError:
+            pass
+
+        if result is None:
+            try:
+                result = [
+                    value if value in NEF_NULLS else float(value) for value in values
+                ]
+            except ValueError:
+                pass
+
+            # values which look like ints are converted to ints as do_reasonable_type_conversions does
+            if result is not None:
+                for index, value in enumerate(result):
+                    if value.__class__ is float and value.is_integer():
+                        result[index] = do_reasonable_type_conversions(values[index])
+
+    if result is None:
+        result = [do_reasonable_type_conversions(value) for value in values]
+
+    return result
+
+
 # TODO we should rename this loop_row_iter
 def loop_row_dict_iter(
     loop: Loop, convert: bool = True
 ) -> Iterator[Dict[str, Union[str, int, float]]]:
     """
     create an iterator that loops over the rows in a star file Loop as dictionaries, by default sensible
-    conversions from strings to ints and floats are made
+    conversions from strings to ints and floats are made [see LoopTable which is used to do the conversions a
+    column at a time]
     :param loop: the Loop
     :param convert: try to convert values to ints or floats if possible [default is True]
     :return: iterator of rows as dictionaries
     """
 
-    if not isinstance(loop, Loop):
-        msg = f"""\
-            loop must be of type Loop you provided a {loop.__class__.__name__}"
-            value: {loop}
-        """
-        raise Exception(msg)
-
-    for i, row in enumerate(loop):
-        result = RowDict(loop, row, convert)
-        yield result
+    return iter(LoopTable(loop, convert))
 
 
 def do_reasonable_type_conversions(value: str) -> Union[str, float, int]:
@@ -408,8 +1274,7 @@ def loop_row_namespace_iter(loop: Loop, convert: bool = True) -> Iterator[Namesp
     :param convert: try to convert values to ints or floats if possible [default is True]
     :return: iterator of rows as dictionaries
 
-    NOTE: This function is effectively replaced by loop_row_dict_iter, which returns a RowDict object
-          with support for attribute lookup
+    NOTE: This function is effectively replaced by loop_row_dict_iter, which returns LoopRow objects
     """
     for row in loop_row_dict_iter(loop, convert=convert):
         # yield row needs more tests modified
@@ -439,34 +1304,14 @@ def select_frames(
     if not predicate:
         predicate = ["*"]
 
-    star_filters = [f"*{filter}*" for filter in predicate]
-    predicate = list(predicate)
-    predicate.extend(star_filters)
-
-    result = {}
-    for frame in entry.frame_dict.values():
+    # anything a filter matches it also matches with * added at both ends, so only the wildcards are needed
+    selectors = compile_frame_selectors(tuple(predicate), wildcard=True)
 
-        if frame.category is not None:
-            accept_frame_category = any(
-                [fnmatch(frame.category, filter) for filter in predicate]
-            )
-        else:
-            accept_frame_category = False
-        accept_frame_name = any([fnmatch(frame.name, filter) for filter in predicate])
-
-        if (
-            selector_type in (SelectionType.NAME, SelectionType.ANY)
-            and accept_frame_name
-        ):
-            result[frame.category, frame.name] = frame
-
-        if (
-            selector_type in (SelectionType.CATEGORY, SelectionType.ANY)
-            and accept_frame_category
-        ):
-            result[frame.category, frame.name] = frame
-
-    return list(result.values()) if result else []
+    return get_entry_index(entry).select(
+        selectors,
+        names=selector_type in (SelectionType.NAME, SelectionType.ANY),
+        categories=selector_type in (SelectionType.CATEGORY, SelectionType.ANY),
+    )
 
 
 def read_entry_from_file_or_stdin_or_exit_error(file: Path) -> Entry:
@@ -498,10 +1343,17 @@ def read_entry_from_file_or_exit_error(file):
         exit_error(f"the file {file} doesn't exist or isn't a file")
     try:
         with open(file) as fh:
-            entry = Entry.from_file(fh)
+            entry = _lazy_entry_from_lines(fh, f"the file {file}")
 
     except IOError as e:
         exit_error(f"couldn't read from the file {file}", e)
+    except (BadNefFileException, ParsingError) as e:
+        exit_error(f"couldn't read a nef entry from the file {file} because {e}", e)
+
+    if entry is None:
+        exit_error(f"the file {file} doesn't contain a nef entry")
+
+    entry.source = str(file)
 
     return entry
 
@@ -526,7 +1378,9 @@ def read_or_create_entry_exit_error_on_bad_file(
         else:
             try:
                 with open(file) as fh:
-                    entry = Entry.from_file(fh)
+                    entry = _lazy_entry_from_lines(fh, f"the file {file}")
+                if entry is not None:
+                    entry.source = str(file)
                     _parse_globals(entry)
 
             except IOError as e:
@@ -639,11 +1493,13 @@ def add_frames_to_entry(entry: Entry, frames: List[Saveframe]) -> Entry:
 
     fixup_metadata(entry, NEF_PIPELINES, get_version(), script_name(__file__))
 
+    entry_index = get_entry_index(entry)
+
     for frame in frames:
 
         new_frame_name = frame.name
 
-        frame_in_entry = is_save_frame_name_in_entry(entry, new_frame_name)
+        frame_in_entry = new_frame_name in entry_index
 
         if frame_in_entry:
             msg = (
@@ -652,7 +1508,7 @@ def add_frames_to_entry(entry: Entry, frames: List[Saveframe]) -> Entry:
             )
             exit_error(msg)
 
-        entry.add_saveframe(frame)
+        entry_index.add_saveframe(frame)
 
     return entry
 
@@ -664,13 +1520,7 @@ def is_save_frame_name_in_entry(entry: Entry, frame_name: str) -> bool:
     :param frame_name: the frame name
     :return: if a savefame with the name is present
     """
-    frame_in_entry = True
-    try:
-        entry.get_saveframe_by_name(frame_name)
-    except KeyError:
-        frame_in_entry = False
-
-    return frame_in_entry
+    return frame_name in get_entry_index(entry)
 
 
 def set_column(loop: Loop, column: Union[int, str], values: List[Any]) -> Loop:
@@ -0,0 +1,531 @@
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+from pynmrstar import Entry, Saveframe
+from pynmrstar.exceptions import ParsingError
+
+from nef_pipelines.lib.nef_lib import (
+    BadNefFileException,
+    entries_are_written_as_text,
+    entries_from_stdin_without_parsing_or_none,
+    write_entry_to_stdout,
+)
+from nef_pipelines.lib.util import STDIN, exit_error
+
+DATA_PREFIX = "data_"
+SAVE_PREFIX = "save_"
+SEMICOLON = ";"
+COMMENT = "#"
+SF_CATEGORY_SUFFIX = ".sf_category"
+QUOTES = "'\""
+
+
+@dataclass
+class EntryStart:
+    """
+    marks the start of an entry [a data_ block] in a stream of frames
+    """
+
+    entry_id: str
+
+
+@dataclass
+class RawSaveframe:
+    """
+    the text of a save frame read from a stream without being parsed, the name and category are found by a
+    fast scan of the text so frames which are passed through unchanged never need to be tokenised. The line
+    number and source are only used to report errors
+    """
+
+    name: str
+    category: Optional[str]
+    text: str
+    line_number: int = 1
+    source: Optional[str] = None
+
+    def parse(self) -> Saveframe:
+        """
+        parse the text of the frame
+
+        can throw a BadNefFileException if the frame can't be parsed, line numbers in the error are lines
+        of the source rather than the frame
+
+        :return: the parsed save frame
+        """
+        try:
+            result = Saveframe.from_string(self.text)
+        except ParsingError as e:
+            if e.line_number is not None:
+                e = ParsingError(e.message, e.line_number + self.line_number - 1)
+            raise BadNefFileException(
+                f"couldn't parse the frame {self.name} because {e}"
+            ) from e
+        except ValueError as e:
+            raise BadNefFileException(
+                f"couldn't parse the frame {self.name} because {e}"
+            ) from e
+
+        return result
+
+    def parse_or_exit_error(self) -> Saveframe:
+        """
+        parse the text of the frame or exit with an error reporting where the frame came from
+
+        :return: the parsed save frame
+        """
+
+        try:
+            result = self.parse()
+        except BadNefFileException as e:
+            source = self.source if self.source else "the input"
+            exit_error(
+                f"failed to read nef entry from {source} because the NEF parser replied: {e}"
+            )
+
+        return result
+
+
+class LazySaveframe(Saveframe):
+    """
+    a pynmrstar Saveframe which holds the text of the frame and is only parsed when its contents are first used,
+    the name and category are available without parsing. Until it is parsed the frame is written back as its
+    original text, so frames which aren't touched keep their exact formatting.
+
+    frames which can't be parsed aren't found until they are used, the program then exits with an error giving
+    the line in the source of the entry where parsing failed
+    """
+
+    # noinspection PyMissingConstructor
+    def __init__(
+        self,
+        name: str,
+        category: Optional[str],
+        text: str,
+        line_number: int = 1,
+        source: Optional[str] = None,
+    ):
+        # Saveframe.__init__ isn't called, the attributes it sets are copied from the parsed frame on first use
+        self._name = name
+        self._category = category
+        self._text = text
+        self._line_number = line_number
+        self._source = source
+
+    @classmethod
+    def from_raw(cls, raw_frame: RawSaveframe) -> "LazySaveframe":
+        return cls(
+            raw_frame.name,
+            raw_frame.category,
+            raw_frame.text,
+            raw_frame.line_number,
+            raw_frame.source,
+        )
+
+    def is_parsed(self) -> bool:
+        """
+        has the frame been parsed
+        :return: True if the frame has been parsed
+        """
+        return "_text" not in self.__dict__
+
+    def __getattr__(self, name):
+        # only called for attributes which haven't been set, which are the contents of the frame before parsing
+        if name.startswith("__") or self.is_parsed():
+            raise AttributeError(
+                f"{type(self).__name__} object has no attribute '{name}'"
+            )
+
+        self._parse()
+
+        return getattr(self, name)
+
+    def validate(self):
+        """
+        check the text of an unparsed frame can be parsed without replacing the text, so it will still be written
+        verbatim
+
+        can throw a BadNefFileException if the frame can't be parsed
+        """
+        if not self.is_parsed():
+            self._raw_frame().parse()
+
+    def _raw_frame(self) -> RawSaveframe:
+        return RawSaveframe(
+            self._name, self._category, self._text, self._line_number, self._source
+        )
+
+    def _parse(self):
+        # the frame is parsed when code that doesn't expect errors reads its contents so errors exit here
+        parsed = self._raw_frame().parse_or_exit_error()
+
+        # anything set before parsing [e.g. a new name] is kept
+        for attribute, value in vars(parsed).items():
+            self.__dict__.setdefault(attribute, value)
+
+        del self._text
+
+    def __str__(
+        self,
+        first_in_category: bool = True,
+        skip_empty_loops: bool = False,
+        skip_empty_tags: bool = False,
+        show_comments: bool = True,
+    ) -> str:
+        if self.is_parsed():
+            result = super().__str__(
+                first_in_category=first_in_category,
+                skip_empty_loops=skip_empty_loops,
+                skip_empty_tags=skip_empty_tags,
+                show_comments=show_comments,
+            )
+        else:
+            result = self._text
+
+        return result
+
+
+class LazyEntry(Entry):
+    """
+    a pynmrstar Entry containing LazySaveframes, frames are selected by category without parsing them
+    """
+
+    def get_saveframes_by_category(self, value: str) -> List[Saveframe]:
+        return [frame for frame in self._frame_list if frame.category == value]
+
+
+def parse_lazy_frames(entry: Entry):
+    """
+    parse any LazySaveframes in an entry which haven't been parsed, the entry will then be written with pynmrstar's
+    formatting rather than the original text of the frames. Exits with an error if a frame can't be parsed
+
+    :param entry: the entry
+    """
+    for frame in entry:
+        if isinstance(frame, LazySaveframe) and not frame.is_parsed():
+            frame._parse()
+
+
+StreamItem = Union[EntryStart, RawSaveframe, Saveframe]
+
+
+def iter_raw_entry_items(
+    lines: Iterable[str], source: Optional[str] = None
+) -> Iterator[Union[EntryStart, RawSaveframe]]:
+    """
+    scan lines of NEF text and yield the start of each entry and the raw text of each save frame in order.
+    Only the boundaries of data_ blocks, save frames and semicolon delimited strings are detected so the text
+    is never tokenised, comments outside save frames are dropped
+
+    can throw a BadNefFileException if there is text other than comments outside save frames, a frame isn't inside
+    an entry or a frame or string isn't terminated
+
+    :param lines: the lines of text, typically a file or stdin which are read in buffered chunks
+    :param source: where the lines came from [e.g. stdin or the file x.nef] for reporting errors in the frames
+    :return: an iterator of EntryStart and RawSaveframe items
+    """
+
+    in_entry = False
+    in_semicolon_string = False
+
+    frame_name = None
+    frame_category = None
+    frame_lines = []
+    frame_line_number = 1
+
+    for line_number, line in enumerate(lines, start=1):
+
+        if in_semicolon_string:
+            frame_lines.append(line)
+            if line.startswith(SEMICOLON):
+                in_semicolon_string = False
+            continue
+
+        if line.startswith(SEMICOLON):
+            if frame_name is None:
+                raise BadNefFileException(
+                    f"a semicolon delimited string at line {line_number} is outside a save frame"
+                )
+            frame_lines.append(line)
+            in_semicolon_string = True
+            continue
+
+        stripped = line.lstrip()
+
+        if frame_name is None:
+            if stripped.startswith(DATA_PREFIX):
+                in_entry = True
+                yield EntryStart(stripped.split()[0][len(DATA_PREFIX) :])
+
+            elif stripped.startswith(SAVE_PREFIX):
+                if not in_entry:
+                    raise BadNefFileException(
+                        f"the save frame at line {line_number} isn't inside a data_ block"
+                    )
+                frame_name = stripped.split()[0][len(SAVE_PREFIX) :]
+                frame_category = None
+                frame_lines = [line]
+                frame_line_number = line_number
+
+            elif stripped and not stripped.startswith(COMMENT):
+                raise BadNefFileException(
+                    f"unexpected text outside a save frame at line {line_number}: {stripped.strip()}"
+                )
+
+            continue
+
+        frame_lines.append(line)
+
+        if stripped.startswith(SAVE_PREFIX):
+            if stripped.split()[0] != SAVE_PREFIX:
+                msg = f"the save frame {frame_name} isn't terminated before the save frame at line {line_number}"
+                raise BadNefFileException(msg)
+
+            yield _build_raw_frame(
+                frame_name, frame_category, frame_lines, frame_line_number, source
+            )
+
+            frame_name = None
+
+        elif frame_category is None and stripped.startswith("_"):
+            fields = stripped.split(None, 2)
+            if len(fields) > 1 and fields[0].endswith(SF_CATEGORY_SUFFIX):
+                frame_category = fields[1].strip(QUOTES)
+
+    if in_semicolon_string:
+        raise BadNefFileException(
+            f"a semicolon delimited string in the save frame {frame_name} isn't terminated"
+        )
+
+    if frame_name is not None:
+        raise BadNefFileException(f"the save frame {frame_name} isn't terminated")
+
+
+def _build_raw_frame(name, category, lines, line_number, source):
+
+    if not lines[-1].endswith("\n"):
+        lines[-1] = f"{lines[-1]}\n"
+
+    result = RawSaveframe(name, category, "".join(lines), line_number, source)
+
+    # the category wasn't on a simple line, so fall back to the parser
+    if category is None:
+        result.category = result.parse().category
+
+    return result
+
+
+def lazy_entry_from_lines(
+    lines: Iterable[str], source: Optional[str] = None
+) -> Optional[LazyEntry]:
+    """
+    read an entry from lines of NEF text with a fast scan of the frame boundaries, the frames are LazySaveframes
+    which are only parsed when they are first used [e.g. by get_tag, a loop accessor or when they are modified]
+
+    can throw a BadNefFileException if the text isn't a single well formed entry
+
+    :param lines: the lines of text
+    :param source: where the lines came from [e.g. stdin or the file x.nef] for reporting errors in the frames
+    :return: the entry or None if the text doesn't contain an entry
+    """
+
+    result = None
+    for entry in iter_lazy_entries(iter_raw_entry_items(lines, source)):
+        if result is not None:
+            msg = f"expected a single entry but found {result.entry_id} and {entry.entry_id}"
+            raise BadNefFileException(msg)
+        result = entry
+
+    return result
+
+
+def iter_lazy_entries(items: Iterable[StreamItem]) -> Iterator[LazyEntry]:
+    """
+    build entries from a stream of items [e.g. from iter_raw_entry_items], raw frames become LazySaveframes so
+    they are only parsed if they are used and parsed frames are added as they are. Each entry is yielded when
+    the next one starts or the items end
+
+    can throw a BadNefFileException if a frame is repeated in an entry
+
+    :param items: EntryStart, RawSaveframe and Saveframe items
+    :return: an iterator of entries
+    """
+
+    entry = None
+    for item in items:
+        if isinstance(item, EntryStart):
+            if entry is not None:
+                yield entry
+            entry = LazyEntry.from_scratch(item.entry_id)
+        else:
+            frame = (
+                LazySaveframe.from_raw(item) if isinstance(item, RawSaveframe) else item
+            )
+            try:
+                entry.add_saveframe(frame)
+            except ValueError as e:
+                raise BadNefFileException(str(e)) from e
+
+    if entry is not None:
+        yield entry
+
+
+def iter_entry_items_from_file_or_stdin_or_exit_error(
+    file: Optional[Path],
+) -> Iterator[StreamItem]:
+    """
+    read the entries in a file or stdin one frame at a time or exit with an error. Text is scanned a line at a time
+    and the frames are yielded as RawSaveframes, if stdin carries entries which don't need to be parsed [from an in
+    process pipeline or the binary stream format] their Saveframes are yielded directly
+
+    only the boundaries of the frames are checked, the contents of a RawSaveframe aren't checked until it is
+    parsed. Commands which pass frames through can validate them with EntryStreamWriter(validate=True), otherwise
+    errors are found by the first command in a pipeline which uses the frame, the text is passed on unchanged so
+    the line numbers reported are the same
+
+    :param file: the file to read, None or - indicates stdin
+    :return: an iterator of EntryStart, RawSaveframe and Saveframe items
+    """
+
+    if file is None or file == STDIN:
+        yield from _iter_entry_items_from_stdin_or_exit_error()
+    else:
+        yield from _iter_entry_items_from_file_or_exit_error(file)
+
+
+def _iter_entry_items_from_stdin_or_exit_error() -> Iterator[StreamItem]:
+
+    if sys.stdin.isatty():
+        exit_error("you appear to be reading from an empty stdin")
+
+    try:
+        entries = entries_from_stdin_without_parsing_or_none()
+    except BadNefFileException as e:
+        exit_error(f"failed to read nef entry from stdin because: {e}", e)
+
+    if entries is not None:
+        for entry in entries:
+            yield EntryStart(entry.entry_id)
+            yield from entry
+    else:
+        yield from _iter_raw_entry_items_or_exit_error(sys.stdin, "stdin")
+
+
+def _iter_entry_items_from_file_or_exit_error(file: Path) -> Iterator[StreamItem]:
+
+    file = Path(file)
+
+    if not file.exists() or not file.is_file():
+        exit_error(f"the file {file} doesn't exist or isn't a file")
+
+    try:
+        with open(file) as fh:
+            yield from _iter_raw_entry_items_or_exit_error(fh, f"the file {file}")
+    except IOError as e:
+        exit_error(f"couldn't read from the file {file}", e)
+
+
+def _iter_raw_entry_items_or_exit_error(
+    lines: Iterable[str], source: str
+) -> Iterator[Union[EntryStart, RawSaveframe]]:
+
+    empty = True
+    try:
+        for item in iter_raw_entry_items(lines, source):
+            empty = False
+            yield item
+    except BadNefFileException as e:
+        exit_error(f"failed to read nef entry from {source} because: {e}", e)
+
+    if empty:
+        exit_error(f"{source} is empty")
+
+
+class EntryStreamWriter:
+    """
+    write entries to stdout a frame at a time. Frames are written as soon as they are received, raw frames as
+    their original text, unless stdout doesn't take text [see entries_are_written_as_text] in which case the
+    entries are built and written with write_entry_to_stdout when they are complete. The text written is the same
+    as print(entry) would produce for an entry read from pynmrstar formatted text
+
+    raw frames written as text aren't parsed unless validate is set, in which case the program exits with an
+    error if one can't be parsed
+
+    use as a context manager or call close to complete the last entry
+    """
+
+    def __init__(self, validate: bool = False):
+        self._validate = validate
+        self._as_text = entries_are_written_as_text()
+        self._entry = None
+        self._entry_open = False
+        self._first_frame = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        if exception_type is None:
+            self.close()
+
+    def start_entry(self, entry_id: str):
+        """
+        complete any current entry and start a new one
+
+        :param entry_id: the id of the new entry
+        """
+
+        self._finish_entry()
+
+        if self._as_text:
+            sys.stdout.write(f"{DATA_PREFIX}{entry_id}\n\n")
+        else:
+            self._entry = Entry.from_scratch(entry_id)
+
+        self._entry_open = True
+        self._first_frame = True
+
+    def write_frame(self, frame: Union[RawSaveframe, Saveframe]):
+        """
+        write a frame to the current entry
+
+        :param frame: a parsed or raw save frame
+        """
+
+        if not self._entry_open:
+            raise ValueError(f"the frame {frame.name} was written before an entry")
+
+        if self._validate and isinstance(frame, RawSaveframe):
+            frame.parse_or_exit_error()
+
+        if self._as_text:
+            if not self._first_frame:
+                sys.stdout.write("\n")
+            sys.stdout.write(
+                frame.text if isinstance(frame, RawSaveframe) else str(frame)
+            )
+        else:
+            self._entry.add_saveframe(
+                frame.parse_or_exit_error()
+                if isinstance(frame, RawSaveframe)
+                else frame
+            )
+
+        self._first_frame = False
+
+    def close(self):
+        """
+        complete the current entry
+        """
+        self._finish_entry()
+
+    def _finish_entry(self):
+        if self._entry_open:
+            if self._as_text:
+                sys.stdout.write("\n")
+            else:
+                write_entry_to_stdout(self._entry)
+
+        self._entry = None
+        self._entry_open = False
@@ -1,4 +1,5 @@
 import copy
+from functools import partial
 from textwrap import dedent
 from typing import Any, Dict, List, Tuple, Union
 
@@ -60,6 +61,8 @@ from nef_pipelines.lib.nef_lib import (
     NEF_NONE,
     NEF_TRUE,
     UNUSED,
+    LoopBuilder,
+    LoopTable,
     loop_row_dict_iter,
 )
 from nef_pipelines.lib.structures import (
@@ -68,7 +71,9 @@ from nef_pipelines.lib.structures import (
     LineInfo,
     NewPeak,
     Residue,
+    RowContext,
     ShiftData,
+    intern_value,
 )
 from nef_pipelines.lib.util import (
     _row_to_table,
@@ -257,7 +262,7 @@ def peaks_to_frame(
     dimension_loop = Loop.from_scratch(SPECTRUM_DIMENSION_LOOP_CATEGORY)
     frame.add_loop(dimension_loop)
 
-    dimension_loop.add_tag(DIMENSION_LOOP_TAGS)
+    dimension_builder = LoopBuilder(dimension_loop, DIMENSION_LOOP_TAGS)
 
     dimensions = copy.deepcopy(dimensions)
     for i, dimension in enumerate(dimensions):
@@ -289,7 +294,8 @@ def peaks_to_frame(
 
         dimension[IS_ACQUISITION] = acquisition
 
-        dimension_loop.add_data([dimension])
+        dimension_builder.add_row(dimension)
+    dimension_builder.build()
 
     transfer_loop = Loop.from_scratch(SPECTRUM_DIMENSION_TRANSFER_LOOP_CATEGORY)
     frame.add_loop(transfer_loop)
@@ -297,7 +303,7 @@ def peaks_to_frame(
     transfer_loop_indices = [{"dimension_index": 1}, {"dimension_index": 2}]
     transfer_loop_tags = _expand_templates(TRANSFER_LOOP_TAGS, transfer_loop_indices)
 
-    transfer_loop.add_tag(transfer_loop_tags)
+    transfer_builder = LoopBuilder(transfer_loop, transfer_loop_tags)
     for dim_index in range(1, len(dimensions)):
         dim_1 = dim_index
         dim_2 = dim_index + 1
@@ -309,11 +315,8 @@ def peaks_to_frame(
             IS_INDIRECT: NEF_FALSE,
         }
 
-        transfer_loop.add_data(
-            [
-                transfer_data,
-            ]
-        )
+        transfer_builder.add_row(transfer_data)
+    transfer_builder.build()
 
     peak_loop = Loop.from_scratch(SPECTRUM_PEAK_LOOP_CATEGORY)
     frame.add_loop(peak_loop)
@@ -331,7 +334,7 @@ def peaks_to_frame(
     if have_merits:
         peak_loop_tags.append(CCPN_MERIT)
 
-    peak_loop.add_tag(peak_loop_tags)
+    peak_builder = LoopBuilder(peak_loop, peak_loop_tags)
 
     for index, peak in enumerate(peaks, start=1):
         peak_data = {
@@ -378,11 +381,8 @@ def peaks_to_frame(
                 peak_data[CCPN_MERIT] = (
                     peak.figure_of_merit if peak.figure_of_merit is not None else UNUSED
                 )
-        peak_loop.add_data(
-            [
-                peak_data,
-            ]
-        )
+        peak_builder.add_row(peak_data)
+    peak_builder.build()
 
     return frame
 
@@ -402,44 +402,44 @@ def frame_to_peaks(frame: Saveframe, source="unknown") -> List[NewPeak]:
 
     peaks = []
 
+    fields = [CHAIN_CODE, SEQUENCE_CODE, RESIDUE_NAME, ATOM_NAME]
+    raw_tags = [
+        CHAIN_CODE__DIMENSION_INDEX,
+        SEQUENCE_CODE__DIMENSION_INDEX,
+        RESIDUE_NAME__DIMENSION_INDEX,
+        ATOM_NAME__DIMENSION_INDEX,
+    ]
+    dimension_tags = {
+        dim_index: [raw_tag.format(dimension_index=dim_index) for raw_tag in raw_tags]
+        for dim_index in range(1, num_dimensions + 1)
+    }
+
+    # peaks typically share a small number of atoms, so each atom label is only created once and residues are shared
+    atom_labels = {}
+    interned = {}
+
     for line_number, row in enumerate(loop_row_dict_iter(loop), start=1):
+
+        # the row is only rendered as a table if an error is reported
+        row_context = RowContext(
+            f"{source}[{frame.name} ]",
+            line_number,
+            partial(_render_loop_row_as_table, loop, line_number - 1),
+        )
+
         shift_data = []
         for dim_index in range(1, num_dimensions + 1):
 
-            values = {}
-            fields = [CHAIN_CODE, SEQUENCE_CODE, RESIDUE_NAME, ATOM_NAME]
-            raw_tags = [
-                CHAIN_CODE__DIMENSION_INDEX,
-                SEQUENCE_CODE__DIMENSION_INDEX,
-                RESIDUE_NAME__DIMENSION_INDEX,
-                ATOM_NAME__DIMENSION_INDEX,
-            ]
-            dimension_tags = [
-                raw_tag.format(dimension_index=dim_index) for raw_tag in raw_tags
-            ]
-            for name, tag in zip(fields, dimension_tags):
-                value = unused_to_empty_string(row[tag])
-                values[name] = value
-
-            residue_values = {
-                key: value
-                for key, value in values.items()
-                if not key.startswith(ATOM_NAME)
-            }
-
-            residue = Residue(**residue_values)
-
-            if values[ATOM_NAME] == "":
-                values[ATOM_NAME] = "?"
-
-            atom_label = AtomLabel(residue, values[ATOM_NAME])
+            atom_values = tuple([row[tag] for tag in dimension_tags[dim_index]])
+
+            atom_label = atom_labels.get(atom_values)
+            if atom_label is None:
+                atom_label = _atom_values_to_atom_label(fields, atom_values, interned)
+                atom_labels[atom_values] = atom_label
 
             position = row[POSITION__DIMENSION_INDEX.format(dimension_index=dim_index)]
 
-            line_info = LineInfo(
-                f"{source}[{frame.name} ]", line_number, _row_to_table(row)
-            )
-            _raise_if_position_isnt_float(position, line_info)
+            _raise_if_position_isnt_float(position, row_context)
 
             position_uncertainty = unused_to_none(
                 row[
@@ -449,7 +449,9 @@ def frame_to_peaks(frame: Saveframe, source="unknown") -> List[NewPeak]:
                 ]
             )
 
-            shift_datum = ShiftData(atom_label, position, position_uncertainty)
+            shift_datum = ShiftData(
+                atom_label, position, position_uncertainty, frame_context=row_context
+            )
 
             shift_data.append(shift_datum)
 
@@ -466,7 +468,31 @@ def frame_to_peaks(frame: Saveframe, source="unknown") -> List[NewPeak]:
     return peaks
 
 
-def _raise_if_position_isnt_float(value: str, line_info: LineInfo):
+def _atom_values_to_atom_label(
+    fields: List[str], atom_values: Tuple, interned: Dict
+) -> AtomLabel:
+
+    values = {
+        name: unused_to_empty_string(value) for name, value in zip(fields, atom_values)
+    }
+
+    residue_values = {
+        key: value for key, value in values.items() if not key.startswith(ATOM_NAME)
+    }
+
+    residue = intern_value(Residue(**residue_values), interned)
+
+    if values[ATOM_NAME] == "":
+        values[ATOM_NAME] = "?"
+
+    return intern_value(AtomLabel(residue, values[ATOM_NAME]), interned)
+
+
+def _render_loop_row_as_table(loop: Loop, row_index: int) -> str:
+    return _row_to_table(dict(LoopTable(loop)[row_index]))
+
+
+def _raise_if_position_isnt_float(value: str, line_info: Union[LineInfo, RowContext]):
     """
     raise an exception if a value which can't be converted to a float
     :param value: the value to check for conversion to a float
@@ -474,7 +500,7 @@ def _raise_if_position_isnt_float(value: str, line_info: LineInfo):
     """
     if not is_float(value):
         msg = f"""
-                    in the spectrum save frame  in {line_info.file_name} at row {line_info.line_number}
+                    in the spectrum save frame  in {line_info.file_name} at row {line_info.line_no}
                     the position wasn't a float: {value}
 
                     processed values from row are:
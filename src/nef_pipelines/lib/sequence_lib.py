@@ -1,18 +1,30 @@
+import functools
 import os
 import string
 from collections import Counter
 from dataclasses import replace
 from enum import auto
+from operator import itemgetter
 from pathlib import Path
 from textwrap import dedent
-from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from ordered_set import OrderedSet
 from pynmrstar import Entry, Loop, Saveframe
 from strenum import LowercaseStrEnum
 
 from nef_pipelines.lib.constants import NEF_UNKNOWN
-from nef_pipelines.lib.nef_lib import UNUSED, loop_row_namespace_iter
+from nef_pipelines.lib.nef_lib import UNUSED, LoopBuilder, loop_row_namespace_iter
 
 # from nef_pipelines.lib.nef_lib import loop_to_dataframe
 from nef_pipelines.lib.structures import AtomLabel, Linking, SequenceResidue
@@ -163,25 +175,25 @@ def sequence_to_nef_frame(
         "cis_peptide",
     )
 
-    nef_loop.add_tag(tags)
+    builder = LoopBuilder(nef_loop, tags)
 
     # TODO need tool to set ionisation correctly
     residue_and_linkages = get_linking(sequences, no_chain_start, no_chain_end)
 
     for index, (sequence_residue, linking) in enumerate(residue_and_linkages):
 
-        data = [
-            {
-                "index": index + 1,
-                "chain_code": sequence_residue.chain_code,
-                "sequence_code": sequence_residue.sequence_code,
-                "residue_name": sequence_residue.residue_name.upper(),
-                "linking": linking,
-                "residue_variant": NEF_UNKNOWN,
-                "cis_peptide": NEF_UNKNOWN,
-            }
-        ]
-        nef_loop.add_data(data)
+        builder.add_row(
+            (
+                index + 1,
+                sequence_residue.chain_code,
+                sequence_residue.sequence_code,
+                sequence_residue.residue_name.upper(),
+                linking,
+                NEF_UNKNOWN,
+                NEF_UNKNOWN,
+            )
+        )
+    builder.build()
 
     return nef_frame
 
@@ -561,9 +573,12 @@ def sequences_from_frames(
         ]
 
     residues = OrderedSet()
+    residues_by_values = {}
     for frame in frame_or_frames:
         for loop in frame.loops:
-            residues.update(_parse_loops_residues(loop, chain_codes_to_select))
+            residues.update(
+                _parse_loops_residues(loop, chain_codes_to_select, residues_by_values)
+            )
 
     return select_best_residues_by_info_content(residues)
 
@@ -653,146 +668,162 @@ def _filter_partially_or_unassigned_residues(residues):
     return result
 
 
-def _parse_loops_residues(loop, chain_codes_to_select):
+# the suffixes of tags in loops which can reference more than one residue per row e.g. chain_code_1
+RESIDUE_TAG_OFFSETS = ("", *[f"_{index}" for index in range(1, 16)])
 
-    offsets = [f"_{index}" for index in range(1, 16)]
-    offsets.insert(0, "")
-    index_sets = []
-    for offset in offsets:
-        if offset == "":
-            linking_tag = f"linking{offset}"
-            linking_index = (
-                loop.tag_index(linking_tag) if linking_tag in loop.tags else None
-            )
+# the number of loop layouts to keep residue extraction plans for
+RESIDUE_PLAN_CACHE_SIZE = 256
 
-            residue_variant_tag = f"residue_variant{offset}"
-            residue_variant_index = (
-                loop.tag_index(residue_variant_tag)
-                if residue_variant_tag in loop.tags
-                else None
-            )
 
-            cis_peptide_tag = f"cis_peptide{offset}"
-            cis_peptide_index = (
-                loop.tag_index(cis_peptide_tag)
-                if cis_peptide_tag in loop.tags
-                else None
-            )
+class _ResidueColumns(NamedTuple):
+    """
+    the columns of a loop which describe one residue in each row, fields is the names of the fields of the
+    residue the values returned by values_getter are for, chain code is always the first
+    """
 
-        chain_code_tag = f"chain_code{offset}"
-        chain_code_index = (
-            loop.tag_index(chain_code_tag) if chain_code_tag in loop.tags else None
-        )
+    chain_code_index: int
+    fields: Tuple[str, ...]
+    values_getter: Callable[[List[str]], Tuple[str, ...]]
 
-        sequence_code_tag = f"sequence_code{offset}"
-        sequence_code_index = (
-            loop.tag_index(sequence_code_tag)
-            if sequence_code_tag in loop.tags
-            else None
-        )
 
-        residue_name_tag = f"residue_name{offset}"
-        residue_name_index = (
-            loop.tag_index(residue_name_tag) if residue_name_tag in loop.tags else None
-        )
+def _parse_loops_residues(
+    loop: Loop,
+    chain_codes_to_select,
+    residues_by_values: Optional[Dict[Tuple, Optional[SequenceResidue]]] = None,
+) -> List[SequenceResidue]:
+    """
+    read the residues referenced by the rows of a loop using an extraction plan for the loop's tags
 
-        if chain_code_index is None and sequence_code_index is None:
-            continue
+    :param loop: the loop to read residues from
+    :param chain_codes_to_select: the chain codes to select, or ANY_CHAIN
+    :param residues_by_values: residues already created keyed by the values they were created from, this is
+                               updated and lets residues be shared across loops
+    :return: the residues in the order they are first seen without duplicates
+    """
 
-        index_set = {
-            "chain_code_index": chain_code_index,
-            "sequence_code_index": sequence_code_index,
-            "residue_name_index": residue_name_index,
-            "linking_index": linking_index,
-            "residue_variant_index": residue_variant_index,
-            "cis_peptide_index": cis_peptide_index,
-        }
+    if residues_by_values is None:
+        residues_by_values = {}
 
-        index_sets.append(index_set)
+    plan = _residue_extraction_plan(tuple(loop.tags))
 
     residues = []
-    for line in loop:
-
-        for index_set in index_sets:
-            chain_code_index = index_set["chain_code_index"]
-            sequence_code_index = index_set["sequence_code_index"]
-            residue_name_index = index_set["residue_name_index"]
-            linking_index = index_set["linking_index"]
-            residue_variant_index = index_set["residue_variant_index"]
-            cis_peptide_index = index_set["cis_peptide_index"]
-
-            if chain_code_index is not None:
-                chain_code = line[chain_code_index]
-                if chain_code == UNUSED:
-                    continue
-
-                if not (
-                    chain_codes_to_select is ANY_CHAIN
-                    or chain_code in chain_codes_to_select
-                ):
-                    continue
-            else:
+    seen = set()
+    for line in loop.data:
+        for chain_code_index, fields, values_getter in plan:
+
+            chain_code = line[chain_code_index]
+            if chain_code == UNUSED:
                 continue
 
-            if sequence_code_index is not None:
-                sequence_code = line[sequence_code_index]
-                sequence_code = (
-                    int(sequence_code) if is_int(sequence_code) else sequence_code
-                )
-            else:
-                sequence_code = None
+            if not (
+                chain_codes_to_select is ANY_CHAIN
+                or chain_code in chain_codes_to_select
+            ):
+                continue
 
-            residue_name = line[residue_name_index] if residue_name_index else None
+            key = fields, values_getter(line)
 
-            if linking_index is not None:
-                linking = (
-                    Linking[line[linking_index].upper()]
-                    if line[linking_index] != NEF_UNKNOWN
-                    else None
-                )
-            else:
-                linking = None
-
-            if cis_peptide_index is not None:
-                cis_peptide = line[cis_peptide_index]
-                if cis_peptide == UNUSED:
-                    cis_peptide = False
-                elif cis_peptide.lower() == "true":
-                    cis_peptide = True
-                elif cis_peptide.lower() == "false":
-                    cis_peptide = False
-                else:
-                    cis_peptide = False
-            else:
-                cis_peptide = False
-
-            if residue_variant_index is not None:
-                residue_variants = line[residue_variant_index].split(",")
-                residue_variants = (
-                    ()
-                    if residue_variants
-                    == [
-                        UNUSED,
-                    ]
-                    else tuple(residue_variants)
-                )
+            if key in seen:
+                continue
+            seen.add(key)
+
+            if key in residues_by_values:
+                residue = residues_by_values[key]
             else:
-                residue_variants = ()
-
-            residue = SequenceResidue(
-                chain_code=chain_code,
-                sequence_code=sequence_code,
-                residue_name=residue_name,
-                linking=linking,
-                is_cis=cis_peptide,
-                variants=residue_variants,
-            )
-            if residue.chain_code and residue.sequence_code:
+                residue = _values_to_residue(dict(zip(*key)))
+                residues_by_values[key] = residue
+
+            if residue is not None:
                 residues.append(residue)
 
     return residues
 
 
+@functools.lru_cache(maxsize=RESIDUE_PLAN_CACHE_SIZE)
+def _residue_extraction_plan(tags: Tuple[str, ...]) -> Tuple[_ResidueColumns, ...]:
+
+    # tags are found like Loop.tag_index, ignoring case, but only if they are present with the same case
+    tag_indices = {tag.lower(): index for index, tag in enumerate(tags)}
+
+    def tag_index(tag):
+        return tag_indices[tag.lower()] if tag in tags else None
+
+    # the linking, residue variant and cis peptide tags aren't numbered and apply to all the residues of a row
+    shared_fields = {
+        "linking": tag_index("linking"),
+        "residue_variant": tag_index("residue_variant"),
+        "cis_peptide": tag_index("cis_peptide"),
+    }
+
+    plan = []
+    for offset in RESIDUE_TAG_OFFSETS:
+
+        chain_code_index = tag_index(f"chain_code{offset}")
+        if chain_code_index is None:
+            continue
+
+        field_indices = {
+            "chain_code": chain_code_index,
+            "sequence_code": tag_index(f"sequence_code{offset}"),
+            "residue_name": tag_index(f"residue_name{offset}"),
+            **shared_fields,
+        }
+        field_indices = {
+            field: index for field, index in field_indices.items() if index is not None
+        }
+
+        values_getter = _tuple_item_getter(*field_indices.values())
+
+        plan.append(
+            _ResidueColumns(chain_code_index, tuple(field_indices), values_getter)
+        )
+
+    return tuple(plan)
+
+
+def _tuple_item_getter(*indices: int) -> Callable[[List[str]], Tuple[str, ...]]:
+    # itemgetter returns a bare item rather than a tuple for a single index
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda line: (line[index],)
+
+    return itemgetter(*indices)
+
+
+def _values_to_residue(values: Dict[str, str]) -> Optional[SequenceResidue]:
+
+    sequence_code = values.get("sequence_code")
+    if sequence_code is not None and is_int(sequence_code):
+        sequence_code = int(sequence_code)
+
+    linking = values.get("linking")
+    if linking is not None:
+        linking = Linking[linking.upper()] if linking != NEF_UNKNOWN else None
+
+    cis_peptide = values.get("cis_peptide", UNUSED)
+    cis_peptide = cis_peptide != UNUSED and cis_peptide.lower() == "true"
+
+    residue_variants = values.get("residue_variant")
+    if residue_variants is not None:
+        residue_variants = residue_variants.split(",")
+        residue_variants = (
+            () if residue_variants == [UNUSED] else tuple(residue_variants)
+        )
+    else:
+        residue_variants = ()
+
+    residue = SequenceResidue(
+        chain_code=values["chain_code"],
+        sequence_code=sequence_code,
+        residue_name=values.get("residue_name"),
+        linking=linking,
+        is_cis=cis_peptide,
+        variants=residue_variants,
+    )
+
+    return residue if residue.chain_code and residue.sequence_code else None
+
+
 def sequence_3let_to_res(
     sequence_3_let: List[str], chain_code: str, start: int = 1
 ) -> List[SequenceResidue]:
@@ -1,17 +1,25 @@
 import dataclasses
 from enum import auto
+from functools import partial
 from typing import Dict, Iterable, List, Tuple
 
 from pynmrstar import Loop, Saveframe
 from strenum import StrEnum
 
-from nef_pipelines.lib.nef_lib import UNUSED, loop_row_namespace_iter
+from nef_pipelines.lib.nef_lib import (
+    UNUSED,
+    LoopBuilder,
+    LoopTable,
+    loop_row_namespace_iter,
+)
 from nef_pipelines.lib.structures import (
     AtomLabel,
     Residue,
+    RowContext,
     SequenceResidue,
     ShiftData,
     ShiftList,
+    intern_value,
 )
 from nef_pipelines.lib.util import fnmatch_one_of
 
@@ -31,33 +39,41 @@ def nef_frames_to_shifts(frames: List[Saveframe]) -> List[ShiftData]:
     """
     shifts = []
 
-    residue_field_names = [field.name for field in dataclasses.fields(SequenceResidue)]
-    atom_field_names = [
+    residue_field_names = {field.name for field in dataclasses.fields(SequenceResidue)}
+    atom_field_names = {
         field.name for field in dataclasses.fields(AtomLabel) if field.name != "residue"
-    ]
+    }
+    # shifts lists may repeat atoms, so each atom label is only created once and residues are shared
+    labels = {}
+    interned = {}
+
     for frame in frames:
 
         loop = frame.get_loop(NEF_CHEMICAL_SHIFT_LOOP)
 
         for i, row in enumerate(loop_row_namespace_iter(loop), start=1):
 
-            residue_fields = {
-                name: value
+            residue_fields = tuple(
+                (name, value)
                 for name, value in vars(row).items()
                 if name in residue_field_names
-            }
-            atom_fields = {
-                name: value
+            )
+            atom_fields = tuple(
+                (name, value)
                 for name, value in vars(row).items()
                 if name in atom_field_names
-            }
-            residue = Residue(**residue_fields)
-            label = AtomLabel(residue, **atom_fields)
+            )
 
-            value_str = ", ".join([f"{value}" for value in vars(row).values()])
-            name_str = ", ".join([f"{name}" for name in vars(row).keys()])
+            label = labels.get((residue_fields, atom_fields))
+            if label is None:
+                residue = intern_value(Residue(**dict(residue_fields)), interned)
+                label = intern_value(AtomLabel(residue, **dict(atom_fields)), interned)
+                labels[residue_fields, atom_fields] = label
 
-            line = f"{name_str}\n{value_str}"
+            # the row is only rendered as text if an error is reported
+            frame_context = RowContext(
+                frame.name, i, partial(_render_loop_row, loop, i - 1)
+            )
 
             shift_data = ShiftData(
                 label,
@@ -65,13 +81,23 @@ def nef_frames_to_shifts(frames: List[Saveframe]) -> List[ShiftData]:
                 row.value_uncertainty,
                 frame_name=frame.name,
                 frame_row=i,
-                frame_line=line,
+                frame_context=frame_context,
             )
             shifts.append(shift_data)
 
     return shifts
 
 
+def _render_loop_row(loop: Loop, row_index: int) -> str:
+
+    row = LoopTable(loop)[row_index]
+
+    value_str = ", ".join([f"{value}" for value in row.values()])
+    name_str = ", ".join([f"{name}" for name in row.keys()])
+
+    return f"{name_str}\n{value_str}"
+
+
 def shifts_to_nef_frame(shift_list: ShiftList, frame_name: str) -> Saveframe:
     """
     convert a shift list to a nef chemical shift list frame
@@ -104,8 +130,8 @@ def shifts_to_nef_frame(shift_list: ShiftList, frame_name: str) -> Saveframe:
     )
 
     loop.set_category(SHIFT_LOOP_CATEGORY)
-    loop.add_tag(tags)
 
+    builder = LoopBuilder(loop, tags)
     for shift in shift_list.shifts:
         value_uncertainty = (
             shift.value_uncertainty if shift.value_uncertainty else UNUSED
@@ -117,21 +143,19 @@ def shifts_to_nef_frame(shift_list: ShiftList, frame_name: str) -> Saveframe:
             shift.atom.isotope_number if shift.atom.isotope_number else UNUSED
         )
 
-        row_data = {
-            "chain_code": shift.atom.residue.chain_code,
-            "sequence_code": shift.atom.residue.sequence_code,
-            "residue_name": shift.atom.residue.residue_name,
-            "atom_name": shift.atom.atom_name,
-            "value": shift.value,
-            "value_uncertainty": value_uncertainty,
-            "element": element,
-            "isotope_number": isotope_number,
-        }
-        loop.add_data(
-            [
-                row_data,
-            ]
+        builder.add_row(
+            (
+                shift.atom.residue.chain_code,
+                shift.atom.residue.sequence_code,
+                shift.atom.residue.residue_name,
+                shift.atom.atom_name,
+                shift.value,
+                value_uncertainty,
+                element,
+                isotope_number,
+            )
         )
+    builder.build()
 
     return frame
 
@@ -0,0 +1,196 @@
+from itertools import product
+from math import dist, floor, inf, prod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# the average number of points per cell the default cell size aims for
+POINTS_PER_CELL = 2.0
+
+
+class GridIndex:
+    """
+    a spatial index for points in a small number of dimensions [e.g. weighted peak positions]. The points are
+    hashed into a grid of cubic cells so nearest neighbour and tolerance queries only look at the points in
+    nearby cells rather than every point
+
+    the results of queries are lists of (distance, index) pairs where index is the position of the point in the
+    sequence the index was built from, they are sorted by distance and then index so results are deterministic
+    """
+
+    def __init__(
+        self, points: Sequence[Sequence[float]], cell_size: Optional[float] = None
+    ):
+        """
+        :param points: the points to index, all points must have the same number of dimensions
+        :param cell_size: the length of the sides of the cells, the default gives a few points per cell
+        """
+
+        self._points = [tuple(point) for point in points]
+
+        dimensions = {len(point) for point in self._points}
+        if len(dimensions) > 1:
+            raise ValueError(
+                f"all points must have the same number of dimensions, got {sorted(dimensions)}"
+            )
+        self._dimensions = dimensions.pop() if dimensions else 0
+
+        self._cell_size = cell_size if cell_size else _default_cell_size(self._points)
+
+        self._cells: Dict[Tuple[int, ...], List[int]] = {}
+        for index, point in enumerate(self._points):
+            self._cells.setdefault(self._cell(point), []).append(index)
+
+        cells = list(self._cells)
+        self._min_cell = [min(axis) for axis in zip(*cells)]
+        self._max_cell = [max(axis) for axis in zip(*cells)]
+
+    def __len__(self):
+        return len(self._points)
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell_size
+
+    def nearest(self, point: Sequence[float], k: int = 1) -> List[Tuple[float, int]]:
+        """
+        find the k points nearest to a point, any further points at the same distance as the kth point are also
+        returned so ties are never broken arbitrarily
+
+        :param point: the point to search around
+        :param k: the number of points to find
+        :return: (distance, index) pairs sorted by distance and index
+        """
+
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+
+        if not self._points:
+            return []
+
+        centre = self._cell(point)
+
+        found = []
+        for ring in range(self._furthest_ring(centre) + 1):
+
+            if _ring_size(ring, self._dimensions) > len(self._cells):
+                # the ring is larger than the occupied cells so just check them all
+                cells = [
+                    cell
+                    for cell in self._cells
+                    if _chebyshev_distance(cell, centre) >= ring
+                ]
+                self._add_points_in_cells(found, point, cells)
+                break
+
+            self._add_points_in_cells(found, point, _ring_cells(centre, ring))
+
+            # points in rings further out are at least this far away
+            if len(found) >= k and sorted(found)[k - 1][0] < ring * self._cell_size:
+                break
+
+        found.sort()
+
+        cutoff = found[min(k, len(found)) - 1][0]
+
+        return [(distance, index) for distance, index in found if distance <= cutoff]
+
+    def within(
+        self, point: Sequence[float], tolerances: Sequence[float]
+    ) -> List[Tuple[float, int]]:
+        """
+        find the points whose difference from a point is no more than a tolerance along every axis
+
+        :param point: the point to search around
+        :param tolerances: the tolerance for each axis, inf doesn't limit the search along an axis
+        :return: (distance, index) pairs sorted by distance and index
+        """
+
+        if len(tolerances) != self._dimensions:
+            raise ValueError(
+                f"expected {self._dimensions} tolerances but got {len(tolerances)}"
+            )
+
+        if not self._points:
+            return []
+
+        # the range of cells to search along each axis, None if the axis isn't limited
+        ranges = [
+            None if tolerance == inf else self._cell_range(value, tolerance)
+            for value, tolerance in zip(point, tolerances)
+        ]
+
+        number_cells = prod(
+            inf if axis_range is None else len(axis_range) for axis_range in ranges
+        )
+
+        if number_cells > len(self._cells):
+            # searching the box would visit more cells than are occupied so just filter the occupied cells
+            cells = [
+                cell
+                for cell in self._cells
+                if all(
+                    axis_range is None or axis in axis_range
+                    for axis, axis_range in zip(cell, ranges)
+                )
+            ]
+        else:
+            cells = product(*ranges)
+
+        result = []
+        for cell in cells:
+            for index in self._cells.get(cell, ()):
+                other = self._points[index]
+                for value, other_value, tolerance in zip(point, other, tolerances):
+                    if abs(value - other_value) > tolerance:
+                        break
+                else:
+                    result.append((dist(point, other), index))
+
+        result.sort()
+
+        return result
+
+    def _cell(self, point: Sequence[float]) -> Tuple[int, ...]:
+        return tuple(floor(value / self._cell_size) for value in point)
+
+    def _cell_range(self, value: float, tolerance: float) -> range:
+        low = floor((value - tolerance) / self._cell_size)
+        high = floor((value + tolerance) / self._cell_size)
+        return range(low, high + 1)
+
+    def _furthest_ring(self, centre: Tuple[int, ...]) -> int:
+        return max(
+            max(axis - low, high - axis)
+            for axis, low, high in zip(centre, self._min_cell, self._max_cell)
+        )
+
+    def _add_points_in_cells(self, found, point, cells):
+        for cell in cells:
+            for index in self._cells.get(cell, ()):
+                found.append((dist(point, self._points[index]), index))
+
+
+def _default_cell_size(points: List[Tuple[float, ...]]) -> float:
+
+    extents = [max(axis) - min(axis) for axis in zip(*points)]
+    extents = [extent for extent in extents if extent > 0]
+
+    if not extents:
+        return 1.0
+
+    volume_per_cell = prod(extents) * POINTS_PER_CELL / len(points)
+
+    return volume_per_cell ** (1 / len(extents))
+
+
+def _chebyshev_distance(cell_1: Tuple[int, ...], cell_2: Tuple[int, ...]) -> int:
+    return max(abs(axis_1 - axis_2) for axis_1, axis_2 in zip(cell_1, cell_2))
+
+
+def _ring_size(ring: int, dimensions: int) -> int:
+    return (2 * ring + 1) ** dimensions - (2 * ring - 1) ** dimensions if ring else 1
+
+
+def _ring_cells(centre: Tuple[int, ...], ring: int):
+    for offsets in product(range(-ring, ring + 1), repeat=len(centre)):
+        if max(abs(offset) for offset in offsets) == ring:
+            yield tuple(axis + offset for axis, offset in zip(centre, offsets))
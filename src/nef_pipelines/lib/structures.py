@@ -1,6 +1,9 @@
-from dataclasses import dataclass, field
+import dataclasses
+from dataclasses import dataclass, field, fields
 from enum import auto
-from typing import Dict, List, Optional, Union
+from functools import partial
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, TypeVar, Union
 
 from strenum import LowercaseStrEnum, StrEnum
 
@@ -29,7 +32,140 @@ class Residue: ...  # noqa: E701
 #     OFFSET_OR_PREFIX = auto()
 #     LABEL = auto()
 
+T = TypeVar("T")
 
+_object_setattr = object.__setattr__
+
+
+def _slotted(cls):
+    """
+    rebuild a frozen dataclass with __slots__ and a hash that is only calculated once, this saves memory and time
+    for structures which are created in large numbers. dataclass(slots=True) isn't available before python 3.10.
+    Use below @dataclass
+
+    :param cls: the frozen dataclass
+    :return: the slotted dataclass
+    """
+
+    field_names = tuple(field.name for field in fields(cls))
+
+    inherited_slots = {
+        slot for base in cls.__mro__[1:] for slot in getattr(base, "__slots__", ())
+    }
+
+    class_dict = dict(cls.__dict__)
+    class_dict["__slots__"] = tuple(
+        name for name in (*field_names, "_hash") if name not in inherited_slots
+    )
+
+    # defaults are held by the fields and __init__ and would conflict with the slots
+    for name in field_names:
+        class_dict.pop(name, None)
+    class_dict.pop("__dict__", None)
+    class_dict.pop("__weakref__", None)
+
+    class_dict["_FIELD_NAMES"] = field_names
+    class_dict["_FIELD_INDICES"] = {
+        name: index for index, name in enumerate(field_names)
+    }
+    class_dict["_FIELD_VALUES"] = _tuple_attrgetter(*field_names)
+
+    # as with dataclasses fields which aren't compared aren't hashed
+    class_dict["_HASH_VALUES"] = _tuple_attrgetter(
+        *[
+            field.name
+            for field in fields(cls)
+            if (field.compare if field.hash is None else field.hash)
+        ]
+    )
+    class_dict["__hash__"] = _cached_hash
+    class_dict["__getstate__"] = _get_slotted_state
+    class_dict["__setstate__"] = _set_slotted_state
+
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, class_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+
+    # the slot descriptors set values directly, bypassing the frozen __setattr__
+    slotted_cls._FIELD_SETTERS = tuple(
+        getattr(slotted_cls, name).__set__ for name in field_names
+    )
+
+    return slotted_cls
+
+
+def _tuple_attrgetter(*names):
+    # attrgetter returns a bare value rather than a tuple for a single name
+    getter = attrgetter(*names)
+    return getter if len(names) > 1 else lambda value: (getter(value),)
+
+
+def _cached_hash(self):
+    try:
+        return self._hash
+    except AttributeError:
+        result = hash(self._HASH_VALUES(self))
+        _object_setattr(self, "_hash", result)
+        return result
+
+
+def _get_slotted_state(self):
+    # the cached hash isn't saved as string hashes differ between processes
+    return self._FIELD_VALUES(self)
+
+
+def _set_slotted_state(self, state):
+
+    # structures pickled before they had slots have their fields in a dictionary
+    if isinstance(state, dict):
+        state = [state[name] for name in self._FIELD_NAMES]
+
+    for setter, value in zip(self._FIELD_SETTERS, state):
+        setter(self, value)
+
+
+def intern_value(value: T, interned: Dict[T, T]) -> T:
+    """
+    get a single shared instance of an immutable value such as a residue or an atom label, equal values give the
+    same instance so large numbers of them use less memory and compare quickly. The shared instances are held by
+    the caller [typically in a dictionary scoped to reading one set of frames] so they are released with it
+
+    :param value: the value to intern, it must be hashable
+    :param interned: the shared instances, keyed by themselves
+    :return: the shared instance equal to the value
+    """
+    return interned.setdefault(value, value)
+
+
+def replace_fields(value: T, **changes) -> T:
+    """
+    make a copy of a structure with some fields changed, like dataclasses.replace but faster for the slotted
+    structures in this module as __init__ is bypassed, other dataclasses are passed to dataclasses.replace
+
+    :param value: the structure to copy
+    :param changes: the new values of fields by name
+    :return: the copy with its fields changed
+    """
+
+    cls = type(value)
+    field_indices = getattr(cls, "_FIELD_INDICES", None)
+
+    if field_indices is None:
+        return dataclasses.replace(value, **changes)
+
+    values = list(cls._FIELD_VALUES(value))
+    for name, new_value in changes.items():
+        if name not in field_indices:
+            raise TypeError(f"{cls.__name__} has no field called {name}")
+        values[field_indices[name]] = new_value
+
+    result = object.__new__(cls)
+    for setter, field_value in zip(cls._FIELD_SETTERS, values):
+        setter(result, field_value)
+
+    return result
+
+
+@_slotted
 @dataclass(frozen=True, order=True)
 class Residue:
     chain_code: str
@@ -48,6 +184,7 @@ class Residue:
         )
 
 
+@_slotted
 @dataclass(frozen=True, order=True)
 class SequenceResidue(Residue):
 
@@ -57,6 +194,7 @@ class SequenceResidue(Residue):
 
 
 # should contain a residue and have constructors?
+@_slotted
 @dataclass(frozen=True, order=True)
 class AtomLabel:
     residue: Residue
@@ -187,6 +325,38 @@ class LineInfo:
     line: str
 
 
+class RowContext:
+    """
+    where a row of data came from for error reporting, it has the same file_name, line_no and line as LineInfo
+    but the text of the row is only rendered when line is read. Rendering every row read is slow and the text is
+    rarely needed, typically only for an error message
+    """
+
+    __slots__ = ("file_name", "line_no", "_render_line")
+
+    def __init__(self, file_name: str, line_no: int, render_line: Callable[[], str]):
+        """
+        :param file_name: the source of the row e.g. a file or frame name
+        :param line_no: the line or row number of the row in the source
+        :param render_line: a function returning the text of the row
+        """
+        self.file_name = file_name
+        self.line_no = line_no
+        self._render_line = render_line
+
+    @property
+    def line(self) -> str:
+        return self._render_line()
+
+    def __reduce__(self):
+        # render the row before pickling so the data it is rendered from isn't pickled with it
+        return RowContext, (self.file_name, self.line_no, partial(str, self.line))
+
+    def __repr__(self):
+        return f"RowContext(file_name={self.file_name!r}, line_no={self.line_no!r})"
+
+
+@_slotted
 @dataclass(frozen=True, order=True)
 class ShiftData:
     atom: AtomLabel
@@ -197,7 +367,11 @@ class ShiftData:
 
     frame_name: Optional[str] = ""
     frame_row: Optional[int] = None
-    frame_line: Optional[str] = None
+    frame_context: Optional[RowContext] = field(default=None, compare=False, repr=False)
+
+    @property
+    def frame_line(self) -> Optional[str]:
+        return self.frame_context.line if self.frame_context is not None else None
 
 
 @dataclass
@@ -220,6 +394,7 @@ class PeakFitMethod(LowercaseStrEnum):
     SPLINE = auto()
 
 
+@_slotted
 @dataclass(frozen=True, order=True)
 class NewPeak:
     # TODO: support multiple assignments
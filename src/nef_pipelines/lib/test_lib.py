@@ -4,7 +4,7 @@ from fnmatch import fnmatch
 from io import StringIO
 from itertools import zip_longest
 from pathlib import Path
-from typing import IO, AnyStr, List, Optional, Tuple, Union
+from typing import IO, AnyStr, Callable, Dict, List, Optional, Tuple, Union
 
 from click.testing import Result
 from pynmrstar import Entry
@@ -414,3 +414,34 @@ def assert_frame_category_exists(
         assert len(globals_frames) == count
     else:
         assert len(globals_frames) >= count
+
+
+class StandInServer:
+    """
+    a web transport for tests which answers requests from a dictionary of url -> content rather than
+    the network and records the requests it receives, unknown urls get a 404
+
+    Args:
+        pages (Dict[str, Union[bytes, Callable]]): the content to return for each url or a function which
+                                                   is passed the request's form data and returns the content
+    """
+
+    def __init__(
+        self, pages: Optional[Dict[str, Union[bytes, Callable[[Dict], bytes]]]] = None
+    ):
+        self.pages = pages if pages else {}
+        self.requests = []
+
+    def __call__(self, method, url, data=None, files=None):
+        from nef_pipelines.lib.web_lib import WebResponse
+
+        self.requests.append((method, url))
+
+        if url in self.pages:
+            content = self.pages[url]
+            content = content(data) if callable(content) else content
+            result = WebResponse(200, content, url)
+        else:
+            result = WebResponse(404, b"not found", url)
+
+        return result
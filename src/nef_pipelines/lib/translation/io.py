@@ -1,14 +1,27 @@
+import contextlib
+import hashlib
 import json
+import os
+import pickle
 import traceback
+from collections.abc import Mapping
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
+import pydantic
 import xmltodict
 
 from nef_pipelines.lib.nef_lib import UNUSED
 from nef_pipelines.lib.translation.chem_comp import ChemComp
 from nef_pipelines.lib.translation.object_iter import ObjectIter
-from nef_pipelines.lib.util import exit_error, nef_pipelines_root
+from nef_pipelines.lib.util import (
+    exit_error,
+    get_version,
+    mark_cache_used,
+    nef_pipelines_root,
+    remove_stale_caches,
+    user_cache_dir,
+)
 
 
 def _items_in(target):
@@ -594,29 +607,194 @@ def find_chem_comps(rel_path=JSON_CHEM_COMP_SUB_PATH, extension="json") -> List[
     return result
 
 
+CHEM_COMP_CACHE_VERSION = 1
+CHEM_COMP_CACHE_PREFIX = "chem_comps"
+
+# errors which show a cached chem comp couldn't be unpickled, e.g. it was pickled from a different ChemComp model
+UNPICKLING_ERRORS = (
+    EOFError,
+    ValueError,
+    TypeError,
+    AttributeError,
+    ImportError,
+    IndexError,
+    KeyError,
+    pickle.UnpicklingError,
+)
+
+
+class ChemCompDictionary(Mapping):
+    """
+    the chem comps keyed by their 3 letter code [or ccp code if they don't have one], the chem comps are held
+    pickled and are only unpickled when they are first accessed so a sequence with 20 residue types only
+    materialises 20 chem comps. If a cached chem comp can't be unpickled the cache is treated as a miss, the
+    chem comps are recompiled using recompile and the cache is rewritten
+    """
+
+    def __init__(self):
+        self._pickled_chem_comps = {}
+        self._chem_comps = {}
+        self._recompile = None
+
+    def __getitem__(self, key):
+        if key not in self._chem_comps:
+            pickled_chem_comp = self._pickled_chem_comps[key]
+            try:
+                self._chem_comps[key] = pickle.loads(pickled_chem_comp)
+            except UNPICKLING_ERRORS:
+                if self._recompile is None:
+                    raise
+                self._set_pickled_chem_comps(self._recompile())
+                return self[key]
+        return self._chem_comps[key]
+
+    def __contains__(self, key):
+        return key in self._pickled_chem_comps
+
+    def __iter__(self):
+        return iter(self._pickled_chem_comps)
+
+    def __len__(self):
+        return len(self._pickled_chem_comps)
+
+    def is_loaded(self) -> bool:
+        return len(self._pickled_chem_comps) > 0
+
+    def _set_pickled_chem_comps(
+        self,
+        pickled_chem_comps: Dict[str, bytes],
+        recompile: Optional[Callable[[], Dict[str, bytes]]] = None,
+    ):
+        """
+        :param pickled_chem_comps: the pickled chem comps by key
+        :param recompile: a function to compile fresh pickled chem comps if they came from a cache, None if they
+                          were just compiled
+        """
+        self._pickled_chem_comps = pickled_chem_comps
+        self._chem_comps = {}
+        self._recompile = recompile
+
+
 MOL_TYPES = set()
-CHEM_COMPS = {}
+CHEM_COMPS = ChemCompDictionary()
 
 
-# rough costs
-# read + parse std chem comps 0.218489s with v2 expected to be 0.054-0.004s typically 0.012s
-# just read chem comps 0.010838s
-# without linking 0.160787s (linking oh 0.058s ie 26%)
-def load_chem_comps():
-    chem_comp_paths = find_chem_comps()
+def _chem_comp_sources_digest(chem_comp_paths: List[Path]) -> str:
+    digest = hashlib.sha256()
+    digest.update(
+        f"{CHEM_COMP_CACHE_VERSION} {get_version()} {pydantic.VERSION}".encode()
+    )
+    for chem_comp_path in sorted(chem_comp_paths):
+        digest.update(chem_comp_path.name.encode())
+        digest.update(chem_comp_path.read_bytes())
+
+    return digest.hexdigest()
 
+
+def _chem_comp_cache_path(digest: str) -> Path:
+    return user_cache_dir() / f"{CHEM_COMP_CACHE_PREFIX}_{digest}.pickle"
+
+
+def _compile_chem_comps(
+    chem_comp_paths: List[Path],
+) -> Tuple[Set[str], Dict[str, bytes]]:
+
+    mol_types = set()
+    pickled_chem_comps = {}
     for chem_comp_path in chem_comp_paths:
         with open(chem_comp_path, "r") as f:
             chemcomp_data = json.load(f)
             chem_comp = ChemComp(**chemcomp_data)
             mol_type = chem_comp.molType
-            MOL_TYPES.add(mol_type.upper())
+            mol_types.add(mol_type.upper())
             key = (
                 chem_comp.code3Letter
                 if chem_comp.code3Letter != UNUSED
                 else chem_comp.ccpCode
             )
-            CHEM_COMPS[key] = chem_comp
+            pickled_chem_comps[key] = pickle.dumps(
+                chem_comp, protocol=pickle.HIGHEST_PROTOCOL
+            )
+
+    return mol_types, pickled_chem_comps
+
+
+def _read_chem_comp_cache_or_none(
+    cache_path: Path,
+) -> Optional[Tuple[Set[str], Dict[str, bytes]]]:
+
+    result = None
+    try:
+        with open(cache_path, "rb") as fh:
+            version, mol_types, pickled_chem_comps = pickle.load(fh)
+        if version == CHEM_COMP_CACHE_VERSION:
+            result = mol_types, pickled_chem_comps
+            mark_cache_used(cache_path)
+    except (OSError, *UNPICKLING_ERRORS):
+        pass
+
+    return result
+
+
+def _write_chem_comp_cache(cache_path: Path, mol_types, pickled_chem_comps):
+
+    # the cache is an optimisation so failing to write it isn't an error, the file is written to a temporary
+    # file and renamed so concurrent processes never see a partial cache
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as fh:
+            pickle.dump(
+                (CHEM_COMP_CACHE_VERSION, mol_types, pickled_chem_comps),
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, cache_path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+
+    # caches for other chem comps or versions of nef pipelines may still be in use by other installs
+    remove_stale_caches(
+        path
+        for path in cache_path.parent.glob(f"{CHEM_COMP_CACHE_PREFIX}_*.pickle")
+        if path != cache_path
+    )
+
+
+# rough costs
+# read + parse std chem comps 0.218489s with v2 expected to be 0.054-0.004s typically 0.012s
+# just read chem comps 0.010838s
+# without linking 0.160787s (linking oh 0.058s ie 26%)
+# with the cache in the user's cache directory: hash json + read cache ~0.006s, unpickle a chem comp ~0.001s
+def load_chem_comps():
+    """
+    load the standard chem comps into CHEM_COMPS and their molecule types into MOL_TYPES, this only does work on
+    the first call. The chem comps are read from a cache in the user's cache directory if the json they were
+    compiled from hasn't changed, otherwise they are parsed and the cache is rewritten
+    """
+
+    if CHEM_COMPS.is_loaded():
+        return
+
+    chem_comp_paths = find_chem_comps()
+
+    cache_path = _chem_comp_cache_path(_chem_comp_sources_digest(chem_comp_paths))
+
+    def recompile():
+        mol_types, pickled_chem_comps = _compile_chem_comps(chem_comp_paths)
+        _write_chem_comp_cache(cache_path, mol_types, pickled_chem_comps)
+        return mol_types, pickled_chem_comps
+
+    cached = _read_chem_comp_cache_or_none(cache_path)
+    if cached is not None:
+        mol_types, pickled_chem_comps = cached
+        CHEM_COMPS._set_pickled_chem_comps(pickled_chem_comps, lambda: recompile()[1])
+    else:
+        mol_types, pickled_chem_comps = recompile()
+        CHEM_COMPS._set_pickled_chem_comps(pickled_chem_comps)
+
+    MOL_TYPES.update(mol_types)
 
 
 if __name__ == "__main__":
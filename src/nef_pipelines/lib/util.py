@@ -3,10 +3,14 @@ import functools
 import inspect
 import io
 import os
+import shutil
 import sys
+import threading
+import time
 import traceback
 import warnings
 from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import auto
 from fnmatch import fnmatch
 from math import floor
@@ -14,6 +18,7 @@ from pathlib import Path
 from textwrap import dedent
 from typing import (
     Any,
+    Callable,
     Dict,
     Iterable,
     Iterator,
@@ -72,7 +77,8 @@ def loop_add_data_tag_dict(loop: Loop, data: Dict[str, object]) -> None:
         else:
             tagged_data.append(NEF_UNKNOWN)
 
-    loop.add_data(tagged_data)
+    # the row is complete and in tag order so it doesn't need checking by add_data
+    loop.data.append(tagged_data)
 
 
 # TODO: there is no space for scrript arguments!
@@ -391,6 +397,178 @@ def exit_error(msg, exception=None):
     sys.exit(EXIT_ERROR)
 
 
+def jobs_help(work: str, threads: bool = False) -> str:
+    """
+    the help for a --jobs option, commands share the wording and only describe what is done in parallel
+
+    :param work: what is done in parallel e.g. input files to read
+    :param threads: the jobs run in threads rather than processes
+    :return: the help text
+    """
+
+    worker = "thread" if threads else "process"
+
+    return f"the number of {work} at the same time, each in a separate {worker}"
+
+
+JOBS_HELP = jobs_help("input files to read")
+
+
+def parallel_map_or_exit_error(
+    function: Callable[..., Any],
+    *iterables: Iterable,
+    jobs: int = 1,
+    names: Optional[Iterable[str]] = None,
+    threads: bool = False,
+) -> List[Any]:
+    """
+    apply a function to the items of one or more iterables [typically input files and their options] like map
+    using a pool of processes. The results are always returned in the order of the items so they can be merged
+    into an entry deterministically. With more than one job errors are reported per item, if the function calls
+    exit_error or raises an exception for any item, all the failed items and their errors are reported and
+    the program exits with an error
+
+    with more than one job the function, its arguments and results must be picklable, the function should be
+    defined at module level. Functions which spend most of their time waiting on the network can use a pool of
+    threads instead, these don't need to be picklable and can share state such as a web cache
+
+    :param function: the function to call with one item from each iterable
+    :param iterables: the iterables of arguments
+    :param jobs: the number of processes or threads to use, 1 runs everything in the current process
+    :param names: names for the items used when reporting errors [defaults to the items of the first iterable]
+    :param threads: use a pool of threads rather than processes
+    :return: the results of calling the function in the order of the items
+    """
+
+    arguments = list(zip(*iterables))
+
+    if jobs <= 1 or len(arguments) < 2:
+        return [function(*item_arguments) for item_arguments in arguments]
+
+    names = (
+        [str(item_arguments[0]) for item_arguments in arguments]
+        if names is None
+        else list(names)
+    )
+
+    max_workers = min(jobs, len(arguments))
+    if threads:
+        with _PerThreadStderr(sys.stderr) as stderr, ThreadPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            outcomes = list(
+                executor.map(
+                    functools.partial(_call_capturing_thread_errors, stderr),
+                    [function] * len(arguments),
+                    arguments,
+                )
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(
+                executor.map(
+                    _call_capturing_errors, [function] * len(arguments), arguments
+                )
+            )
+
+    failures = [
+        (name, result) for name, (failed, result) in zip(names, outcomes) if failed
+    ]
+
+    if failures:
+        _exit_error_item_failures(failures, len(arguments))
+
+    return [result for _, result in outcomes]
+
+
+def _call_capturing_errors(function, arguments):
+
+    # this runs in a worker process, exit_error writes to stderr and exits so its message is captured and the
+    # failure returned rather than interleaving output from several processes
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            result = function(*arguments)
+    except SystemExit:
+        return True, _exit_error_text_to_message(stderr.getvalue())
+    except Exception as e:
+        return True, str(e)
+
+    return False, result
+
+
+class _PerThreadStderr(io.TextIOBase):
+
+    # sys.stderr is shared by all threads so redirecting it per call as _call_capturing_errors does would
+    # capture other threads' output, instead this is installed once and routes each thread's writes to its own buffer
+
+    def __init__(self, stderr):
+        self._stderr = stderr
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._redirect = contextlib.redirect_stderr(self)
+        self._redirect.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._redirect.__exit__(*exc_info)
+
+    @contextlib.contextmanager
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer if buffer is not None else self._stderr).write(text)
+
+    def flush(self):
+        self._stderr.flush()
+
+
+def _call_capturing_thread_errors(stderr, function, arguments):
+
+    with stderr.capture() as buffer:
+        try:
+            result = function(*arguments)
+        except SystemExit:
+            return True, _exit_error_text_to_message(buffer.getvalue())
+        except Exception as e:
+            return True, str(e)
+
+    # anything else the function reported is written in one piece so output from threads isn't interleaved
+    stderr.write(buffer.getvalue())
+
+    return False, result
+
+
+def _exit_error_text_to_message(text):
+    result = []
+    for line in text.split("\n"):
+        if line.startswith("ERROR [in:"):
+            line = line.split("]: ", 1)[-1]
+        if line.strip() and line != "exiting...":
+            result.append(line.strip())
+
+    return "\n".join(result)
+
+
+def _exit_error_item_failures(failures, number_items):
+
+    msg = [f"{len(failures)} of {number_items} input files couldn't be read"]
+    for name, message in failures:
+        msg.append("")
+        msg.append(f"{name}:")
+        msg.extend([f"    {line}" for line in message.split("\n") if line.strip()])
+    msg.append("")
+
+    exit_error("\n".join(msg))
+
+
 def process_stream_and_add_frames(
     frames: List[Saveframe], input_args: Namespace
 ) -> Entry:
@@ -406,24 +584,31 @@ def process_stream_and_add_frames(
         a new entry containing the frames
     """
 
+    # avoid a circular import
+    from nef_pipelines.lib.nef_lib import entry_from_stdin_without_parsing_or_none
+
+    reading_stdin = not (
+        "input" in input_args and input_args.input and input_args.input != STDIN
+    )
+
     try:
-        stream = get_pipe_file(input_args)
+        new_entry = (
+            entry_from_stdin_without_parsing_or_none()
+            if reading_stdin and not running_in_pycharm()
+            else None
+        )
+        stream = get_pipe_file(input_args) if new_entry is None else None
     except Exception as e:
         exit_error(f"failed to load pipe file because {e}")
 
-    if stream is not None:
-        lines = stream.read()
-    else:
-        lines = ""
+    if new_entry is None:
+        lines = stream.read() if stream is not None else ""
 
-    if len(lines.strip()) == 0:
-        stream = None
-
-    new_entry = (
-        Entry.from_string(lines)
-        if stream
-        else Entry.from_scratch(input_args.entry_name)
-    )
+        new_entry = (
+            Entry.from_string(lines)
+            if len(lines.strip()) != 0
+            else Entry.from_scratch(input_args.entry_name)
+        )
 
     fixup_metadata(new_entry, NEF_PIPELINES, get_version(), script_name(__file__))
 
@@ -476,6 +661,13 @@ def is_float(value: str) -> bool:
 
 T = TypeVar("T")
 
+NEF_PIPELINES_CACHE_DIR_ENV = "NEF_PIPELINES_CACHE_DIR"
+
+# caches which haven't been used for this many days are removed when another cache of the same kind is written
+STALE_CACHE_DAYS = 30
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
 
 def nef_pipelines_root():
     """
@@ -487,6 +679,66 @@ def nef_pipelines_root():
     return Path(__file__).parent.parent.parent
 
 
+def user_cache_dir() -> Path:
+    """
+    get the directory nef pipelines caches data in for the current user, this follows the platform's conventions
+    and can be overridden with the environment variable NEF_PIPELINES_CACHE_DIR. The directory may not exist yet
+
+    :return: the path of the cache directory
+    """
+
+    if NEF_PIPELINES_CACHE_DIR_ENV in os.environ:
+        result = Path(os.environ[NEF_PIPELINES_CACHE_DIR_ENV])
+    elif sys.platform == "win32":
+        result = (
+            Path(os.environ.get("LOCALAPPDATA", Path.home())) / NEF_PIPELINES / "cache"
+        )
+    elif sys.platform == "darwin":
+        result = Path.home() / "Library" / "Caches" / NEF_PIPELINES
+    else:
+        result = (
+            Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+            / NEF_PIPELINES
+        )
+
+    return result
+
+
+def mark_cache_used(path: Path):
+    """
+    record that a cache file or directory has been used by updating its modification time, so
+    remove_stale_caches leaves it alone while it is in use. Errors are ignored as caches are an optimisation
+
+    :param path: the cache file or directory
+    """
+
+    with contextlib.suppress(OSError):
+        os.utime(path)
+
+
+def remove_stale_caches(paths: Iterable[Path], max_age_days: float = STALE_CACHE_DAYS):
+    """
+    remove cache files or directories which haven't been used [see mark_cache_used] for max_age_days. This
+    allows caches made by other versions of nef pipelines installed for the same user to coexist while they are
+    still used. Errors are ignored as caches are an optimisation
+
+    :param paths: the cache files or directories to check
+    :param max_age_days: the number of days since their last use after which caches are removed
+    """
+
+    oldest_allowed = time.time() - max_age_days * SECONDS_PER_DAY
+
+    for path in paths:
+        with contextlib.suppress(OSError):
+            if path.stat().st_mtime >= oldest_allowed:
+                continue
+
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+
+
 # https://stackoverflow.com/questions/312443/how-do-i-split-a-list-into-equally-sized-chunks
 def chunks(input: Iterator[T], n: int) -> Iterator[List[T]]:
     """Yield successive n-sized chunks from lst.
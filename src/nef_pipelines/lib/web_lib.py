@@ -0,0 +1,385 @@
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from nef_pipelines.lib.util import user_cache_dir
+
+WEB_CACHE_VERSION = 1
+
+WEB_CACHE_DIRECTORY = "web"
+
+HTTP_OK = 200
+HTTP_TOO_MANY_REQUESTS = 429
+HTTP_SERVER_ERROR = 500
+
+# how long responses are reused for in seconds, None means responses never expire
+ONE_DAY = 24 * 60 * 60
+DEFAULT_TTL = 30 * ONE_DAY
+
+OFFLINE_HELP = "only use responses already in the cache and don't use the network"
+NO_CACHE_HELP = "don't use or update the cache of web responses"
+
+
+class WebResponse(NamedTuple):
+    """
+    the response to a web request, from the network or the cache
+    """
+
+    status_code: int
+    content: bytes
+    url: str
+    from_cache: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code != HTTP_OK:
+            raise WebRequestException(
+                f"the url {self.url} returned the status code {self.status_code}"
+            )
+
+
+class WebRequestException(Exception):
+    """
+    a web request failed
+    """
+
+    ...
+
+
+class NotInCacheException(WebRequestException):
+    """
+    a web request was made offline and there was no response for it in the cache
+    """
+
+    ...
+
+
+# a transport makes a request over the network: transport(method, url, data, files) where files maps form field
+# names to the paths of files to upload
+Transport = Callable[[str, str, Optional[Dict], Optional[Dict[str, Path]]], WebResponse]
+
+
+def requests_transport(
+    method: str,
+    url: str,
+    data: Optional[Dict] = None,
+    files: Optional[Dict[str, Path]] = None,
+) -> WebResponse:
+    """
+    make a web request using requests
+
+    :param method: the http method e.g. GET or POST
+    :param url: the url
+    :param data: form data to send
+    :param files: files to upload as form field name -> path
+    :return: the response
+    """
+
+    with contextlib.ExitStack() as stack:
+        open_files = {
+            name: stack.enter_context(open(path, "rb"))
+            for name, path in (files or {}).items()
+        }
+        response = _requests_session().request(
+            method, url, data=data, files=open_files if open_files else None
+        )
+
+    return WebResponse(response.status_code, response.content, url)
+
+
+_SESSIONS = threading.local()
+
+
+def _requests_session():
+
+    # sessions keep connections to each host open between requests, they aren't thread safe so each thread has its own
+    import requests
+
+    if not hasattr(_SESSIONS, "session"):
+        _SESSIONS.session = requests.Session()
+
+    return _SESSIONS.session
+
+
+# the transport used by web caches which aren't given one, tests replace this with a stand in for the servers
+TRANSPORT: Transport = requests_transport
+
+
+class ThrottledTransport:
+    """
+    a transport which wraps another to be polite to servers when making many requests at once. It limits the
+    number of requests open to each host at a time and the rate at which they are started, and retries requests
+    that fail with a network error, a server error or a too many requests reply with an exponentially increasing
+    delay
+    """
+
+    def __init__(
+        self,
+        connections_per_host: int = 4,
+        min_interval: float = 0.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        transport: Optional[Transport] = None,
+    ):
+        """
+        :param connections_per_host: the maximum number of requests open to a host at once
+        :param min_interval: the minimum time between starting requests to a host in seconds
+        :param retries: how many times to retry a failed request
+        :param backoff: the delay before the first retry in seconds, it doubles for each further retry
+        :param transport: the transport to wrap [default: TRANSPORT]
+        """
+        self._connections_per_host = connections_per_host
+        self._min_interval = min_interval
+        self._retries = retries
+        self._backoff = backoff
+        self._transport = transport
+
+        self._lock = threading.Lock()
+        self._host_semaphores = {}
+        self._host_next_start = defaultdict(float)
+
+    def __call__(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        files: Optional[Dict[str, Path]] = None,
+    ) -> WebResponse:
+
+        transport = self._transport if self._transport else TRANSPORT
+        host = urlsplit(url).netloc
+
+        for attempt in range(self._retries + 1):
+            if attempt > 0:
+                time.sleep(self._backoff * 2 ** (attempt - 1))
+
+            with self._host_semaphore(host):
+                self._wait_for_turn(host)
+
+                try:
+                    response = transport(method, url, data, files)
+                except OSError:
+                    # requests' network errors are OSErrors
+                    if attempt == self._retries:
+                        raise
+                    continue
+
+            if not _is_retryable(response.status_code):
+                break
+
+        return response
+
+    def _host_semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.Semaphore(
+                    self._connections_per_host
+                )
+            return self._host_semaphores[host]
+
+    def _wait_for_turn(self, host: str):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._host_next_start[host])
+            self._host_next_start[host] = start + self._min_interval
+
+        if start > now:
+            time.sleep(start - now)
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == HTTP_TOO_MANY_REQUESTS or status_code >= HTTP_SERVER_ERROR
+
+
+class WebCache:
+    """
+    a persistent cache of web responses stored in the user's cache directory. Responses are keyed by a hash of the
+    request: its method, url, form data and the contents of any uploaded files, so the same request with the same
+    inputs is only made once while its response is still fresh. Only successful responses are cached.
+
+    offline caches only return responses from the cache [however old] and raise NotInCacheException for
+    requests that aren't cached, disabled caches always use the network and don't store responses
+    """
+
+    def __init__(
+        self,
+        offline: bool = False,
+        enabled: bool = True,
+        directory: Optional[Path] = None,
+        transport: Optional[Transport] = None,
+    ):
+        """
+        :param offline: only return cached responses
+        :param enabled: use and update the cache
+        :param directory: where to store responses [default: web in the user's nef pipelines cache directory]
+        :param transport: how to make requests [default: TRANSPORT]
+        """
+        self.offline = offline
+        self.enabled = enabled
+        self._directory = directory
+        self._transport = transport
+
+    @property
+    def directory(self) -> Path:
+        return (
+            self._directory
+            if self._directory
+            else user_cache_dir() / WEB_CACHE_DIRECTORY
+        )
+
+    def get(self, url: str, ttl: Optional[float] = DEFAULT_TTL) -> WebResponse:
+        """
+        get a url using the cache
+
+        :param url: the url
+        :param ttl: how long a cached response can be used for in seconds, None for ever
+        :return: the response
+        """
+        return self.request("GET", url, ttl=ttl)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        files: Optional[Dict[str, Path]] = None,
+        ttl: Optional[float] = DEFAULT_TTL,
+        is_cacheable: Optional[Callable[[WebResponse], bool]] = None,
+    ) -> WebResponse:
+        """
+        make a web request using the cache
+
+        :param method: the http method e.g. GET or POST
+        :param url: the url
+        :param data: form data to send
+        :param files: files to upload as form field name -> path
+        :param ttl: how long a cached response can be used for in seconds, None for ever
+        :param is_cacheable: an extra check that a successful response is complete enough to be cached
+        :return: the response
+        """
+
+        key = _request_key(method, url, data, files)
+        cache_path = self.directory / f"{key}.pickle"
+
+        if self.enabled or self.offline:
+            # offline any cached response is better than none so it never expires
+            cached = _read_cached_response_or_none(
+                cache_path, None if self.offline else ttl
+            )
+            if cached is not None:
+                return cached
+
+        if self.offline:
+            msg = f"there is no cached response for the {method} request to {url} and the network isn't being used"
+            raise NotInCacheException(msg)
+
+        transport = self._transport if self._transport else TRANSPORT
+        response = transport(method, url, data, files)
+
+        if (
+            self.enabled
+            and response.status_code == HTTP_OK
+            and (is_cacheable is None or is_cacheable(response))
+        ):
+            _write_cached_response(cache_path, response)
+
+        return response
+
+    def forget(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        files: Optional[Dict[str, Path]] = None,
+    ):
+        """
+        remove the cached response to a request if there is one
+
+        :param method: the http method e.g. GET or POST
+        :param url: the url
+        :param data: form data sent
+        :param files: files uploaded as form field name -> path
+        """
+
+        if self.enabled and not self.offline:
+            key = _request_key(method, url, data, files)
+            with contextlib.suppress(OSError):
+                (self.directory / f"{key}.pickle").unlink()
+
+
+def _request_key(
+    method: str, url: str, data: Optional[Dict], files: Optional[Dict[str, Path]]
+) -> str:
+
+    file_digests = {
+        name: hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        for name, path in (files or {}).items()
+    }
+
+    request = [
+        WEB_CACHE_VERSION,
+        method.upper(),
+        url,
+        {str(name): str(value) for name, value in (data or {}).items()},
+        file_digests,
+    ]
+
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+def _read_cached_response_or_none(
+    cache_path: Path, ttl: Optional[float]
+) -> Optional[WebResponse]:
+
+    result = None
+    try:
+        with open(cache_path, "rb") as fh:
+            version, created, status_code, content, url = pickle.load(fh)
+        is_fresh = ttl is None or time.time() - created < ttl
+        if version == WEB_CACHE_VERSION and is_fresh:
+            result = WebResponse(status_code, content, url, from_cache=True)
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+        pass
+
+    return result
+
+
+def _write_cached_response(cache_path: Path, response: WebResponse):
+
+    # as with the chem comp cache failing to write isn't an error and responses are written to a temporary file
+    # and renamed so concurrent processes and threads never see a partial response
+    temp_path = cache_path.with_name(
+        f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as fh:
+            pickle.dump(
+                (
+                    WEB_CACHE_VERSION,
+                    time.time(),
+                    response.status_code,
+                    response.content,
+                    response.url,
+                ),
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, cache_path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
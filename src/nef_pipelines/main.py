@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 
 import logging
+import os
 import sys
 from importlib import import_module
 from textwrap import dedent
+from time import perf_counter
 from traceback import format_exc, print_exc
+from typing import Dict, List, Optional
 
 verbose_mode = False
 
@@ -27,6 +30,110 @@ logging.getLogger().setLevel(logging.ERROR)
 
 EXIT_ERROR = 1
 
+PROFILE_STARTUP_OPTION = "--profile-startup"
+
+# the manifest of plugins, each plugin provides a top level command and is only imported when its command is
+# used. the help is used to list the commands without importing them and must match the help the plugin registers
+PLUGINS = {
+    "help": (
+        "nef_pipelines.tools.help",
+        "- help on the nef pipelines tools and their usage",
+    ),
+    "benchmark": (
+        "nef_pipelines.tools.benchmark",
+        "- benchmark nef pipelines on synthetic data [alpha]",
+    ),
+    "chains": ("nef_pipelines.tools.chains", "- carry out operations on chains"),
+    "entry": (
+        "nef_pipelines.tools.entry",
+        "- carry out operations on the nef file entry",
+    ),
+    "fit": ("nef_pipelines.tools.fit", "- carry out fitting operations [alpha]"),
+    "frames": (
+        "nef_pipelines.tools.frames",
+        "- carry out operations on frames in nef files",
+    ),
+    "globals": (
+        "nef_pipelines.tools.globals",
+        "- add global options to the pipeline [use save as your last command to clean up the globals]",
+    ),
+    "header": ("nef_pipelines.tools.header", "- add a header to the stream"),
+    "loops": (
+        "nef_pipelines.tools.loops",
+        "- carry out operations on loops in nef frames",
+    ),
+    "peaks": ("nef_pipelines.tools.peaks", "- carry out operations on nef peaks"),
+    "run": (
+        "nef_pipelines.tools.run",
+        "- run a pipeline of nef commands in a single process without re-reading NEF between stages [alpha]",
+    ),
+    "save": (
+        "nef_pipelines.tools.save",
+        "- save the entries in the stream to a file / files or stdout with delimiters",
+    ),
+    "series": ("nef_pipelines.tools.series", "- carry out operations on a data series"),
+    "shifts": (
+        "nef_pipelines.tools.shifts",
+        "- carry out operations on shifts [average]",
+    ),
+    "simulate": ("nef_pipelines.tools.simulate", "- simulate data"),
+    "sink": (
+        "nef_pipelines.tools.sink",
+        "- read the current stream and don't write anything",
+    ),
+    "stream": ("nef_pipelines.tools.stream", "- stream a nef file"),
+    "test": ("nef_pipelines.tools.test", "- run the test suite"),
+    "csv": ("nef_pipelines.transcoders.csv", "- read [rdcs]"),
+    "deep": ("nef_pipelines.transcoders.deep", "- read deep [peaks]"),
+    "echidna": ("nef_pipelines.transcoders.echidna", "- read echidna data [peaks]"),
+    "fasta": ("nef_pipelines.transcoders.fasta", "- read and write fasta sequences"),
+    "mars": (
+        "nef_pipelines.transcoders.mars",
+        "- read and write mars [shifts and sequences]",
+    ),
+    "modelfree": (
+        "nef_pipelines.transcoders.modelfree",
+        "- write modelfree [relaxation data]",
+    ),
+    "nmrpipe": (
+        "nef_pipelines.transcoders.nmrpipe",
+        "- read nmrpipe [peaks, shifts & sequencess]",
+    ),
+    "nmrview": (
+        "nef_pipelines.transcoders.nmrview",
+        "- read and write nmrview [peaks, sequences & shifts]",
+    ),
+    "pales": ("nef_pipelines.transcoders.pales", "- read and write pales/dc [rdcs]"),
+    "rcsb": ("nef_pipelines.transcoders.rcsb", "- read pdb/cif [sequences]"),
+    "rpf": ("nef_pipelines.transcoders.rpf", "- write rpf shifts"),
+    "shifty": ("nef_pipelines.transcoders.shifty", "- write shifty [shifts]"),
+    "shiftx2": ("nef_pipelines.transcoders.shiftx2", "- read shiftx2 data [shifts]"),
+    "sparky": ("nef_pipelines.transcoders.sparky", "- read sparky files [shifts]"),
+    "nmrstar": (
+        "nef_pipelines.transcoders.nmrstar",
+        "- read NMR-STAR [sequences & shifts]",
+    ),
+    "talos": (
+        "nef_pipelines.transcoders.talos",
+        "- read and write talos files [shifts & restraints]",
+    ),
+    "xcamshift": (
+        "nef_pipelines.transcoders.xcamshift",
+        "- write xcamshift for xplor [shifts]",
+    ),
+    "xeasy": (
+        "nef_pipelines.transcoders.xeasy",
+        "- read xeasy files [flya dialect: sequence]",
+    ),
+    "xplor": (
+        "nef_pipelines.transcoders.xplor",
+        "- read xplor [sequences, dihedral & distance restraints]",
+    ),
+}
+
+# commands which need the whole command tree to be available
+LOAD_ALL_PLUGINS_COMMANDS = {"help", "run"}
+
 
 def do_exit_error(msg, trace_back=True, exit_code=EXIT_ERROR):
     msg = dedent(msg)
@@ -44,6 +151,18 @@ def create_nef_app():
 
     nef_app.app = typer.Typer(no_args_is_help=True)
     app = nef_app.app  # noqa: F841
+
+    # noinspection PyUnusedLocal
+    @app.callback()
+    def nef(
+        profile_startup: bool = typer.Option(
+            False,
+            PROFILE_STARTUP_OPTION,
+            help="report the time taken to import each plugin on startup",
+        )
+    ):
+        """- NEF-Pipelines tools for manipulating NEF files and converting to and from other formats"""
+
     return nef_app
 
 
@@ -72,49 +191,19 @@ def main():
                  exiting..."""
         do_exit_error(msg, e)
 
+    profile_startup = PROFILE_STARTUP_OPTION in sys.argv[1:]
+
+    command_name = _get_command_name(sys.argv[1:])
+
     warnings = []
+    import_times = {}
     try:
-        # import components which will self register, this could and will be automated
-        modules = [
-            "nef_pipelines.tools.help",
-            "nef_pipelines.tools.chains",
-            "nef_pipelines.tools.entry",
-            "nef_pipelines.tools.fit",
-            "nef_pipelines.tools.frames",
-            "nef_pipelines.tools.globals",
-            "nef_pipelines.tools.header",
-            "nef_pipelines.tools.loops",
-            "nef_pipelines.tools.peaks",
-            "nef_pipelines.tools.save",
-            "nef_pipelines.tools.series",
-            "nef_pipelines.tools.shifts",
-            "nef_pipelines.tools.simulate",
-            "nef_pipelines.tools.sink",
-            "nef_pipelines.tools.stream",
-            "nef_pipelines.tools.test",
-            "nef_pipelines.transcoders.csv",
-            "nef_pipelines.transcoders.deep",
-            "nef_pipelines.transcoders.echidna",
-            "nef_pipelines.transcoders.fasta",
-            "nef_pipelines.transcoders.mars",
-            "nef_pipelines.transcoders.modelfree",
-            "nef_pipelines.transcoders.nmrpipe",
-            "nef_pipelines.transcoders.nmrview",
-            "nef_pipelines.transcoders.pales",
-            "nef_pipelines.transcoders.rcsb",
-            "nef_pipelines.transcoders.rpf",
-            "nef_pipelines.transcoders.shifty",
-            "nef_pipelines.transcoders.shiftx2",
-            "nef_pipelines.transcoders.sparky",
-            "nef_pipelines.transcoders.nmrstar",
-            "nef_pipelines.transcoders.talos",
-            "nef_pipelines.transcoders.xcamshift",
-            "nef_pipelines.transcoders.xeasy",
-            "nef_pipelines.transcoders.xplor",
-        ]
-        for module_name in modules:
+        plugins_to_load = _select_plugins_to_load(command_name, profile_startup)
+        for module_name in plugins_to_load:
             try:
+                start_time = perf_counter()
                 import_module(module_name)
+                import_times[module_name] = perf_counter() - start_time
             except Exception:
                 msg = f"plugin {module_name}\n{format_exc()}"
 
@@ -128,12 +217,22 @@ def main():
 
         do_exit_error(msg, e)
 
+    if profile_startup:
+        _report_import_times(import_times)
+
+    if profile_startup and command_name is None:
+        _report_warnings(warnings)
+        sys.exit(0)
+
     try:
 
         nef_app.app
 
         command = typer.main.get_command(nef_app.app)
 
+        if command_name is None:
+            _add_placeholders_for_unloaded_plugins(command)
+
         command(standalone_mode=False)
 
         _report_warnings(warnings)
@@ -156,6 +255,84 @@ def main():
         do_exit_error(msg)
 
 
+def _get_command_name(args: List[str]) -> Optional[str]:
+    """
+    find the name of the top level command in the command line arguments, this is the first argument
+    that isn't an option
+    :param args: the command line arguments without the program name
+    :return: the command name or None if there isn't one
+    """
+
+    result = None
+    for arg in args:
+        if not arg.startswith("-"):
+            result = arg
+            break
+
+    return result
+
+
+def _select_plugins_to_load(command_name: Optional[str], load_all: bool) -> List[str]:
+    """
+    select the plugin modules to import, only the plugin providing the command is imported unless the command
+    needs the whole command tree, the command is unknown or shell completion is running
+
+    :param command_name: the top level command being run or None
+    :param load_all: load all the plugins
+    :return: the names of the modules to import
+    """
+    all_plugins = [module_name for module_name, _ in PLUGINS.values()]
+
+    completing = any(
+        key.startswith("_") and key.endswith("_COMPLETE") for key in os.environ
+    )
+
+    if load_all and command_name is None:
+        result = all_plugins
+    elif completing or command_name in LOAD_ALL_PLUGINS_COMMANDS:
+        result = all_plugins
+    elif command_name in PLUGINS:
+        result = [PLUGINS[command_name][0]]
+    elif command_name is None:
+        result = []
+    else:
+        result = all_plugins
+
+    return result
+
+
+def _add_placeholders_for_unloaded_plugins(command):
+    """
+    add commands for plugins that haven't been imported using the help from the manifest, so that the
+    top level help lists all the commands without importing them
+    :param command: the root click command
+    """
+    from click import Command
+
+    for name, (_, help) in PLUGINS.items():
+        if name not in command.commands:
+            command.add_command(Command(name, help=help))
+
+
+def _report_import_times(import_times: Dict[str, float]):
+    from tabulate import tabulate
+
+    table = [
+        [module_name, f"{import_time * 1000:.1f}"]
+        for module_name, import_time in sorted(
+            import_times.items(), key=lambda item: item[1], reverse=True
+        )
+    ]
+    table.append(["total", f"{sum(import_times.values()) * 1000:.1f}"])
+
+    print(file=sys.stderr)
+    print(
+        tabulate(table, headers=["plugin", "import time [ms]"], disable_numparse=True),
+        file=sys.stderr,
+    )
+    print(file=sys.stderr)
+
+
 def _report_warnings(warnings):
     if warnings:
 
@@ -0,0 +1,131 @@
+"""
+compare greedy [nef peaks match] and global [nef peaks match --global] peak matching on synthetic HNCO
+peak lists made with simulate peaks, the second peak list is a copy of the first with noise added to the
+peak positions. run with
+
+    python -m nef_pipelines.tests.benchmarks.benchmark_peaks_match [NUMBER_PEAKS ...]
+"""
+
+import random
+import sys
+from time import perf_counter
+
+from pynmrstar import Entry
+from tabulate import tabulate
+
+from nef_pipelines.lib.nef_frames_lib import SHIFT_LIST_FRAME_CATEGORY
+from nef_pipelines.lib.shift_lib import shifts_to_nef_frame
+from nef_pipelines.lib.spectra_lib import ExperimentType
+from nef_pipelines.lib.structures import AtomLabel, Residue, ShiftData, ShiftList
+from nef_pipelines.tools.peaks.match import (
+    _nef_frames_to_peak_shifts,
+    find_best_matches,
+    find_global_matches,
+)
+from nef_pipelines.tools.simulate.peaks import pipe as simulate_peaks_pipe
+
+DEFAULT_NUMBER_PEAKS = [1_000, 5_000, 20_000]
+
+# noise added to the second peak list in ppm
+NOISE = {"H": 0.02, "N": 0.15, "C": 0.05}
+
+SEARCH_RADII = {"H": 0.1, "N": 0.7, "C": 0.2}
+
+
+def _synthetic_entry(number_residues, rng):
+    shifts = []
+    for sequence_code in range(1, number_residues + 1):
+        residue = Residue("A", sequence_code, "ALA")
+        shifts.append(ShiftData(AtomLabel(residue, "H"), round(rng.gauss(8.2, 0.6), 3)))
+        shifts.append(
+            ShiftData(AtomLabel(residue, "N"), round(rng.gauss(120.0, 4.0), 3))
+        )
+        shifts.append(
+            ShiftData(AtomLabel(residue, "C"), round(rng.gauss(176.0, 1.5), 3))
+        )
+
+    entry = Entry.from_scratch("benchmark")
+    entry.add_saveframe(shifts_to_nef_frame(ShiftList(shifts), "default"))
+
+    entry = simulate_peaks_pipe(
+        entry,
+        [f"{SHIFT_LIST_FRAME_CATEGORY}_default"],
+        True,
+        [ExperimentType.HNCO],
+        "synthetic_{spectrum}",
+    )
+
+    return entry
+
+
+def _add_noise(peak_shifts, rng):
+    return {
+        peak_id: {
+            atom_name: value + rng.gauss(0.0, NOISE[atom_name[0]])
+            for atom_name, value in shifts.items()
+        }
+        for peak_id, shifts in peak_shifts.items()
+    }
+
+
+def _benchmark(number_peaks, rng):
+
+    entry = _synthetic_entry(number_peaks, rng)
+    (peak_frame,) = entry.get_saveframes_by_category("nef_nmr_spectrum")
+
+    peak_shifts_1 = _nef_frames_to_peak_shifts(peak_frame)
+    peak_shifts_2 = _add_noise(peak_shifts_1, rng)
+
+    # peak ids are shared by the two lists so a match is correct if the peak ids are the same
+    start = perf_counter()
+    best_matches = find_best_matches(peak_shifts_1, peak_shifts_2, SEARCH_RADII)
+    greedy_time = perf_counter() - start
+
+    greedy_correct = sum(
+        1
+        for peak_id, matches in best_matches.items()
+        if matches and min(matches.items())[1] == [peak_id]
+    )
+    greedy_matched_peaks_2 = [
+        peak_id_2
+        for matches in best_matches.values()
+        if matches
+        for peak_id_2 in min(matches.items())[1]
+    ]
+    greedy_clashes = len(greedy_matched_peaks_2) - len(set(greedy_matched_peaks_2))
+
+    start = perf_counter()
+    global_matches = find_global_matches(peak_shifts_1, peak_shifts_2, SEARCH_RADII)
+    global_time = perf_counter() - start
+
+    global_correct = sum(
+        1 for peak_id, match in global_matches.items() if match and match[0] == peak_id
+    )
+
+    return [
+        [
+            len(peak_shifts_1),
+            "greedy",
+            f"{greedy_time:.2f}",
+            greedy_correct,
+            greedy_clashes,
+        ],
+        [len(peak_shifts_1), "global", f"{global_time:.2f}", global_correct, 0],
+    ]
+
+
+def main(numbers_peaks):
+
+    rng = random.Random(42)
+
+    table = []
+    for number_peaks in numbers_peaks:
+        table.extend(_benchmark(number_peaks, rng))
+
+    headers = ["peaks", "method", "time [s]", "correct", "shared matches"]
+    print(tabulate(table, headers=headers, tablefmt="plain"))
+
+
+if __name__ == "__main__":
+    numbers_peaks = [int(arg) for arg in sys.argv[1:]] or DEFAULT_NUMBER_PEAKS
+    main(numbers_peaks)
@@ -2,12 +2,42 @@ from random import seed
 
 import pytest
 
+from nef_pipelines.lib import web_lib
+from nef_pipelines.lib.test_lib import StandInServer
+from nef_pipelines.lib.util import NEF_PIPELINES_CACHE_DIR_ENV
+
 
 @pytest.fixture
 def fixed_seed():
     seed(42)
 
 
+@pytest.fixture(autouse=True)
+def user_cache_dir(monkeypatch, tmp_path_factory):
+    """
+    give each test an empty nef pipelines cache directory so tests never read or write the user's caches [chem
+    comps, parsed structures and web responses] and always exercise the code that fills them
+    """
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv(NEF_PIPELINES_CACHE_DIR_ENV, str(cache_dir))
+
+    return cache_dir
+
+
+@pytest.fixture
+def stand_in_server(request, monkeypatch):
+    """
+    replace the network used by web caches with a StandInServer, the pages served can be set by parametrising
+    the fixture indirectly [@pytest.mark.parametrize("stand_in_server", [pages], indirect=True)] or added to
+    server.pages
+    """
+
+    server = StandInServer(dict(getattr(request, "param", {})))
+    monkeypatch.setattr(web_lib, "TRANSPORT", server)
+
+    return server
+
+
 def pytest_configure(config):
     from nef_pipelines.main import create_nef_app
 
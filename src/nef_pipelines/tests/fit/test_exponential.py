@@ -0,0 +1,75 @@
+import random
+
+from nef_pipelines.tools.fit.exponential import ErrorPropogation, _fit_by_residue
+
+ID_XY_DATA = {
+    1: ([0.0, 0.0, 1.0, 2.0], [10.0, 10.5, 5.0, 2.5]),
+    2: ([0.0, 1.0, 1.0, 2.0], [8.0, 4.0, 3.0, 2.0]),
+    3: ([0.0, 1.0, 2.0], [6.0, 3.0, 1.5]),
+}
+
+
+def _stand_in_noise_level(id_xy_data):
+    # the noise level the stand in fitter estimates, it depends on all the data it is given
+    return sum(sum(ys) for _, ys in id_xy_data.values()) / 100.0
+
+
+def _replicate_fitter(id_xy_data, error_method, cycles, noise_level, seed):
+    # stands in for the streamfitter fitter, the random values depend only on the seed it is given and as in
+    # streamfitter the noise level is estimated from the data if it isn't given
+    if noise_level is None:
+        noise_level = _stand_in_noise_level(id_xy_data)
+
+    generator = random.Random(seed)
+    return {
+        "fits": {id: generator.random() for id in id_xy_data},
+        "monte_carlo_errors": {
+            id: [cycles, error_method, noise_level] for id in id_xy_data
+        },
+        "monte_carlo_value_stats": {id: seed for id in id_xy_data},
+        "monte_carlo_param_values": {id: len(xy[0]) for id, xy in id_xy_data.items()},
+        "noise_level": noise_level,
+        "versions": "test fitter",
+    }
+
+
+def test_fit_by_residue_independent_of_jobs():
+
+    args = ID_XY_DATA, ErrorPropogation.PROPOGATION, 10, None, 42
+
+    serial = _fit_by_residue(_replicate_fitter, *args, jobs=1)
+    parallel = _fit_by_residue(_replicate_fitter, *args, jobs=3)
+
+    assert serial == parallel
+
+    assert list(serial["fits"]) == [1, 2, 3]
+    assert serial["monte_carlo_param_values"] == {1: 4, 2: 4, 3: 3}
+    assert serial["versions"] == "test fitter"
+
+    # the fitter estimates the noise once from all the residues and every residue is fitted with it
+    noise_level = _stand_in_noise_level(ID_XY_DATA)
+    assert serial["noise_level"] == noise_level
+    assert serial["monte_carlo_errors"] == {
+        id: [10, ErrorPropogation.PROPOGATION, noise_level] for id in ID_XY_DATA
+    }
+
+    seeds = serial["monte_carlo_value_stats"]
+    assert len(set(seeds.values())) == 3
+
+
+def test_fit_by_residue_seeds_stable():
+
+    fitted = _fit_by_residue(
+        _replicate_fitter, ID_XY_DATA, ErrorPropogation.PROPOGATION, 10, 1.0, 42
+    )
+    fewer_residues = {id: ID_XY_DATA[id] for id in (2, 3)}
+    fitted_fewer = _fit_by_residue(
+        _replicate_fitter, fewer_residues, ErrorPropogation.PROPOGATION, 10, 1.0, 42
+    )
+    reseeded = _fit_by_residue(
+        _replicate_fitter, ID_XY_DATA, ErrorPropogation.PROPOGATION, 10, 1.0, 43
+    )
+
+    assert fitted["noise_level"] == 1.0
+    assert fitted_fewer["fits"] == {id: fitted["fits"][id] for id in (2, 3)}
+    assert reseeded["fits"] != fitted["fits"]
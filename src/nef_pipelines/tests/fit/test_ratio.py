@@ -0,0 +1,43 @@
+import pytest
+from uncertainties import ufloat
+
+from nef_pipelines.tools.fit.ratio import _ratio_calculation
+
+ID_XY_DATA = {
+    1: ([1, 0], [80.0, 100.0]),
+    2: ([0, 1, 1], [50.0, -20.0, -21.0]),
+    3: ([True, False], [0.0, 12.5]),
+}
+
+
+def test_ratio_calculation_matches_error_propagation():
+
+    result = _ratio_calculation(ID_XY_DATA, 2.0)
+
+    for id, (x_data, y_data) in ID_XY_DATA.items():
+        on_value = ufloat(y_data[list(x_data).index(True)], 2.0)
+        off_value = ufloat(y_data[list(x_data).index(False)], 2.0)
+        expected = on_value / off_value
+
+        ratio, error = result[id]
+        assert ratio == pytest.approx(expected.nominal_value)
+        assert error == pytest.approx(expected.std_dev)
+
+
+def test_ratio_calculation_monte_carlo():
+
+    result = _ratio_calculation(ID_XY_DATA, 2.0, cycles=2000, seed=7)
+    propagated = _ratio_calculation(ID_XY_DATA, 2.0)
+
+    assert result == _ratio_calculation(ID_XY_DATA, 2.0, cycles=2000, seed=7)
+
+    for id, (ratio, error) in result.items():
+        propagated_ratio, propagated_error = propagated[id]
+        assert ratio == propagated_ratio
+        assert error == pytest.approx(propagated_error, rel=0.1)
+
+
+def test_ratio_calculation_zero_off_value():
+
+    with pytest.raises(SystemExit):
+        _ratio_calculation({1: ([1, 0], [10.0, 0.0])}, 1.0)
@@ -88,3 +88,34 @@ def test_delete_name():
     result = run_and_report(app, ["test_1"], input=INPUT_PALES_TEST_1_NEF)
 
     assert_lines_match(EXPECTED_DELETE_NAME, result.stdout)
+
+
+BAD_LOOP = """\
+data_test
+
+save_nef_nmr_meta_data
+   _nef_nmr_meta_data.sf_category   nef_nmr_meta_data
+   _nef_nmr_meta_data.sf_framecode  nef_nmr_meta_data
+
+   loop_
+      _x.a
+      _x.b
+
+      1 2 3
+   stop_
+save_
+"""
+
+
+def test_delete_validate():
+
+    # frames which aren't deleted are copied without being checked...
+    result = run_and_report(app, ["zzz"], input=BAD_LOOP)
+    assert "1 2 3" in result.stdout
+
+    # ...unless they are validated
+    result = run_and_report(
+        app, ["--validate", "zzz"], input=BAD_LOOP, expected_exit_code=1
+    )
+    assert "failed to read nef entry from stdin" in result.stdout
+    assert "line 12" in result.stdout
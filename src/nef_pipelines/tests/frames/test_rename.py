@@ -339,3 +339,25 @@ def test_rename_category():
     assert sorted(NEW_FRAME_NAMES) == sorted(frame_names)
 
     assert ["sf_category", NEW_NAME] in entry.frame_dict[NEW_FRAME_ID].tags
+
+
+def test_rename_chained_pairs():
+
+    path = path_in_test_data(__file__, "ubiquitin_short.nef")
+    result = run_and_report(app, ["--in", path, "k_ubi_hnco`1`", "x1", "x1", "x2"])
+
+    frame_names = [frame.name for frame in Entry.from_string(result.stdout)]
+    assert "nef_nmr_spectrum_x2" in frame_names
+    assert "nef_nmr_spectrum_x1" not in frame_names
+
+
+def test_rename_old_name_not_found_after_rename():
+
+    path = path_in_test_data(__file__, "ubiquitin_short.nef")
+    result = run_and_report(
+        app,
+        ["--in", path, "k_ubi_hnco`1`", "x1", "k_ubi_hnco`1`", "x2"],
+        expected_exit_code=EXIT_ERROR,
+    )
+
+    assert "wasn't found in the entry" in result.stdout
@@ -28,3 +28,32 @@ def test_peaks():
     peaks_result = isolate_frame(result.stdout, "nef_nmr_spectrum_gb3_assigned_trunc")
 
     assert_lines_match(EXPECTED, peaks_result)
+
+
+def test_peaks_jobs():
+
+    path = path_in_test_data(__file__, "gb3_assigned_trunc.tab")
+    path_2 = path_in_test_data(__file__, "gb3.tab")
+
+    expected = run_and_report(app, [path, path_2], input=HEADER)
+    result = run_and_report(app, ["--jobs", "2", path, path_2], input=HEADER)
+
+    for frame_name in ["gb3_assigned_trunc", "gb3"]:
+        frame_name = f"nef_nmr_spectrum_{frame_name}"
+        assert isolate_frame(result.stdout, frame_name) == isolate_frame(
+            expected.stdout, frame_name
+        )
+
+
+def test_peaks_jobs_reports_bad_files():
+
+    path = path_in_test_data(__file__, "gb3_assigned_trunc.tab")
+    bad_path = path_in_test_data(__file__, "3aa.seq")
+
+    result = run_and_report(
+        app, ["--jobs", "2", path, bad_path], input=HEADER, expected_exit_code=1
+    )
+
+    assert "1 of 2 input files couldn't be read" in result.stdout
+    assert f"{bad_path}:" in result.stdout
+    assert "data seen before VAR and FORMAT" in result.stdout
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import pytest
+import typer
+
+from nef_pipelines.lib.test_lib import isolate_frame, path_in_test_data, run_and_report
+from nef_pipelines.transcoders.nmrstar.importers.project_cli import project
+
+app = typer.Typer()
+app.command()(project)
+
+
+BMRB_5387_URL = "https://bmrb.io/ftp/pub/bmrb/entry_directories/bmr5387/bmr5387_3.str"
+BMRB_5387_PAGES = {
+    BMRB_5387_URL: Path(path_in_test_data(__file__, "bmr5387_3.str.txt")).read_bytes()
+}
+
+
+@pytest.mark.parametrize("stand_in_server", [BMRB_5387_PAGES], indirect=True)
+def test_project_from_bmrb_offline(stand_in_server):
+
+    result = run_and_report(app, ["--source", "web", "bmr5387"])
+    assert "save_nef_molecular_system" in result.stdout
+    assert len(stand_in_server.requests) == 1
+
+    offline_result = run_and_report(app, ["--source", "web", "--offline", "bmr5387"])
+    # the entries only differ in their creation times
+    assert isolate_frame(offline_result.stdout, "nef_molecular_system") == (
+        isolate_frame(result.stdout, "nef_molecular_system")
+    )
+    assert len(stand_in_server.requests) == 1
+
+    result = run_and_report(
+        app, ["--source", "web", "--offline", "bmr15457"], expected_exit_code=1
+    )
+    assert "there is no cached response" in result.stdout
+    assert len(stand_in_server.requests) == 1
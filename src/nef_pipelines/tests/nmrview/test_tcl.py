@@ -86,5 +86,38 @@ def test_rest_of_line(parse_tcl, capsys):
     assert "file: Wibble.txt" in stderr
 
 
+def test_parser_cached():
+    assert nmrview_lib.get_tcl_parser() is nmrview_lib.get_tcl_parser()
+
+
+def test_flat_tcl_matches_parser(parser, parse_tcl):
+    tests = [
+        "",
+        "123",
+        "{123 456}",
+        "{}",
+        "{} {123 456}",
+        "0 {2.H} 8.15968 0.03748 ++ {0.0} {} {2.N} 126.97411 0 {} 0",
+        "{8810.50 } {8849.49 } {6639.53 }",
+        "abc{def}ghi",
+    ]
+
+    for test in tests:
+        result = parse_tcl(test)
+
+        assert isinstance(result, list)
+        assert result == parser.parseString(test, parseAll=True).asList()
+
+
+def test_nested_and_quoted_tcl_use_parser(parse_tcl):
+    tests_and_expecteds = {
+        "{} {{} 123 456}": ["", [[], "123", "456"]],
+        '"abc" "123 456"': ["abc", ["123", "456"]],
+    }
+
+    for test, expected in tests_and_expecteds.items():
+        assert parse_tcl(test).asList() == expected
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-vv"])
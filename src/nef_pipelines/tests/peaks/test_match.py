@@ -0,0 +1,110 @@
+import typer
+
+from nef_pipelines.lib.test_lib import (
+    assert_lines_match,
+    isolate_frame,
+    read_test_data,
+    run_and_report,
+)
+from nef_pipelines.tools.peaks.match import match
+
+EXIT_ERROR = 1
+
+app = typer.Typer()
+app.command()(match)
+
+MATCH_PEAKS = read_test_data("match_peaks.nef", __file__)
+
+EXPECTED_HEADER = """\
+    *** WARNING *** this command [shifts make_peaks] is only lightly tested use at your own risk!
+    frame 1: nef_nmr_spectrum_a
+    frame 2: nef_nmr_spectrum_b
+"""
+
+EXPECTED_HEADINGS = """\
+  f1.pk  f2.pks      num       dist  f1:    chn-1      seq-1  resn-1    atm-1    chn-2      seq-2  resn-2    atm-2    f2:    chn-1      seq-1  resn-1    atm-1    chn-2      seq-2  resn-2    atm-2
+"""  # noqa: E501
+
+EXPECTED_MATCHES = """\
+      1  2, 4          2  0.01              A              1  ALA       H        A              1  ALA       N               A             12  GLY       H        A             12  GLY       N
+      2  1             1  0.0245781         A              2  SER       H        A              2  SER       N               A             11  GLY       H        A             11  GLY       N
+"""  # noqa: E501
+
+EXPECTED_MATCH_3 = """\
+      3  3             1  0.2               A              3  THR       H        A              3  THR       N               A             13  GLY       H        A             13  GLY       N
+"""  # noqa: E501
+
+
+def test_match():
+
+    result = run_and_report(app, ["a", "b"], input=MATCH_PEAKS)
+
+    expected = EXPECTED_HEADER + EXPECTED_HEADINGS + EXPECTED_MATCHES + EXPECTED_MATCH_3
+
+    assert_lines_match(expected, result.stdout)
+
+
+def test_match_search_radius():
+
+    result = run_and_report(
+        app, ["--search-radius", "H:0.1", "a", "b"], input=MATCH_PEAKS
+    )
+
+    expected_no_matches = "note no matches for the following peak-1's: 3"
+    expected = (
+        EXPECTED_HEADER
+        + expected_no_matches
+        + "\n"
+        + EXPECTED_HEADINGS
+        + EXPECTED_MATCHES
+    )
+
+    assert_lines_match(expected, result.stdout)
+
+
+def test_match_bad_search_radius():
+
+    result = run_and_report(
+        app,
+        ["--search-radius", "H:x", "a", "b"],
+        input=MATCH_PEAKS,
+        expected_exit_code=EXIT_ERROR,
+    )
+
+    assert "search radii must be in the form <NUCLEUS>:<PPM>" in result.stdout
+
+
+EXPECTED_GLOBAL_MATCHES = """\
+    save_nefpls_peak_matches_a_b
+       _nefpls_peak_matches.sf_category   nefpls_peak_matches
+       _nefpls_peak_matches.sf_framecode  nefpls_peak_matches_a_b
+       _nefpls_peak_matches.peak_list_1   nef_nmr_spectrum_a
+       _nefpls_peak_matches.peak_list_2   nef_nmr_spectrum_b
+
+       loop_
+          _nefpls_peak_match.index
+          _nefpls_peak_match.peak_id_1
+          _nefpls_peak_match.peak_id_2
+          _nefpls_peak_match.distance
+
+         1   1   2   0.01
+         2   2   1   0.024578
+         3   3   3   0.2
+
+       stop_
+
+    save_
+"""
+
+
+def test_match_global():
+
+    result = run_and_report(
+        app, ["--global", "--search-radius", "H:0.3", "a", "b"], input=MATCH_PEAKS
+    )
+
+    # the runner mixes stderr into stdout so skip the warning
+    _, _, stdout = result.stdout.partition("\n")
+    result = isolate_frame(stdout, "nefpls_peak_matches_a_b")
+
+    assert_lines_match(EXPECTED_GLOBAL_MATCHES, result)
@@ -1,3 +1,5 @@
+import gzip
+
 import pytest
 from frozendict import frozendict
 
@@ -7,6 +9,8 @@ from nef_pipelines.transcoders.rcsb.rcsb_lib import (
     RCSBFileType,
     SequenceSource,
     guess_cif_or_pdb,
+    guess_cif_or_pdb_from_stream,
+    open_structure_file,
     parse_cif,
     parse_pdb,
 )
@@ -216,3 +220,99 @@ def test_parse_clic1(file_name):
         assert id(sequence.structure) == id(structure)
         assert sequence.id == 1
         assert sequence.source == SequenceSource.SEQRES
+
+
+def _sequences_and_residues(structure):
+    sequences = {
+        sequence_id: (sequence.start_sequence_code, sequence.residues)
+        for sequence_id, sequence in structure.sequences.items()
+    }
+    chains = [
+        (
+            chain.chain_code,
+            chain.segment_id,
+            [(residue.sequence_code, residue.residue_name) for residue in chain],
+            chain.sequence.id if chain.sequence else None,
+        )
+        for chain in structure.models[0]
+    ]
+    return sequences, chains
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    ["1l2y_short.pdb", "1l2y_short.cif", "1k0o.pdb", "1k0o.cif", "3a_ab.pdb"],
+)
+def test_sequence_only_matches_full_parse(file_name, tmp_path):
+
+    file_path = path_in_test_data(__file__, file_name)
+    file_type = file_name.split(".")[-1]
+    reader = FILE_TYPE_TO_READER[file_type]
+
+    with open(file_path) as lines:
+        structure = reader(lines, file_name)
+
+    gzipped_path = tmp_path / f"{file_name}.gz"
+    with open(file_path, "rb") as fh, gzip.open(gzipped_path, "wb") as gzipped_fh:
+        gzipped_fh.write(fh.read())
+
+    for path in file_path, gzipped_path:
+        with open_structure_file(path) as fh:
+            guessed_type, lines = guess_cif_or_pdb_from_stream(fh, str(path))
+            sequence_structure = reader(lines, file_name, sequence_only=True)
+
+        assert guessed_type == RCSBFileType[file_type.upper()]
+        assert len(sequence_structure.models) == 1
+        assert not sequence_structure.secondary_structure
+        assert (
+            not sequence_structure.models[0]
+            .chains[next(iter(sequence_structure.models[0].chains))]
+            .residues[0]
+            .atoms
+        )
+        assert _sequences_and_residues(sequence_structure) == _sequences_and_residues(
+            structure
+        )
+
+
+CIF_QUOTING = """\
+data_test
+_entity_poly_seq.entity_id 1
+_entity_poly_seq.num 1
+_entity_poly_seq.mon_id ALA
+_entity_poly_seq.hetero n
+#
+loop_
+_atom_site.group_PDB
+_atom_site.id
+_atom_site.label_atom_id
+_atom_site.label_comp_id
+_atom_site.label_asym_id
+_atom_site.label_seq_id
+_atom_site.auth_seq_id
+_atom_site.auth_comp_id
+_atom_site.auth_asym_id
+_atom_site.pdbx_PDB_model_num
+ATOM 1 "O5'" ALA A 1 11 ALA A 1
+ATOM 2 'C 1' ALA A 1 11 ALA A 1
+# a comment
+ATOM 3
+;a multi
+line value
+;
+ALA A 1 11 ALA A 1
+ATOM 4 N ALA A 1 11 ALA A 2
+"""
+
+
+def test_sequence_only_cif_quoting():
+
+    structure = parse_cif(CIF_QUOTING.split("\n"), "test.cif", sequence_only=True)
+
+    assert structure.sequences[1].residues == ["ALA"]
+    assert len(structure.models) == 1
+
+    chain = structure.models[0].chains["A"]
+    assert [(residue.sequence_code, residue.residue_name) for residue in chain] == [
+        (11, "ALA")
+    ]
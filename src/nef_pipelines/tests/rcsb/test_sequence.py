@@ -1,3 +1,6 @@
+import os
+import time
+
 import typer
 
 from nef_pipelines.lib.nef_lib import NEF_MOLECULAR_SYSTEM
@@ -8,6 +11,8 @@ from nef_pipelines.lib.test_lib import (
     read_test_data,
     run_and_report,
 )
+from nef_pipelines.lib.util import SECONDS_PER_DAY, STALE_CACHE_DAYS
+from nef_pipelines.transcoders.rcsb import rcsb_lib
 from nef_pipelines.transcoders.rcsb.importers.sequence import sequence
 
 app = typer.Typer()
@@ -152,3 +157,120 @@ def test_3a_test_no_chain_segid():
     assert "ERROR" in result.stdout
     assert "both the chain code and segment id" in result.stdout
     assert "not present on an ATOM record" in result.stdout
+
+
+EXPECTED_3AA_AND_CCCC_DDDD = """\
+    save_nef_molecular_system
+        _nef_molecular_system.sf_category   nef_molecular_system
+        _nef_molecular_system.sf_framecode  nef_molecular_system
+
+        loop_
+            _nef_sequence.index
+            _nef_sequence.chain_code
+            _nef_sequence.sequence_code
+            _nef_sequence.residue_name
+            _nef_sequence.linking
+            _nef_sequence.residue_variant
+            _nef_sequence.cis_peptide
+
+            1   A       1   ALA   start    .   .
+            2   A       2   ALA   middle   .   .
+            3   A       3   ALA   end      .   .
+            4   CCCC    1   ALA   start    .   .
+            5   CCCC    2   ALA   middle   .   .
+            6   CCCC    3   ALA   end      .   .
+            7   DDDD   11   ALA   start    .   .
+            8   DDDD   12   ALA   middle   .   .
+            9   DDDD   13   ALA   end      .   .
+
+        stop_
+
+    save_"""
+
+
+def test_multiple_files():
+
+    paths = [
+        path_in_test_data(__file__, "3aa.pdb"),
+        path_in_test_data(__file__, "3a_cccc_dddd.pdb"),
+    ]
+
+    for jobs in "1", "2":
+        result = run_and_report(app, ["--jobs", jobs, *paths], input=HEADER)
+
+        mol_sys_result = isolate_frame(result.stdout, "%s" % NEF_MOLECULAR_SYSTEM)
+
+        assert_lines_match(EXPECTED_3AA_AND_CCCC_DDDD, mol_sys_result)
+
+
+def test_multiple_files_chain_clash():
+
+    paths = [
+        path_in_test_data(__file__, "3aa.pdb"),
+        path_in_test_data(__file__, "3a_ab.pdb"),
+    ]
+
+    result = run_and_report(app, paths, input=HEADER, expected_exit_code=1)
+
+    assert "chain codes were read from more than one file" in result.stdout
+    assert "A: " in result.stdout
+
+    # choosing chains which are only in one of the files avoids the clash
+    result = run_and_report(app, ["--chains", "B", *paths], input=HEADER)
+
+    mol_sys_result = isolate_frame(result.stdout, "%s" % NEF_MOLECULAR_SYSTEM)
+    assert "B   11   ALA" in mol_sys_result
+    assert "A   1   ALA" not in mol_sys_result
+
+
+def test_parsed_structures_cached(monkeypatch):
+
+    path = path_in_test_data(__file__, "3aa.pdb")
+    run_and_report(app, [path], input=HEADER)
+
+    def fail_to_parse(*args, **kwargs):
+        raise Exception("the parser was called")
+
+    monkeypatch.setattr(rcsb_lib, "parse_pdb", fail_to_parse)
+
+    result = run_and_report(app, [path], input=HEADER)
+
+    mol_sys_result = isolate_frame(result.stdout, "%s" % NEF_MOLECULAR_SYSTEM)
+    assert_lines_match(EXPECTED_3AA, mol_sys_result)
+
+    result = run_and_report(
+        app, ["--no-cache", path], input=HEADER, expected_exit_code=1
+    )
+    assert "the parser was called" in result.stdout
+
+
+def test_stale_structures_cached_by_other_parsers_removed(user_cache_dir, monkeypatch):
+
+    path = path_in_test_data(__file__, "3aa.pdb")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(rcsb_lib, "_parser_digest", lambda: "an_older_parser")
+        run_and_report(app, [path], input=HEADER)
+
+    structures_dir = user_cache_dir / rcsb_lib.STRUCTURE_CACHE_DIRECTORY
+    assert [directory.name for directory in structures_dir.iterdir()] == [
+        "an_older_parser"
+    ]
+
+    run_and_report(app, [path], input=HEADER)
+
+    # structures cached by other parsers may still be used by other installs
+    assert sorted(directory.name for directory in structures_dir.iterdir()) == sorted(
+        ["an_older_parser", rcsb_lib._parser_digest()]
+    )
+
+    stale_time = time.time() - (STALE_CACHE_DAYS + 1) * SECONDS_PER_DAY
+    os.utime(structures_dir / "an_older_parser", (stale_time, stale_time))
+
+    with monkeypatch.context() as patch:
+        patch.setattr(rcsb_lib, "_parser_digest", lambda: "a_newer_parser")
+        run_and_report(app, [path], input=HEADER)
+
+    assert sorted(directory.name for directory in structures_dir.iterdir()) == sorted(
+        ["a_newer_parser", rcsb_lib._parser_digest()]
+    )
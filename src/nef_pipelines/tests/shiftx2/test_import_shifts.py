@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+import typer
+from pynmrstar import Entry
+
+from nef_pipelines.lib.shift_lib import shifts_to_nef_frame
+from nef_pipelines.lib.structures import AtomLabel, Residue, ShiftData, ShiftList
+from nef_pipelines.lib.test_lib import isolate_loop, run_and_report
+from nef_pipelines.transcoders.shiftx2.importers import shifts as shiftx2_shifts
+from nef_pipelines.transcoders.shiftx2.importers.shifts import shifts
+
+app = typer.Typer()
+app.command()(shifts)
+
+PREDICTIONS = {
+    "1UBQA": b"A 1 M CA 54.5 .\nA 1 M HA 4.2 .\n",
+    "2GB1A": b"A 1 M CA 55.1 .\n",
+    "3NOTA": b"A 1 T CA 61.9 .\n",
+}
+
+
+def _shiftx2_reply(data):
+    pdb_id = data["pdbid"]
+    return (
+        f'<html><a href="../tmp/{pdb_id}.nef">download predictions</a></html>'.encode()
+    )
+
+
+SHIFTX2_PAGES = {
+    shiftx2_shifts.CGI_URL: _shiftx2_reply,
+    **{
+        f"{shiftx2_shifts.ROOT_URL}/../tmp/{pdb_id}.nef": prediction
+        for pdb_id, prediction in PREDICTIONS.items()
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def no_request_interval(monkeypatch):
+    monkeypatch.setattr(shiftx2_shifts, "SHIFTX2_MIN_REQUEST_INTERVAL", 0.0)
+
+
+@pytest.mark.parametrize("stand_in_server", [SHIFTX2_PAGES], indirect=True)
+def test_batch_predictions(stand_in_server):
+
+    result = run_and_report(
+        app, ["--jobs", "3", "--source-chain", "A", "1UBQ", "2GB1", "3NOT"]
+    )
+
+    loop = isolate_loop(
+        result.stdout, "nef_chemical_shift_list_shiftx2_1UBQ", "nef_chemical_shift"
+    )
+    assert "A   1   MET   HA   4.2" in loop
+
+    loop = isolate_loop(
+        result.stdout, "nef_chemical_shift_list_shiftx2_3NOT", "nef_chemical_shift"
+    )
+    assert "A   1   THR   CA   61.9" in loop
+
+    # one submission and one download for each structure
+    assert len(stand_in_server.requests) == 6
+
+    offline_result = run_and_report(
+        app, ["--offline", "--source-chain", "A", "1UBQ", "2GB1", "3NOT"]
+    )
+    assert len(stand_in_server.requests) == 6
+    assert isolate_loop(
+        offline_result.stdout,
+        "nef_chemical_shift_list_shiftx2_2GB1",
+        "nef_chemical_shift",
+    ) == isolate_loop(
+        result.stdout, "nef_chemical_shift_list_shiftx2_2GB1", "nef_chemical_shift"
+    )
+
+
+@pytest.mark.parametrize("stand_in_server", [SHIFTX2_PAGES], indirect=True)
+def test_batch_failures_reported(stand_in_server, monkeypatch):
+
+    monkeypatch.setattr(shiftx2_shifts, "SHIFTX2_RETRY_COUNT", 2)
+    monkeypatch.setattr(shiftx2_shifts, "SHIFTX2_RETRY_BACKOFF", 0.0)
+
+    result = run_and_report(
+        app,
+        ["--jobs", "2", "--source-chain", "A", "1UBQ", "9BAD"],
+        expected_exit_code=1,
+    )
+
+    assert "1 of 2 input files couldn't be read" in result.stdout
+    assert "couldn't get a shiftx2 prediction for 9BAD after 2 retries" in result.stdout
+
+    # the submission for 9BAD was forgotten after its download failed so it was resubmitted
+    assert stand_in_server.requests.count(("POST", shiftx2_shifts.CGI_URL)) == 3
+
+
+@pytest.mark.parametrize("stand_in_server", [SHIFTX2_PAGES], indirect=True)
+def test_batch_duplicate_inputs(stand_in_server):
+
+    result = run_and_report(app, ["1UBQ", "1UBQ"], expected_exit_code=1)
+
+    assert "would give shift lists with the same names" in result.stdout
+    assert not stand_in_server.requests
+
+
+def test_alphafold_trim_only_trims_its_frame():
+
+    def shift_frame(name):
+        shifts = [
+            ShiftData(AtomLabel(Residue("A", sequence_code, "ALA"), "CA"), 52.0)
+            for sequence_code in (1, 2, 3)
+        ]
+        return shifts_to_nef_frame(ShiftList(shifts), name)
+
+    entry = Entry.from_scratch("test")
+    for name in "shiftx2_1ubq", "shiftx2_1ubq_a":
+        entry.add_saveframe(shift_frame(name))
+
+    pdb_file_info = SimpleNamespace(pdb_uniprot_start=2, pdb_uniprot_end=2)
+    shiftx2_shifts._trim_to_alphafold_structure(entry.frame_list[0], "A", pdb_file_info)
+
+    def sequence_codes(frame):
+        return frame.get_loop("_nef_chemical_shift").get_tag("sequence_code")
+
+    assert sequence_codes(entry.frame_list[0]) == [2]
+    assert sequence_codes(entry.frame_list[1]) == [1, 2, 3]
@@ -0,0 +1,79 @@
+import random
+
+from nef_pipelines.lib.assignment_lib import min_cost_assignment
+
+
+def _brute_force_min_cost(candidates, unassigned_cost):
+
+    best = None
+
+    def search(row, used, cost):
+        nonlocal best
+        if best is not None and cost >= best:
+            return
+        if row == len(candidates):
+            best = cost
+            return
+
+        search(row + 1, used, cost + unassigned_cost)
+        for column, column_cost in candidates[row]:
+            if column not in used:
+                search(row + 1, used | {column}, cost + column_cost)
+
+    search(0, frozenset(), 0.0)
+
+    return best
+
+
+def _assignment_cost(candidates, assignment, unassigned_cost):
+    return sum(
+        dict(row_candidates)[column] if column is not None else unassigned_cost
+        for row_candidates, column in zip(candidates, assignment)
+    )
+
+
+def test_min_cost_assignment_beats_greedy():
+
+    # greedily row 0 takes column 0 leaving row 1 with column 1
+    candidates = [[(0, 1.0), (1, 1.1)], [(0, 1.05), (1, 3.0)]]
+
+    assert min_cost_assignment(candidates, 10.0) == [1, 0]
+
+
+def test_min_cost_assignment_unassigned():
+
+    candidates = [[(0, 1.0)], [(0, 2.0)], []]
+
+    assert min_cost_assignment(candidates, 10.0) == [0, None, None]
+
+    # it's cheaper to leave row 0 unassigned than to assign it to column 1
+    candidates = [[(0, 1.0), (1, 4.0)], [(0, 0.5)]]
+
+    assert min_cost_assignment(candidates, 2.0) == [None, 0]
+
+
+def test_min_cost_assignment_matches_brute_force():
+
+    rng = random.Random(42)
+
+    for _ in range(500):
+        num_rows = rng.randint(0, 6)
+        num_columns = rng.randint(1, 6)
+        candidates = [
+            [
+                (column, round(rng.uniform(0.0, 1.0), 2))
+                for column in rng.sample(
+                    range(num_columns), rng.randint(0, num_columns)
+                )
+            ]
+            for _ in range(num_rows)
+        ]
+        unassigned_cost = rng.choice([0.3, 1.0, 5.0])
+
+        assignment = min_cost_assignment(candidates, unassigned_cost)
+
+        assigned_columns = [column for column in assignment if column is not None]
+        assert len(assigned_columns) == len(set(assigned_columns))
+
+        cost = _assignment_cost(candidates, assignment, unassigned_cost)
+        assert abs(cost - _brute_force_min_cost(candidates, unassigned_cost)) < 1e-9
@@ -0,0 +1,182 @@
+import json
+
+import typer
+
+from nef_pipelines.lib.benchmark_lib import (
+    BenchmarkResult,
+    SyntheticSizes,
+    compare_to_baseline,
+    results_to_baseline,
+    synthetic_entry,
+    synthetic_sequence_fasta,
+)
+from nef_pipelines.lib.peak_lib import frame_to_peaks
+from nef_pipelines.lib.sequence_lib import sequence_from_entry, translate_3_to_1
+from nef_pipelines.lib.test_lib import run_and_report
+from nef_pipelines.tools import benchmark as benchmark_module
+from nef_pipelines.tools.benchmark import benchmark
+
+app = typer.Typer()
+app.command()(benchmark)
+
+
+def test_synthetic_entry():
+
+    sizes = SyntheticSizes(residues=5, spectra=3, peaks=7)
+
+    entry = synthetic_entry(sizes)
+
+    assert [frame.name for frame in entry] == [
+        "nef_nmr_meta_data",
+        "nef_molecular_system",
+        "nef_chemical_shift_list_default",
+        "nef_nmr_spectrum_t1_1",
+        "nef_nmr_spectrum_t1_2",
+        "nef_nmr_spectrum_t1_3",
+    ]
+
+    residues = sequence_from_entry(entry)
+    assert [residue.sequence_code for residue in residues] == [1, 2, 3, 4, 5]
+
+    header, fasta_sequence, _ = synthetic_sequence_fasta(sizes).split("\n")
+    assert header == ">benchmark CHAIN: A | START: 1"
+    assert fasta_sequence == "".join(
+        translate_3_to_1([residue.residue_name for residue in residues])
+    )
+
+    shifts = entry.get_saveframe_by_name("nef_chemical_shift_list_default")
+    assert len(shifts.get_loop("nef_chemical_shift").data) == 10
+
+    first_peaks = frame_to_peaks(entry.get_saveframe_by_name("nef_nmr_spectrum_t1_1"))
+    last_peaks = frame_to_peaks(entry.get_saveframe_by_name("nef_nmr_spectrum_t1_3"))
+    assert len(first_peaks) == 7
+    assert first_peaks[5].shifts == first_peaks[0].shifts
+    assert all(
+        last.height < first.height for first, last in zip(first_peaks, last_peaks)
+    )
+
+    assert str(synthetic_entry(sizes)).split("\n")[20:] == str(entry).split("\n")[20:]
+
+
+def test_benchmark_series_build_ten_or_more_spectra():
+
+    # spectrum names must not select each other [t1_1 would select t1_10 to t1_12 if they weren't padded]
+    assert [
+        frame.name
+        for frame in synthetic_entry(SyntheticSizes(residues=3, spectra=12, peaks=3))
+    ][3:6] == [
+        "nef_nmr_spectrum_t1_01",
+        "nef_nmr_spectrum_t1_02",
+        "nef_nmr_spectrum_t1_03",
+    ]
+
+    result = run_and_report(app, ["--residues", "3", "--spectra", "12", "series_build"])
+
+    assert "series_build" in result.stdout
+    assert "failed" not in result.stdout
+
+
+def test_compare_to_baseline():
+
+    sizes = SyntheticSizes(10, 2, 10)
+    baseline = results_to_baseline(
+        {
+            "fast": BenchmarkResult(0.1, 0.2, 0.1, 100),
+            "slow": BenchmarkResult(1.0, 2.0, 1.0, 100),
+            "skipped": "skipped, xxx isn't installed",
+        },
+        sizes,
+        1,
+    )
+
+    assert baseline["sizes"] == {"residues": 10, "spectra": 2, "peaks": 10}
+    assert list(baseline["results"]) == ["fast", "slow"]
+
+    results = {
+        # small changes in time are ignored even if they are large fractions
+        "fast": BenchmarkResult(0.1, 0.21, 0.1, 120),
+        "slow": BenchmarkResult(1.0, 4.0, 1.0, 100),
+        "new": BenchmarkResult(1.0, 3.0, 1.0, 100),
+    }
+
+    comparisons = compare_to_baseline(results, json.loads(json.dumps(baseline)))
+
+    assert list(comparisons) == ["fast", "slow"]
+    assert not comparisons["fast"].is_regression
+    assert comparisons["fast"].rss_ratio == 1.2
+    assert comparisons["slow"].is_regression
+    assert comparisons["slow"].time_ratio == 1.5
+
+    comparisons = compare_to_baseline(results, baseline, tolerance=0.1)
+    assert comparisons["fast"].is_regression
+
+    # benchmarks in the baseline which now fail or are skipped are regressions
+    results = {"fast": "failed, boom", "slow": "skipped, xxx isn't installed"}
+    comparisons = compare_to_baseline(results, baseline)
+
+    assert list(comparisons) == ["fast", "slow"]
+    assert comparisons["fast"].is_regression
+    assert comparisons["fast"].failure == "failed, boom"
+    assert comparisons["slow"].is_regression
+
+
+def test_benchmark_save_and_compare_baseline(tmp_path):
+
+    baseline_file = tmp_path / "baseline.json"
+
+    result = run_and_report(
+        app,
+        ["--residues", "5", "--spectra", "2", "--save-baseline", baseline_file, "ren*"],
+    )
+
+    assert "renumber" in result.stdout
+    assert "unassign" not in result.stdout
+
+    baseline = json.loads(baseline_file.read_text())
+    assert baseline["sizes"] == {"residues": 5, "spectra": 2, "peaks": 5}
+    assert list(baseline["results"]) == ["renumber"]
+    assert baseline["results"]["renumber"]["pipe"] > 0.0
+
+    # make the baseline use much less memory so the benchmark regresses
+    baseline["results"]["renumber"]["peak_rss"] = 1
+    baseline_file.write_text(json.dumps(baseline))
+
+    result = run_and_report(
+        app, ["--baseline", baseline_file, "renumber"], expected_exit_code=1
+    )
+
+    assert "REGRESSION" in result.stdout
+    assert "the benchmarks renumber are more than 25% slower" in result.stdout
+
+    result = run_and_report(
+        app,
+        ["--baseline", baseline_file, "--residues", "6", "renumber"],
+        expected_exit_code=1,
+    )
+
+    assert "don't match the baseline" in result.stdout
+
+
+def test_benchmark_failures_in_baseline_are_regressions(tmp_path, monkeypatch):
+
+    baseline_file = tmp_path / "baseline.json"
+    baseline = results_to_baseline(
+        {"renumber": BenchmarkResult(0.1, 0.2, 0.1, 100)},
+        SyntheticSizes(5, 2, 5),
+        1,
+    )
+    baseline_file.write_text(json.dumps(baseline))
+
+    monkeypatch.setattr(
+        benchmark_module,
+        "run_benchmarks",
+        lambda *args: {"renumber": "failed, boom"},
+    )
+
+    result = run_and_report(
+        app, ["--baseline", baseline_file, "renumber"], expected_exit_code=1
+    )
+
+    assert "REGRESSION, failed, boom" in result.stdout
+    assert "the benchmarks renumber are in the baseline" in result.stdout
+    assert "failed or were skipped" in result.stdout
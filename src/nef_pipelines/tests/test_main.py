@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+from textwrap import dedent
+
+from nef_pipelines.main import (
+    LOAD_ALL_PLUGINS_COMMANDS,
+    PLUGINS,
+    _get_command_name,
+    _select_plugins_to_load,
+)
+
+# run in a separate process as the tests replace the global nef app
+LIST_REGISTERED_COMMANDS = """
+    import json
+    from importlib import import_module
+
+    from nef_pipelines.main import PLUGINS, create_nef_app
+
+    nef_app = create_nef_app()
+    for module_name, _ in PLUGINS.values():
+        import_module(module_name)
+
+    commands = {group.name: group.help for group in nef_app.app.registered_groups}
+    for command in nef_app.app.registered_commands:
+        name = command.name if command.name else command.callback.__name__
+        commands[name] = command.callback.__doc__.strip()
+
+    print(json.dumps(commands))
+"""
+
+
+def test_plugin_manifest_matches_registered_commands():
+
+    result = subprocess.run(
+        [sys.executable, "-c", dedent(LIST_REGISTERED_COMMANDS)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    registered = json.loads(result.stdout)
+    manifest = {name: help for name, (_, help) in PLUGINS.items()}
+
+    assert registered == manifest
+
+
+def test_get_command_name():
+    assert _get_command_name(["--profile-startup", "frames", "list"]) == "frames"
+    assert _get_command_name(["--help"]) is None
+    assert _get_command_name([]) is None
+
+
+def test_select_plugins_to_load():
+
+    all_plugins = [module_name for module_name, _ in PLUGINS.values()]
+
+    assert _select_plugins_to_load("frames", False) == ["nef_pipelines.tools.frames"]
+    assert _select_plugins_to_load(None, False) == []
+    assert _select_plugins_to_load(None, True) == all_plugins
+    assert _select_plugins_to_load("not_a_command", False) == all_plugins
+    for command_name in LOAD_ALL_PLUGINS_COMMANDS:
+        assert _select_plugins_to_load(command_name, False) == all_plugins
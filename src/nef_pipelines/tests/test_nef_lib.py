@@ -1,24 +1,37 @@
 import sys
 from argparse import Namespace
 from contextlib import contextmanager
-from io import StringIO
+from io import BytesIO, StringIO, TextIOWrapper
 
 import pytest
+from pynmrstar import Entry, Loop, Saveframe
 
-# from pandas import DataFrame
-from pynmrstar import Entry, Loop
-
-from nef_pipelines.lib.nef_lib import (  # dataframe_to_loop,; loop_to_dataframe,; NEF_CATEGORY_ATTR,
+from nef_pipelines.lib.nef_lib import (
+    NEF_CATEGORY_ATTR,
     UNUSED,
     BadNefFileException,
+    EntryIndex,
+    LoopBuilder,
+    LoopTable,
+    SelectionType,
     create_entry_from_stdin,
+    dataframe_to_loop,
+    entries_from_binary_stream,
+    entry_to_binary_stream,
+    get_entry_index,
     loop_row_dict_iter,
     loop_row_namespace_iter,
+    loop_to_dataframe,
     read_entry_from_stdin_or_exit,
     read_or_create_entry_exit_error_on_bad_file,
+    select_frames,
     select_frames_by_name,
 )
-from nef_pipelines.lib.test_lib import assert_lines_match, path_in_test_data
+from nef_pipelines.lib.test_lib import (
+    assert_lines_match,
+    path_in_test_data,
+    read_test_data,
+)
 from nef_pipelines.lib.util import STDIN
 from nef_pipelines.main import EXIT_ERROR
 
@@ -35,70 +48,130 @@ ITER_TEST_DATA = """\
 
 """
 
-# def test_nef_to_pandas():
-#
-#     TEST_DATA_NEF = """
-#         loop_
-#           _test_loop.tag_1 _test_loop.tag_2
-#           1                 2
-#           3                 .
-#         stop_
-#     """
-#
-#     loop = Loop.from_string(TEST_DATA_NEF, convert_data_types=True)
-#     result = loop_to_dataframe(loop)
-#
-#     EXPECTED_DATA_FRAME = DataFrame()
-#     EXPECTED_DATA_FRAME["tag_1"] = ["1", "3"]
-#     EXPECTED_DATA_FRAME["tag_2"] = ["2", "."]
-#
-#     assert result.equals(EXPECTED_DATA_FRAME)
-#
-#
-# def test_pandas_to_nef():
-#
-#     TEST_DATA_NEF = """
-#         loop_
-#           _test_loop.tag_1 _test_loop.tag_2
-#           1                 2
-#           3                 .
-#         stop_
-#     """
-#
-#     EXPECTED_NEF = Loop.from_string(TEST_DATA_NEF)
-#
-#     data_frame = DataFrame()
-#     data_frame["tag_1"] = ["1", "3"]
-#     data_frame["tag_2"] = ["2", "."]
-#
-#     result = dataframe_to_loop(data_frame, category="test_loop")
-#
-#     assert result == EXPECTED_NEF
-
-
-# def test_nef_category():
-#
-#     TEST_DATA_NEF = """
-#         loop_
-#           _test_loop.tag_1 _test_loop.tag_2
-#           1                 2
-#           3                 .
-#         stop_
-#     """
-#
-#     loop = Loop.from_string(TEST_DATA_NEF, convert_data_types=True)
-#     frame = loop_to_dataframe(loop)
-#
-#     assert frame.attrs[NEF_CATEGORY_ATTR] == "test_loop"
-#
-#     new_loop = dataframe_to_loop(frame)
-#
-#     # note pynmrstar includes the leading _ in the category, I don't...!
-#     assert new_loop.category == "_test_loop"
-#
-#     new_loop_2 = dataframe_to_loop(frame, category="wibble")
-#     # note pynmrstar includes the leading _ in the category, I don't...!
-#     assert new_loop_2.category == "_wibble"
+DATAFRAME_TEST_DATA_NEF = """
+    loop_
+      _test_loop.tag_1 _test_loop.tag_2 _test_loop.tag_3  _test_loop.tag_4
+      1                 2.5             a                 true
+      3                 .               ?                 false
+    stop_
+"""
+
+
+def test_nef_to_pandas():
+
+    pandas = pytest.importorskip("pandas")
+
+    loop = Loop.from_string(DATAFRAME_TEST_DATA_NEF)
+    result = loop_to_dataframe(loop)
+
+    assert list(result.columns) == ["tag_1", "tag_2", "tag_3", "tag_4"]
+    assert str(result["tag_1"].dtype) == "Int64"
+    assert str(result["tag_2"].dtype) == "Float64"
+    assert str(result["tag_4"].dtype) == "boolean"
+
+    assert result["tag_1"].tolist() == [1, 3]
+    assert result["tag_2"][0] == 2.5
+    assert result["tag_2"][1] is pandas.NA
+    assert result["tag_3"].tolist() == ["a", None]
+    assert result["tag_4"].tolist() == [True, False]
+
+
+def test_nef_to_pandas_no_convert():
+
+    pytest.importorskip("pandas")
+
+    loop = Loop.from_string(DATAFRAME_TEST_DATA_NEF)
+    result = loop_to_dataframe(loop, convert=False)
+
+    assert result["tag_1"].tolist() == ["1", "3"]
+    assert result["tag_2"].tolist() == ["2.5", "."]
+
+    # the strings are shared with the loop not copied
+    assert result["tag_3"][0] is loop.data[0][2]
+
+
+def test_nef_to_pandas_arrow():
+
+    pytest.importorskip("pyarrow")
+    pandas = pytest.importorskip("pandas")
+
+    loop = Loop.from_string(DATAFRAME_TEST_DATA_NEF)
+    result = loop_to_dataframe(loop, dtype_backend="pyarrow")
+
+    assert all(
+        isinstance(result[column].dtype, pandas.ArrowDtype) for column in result.columns
+    )
+
+    assert dataframe_to_loop(result) == loop_with_nulls_as_unused(loop)
+
+
+def test_pandas_to_nef():
+
+    pandas = pytest.importorskip("pandas")
+
+    TEST_DATA_NEF = """
+        loop_
+          _test_loop.tag_1 _test_loop.tag_2
+          1                 2
+          3                 .
+        stop_
+    """
+
+    EXPECTED_NEF = Loop.from_string(TEST_DATA_NEF)
+
+    data_frame = pandas.DataFrame()
+    data_frame["tag_1"] = ["1", "3"]
+    data_frame["tag_2"] = ["2", "."]
+
+    result = dataframe_to_loop(data_frame, category="test_loop")
+
+    assert result == EXPECTED_NEF
+
+
+def test_nef_pandas_round_trip():
+
+    pytest.importorskip("pandas")
+
+    loop = Loop.from_string(DATAFRAME_TEST_DATA_NEF)
+
+    result = dataframe_to_loop(loop_to_dataframe(loop))
+
+    assert result == loop_with_nulls_as_unused(loop)
+
+
+def loop_with_nulls_as_unused(loop):
+    result = Loop.from_string(str(loop))
+    result.data = [
+        [UNUSED if value == "?" else value for value in row] for row in result.data
+    ]
+    return result
+
+
+def test_nef_category():
+
+    pytest.importorskip("pandas")
+
+    TEST_DATA_NEF = """
+        loop_
+          _test_loop.tag_1 _test_loop.tag_2
+          1                 2
+          3                 .
+        stop_
+    """
+
+    loop = Loop.from_string(TEST_DATA_NEF)
+    frame = loop_to_dataframe(loop)
+
+    assert frame.attrs[NEF_CATEGORY_ATTR] == "test_loop"
+
+    new_loop = dataframe_to_loop(frame)
+
+    # note pynmrstar includes the leading _ in the category, I don't...!
+    assert new_loop.category == "_test_loop"
+
+    new_loop_2 = dataframe_to_loop(frame, category="wibble")
+    # note pynmrstar includes the leading _ in the category, I don't...!
+    assert new_loop_2.category == "_wibble"
 
 
 def test_create_entry_from_empty_stdin(mocker):
@@ -374,6 +447,210 @@ def test_row_dict_iter_delete():
     assert result == EXPECTED
 
 
+MIXED_COLUMNS_TEST_DATA = """\
+    loop_
+        _test.ints
+        _test.floats
+        _test.mixed
+        _test.strings
+
+        1  1.5  2.0  a
+        .  2.5  3    true
+        3  ?    x    .
+
+    stop_
+"""
+
+
+def test_loop_table_columns():
+
+    loop = Loop.from_string(MIXED_COLUMNS_TEST_DATA)
+
+    table = LoopTable(loop)
+
+    assert table.column("ints") == [1, UNUSED, 3]
+    assert table.column("floats") == [1.5, 2.5, "?"]
+    assert table.column("mixed") == [2.0, 3, "x"]
+    assert table.column("strings") == ["a", True, UNUSED]
+
+    assert table.column_type("ints") == int
+    assert table.column_type("floats") == float
+    assert table.column_type("mixed") is None
+
+    floats = table.float_column("floats")
+    assert list(floats[:2]) == [1.5, 2.5]
+    assert floats[2] != floats[2]
+
+
+def test_loop_table_rows_share_columns():
+
+    loop = Loop.from_string(MIXED_COLUMNS_TEST_DATA)
+
+    table = LoopTable(loop)
+
+    assert table.column("ints")[0] == 1
+    table[0]["ints"] = table[0]["ints"] + 10
+
+    assert table.column("ints")[0] == 11
+    assert table[-1]["floats"] == "?"
+    assert loop.data[0][0] == "11"
+
+
+INDEX_TEST_DATA = """\
+    data_test
+        save_test_frame_1
+            _test.sf_category test
+        save_
+
+        save_other_frame_2
+            _other.sf_category other
+        save_
+
+        save_test_frame_13
+            _test.sf_category test
+        save_
+"""
+
+
+def _test_frame(name):
+    frame = Saveframe.from_scratch(name, "test")
+    frame.add_tag("sf_category", "test")
+    return frame
+
+
+def test_entry_index():
+
+    entry = Entry.from_string(INDEX_TEST_DATA)
+    index = EntryIndex(entry)
+
+    assert len(index) == 3
+    assert "test_frame_13" in index
+    assert "test_frame_2" not in index
+    assert index.get("other_frame_2") is entry.frame_list[1]
+    assert index.get("test_frame_2") is None
+    assert [frame.name for frame in index.frames_in_category("test")] == [
+        "test_frame_1",
+        "test_frame_13",
+    ]
+
+    new_frame = _test_frame("test_frame_2")
+    index.add_saveframe(new_frame)
+
+    assert entry.get_saveframe_by_name("test_frame_2") is new_frame
+    assert index.frames_in_category("test")[-1] is new_frame
+
+    with pytest.raises(ValueError):
+        index.add_saveframe(_test_frame("test_frame_2"))
+
+    # frames added and removed through the entry are picked up
+    entry.remove_saveframe("test_frame_1")
+    entry.add_saveframe(_test_frame("test_frame_4"))
+
+    assert "test_frame_1" not in index
+    assert index.get("test_frame_4") is entry.frame_list[-1]
+
+    # renames need the index to be invalidated
+    entry.frame_list[0].name = "other_frame_3"
+    index.invalidate()
+
+    assert "other_frame_2" not in index
+    assert index.get("other_frame_3") is entry.frame_list[0]
+    assert [frame.name for frame in index.frames_in_category("test")] == [
+        "test_frame_13",
+        "test_frame_2",
+        "test_frame_4",
+    ]
+
+
+def test_select_frames_order_and_type():
+
+    entry = Entry.from_string(INDEX_TEST_DATA)
+
+    def names(frames):
+        return [frame.name for frame in frames]
+
+    assert names(select_frames(entry, [])) == [
+        "test_frame_1",
+        "other_frame_2",
+        "test_frame_13",
+    ]
+    assert names(select_frames(entry, ["1", "other"])) == [
+        "test_frame_1",
+        "other_frame_2",
+        "test_frame_13",
+    ]
+    assert names(select_frames(entry, "other", SelectionType.CATEGORY)) == [
+        "other_frame_2"
+    ]
+    assert names(select_frames(entry, "frame_1", SelectionType.CATEGORY)) == []
+    assert names(select_frames(entry, "test_frame_1?", SelectionType.NAME)) == [
+        "test_frame_13"
+    ]
+
+    # selections are cached until the entry changes
+    entry.frame_list[1].name = "other_frame_14"
+    get_entry_index(entry).invalidate()
+    assert names(select_frames(entry, "frame_1", SelectionType.NAME)) == [
+        "test_frame_1",
+        "other_frame_14",
+        "test_frame_13",
+    ]
+
+
+def test_loop_builder():
+
+    rows = [
+        {"col_1": "a", "col_2": 2, "col_3": 4.5},
+        {"col_1": "b", "col_2": 3, "col_3": 5.6},
+        {"col_1": "c", "col_3": 6.7},
+    ]
+
+    expected = Loop.from_scratch("test")
+    expected.add_tag(["col_1", "col_2", "col_3"])
+    expected.add_data(rows)
+
+    builder = LoopBuilder("test", ["col_1", ["col_2", "col_3"]])
+    builder.add_row(rows[0])
+    builder.add_row(("b", 3, 5.6))
+    builder.add_row({"_test.COL_1": "c", "col_3": 6.7})
+
+    assert len(builder) == 3
+    assert not builder.loop.data
+
+    loop = builder.build()
+
+    assert loop is builder.loop
+    assert str(loop) == str(expected)
+
+    builder = LoopBuilder("test", ["col_1", "col_2", "col_3"])
+    builder.add_columns({"col_1": ["a", "b", "c"], "col_3": [4.5, 5.6, 6.7]})
+    builder.add_columns({"col_2": [4]})
+    loop = builder.build()
+
+    assert loop.data == [
+        ["a", None, 4.5],
+        ["b", None, 5.6],
+        ["c", None, 6.7],
+        [None, 4, None],
+    ]
+
+
+def test_loop_builder_bad_rows():
+
+    builder = LoopBuilder("test", ["col_1", "col_2"])
+
+    with pytest.raises(ValueError):
+        builder.add_row({"col_4": 1})
+
+    with pytest.raises(ValueError):
+        builder.add_row([1, 2, 3])
+
+    with pytest.raises(ValueError):
+        builder.add_columns({"col_1": [1, 2], "col_2": [3]})
+
+    assert len(builder) == 0
+
+
 def test_loop_row_namespace_iter():
 
     loop = Loop.from_string(ITER_TEST_DATA)
@@ -437,3 +714,48 @@ def test_loop_row_dict_iter_attributes_update():
         assert str(row.col_1) == EXPECTED[i]["a"]
         assert str(row.col_2) == EXPECTED[i]["b"]
         assert str(row.col_3) == EXPECTED[i]["c"]
+
+
+def test_binary_stream_round_trip():
+
+    entry = Entry.from_string(read_test_data("ubiquitin_short.nef", __file__))
+
+    entries = entries_from_binary_stream(entry_to_binary_stream(entry))
+
+    assert len(entries) == 1
+    assert str(entries[0]) == str(entry)
+
+
+def test_binary_stream_multiple_entries():
+
+    entry_1 = Entry.from_scratch("entry_1")
+    entry_2 = Entry.from_string(read_test_data("ubiquitin_short.nef", __file__))
+
+    stream = entry_to_binary_stream(entry_1) + entry_to_binary_stream(entry_2)
+
+    entries = entries_from_binary_stream(stream)
+
+    assert [entry.entry_id for entry in entries] == ["entry_1", entry_2.entry_id]
+
+
+def test_binary_stream_truncated():
+
+    stream = entry_to_binary_stream(Entry.from_scratch("test"))
+
+    with pytest.raises(BadNefFileException):
+        entries_from_binary_stream(stream[:-1])
+
+
+def test_read_entry_from_binary_stdin():
+
+    entry = Entry.from_string(read_test_data("ubiquitin_short.nef", __file__))
+
+    orig = sys.stdin
+    sys.stdin = TextIOWrapper(BytesIO(entry_to_binary_stream(entry)))
+    try:
+        result = read_entry_from_stdin_or_exit()
+    finally:
+        sys.stdin = orig
+
+    assert result.source == "-"
+    assert str(result) == str(entry)
@@ -0,0 +1,193 @@
+import copy
+from contextlib import redirect_stdout
+from io import StringIO
+
+import pytest
+from pynmrstar import Entry
+
+from nef_pipelines.lib.nef_lib import BadNefFileException
+from nef_pipelines.lib.nef_stream_lib import (
+    EntryStart,
+    EntryStreamWriter,
+    LazySaveframe,
+    RawSaveframe,
+    iter_raw_entry_items,
+    lazy_entry_from_lines,
+)
+from nef_pipelines.lib.test_lib import read_test_data
+
+UBIQUITIN_SHORT = read_test_data("ubiquitin_short.nef", __file__)
+
+SEMICOLON_STRING = """\
+data_test
+
+save_nef_nmr_meta_data
+   _nef_nmr_meta_data.sf_category   nef_nmr_meta_data
+   _nef_nmr_meta_data.sf_framecode  nef_nmr_meta_data
+   _nef_nmr_meta_data.comment
+;
+save_ this isn't the end of the frame
+;
+
+save_
+"""
+
+
+def test_raw_frames_match_parsed_frames():
+
+    entry = Entry.from_string(UBIQUITIN_SHORT)
+
+    items = list(iter_raw_entry_items(StringIO(UBIQUITIN_SHORT)))
+
+    assert items[0] == EntryStart(entry.entry_id)
+
+    frames = items[1:]
+    assert all(isinstance(frame, RawSaveframe) for frame in frames)
+    assert [frame.name for frame in frames] == [frame.name for frame in entry]
+    assert [frame.category for frame in frames] == [frame.category for frame in entry]
+    assert [str(frame.parse()) for frame in frames] == [str(frame) for frame in entry]
+
+
+def test_raw_frames_semicolon_string():
+
+    items = list(iter_raw_entry_items(StringIO(SEMICOLON_STRING)))
+
+    assert len(items) == 2
+    assert items[1].name == "nef_nmr_meta_data"
+    assert items[1].category == "nef_nmr_meta_data"
+    assert items[1].parse().get_tag("comment") == [
+        "save_ this isn't the end of the frame\n"
+    ]
+
+
+def test_raw_frames_unterminated_frame():
+
+    text = SEMICOLON_STRING[: -len("save_\n")]
+
+    with pytest.raises(BadNefFileException):
+        list(iter_raw_entry_items(StringIO(text)))
+
+
+def test_writer_matches_print():
+
+    entry = Entry.from_string(UBIQUITIN_SHORT)
+
+    expected = StringIO()
+    with redirect_stdout(expected):
+        print(entry)
+
+    result = StringIO()
+    with redirect_stdout(result):
+        with EntryStreamWriter() as writer:
+            for item in iter_raw_entry_items(StringIO(str(entry))):
+                if isinstance(item, EntryStart):
+                    writer.start_entry(item.entry_id)
+                else:
+                    writer.write_frame(item)
+
+    assert result.getvalue() == expected.getvalue()
+
+
+UNFORMATTED = """\
+data_test
+save_nef_nmr_meta_data
+_nef_nmr_meta_data.sf_category nef_nmr_meta_data
+_nef_nmr_meta_data.sf_framecode nef_nmr_meta_data
+save_
+save_nef_molecular_system
+_nef_molecular_system.sf_category nef_molecular_system
+_nef_molecular_system.sf_framecode nef_molecular_system
+save_
+"""
+
+
+def test_lazy_entry_frames_parsed_on_demand():
+
+    entry = lazy_entry_from_lines(StringIO(UNFORMATTED))
+
+    assert [frame.name for frame in entry] == [
+        "nef_nmr_meta_data",
+        "nef_molecular_system",
+    ]
+    assert all(isinstance(frame, LazySaveframe) for frame in entry)
+    assert not any(frame.is_parsed() for frame in entry)
+
+    frames = entry.get_saveframes_by_category("nef_molecular_system")
+    assert not frames[0].is_parsed()
+
+    assert frames[0].get_tag("sf_framecode") == ["nef_molecular_system"]
+    assert frames[0].is_parsed()
+    assert not entry["nef_nmr_meta_data"].is_parsed()
+
+
+def test_lazy_entry_untouched_frames_written_verbatim():
+
+    entry = lazy_entry_from_lines(StringIO(UNFORMATTED))
+
+    entry["nef_molecular_system"].name = "nef_molecular_system_renamed"
+
+    expected_meta_data = Entry.from_string(UNFORMATTED)["nef_nmr_meta_data"]
+    expected_molecular_system = Entry.from_string(UNFORMATTED)["nef_molecular_system"]
+    expected_molecular_system.name = "nef_molecular_system_renamed"
+
+    result = str(entry)
+
+    assert result.startswith("data_test")
+    assert (
+        "save_nef_nmr_meta_data\n_nef_nmr_meta_data.sf_category nef_nmr_meta_data"
+        in result
+    )
+    assert str(expected_molecular_system) in result
+    assert Entry.from_string(result)["nef_nmr_meta_data"] == expected_meta_data
+
+
+def test_lazy_frame_copy():
+
+    entry = lazy_entry_from_lines(StringIO(UBIQUITIN_SHORT))
+    frame = entry.get_saveframes_by_category("nef_molecular_system")[0]
+
+    frame_copy = copy.deepcopy(frame)
+
+    assert frame_copy == Entry.from_string(UBIQUITIN_SHORT)[frame.name]
+
+
+BAD_LOOP = """\
+data_test
+
+save_nef_nmr_meta_data
+   _nef_nmr_meta_data.sf_category   nef_nmr_meta_data
+   _nef_nmr_meta_data.sf_framecode  nef_nmr_meta_data
+
+   loop_
+      _x.a
+      _x.b
+
+      1 2 3
+   stop_
+save_
+"""
+
+
+def test_parse_errors_report_lines_of_the_source(capsys):
+
+    expected_line = "line 12"
+    with pytest.raises(Exception, match=expected_line):
+        Entry.from_string(BAD_LOOP)
+
+    (frame,) = [
+        item
+        for item in iter_raw_entry_items(StringIO(BAD_LOOP), "stdin")
+        if isinstance(item, RawSaveframe)
+    ]
+    assert frame.line_number == 3
+    with pytest.raises(BadNefFileException, match=expected_line):
+        frame.parse()
+
+    # lazy frames are parsed by code that doesn't expect errors so they exit with an error
+    entry = lazy_entry_from_lines(StringIO(BAD_LOOP), "stdin")
+    with pytest.raises(SystemExit):
+        entry["nef_nmr_meta_data"].get_tag("sf_framecode")
+
+    error = capsys.readouterr().err
+    assert "failed to read nef entry from stdin" in error
+    assert expected_line in error
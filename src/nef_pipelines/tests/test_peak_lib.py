@@ -0,0 +1,89 @@
+from textwrap import dedent
+
+import pytest
+from pynmrstar import Entry
+
+from nef_pipelines.lib.peak_lib import BadPositionException, frame_to_peaks
+from nef_pipelines.lib.util import _row_to_table
+
+PEAKS = """
+    data_test
+
+    save_nef_nmr_spectrum_test
+       _nef_nmr_spectrum.sf_category      nef_nmr_spectrum
+       _nef_nmr_spectrum.sf_framecode     nef_nmr_spectrum_test
+
+       loop_
+          _nef_peak.index
+          _nef_peak.peak_id
+          _nef_peak.volume
+          _nef_peak.volume_uncertainty
+          _nef_peak.height
+          _nef_peak.height_uncertainty
+          _nef_peak.position_1
+          _nef_peak.position_uncertainty_1
+          _nef_peak.chain_code_1
+          _nef_peak.sequence_code_1
+          _nef_peak.residue_name_1
+          _nef_peak.atom_name_1
+
+         1   1   .   .   1.5   .   8.1   .   A   1   ALA   H
+         2   2   .   .   2.5   .   bad   .   A   2   GLY   H
+
+       stop_
+
+    save_
+"""
+
+
+def test_frame_to_peaks_row_context():
+
+    frame = Entry.from_string(dedent(PEAKS)).get_saveframe_by_name(
+        "nef_nmr_spectrum_test"
+    )
+    frame.get_loop("nef_peak").data[1][6] = "8.2"
+
+    peaks = frame_to_peaks(frame, "test.nef")
+
+    context = peaks[1].shifts[0].frame_context
+    assert context.file_name == "test.nef[nef_nmr_spectrum_test ]"
+    assert context.line_no == 2
+    assert "position_1" in context.line and "8.2" in context.line
+
+
+def test_frame_to_peaks_bad_position():
+
+    frame = Entry.from_string(dedent(PEAKS)).get_saveframe_by_name(
+        "nef_nmr_spectrum_test"
+    )
+
+    with pytest.raises(BadPositionException) as exception_info:
+        frame_to_peaks(frame, "test.nef")
+
+    expected_row = {
+        "index": 2,
+        "peak_id": 2,
+        "volume": ".",
+        "volume_uncertainty": ".",
+        "height": 2.5,
+        "height_uncertainty": ".",
+        "position_1": "bad",
+        "position_uncertainty_1": ".",
+        "chain_code_1": "A",
+        "sequence_code_1": 2,
+        "residue_name_1": "GLY",
+        "atom_name_1": "H",
+    }
+
+    expected = dedent(
+        """
+            in the spectrum save frame  in test.nef[nef_nmr_spectrum_test ] at row 2
+            the position wasn't a float: bad
+
+            processed values from row are:
+
+        """
+    )
+    expected += _row_to_table(expected_row)
+
+    assert str(exception_info.value) == expected
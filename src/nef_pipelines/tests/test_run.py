@@ -0,0 +1,77 @@
+import typer
+from pynmrstar import Entry
+
+from nef_pipelines.lib.nef_lib import EntryStream
+from nef_pipelines.lib.test_lib import read_test_data, run_and_report
+from nef_pipelines.tools.entry import entry_app
+from nef_pipelines.tools.frames import frames_app
+from nef_pipelines.tools.run import parse_pipeline_stages, run, run_pipeline
+
+app = typer.Typer()
+app.command()(run)
+app.add_typer(frames_app, name="frames")
+app.add_typer(entry_app, name="entry")
+
+UBIQUITIN_SHORT = read_test_data("ubiquitin_short.nef", __file__)
+
+
+def test_parse_pipeline_stages():
+
+    lines = [
+        "# a comment",
+        "nef frames delete 'a b' | entry rename test",
+        "",
+        "frames list|frames delete c",
+    ]
+
+    result = parse_pipeline_stages(lines, comments=True)
+
+    expected = [
+        ["frames", "delete", "a b"],
+        ["entry", "rename", "test"],
+        ["frames", "list"],
+        ["frames", "delete", "c"],
+    ]
+
+    assert result == expected
+
+
+def test_run_two_stages():
+
+    result = run_and_report(
+        app,
+        ["run", "frames delete -c nef_chemical_shift_list", "entry rename renamed"],
+        input=UBIQUITIN_SHORT,
+    )
+
+    entry = Entry.from_string(result.stdout)
+    expected_frame_names = [
+        frame.name
+        for frame in Entry.from_string(UBIQUITIN_SHORT)
+        if frame.category != "nef_chemical_shift_list"
+    ]
+
+    assert entry.entry_id == "renamed"
+    assert [frame.name for frame in entry] == expected_frame_names
+
+
+def test_run_hands_entry_between_stages_without_serialising():
+
+    entry = Entry.from_string(UBIQUITIN_SHORT)
+    root_command = typer.main.get_command(app)
+
+    stages = [
+        ["frames", "delete", "-c", "nef_chemical_shift_list"],
+        ["entry", "rename"],
+    ]
+    expected_frames = [
+        frame for frame in entry if frame.category != "nef_chemical_shift_list"
+    ]
+
+    result = run_pipeline(root_command, "nef", stages, entry)
+
+    assert isinstance(result, EntryStream)
+    assert result.carries_only_entry()
+    assert len(result.entry.frame_list) == len(expected_frames)
+    for result_frame, expected_frame in zip(result.entry, expected_frames):
+        assert result_frame is expected_frame
@@ -435,3 +435,64 @@ def test_globals_cleanup_off():
     )
 
     assert_frame_category_exists(result.stdout, "nefpls_globals", count=1)
+
+
+def test_save_multi_stream_to_directory_jobs(tmp_path):
+    data = read_test_data(
+        "multi.nef",
+        __file__,
+    )
+
+    result = run_and_report(
+        app,
+        [
+            "--jobs",
+            "2",
+            str(tmp_path),
+        ],
+        input=data,
+    )
+
+    assert_lines_match(result.stdout, data)
+
+    assert_lines_match(EXPECTED_XPLOR, Path(tmp_path / "xplor.nef").read_text())
+    assert_lines_match(EXPECTED_TEST, Path(tmp_path / "test.nef").read_text())
+
+
+UNFORMATTED = """\
+data_unformatted
+save_nef_nmr_meta_data
+_nef_nmr_meta_data.sf_category nef_nmr_meta_data
+_nef_nmr_meta_data.sf_framecode nef_nmr_meta_data
+save_
+"""
+
+
+def test_save_writes_entries_verbatim(tmp_path):
+
+    run_and_report(app, [str(tmp_path)], input=UNFORMATTED)
+
+    # the frames are written with their original text
+    expected = UNFORMATTED.replace("data_unformatted\n", "data_unformatted\n\n")
+    assert (tmp_path / "unformatted.nef").read_text() == f"{expected}\n"
+
+
+def test_save_validate_bad_frame(tmp_path):
+
+    bad_frame = UNFORMATTED.replace("save_\n", "loop_\n_nef_sequence.index\nsave_\n")
+
+    run_and_report(app, [str(tmp_path)], input=bad_frame)
+
+    assert (tmp_path / "unformatted.nef").exists()
+
+    result = run_and_report(
+        app,
+        ["--validate", "--force", str(tmp_path)],
+        input=bad_frame,
+        expected_exit_code=1,
+    )
+
+    assert (
+        "the frame nef_nmr_meta_data in the entry unformatted isn't valid"
+        in result.stdout
+    )
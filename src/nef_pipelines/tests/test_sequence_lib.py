@@ -2,10 +2,13 @@ from itertools import islice
 from textwrap import dedent
 
 import pytest
-from pynmrstar import Entry, Saveframe
+from pynmrstar import Entry, Loop, Saveframe
 
 from nef_pipelines.lib.sequence_lib import (
+    ANY_CHAIN,
     BadResidue,
+    _parse_loops_residues,
+    _residue_extraction_plan,
     chains_from_frames,
     count_residues,
     get_chain_code_iter,
@@ -15,7 +18,7 @@ from nef_pipelines.lib.sequence_lib import (
     sequences_from_frames,
     translate_1_to_3,
 )
-from nef_pipelines.lib.structures import SequenceResidue
+from nef_pipelines.lib.structures import Linking, SequenceResidue
 from nef_pipelines.lib.test_lib import path_in_test_data
 
 ABC_SEQUENCE_1LET = "acdefghiklmnpqrstvwy"
@@ -293,3 +296,55 @@ def test_sequence_from_frame_all():
     ]
 
     assert sequence == EXPECTED
+
+
+def test_parse_loops_residues_numbered_tags():
+
+    loop = Loop.from_scratch("nef_peak")
+    loop.add_tag(
+        "index chain_code_1 sequence_code_1 residue_name_1 chain_code_2 sequence_code_2 linking".split()
+    )
+    loop.add_data(
+        [
+            ["1", "A", "1", "ALA", "A", "2", "middle"],
+            ["2", "A", "2", "GLY", "B", "@3", "middle"],
+            ["3", ".", "3", "SER", "A", "1", "."],
+            ["4", "A", "1", "ALA", "A", "2", "middle"],
+        ]
+    )
+
+    residues = _parse_loops_residues(loop, {"A", "B"})
+
+    EXPECTED = [
+        SequenceResidue("A", 1, "ALA", linking=Linking.MIDDLE),
+        SequenceResidue("A", 2, None, linking=Linking.MIDDLE),
+        SequenceResidue("A", 2, "GLY", linking=Linking.MIDDLE),
+        SequenceResidue("B", "@3", None, linking=Linking.MIDDLE),
+        SequenceResidue("A", 1, None),
+    ]
+
+    assert residues == EXPECTED
+
+    assert _parse_loops_residues(loop, ["B"]) == [EXPECTED[3]]
+
+    # the plan for a layout of tags is only made once
+    assert _residue_extraction_plan(tuple(loop.tags)) is _residue_extraction_plan(
+        tuple(loop.tags)
+    )
+
+
+def test_parse_loops_residues_shared():
+
+    loops = []
+    for category in "nef_peak", "nef_distance_restraint":
+        loop = Loop.from_scratch(category)
+        loop.add_tag("chain_code_1 sequence_code_1 residue_name_1".split())
+        loop.add_data([["A", "10", "LYS"]])
+        loops.append(loop)
+
+    residues_by_values = {}
+    residue_1 = _parse_loops_residues(loops[0], ANY_CHAIN, residues_by_values)[0]
+    residue_2 = _parse_loops_residues(loops[1], ANY_CHAIN, residues_by_values)[0]
+
+    assert residue_1 == SequenceResidue("A", 10, "LYS")
+    assert residue_1 is residue_2
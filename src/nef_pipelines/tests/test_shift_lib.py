@@ -0,0 +1,30 @@
+from pynmrstar import Entry
+
+from nef_pipelines.lib.shift_lib import nef_frames_to_shifts
+from nef_pipelines.lib.test_lib import read_test_data
+
+UBIQUITIN_SHORT = read_test_data("ubiquitin_short.nef", __file__)
+
+
+def test_nef_frames_to_shifts_frame_line():
+
+    entry = Entry.from_string(UBIQUITIN_SHORT)
+    frame = entry.get_saveframes_by_category("nef_chemical_shift_list")[0]
+    loop = frame.get_loop("nef_chemical_shift")
+
+    shifts = nef_frames_to_shifts([frame])
+
+    assert len(shifts) == len(loop.data)
+
+    shift = shifts[1]
+    assert shift.frame_name == frame.name
+    assert shift.frame_row == 2
+
+    names, values = shift.frame_line.split("\n")
+    assert names.split(", ") == loop.tags
+    assert values.split(", ")[:4] == [
+        str(shift.atom.residue.chain_code),
+        str(shift.atom.residue.sequence_code),
+        shift.atom.residue.residue_name,
+        shift.atom.atom_name,
+    ]
@@ -0,0 +1,93 @@
+import random
+from itertools import product
+from math import dist, inf
+
+import pytest
+
+from nef_pipelines.lib.spatial_lib import GridIndex
+
+
+def _brute_force_nearest(points, point, k):
+    distances = sorted(
+        (dist(point, other), index) for index, other in enumerate(points)
+    )
+    cutoff = distances[k - 1][0]
+    return [(distance, index) for distance, index in distances if distance <= cutoff]
+
+
+def _brute_force_within(points, point, tolerances):
+    result = []
+    for index, other in enumerate(points):
+        if all(
+            abs(a - b) <= tolerance for a, b, tolerance in zip(point, other, tolerances)
+        ):
+            result.append((dist(point, other), index))
+    return sorted(result)
+
+
+def test_nearest_matches_brute_force():
+
+    rng = random.Random(42)
+    points = [(rng.uniform(6, 10), rng.uniform(15, 19)) for _ in range(500)]
+    index = GridIndex(points)
+
+    for _ in range(100):
+        point = (rng.uniform(5, 11), rng.uniform(14, 20))
+        for k in 1, 3:
+            assert index.nearest(point, k) == _brute_force_nearest(points, point, k)
+
+
+def test_nearest_returns_ties():
+
+    points = [(1.0, 1.0), (0.0, 0.0), (2.0, 2.0), (0.0, 0.0)]
+    index = GridIndex(points, cell_size=0.5)
+
+    assert index.nearest((0.0, 0.0)) == [(0.0, 1), (0.0, 3)]
+    assert index.nearest((1.0, 1.0), k=2) == [
+        (0.0, 0),
+        (dist((1.0, 1.0), (0.0, 0.0)), 1),
+        (dist((1.0, 1.0), (2.0, 2.0)), 2),
+        (dist((1.0, 1.0), (0.0, 0.0)), 3),
+    ]
+
+
+def test_nearest_far_from_points():
+
+    points = [(float(x), float(y)) for x, y in product(range(10), repeat=2)]
+    index = GridIndex(points, cell_size=1.0)
+
+    assert index.nearest((100.0, 100.0)) == [(dist((100.0, 100.0), (9.0, 9.0)), 99)]
+
+
+def test_within_matches_brute_force():
+
+    rng = random.Random(42)
+    points = [
+        (rng.uniform(6, 10), rng.uniform(15, 19), rng.uniform(0, 1)) for _ in range(500)
+    ]
+    index = GridIndex(points)
+
+    for tolerances in (0.2, 0.2, 0.2), (0.1, 1.0, inf), (inf, inf, inf):
+        for _ in range(20):
+            point = (rng.uniform(6, 10), rng.uniform(15, 19), rng.uniform(0, 1))
+            assert index.within(point, tolerances) == _brute_force_within(
+                points, point, tolerances
+            )
+
+
+def test_empty_index():
+
+    index = GridIndex([])
+
+    assert len(index) == 0
+    assert index.nearest((1.0, 2.0)) == []
+    assert index.within((), ()) == []
+
+
+def test_bad_points():
+
+    with pytest.raises(ValueError):
+        GridIndex([(1.0, 2.0), (1.0,)])
+
+    with pytest.raises(ValueError):
+        GridIndex([(1.0, 2.0)]).within((1.0, 2.0), (1.0,))
@@ -0,0 +1,111 @@
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+from nef_pipelines.lib.structures import (
+    AtomLabel,
+    LineInfo,
+    Residue,
+    RowContext,
+    SequenceResidue,
+    ShiftData,
+    intern_value,
+    replace_fields,
+)
+
+
+def test_slotted_structures_have_no_instance_dict():
+
+    residue = Residue("A", 1, "ALA")
+    label = AtomLabel(residue, "HA")
+    shift = ShiftData(label, 4.5, 0.01)
+
+    for value in residue, label, shift:
+        assert not hasattr(value, "__dict__")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        residue.chain_code = "B"
+
+
+def test_slotted_structures_compare_hash_and_pickle():
+
+    residue = SequenceResidue("A", 1, "ALA")
+    label = AtomLabel(residue, "HA")
+
+    assert residue == SequenceResidue("A", 1, "ALA")
+    assert hash(residue) == hash(SequenceResidue("A", 1, "ALA"))
+    assert Residue("A", 1, "ALA") < Residue("A", 2, "ALA")
+
+    for value in residue, label, ShiftData(label, 4.5):
+        for copied in pickle.loads(pickle.dumps(value)), copy.deepcopy(value):
+            assert copied == value
+            assert hash(copied) == hash(value)
+            assert repr(copied) == repr(value)
+
+
+def test_replace_fields():
+
+    residue = Residue("A", 1, "ALA", offset=-1)
+
+    replaced = replace_fields(residue, sequence_code=2, residue_name="GLY")
+
+    assert replaced == dataclasses.replace(residue, sequence_code=2, residue_name="GLY")
+    assert replaced.offset == -1
+    assert residue == Residue("A", 1, "ALA", offset=-1)
+    assert hash(replaced) == hash(Residue("A", 2, "GLY", offset=-1))
+
+    with pytest.raises(TypeError, match="Residue has no field called atom_name"):
+        replace_fields(residue, atom_name="HA")
+
+    # structures without slots are handled by dataclasses.replace
+    line_info = LineInfo("test.nef", 1, "line")
+    assert replace_fields(line_info, line_no=2) == LineInfo("test.nef", 2, "line")
+
+
+def test_intern_value():
+
+    interned = {}
+    label_1 = intern_value(AtomLabel(Residue("A", 1, "ALA"), "HA"), interned)
+    label_2 = intern_value(AtomLabel(Residue("A", 1, "ALA"), "HA"), interned)
+
+    assert label_1 is label_2
+    assert (
+        intern_value(AtomLabel(Residue("A", 1, "ALA"), "HB"), interned) is not label_1
+    )
+    assert len(interned) == 2
+
+    # values are only shared through the same table
+    assert intern_value(AtomLabel(Residue("A", 1, "ALA"), "HA"), {}) is not label_1
+
+
+def test_row_context_is_rendered_lazily():
+
+    rendered = []
+
+    def render_line():
+        rendered.append(True)
+        return "a row"
+
+    context = RowContext("test.nef", 3, render_line)
+    shift = ShiftData(
+        AtomLabel(Residue("A", 1, "ALA"), "HA"), 4.5, frame_context=context
+    )
+
+    assert not rendered
+    assert shift.frame_line == "a row"
+    assert len(rendered) == 1
+
+    # the context isn't compared or hashed
+    assert shift == ShiftData(AtomLabel(Residue("A", 1, "ALA"), "HA"), 4.5)
+    assert hash(shift) == hash(ShiftData(AtomLabel(Residue("A", 1, "ALA"), "HA"), 4.5))
+
+    copied = pickle.loads(pickle.dumps(shift))
+    assert len(rendered) == 2
+    assert (copied.frame_context.file_name, copied.frame_context.line_no) == (
+        "test.nef",
+        3,
+    )
+    assert copied.frame_line == "a row"
+    assert len(rendered) == 2
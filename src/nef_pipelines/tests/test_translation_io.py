@@ -0,0 +1,116 @@
+import os
+import time
+
+import nef_pipelines.lib.translation.io as translation_io
+from nef_pipelines.lib.translation.io import ChemCompDictionary, load_chem_comps
+from nef_pipelines.lib.util import (
+    NEF_PIPELINES_CACHE_DIR_ENV,
+    SECONDS_PER_DAY,
+    STALE_CACHE_DAYS,
+)
+
+
+def _fresh_chem_comps(monkeypatch, cache_dir):
+    monkeypatch.setenv(NEF_PIPELINES_CACHE_DIR_ENV, str(cache_dir))
+    monkeypatch.setattr(translation_io, "CHEM_COMPS", ChemCompDictionary())
+    monkeypatch.setattr(translation_io, "MOL_TYPES", set())
+
+
+def test_chem_comps_cached_and_loaded_lazily(monkeypatch, tmp_path):
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    cache_files = list(tmp_path.iterdir())
+    assert len(cache_files) == 1
+
+    compiled_ala = [atom.name for atom in translation_io.CHEM_COMPS["ALA"].chemAtoms]
+    compiled_mol_types = set(translation_io.MOL_TYPES)
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    chem_comps = translation_io.CHEM_COMPS
+    assert len(chem_comps) == 33
+    assert "ALA" in chem_comps
+    assert not chem_comps._chem_comps
+
+    ala = chem_comps["ALA"]
+    assert list(chem_comps._chem_comps) == ["ALA"]
+    assert chem_comps["ALA"] is ala
+    assert [atom.name for atom in ala.chemAtoms] == compiled_ala
+    assert ala.chemAtoms[0].chemComp is ala
+
+    assert translation_io.MOL_TYPES == compiled_mol_types == {"PROTEIN", "DNA", "RNA"}
+
+
+def test_chem_comps_bad_cache_ignored(monkeypatch, tmp_path):
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    (cache_file,) = tmp_path.iterdir()
+    cache_file.write_bytes(b"not a pickle")
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    assert translation_io.CHEM_COMPS["GLY"].code3Letter == "GLY"
+    assert cache_file.read_bytes() != b"not a pickle"
+
+
+def test_chem_comps_bad_cached_chem_comp_recompiled(monkeypatch, tmp_path):
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    # e.g. pickled from a ChemComp model that has since changed
+    translation_io.CHEM_COMPS._pickled_chem_comps["ALA"] = b"not a pickle"
+
+    assert translation_io.CHEM_COMPS["ALA"].code3Letter == "ALA"
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    assert translation_io.CHEM_COMPS._recompile is not None
+    assert translation_io.CHEM_COMPS["ALA"].code3Letter == "ALA"
+
+
+def test_chem_comps_cache_keyed_by_version(monkeypatch, tmp_path):
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+    (first_cache_file,) = tmp_path.iterdir()
+
+    monkeypatch.setattr(translation_io, "get_version", lambda: "0.0.0-test")
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    # the cache of another version may still be in use by another install so it is kept
+    cache_file = _chem_comp_cache_path()
+    assert sorted(tmp_path.iterdir()) == sorted([first_cache_file, cache_file])
+    assert not translation_io.CHEM_COMPS._recompile
+
+    # reading a cache marks it as used, caches which haven't been used recently are removed when a cache is written
+    stale_time = time.time() - (STALE_CACHE_DAYS + 1) * SECONDS_PER_DAY
+    for path in tmp_path.iterdir():
+        os.utime(path, (stale_time, stale_time))
+
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+    assert translation_io.CHEM_COMPS._recompile
+
+    monkeypatch.setattr(translation_io, "get_version", lambda: "0.0.1-test")
+    _fresh_chem_comps(monkeypatch, tmp_path)
+    load_chem_comps()
+
+    assert sorted(tmp_path.iterdir()) == sorted([cache_file, _chem_comp_cache_path()])
+
+
+def _chem_comp_cache_path():
+    return translation_io._chem_comp_cache_path(
+        translation_io._chem_comp_sources_digest(translation_io.find_chem_comps())
+    )
@@ -5,8 +5,10 @@ import pytest
 
 from nef_pipelines.lib.util import (
     STDOUT,
+    exit_error,
     exit_if_file_has_bytes_and_no_force,
     fnmatch_one_of,
+    parallel_map_or_exit_error,
     strip_characters_left,
     strip_characters_right,
 )
@@ -92,3 +94,31 @@ def test_exit_if_file_has_bytes_and_no_force(
         exception_raised = True
 
     assert exception_raised == is_exception_raised
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+@pytest.mark.parametrize("threads", [False, True])
+def test_parallel_map_keeps_order(jobs, threads):
+
+    result = parallel_map_or_exit_error(
+        pow, [2, 3, 4, 5], [2, 2, 2, 2], jobs=jobs, threads=threads
+    )
+
+    assert result == [4, 9, 16, 25]
+
+
+def _exit_error_on_odd(value):
+    if value % 2:
+        exit_error(f"{value} is odd")
+    return value
+
+
+def test_parallel_map_threads_reports_failures(capsys):
+
+    with pytest.raises(SystemExit):
+        parallel_map_or_exit_error(_exit_error_on_odd, [1, 2, 3], jobs=3, threads=True)
+
+    stderr = capsys.readouterr().err
+    assert "2 of 3 input files couldn't be read" in stderr
+    assert "1 is odd" in stderr
+    assert "3 is odd" in stderr
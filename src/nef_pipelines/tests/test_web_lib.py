@@ -0,0 +1,196 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nef_pipelines.lib.web_lib import (
+    NotInCacheException,
+    ThrottledTransport,
+    WebCache,
+    WebRequestException,
+    WebResponse,
+)
+
+
+def test_responses_cached(stand_in_server):
+
+    stand_in_server.pages["https://test/a"] = b"a page"
+
+    web_cache = WebCache()
+
+    response = web_cache.get("https://test/a")
+    assert response.text == "a page"
+    assert not response.from_cache
+
+    response = WebCache().get("https://test/a")
+    assert response.text == "a page"
+    assert response.from_cache
+    assert len(stand_in_server.requests) == 1
+
+    # failed requests aren't cached
+    for _ in range(2):
+        assert web_cache.get("https://test/b").status_code == 404
+    assert len(stand_in_server.requests) == 3
+
+    with pytest.raises(WebRequestException):
+        web_cache.get("https://test/b").raise_for_status()
+
+
+def test_responses_expire(stand_in_server):
+
+    stand_in_server.pages["https://test/a"] = b"a page"
+
+    web_cache = WebCache()
+    web_cache.get("https://test/a", ttl=0.0)
+    web_cache.get("https://test/a", ttl=0.0)
+    assert len(stand_in_server.requests) == 2
+
+    web_cache.get("https://test/a", ttl=None)
+    assert len(stand_in_server.requests) == 2
+
+    # offline expired responses are still used
+    response = WebCache(offline=True).get("https://test/a", ttl=0.0)
+    assert response.text == "a page"
+    assert len(stand_in_server.requests) == 2
+
+    WebCache(enabled=False).get("https://test/a")
+    assert len(stand_in_server.requests) == 3
+
+
+def test_uploads_keyed_by_content(stand_in_server, tmp_path):
+
+    stand_in_server.pages["https://test/upload"] = b"uploaded"
+
+    upload_1 = tmp_path / "upload_1.pdb"
+    upload_1.write_text("ATOM 1")
+    upload_2 = tmp_path / "upload_2.pdb"
+    upload_2.write_text("ATOM 1")
+
+    web_cache = WebCache()
+    for upload in upload_1, upload_2:
+        web_cache.request(
+            "POST", "https://test/upload", data={"a": 1}, files={"file": upload}
+        )
+    assert len(stand_in_server.requests) == 1
+
+    upload_2.write_text("ATOM 2")
+    web_cache.request(
+        "POST", "https://test/upload", data={"a": 1}, files={"file": upload_2}
+    )
+    web_cache.request(
+        "POST", "https://test/upload", data={"a": 2}, files={"file": upload_2}
+    )
+    assert len(stand_in_server.requests) == 3
+
+
+def test_incomplete_responses_not_cached(stand_in_server):
+
+    stand_in_server.pages["https://test/a"] = b"incomplete"
+
+    web_cache = WebCache()
+    for _ in range(2):
+        web_cache.request(
+            "GET",
+            "https://test/a",
+            is_cacheable=lambda response: response.text == "complete",
+        )
+    assert len(stand_in_server.requests) == 2
+
+    stand_in_server.pages["https://test/a"] = b"complete"
+    for _ in range(2):
+        web_cache.request(
+            "GET",
+            "https://test/a",
+            is_cacheable=lambda response: response.text == "complete",
+        )
+    assert len(stand_in_server.requests) == 3
+
+
+def test_offline_miss(stand_in_server):
+
+    with pytest.raises(NotInCacheException, match="https://test/a"):
+        WebCache(offline=True).get("https://test/a")
+
+    assert not stand_in_server.requests
+
+
+class FlakyServer:
+    """
+    a transport that fails a number of times before succeeding and records the most requests open at once
+    """
+
+    def __init__(self, failures, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.open = 0
+        self.most_open = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, url, data=None, files=None):
+        with self._lock:
+            self.calls += 1
+            self.open += 1
+            self.most_open = max(self.most_open, self.open)
+            failed = self.calls <= self.failures
+
+        time.sleep(self.delay)
+
+        with self._lock:
+            self.open -= 1
+
+        return WebResponse(503 if failed else 200, b"a page", url)
+
+
+def test_throttled_transport_retries():
+
+    server = FlakyServer(failures=2)
+    transport = ThrottledTransport(retries=3, backoff=0.0, transport=server)
+
+    assert transport("GET", "https://test/a").status_code == 200
+    assert server.calls == 3
+
+    server = FlakyServer(failures=5)
+    transport = ThrottledTransport(retries=2, backoff=0.0, transport=server)
+
+    assert transport("GET", "https://test/a").status_code == 503
+    assert server.calls == 3
+
+
+def test_throttled_transport_limits_connections():
+
+    server = FlakyServer(failures=0, delay=0.05)
+    transport = ThrottledTransport(connections_per_host=2, transport=server)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        responses = list(
+            executor.map(lambda i: transport("GET", f"https://test/{i}"), range(6))
+        )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert server.most_open == 2
+
+
+def test_throttled_transport_rate_limits():
+
+    server = FlakyServer(failures=0)
+    transport = ThrottledTransport(min_interval=0.05, transport=server)
+
+    start = time.monotonic()
+    for i in range(3):
+        transport("GET", f"https://test/{i}")
+
+    assert time.monotonic() - start >= 0.1
+
+
+def test_forget(stand_in_server):
+
+    stand_in_server.pages["https://test/a"] = b"a page"
+
+    web_cache = WebCache()
+    web_cache.request("POST", "https://test/a", data={"a": 1})
+    web_cache.forget("POST", "https://test/a", data={"a": 1})
+    web_cache.request("POST", "https://test/a", data={"a": 1})
+
+    assert len(stand_in_server.requests) == 2
@@ -0,0 +1,242 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import typer
+from tabulate import tabulate
+
+from nef_pipelines.lib.benchmark_lib import (
+    BENCHMARKS,
+    DEFAULT_TOLERANCE,
+    BenchmarkComparison,
+    BenchmarkResult,
+    SyntheticSizes,
+    compare_to_baseline,
+    read_baseline_or_exit_error,
+    results_to_baseline,
+    run_benchmarks,
+)
+from nef_pipelines.lib.util import exit_error, fnmatch_one_of
+from nef_pipelines.nef_app import app
+
+DEFAULT_RESIDUES = 200
+DEFAULT_SPECTRA = 8
+
+NAMES_HELP = f"""
+    the benchmarks to run, wildcards are allowed [default: all]. The benchmarks are:
+    {', '.join(benchmark.name for benchmark in BENCHMARKS)}
+"""
+
+
+@app.command()
+def benchmark(
+    residues: int = typer.Option(
+        None,
+        "-r",
+        "--residues",
+        min=1,
+        help=f"the number of residues in the synthetic entry [default: {DEFAULT_RESIDUES} or the baseline's]",
+    ),
+    spectra: int = typer.Option(
+        None,
+        "-s",
+        "--spectra",
+        min=1,
+        help=f"the number of spectra in the synthetic entry [default: {DEFAULT_SPECTRA} or the baseline's]",
+    ),
+    peaks: int = typer.Option(
+        None,
+        "-p",
+        "--peaks",
+        min=1,
+        help="the number of peaks in each spectrum [default: one per residue or the baseline's]",
+    ),
+    repeats: int = typer.Option(
+        1,
+        "--repeats",
+        min=1,
+        help="run each benchmark this many times and report the fastest time for each phase",
+    ),
+    seed: int = typer.Option(42, help="the seed used to make the synthetic entry"),
+    baseline_file: Path = typer.Option(
+        None,
+        "-b",
+        "--baseline",
+        metavar="BASELINE-FILE",
+        help="compare the results with a baseline saved by --save-baseline and exit with an error on regressions",
+    ),
+    save_baseline_file: Path = typer.Option(
+        None,
+        "--save-baseline",
+        metavar="BASELINE-FILE",
+        help="save the results as a json baseline for later comparisons",
+    ),
+    tolerance: float = typer.Option(
+        DEFAULT_TOLERANCE,
+        "-t",
+        "--tolerance",
+        min=0.0,
+        help="the fractional increase in time or peak memory from the baseline reported as a regression",
+    ),
+    names: List[str] = typer.Argument(None, help=NAMES_HELP, metavar="<BENCHMARK>"),
+):
+    """- benchmark nef pipelines on synthetic data [alpha]"""
+
+    baseline = read_baseline_or_exit_error(baseline_file) if baseline_file else None
+
+    sizes = _get_sizes_or_exit_error(residues, spectra, peaks, baseline)
+
+    benchmarks = _select_benchmarks_or_exit_error(names)
+
+    results = run_benchmarks(benchmarks, sizes, repeats, seed)
+
+    comparisons = compare_to_baseline(results, baseline, tolerance) if baseline else {}
+
+    print(_results_as_table(results, comparisons))
+
+    if save_baseline_file:
+        baseline_text = json.dumps(
+            results_to_baseline(results, sizes, repeats), indent=4
+        )
+        save_baseline_file.write_text(f"{baseline_text}\n")
+
+    _exit_if_regressions(comparisons, baseline_file, tolerance)
+
+
+def _get_sizes_or_exit_error(
+    residues: Optional[int],
+    spectra: Optional[int],
+    peaks: Optional[int],
+    baseline: Optional[Dict],
+) -> SyntheticSizes:
+
+    if baseline:
+        baseline_sizes = SyntheticSizes(**baseline["sizes"])
+        sizes = SyntheticSizes(
+            residues if residues else baseline_sizes.residues,
+            spectra if spectra else baseline_sizes.spectra,
+            peaks if peaks else baseline_sizes.peaks,
+        )
+
+        if sizes != baseline_sizes:
+            msg = f"""
+                the sizes of the synthetic entry [residues: {sizes.residues} spectra: {sizes.spectra}
+                peaks: {sizes.peaks}] don't match the baseline [residues: {baseline_sizes.residues}
+                spectra: {baseline_sizes.spectra} peaks: {baseline_sizes.peaks}] so the results can't be compared
+            """
+            exit_error(msg)
+    else:
+        residues = residues if residues else DEFAULT_RESIDUES
+        sizes = SyntheticSizes(
+            residues,
+            spectra if spectra else DEFAULT_SPECTRA,
+            peaks if peaks else residues,
+        )
+
+    return sizes
+
+
+def _select_benchmarks_or_exit_error(names: Optional[List[str]]):
+
+    if not names:
+        names = ["*"]
+
+    result = [
+        benchmark for benchmark in BENCHMARKS if fnmatch_one_of(benchmark.name, names)
+    ]
+
+    if not result:
+        msg = f"""
+            no benchmarks matched {', '.join(names)}, the benchmarks are:
+            {', '.join(benchmark.name for benchmark in BENCHMARKS)}
+        """
+        exit_error(msg)
+
+    return result
+
+
+def _results_as_table(
+    results: Dict[str, Union[BenchmarkResult, str]],
+    comparisons: Dict[str, BenchmarkComparison],
+) -> str:
+
+    headers = [
+        "benchmark",
+        "parse [s]",
+        "pipe [s]",
+        "write [s]",
+        "total [s]",
+        "peak rss [MB]",
+    ]
+    if comparisons:
+        headers.extend(["time vs baseline", "rss vs baseline"])
+    headers.append("status")
+
+    table = []
+    for name, result in results.items():
+
+        if not isinstance(result, BenchmarkResult):
+            status = f"REGRESSION, {result}" if name in comparisons else result
+            table.append([name, *[""] * (len(headers) - 2), status])
+            continue
+
+        row = [
+            name,
+            f"{result.parse:.3f}",
+            f"{result.pipe:.3f}",
+            f"{result.write:.3f}",
+            f"{result.total:.3f}",
+            f"{result.peak_rss / 1e6:.1f}" if result.peak_rss is not None else "",
+        ]
+
+        if name in comparisons:
+            comparison = comparisons[name]
+            row.extend(
+                [
+                    _format_ratio(comparison.time_ratio),
+                    _format_ratio(comparison.rss_ratio),
+                    "REGRESSION" if comparison.is_regression else "ok",
+                ]
+            )
+        elif comparisons:
+            row.extend(["", "", "not in baseline"])
+        else:
+            row.append("ok")
+
+        table.append(row)
+
+    return tabulate(table, headers=headers, disable_numparse=True)
+
+
+def _format_ratio(ratio: Optional[float]) -> str:
+    return f"{(ratio - 1.0) * 100:+.0f}%" if ratio is not None else ""
+
+
+def _exit_if_regressions(
+    comparisons: Dict[str, BenchmarkComparison], baseline_file: Path, tolerance: float
+):
+    failures = [name for name, comparison in comparisons.items() if comparison.failure]
+    regressions = [
+        name
+        for name, comparison in comparisons.items()
+        if comparison.is_regression and not comparison.failure
+    ]
+
+    msgs = []
+    if failures:
+        msgs.append(
+            f"""
+            the benchmarks {', '.join(failures)} are in the baseline {baseline_file} but failed or were skipped
+            """
+        )
+
+    if regressions:
+        msgs.append(
+            f"""
+            the benchmarks {', '.join(regressions)} are more than {tolerance * 100:.0f}% slower or use more than
+            {tolerance * 100:.0f}% more memory than the baseline {baseline_file}
+            """
+        )
+
+    if msgs:
+        exit_error("\n".join(msgs))
@@ -17,6 +17,7 @@ from nef_pipelines.lib.nef_lib import (
     SelectionType,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     chains_from_frames,
@@ -196,7 +197,7 @@ def align(
                 },
             )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def _get_offset_or_none(matcher):
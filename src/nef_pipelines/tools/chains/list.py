@@ -3,7 +3,10 @@ from pathlib import Path
 import typer
 from typer import Option
 
-from nef_pipelines.lib.nef_lib import read_or_create_entry_exit_error_on_bad_file
+from nef_pipelines.lib.nef_lib import (
+    read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
+)
 from nef_pipelines.lib.sequence_lib import chains_from_frames
 from nef_pipelines.lib.util import STDIN
 from nef_pipelines.tools.chains import chains_app
@@ -46,4 +49,4 @@ def list(
     print(f"{comment}{verbose}{result}")
 
     if stream:
-        print(entry)
+        write_entry_to_stdout(entry)
@@ -10,6 +10,7 @@ from nef_pipelines.lib.nef_lib import (
     SelectionType,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.util import STDIN
 from nef_pipelines.tools.chains import chains_app
@@ -77,4 +78,4 @@ def rename(
 
                     loop[tag] = tag_values
 
-    print(entry)
+    write_entry_to_stdout(entry)
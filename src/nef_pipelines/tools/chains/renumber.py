@@ -12,9 +12,11 @@ from typer import Argument, Option
 from nef_pipelines.lib.nef_lib import (
     NEF_MOLECULAR_SYSTEM,
     SELECTORS_LOWER,
+    LoopTable,
     SelectionType,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     chains_from_frames,
@@ -123,7 +125,7 @@ def renumber(
 
     entry = pipe(entry, frame_selectors, selector_type, chain_offsets)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -381,19 +383,22 @@ def _exit_if_chains_and_offsets_dont_match(chains, offsets):
 def _offset_residue_numbers(frame, chain, offset):
 
     for loop_data in frame.loop_dict.values():
-        for tag in loop_data.tags:
+        table = LoopTable(loop_data)
+        raw_table = LoopTable(loop_data, convert=False)
+        for tag in table.tags:
             if _tag_is_based_on(tag, SEQUENCE_CODE):
-                sequence_index = loop_data.tag_index(tag)
 
                 chain_code_tag = _tag_based_on(tag, SEQUENCE_CODE, CHAIN_CODE)
-                chain_code_index = loop_data.tag_index(chain_code_tag)
-                for line in loop_data:
-                    if chain_code_index is not None and line[chain_code_index] == chain:
-                        sequence = line[sequence_index]
-                        if is_int(sequence):
-                            sequence = int(sequence)
-                            sequence = sequence + offset
-                            line[sequence_index] = str(sequence)
+                if chain_code_tag not in table.tag_indices:
+                    continue
+
+                chain_codes = raw_table.column(chain_code_tag)
+                sequence_codes = table.column(tag)
+                for row_index, (chain_code, sequence_code) in enumerate(
+                    zip(chain_codes, sequence_codes)
+                ):
+                    if chain_code == chain and type(sequence_code) is int:
+                        table[row_index][tag] = sequence_code + offset
 
 
 def _tag_based_on(tag, base, substitute):
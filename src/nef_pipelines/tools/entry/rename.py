@@ -3,7 +3,11 @@ from pathlib import Path
 
 import typer
 
-from nef_pipelines.lib.nef_lib import read_entry_from_stdin_or_exit
+from nef_pipelines.lib.nef_stream_lib import (
+    EntryStart,
+    EntryStreamWriter,
+    iter_entry_items_from_file_or_stdin_or_exit_error,
+)
 from nef_pipelines.tools.entry import entry_app
 
 
@@ -17,6 +21,10 @@ def rename(
         metavar="NEF-FILE",
         help="read NEF data from a file instead of stdin",
     ),
+    validate: bool = typer.Option(
+        False,
+        help="parse the frames to check they are valid before writing them, otherwise they are copied unchecked",
+    ),
     name: str = typer.Argument(
         None,
         help="the new name for the entry",
@@ -24,10 +32,13 @@ def rename(
 ):
     """- rename the current entry"""
 
-    entry = read_entry_from_stdin_or_exit()
-
-    if name is not None:
-        entry.entry_id = name
+    if sys.stdout.isatty():
+        return
 
-    if not sys.stdout.isatty():
-        print(entry)
+    # the frames are streamed and written unparsed unless they are validated
+    with EntryStreamWriter(validate=validate) as writer:
+        for item in iter_entry_items_from_file_or_stdin_or_exit_error(input):
+            if isinstance(item, EntryStart):
+                writer.start_entry(name if name is not None else item.entry_id)
+            else:
+                writer.write_frame(item)
@@ -1,5 +1,7 @@
+import zlib
+from itertools import repeat
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 import typer
 
@@ -9,9 +11,15 @@ from pynmrstar import Entry, Saveframe
 from nef_pipelines.lib.nef_lib import (
     NEF_PIPELINES_PREFIX,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.shift_lib import IntensityMeasurementType
-from nef_pipelines.lib.util import exit_error, parse_comma_separated_options
+from nef_pipelines.lib.util import (
+    exit_error,
+    jobs_help,
+    parallel_map_or_exit_error,
+    parse_comma_separated_options,
+)
 from nef_pipelines.tools.fit import fit_app
 from nef_pipelines.tools.fit.fit_lib import (
     _exit_if_no_frame_selectors,
@@ -23,6 +31,7 @@ from nef_pipelines.tools.fit.fit_lib import (
 
 try:
 
+    import streamfitter
     from streamfitter.error_propogation import ErrorPropogation
 
 except ImportError as e:
@@ -41,6 +50,18 @@ except ImportError as e:
 
 NAMESPACE = NEF_PIPELINES_PREFIX
 
+# the results from the fitter which are keyed by data id and so can be merged across residues
+RESIDUE_RESULTS = (
+    "fits",
+    "monte_carlo_errors",
+    "monte_carlo_value_stats",
+    "monte_carlo_param_values",
+)
+
+JOBS_HELP = (
+    f"{jobs_help('residues to fit')}, results don't depend on the number of jobs"
+)
+
 
 @fit_app.command()
 def exponential(
@@ -75,6 +96,7 @@ def exponential(
     data_type: IntensityMeasurementType = typer.Option(
         IntensityMeasurementType.HEIGHT, "-d", "--data-type", help="data type to fit"
     ),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help=JOBS_HELP),
     frames_selectors: List[str] = typer.Argument(None, help="select frames to fit"),
 ):
     """- fit a data series to an exponential decay with error propagation [alpha]"""
@@ -97,10 +119,17 @@ def exponential(
     _exit_if_no_series_frames_selected(series_frames, frame_selectors)
 
     entry = pipe(
-        entry, series_frames, error_method, cycles, noise_level, data_type, seed
+        entry,
+        series_frames,
+        error_method,
+        cycles,
+        noise_level,
+        data_type,
+        seed,
+        jobs,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -111,6 +140,7 @@ def pipe(
     noise_level,
     data_type: IntensityMeasurementType,
     seed: int,
+    jobs: int = 1,
 ) -> Entry:
 
     try:
@@ -137,13 +167,15 @@ def pipe(
             for id, series_datum in id_series_data.items()
         }
 
-        results = fitter(id_xy_data, error_method, cycles, noise_level, seed)
+        results = _fit_by_residue(
+            fitter, id_xy_data, error_method, cycles, noise_level, seed, jobs
+        )
 
         fits = results["fits"]
         monte_carlo_errors = results["monte_carlo_errors"]
         monte_carlo_value_stats = results["monte_carlo_value_stats"]
         monte_carlo_param_values = results["monte_carlo_param_values"]
-        noise_level = results["noise_level"]
+        fitted_noise_level = results["noise_level"]
         version_strings = results["versions"]
 
         frame = _fit_results_as_frame(
@@ -154,7 +186,7 @@ def pipe(
             monte_carlo_errors,
             monte_carlo_value_stats,
             monte_carlo_param_values,
-            noise_level,
+            fitted_noise_level,
             version_strings,
         )
 
@@ -163,6 +195,76 @@ def pipe(
     return entry
 
 
+def _fit_by_residue(
+    fitter,
+    id_xy_data: Dict,
+    error_method: ErrorPropogation,
+    cycles: int,
+    noise_level: Optional[float],
+    seed: int,
+    jobs: int = 1,
+) -> Dict:
+    """
+    fit each residue's series separately, possibly in parallel, and merge the results as if they were fitted
+    together. Each residue gets its own seed derived from the seed and its data id, and the noise level is
+    estimated once by the fitter from the replicates of all the residues, so the results don't depend on the
+    number of jobs
+
+    :param fitter: the fitter from streamfitter, it must be picklable to use more than one job
+    :param id_xy_data: data ids mapped to the x and y values of their series
+    :param error_method: the error propagation method
+    :param cycles: the number of cycles for error propagation
+    :param noise_level: the noise level or None for the fitter to estimate it from replicates
+    :param seed: the seed for the random number generator
+    :param jobs: the number of processes to use
+    :return: the fitters results merged across residues
+    """
+
+    if not id_xy_data:
+        return fitter(id_xy_data, error_method, cycles, noise_level, seed)
+
+    if noise_level is None:
+        noise_level = _get_noise_level_from_fitter(
+            fitter, id_xy_data, error_method, seed
+        )
+
+    data_ids = list(id_xy_data)
+
+    residue_results = parallel_map_or_exit_error(
+        fitter,
+        [{data_id: id_xy_data[data_id]} for data_id in data_ids],
+        repeat(error_method),
+        repeat(cycles),
+        repeat(noise_level),
+        [_residue_seed(seed, data_id) for data_id in data_ids],
+        jobs=jobs,
+        names=[f"data id {data_id}" for data_id in data_ids],
+    )
+
+    results = dict(residue_results[0])
+    for name in RESIDUE_RESULTS:
+        results[name] = {}
+        for residue_result in residue_results:
+            results[name].update(residue_result[name])
+
+    return results
+
+
+def _residue_seed(seed: int, data_id) -> int:
+    # derived from the data id rather than the position of the residue so adding or removing residues doesn't
+    # change the random numbers used for the others, crc32 fits the 32 bit seeds numpy accepts
+    return zlib.crc32(f"{seed}:{data_id}".encode())
+
+
+def _get_noise_level_from_fitter(
+    fitter, id_xy_data, error_method, seed
+) -> Optional[float]:
+
+    # the fitter estimates the noise from the replicates in all the data it is given, without monte carlo cycles
+    # this costs one fit of each residue, without replicates it is None and each residue's fit reports it missing
+    return fitter(id_xy_data, error_method, 0, None, seed)["noise_level"]
+
+
 # implementation thoughts
 # 1. having a spectrometer frequency and field strength in the same construct is a pain, what do we define as the
 #    conversion ratio i took value in cavanagh and cross-checked it with from https://www.kherb.io/docs/nmr_table.html
@@ -16,8 +16,10 @@ from nef_pipelines.lib.isotope_lib import (
 from nef_pipelines.lib.nef_lib import (
     NEF_RELAXATION_VERSION,
     UNUSED,
+    LoopBuilder,
     SelectionType,
     create_nef_save_frame,
+    get_entry_index,
     get_frame_id,
     loop_row_namespace_iter,
     select_frames,
@@ -119,9 +121,8 @@ def _fit_results_as_frame(
     for axis in range(1, len(isotope_axes) + 1):
         all_tags.append(RELAXATION_LOOP_ATOM_TAGS.format(axis=axis).split())
 
-    relaxation_loop.add_tag(all_tags)
+    builder = LoopBuilder(relaxation_loop, all_tags)
 
-    data = []
     for index, (data_id, fit) in enumerate(fits.items(), start=1):
         data_row = {"index": index, "data_id": index, "data_combination_id": UNUSED}
 
@@ -140,7 +141,6 @@ def _fit_results_as_frame(
                     f"atom_name_{i}": atom.atom_name,
                 }
             )
-        data.append(data_row)
         mc_error = monte_carlo_errors[data_id]["time_constant_mc_error"]
         data_row.update(
             {
@@ -148,8 +148,9 @@ def _fit_results_as_frame(
                 "value_error": f"{mc_error:.20f}",
             }
         )
+        builder.add_row(data_row)
 
-    relaxation_loop.add_data(data)
+    builder.build()
 
     return result_frame
 
@@ -208,6 +209,8 @@ def _get_unique_isotope_frequencies(isotope_frequencies):
 
 def _series_frame_to_spectrum_frames(series_frame, prefix, entry):
 
+    entry_index = get_entry_index(entry)
+
     spectrum_frames = []
     for i, row in enumerate(
         loop_row_namespace_iter(
@@ -215,9 +218,8 @@ def _series_frame_to_spectrum_frames(series_frame, prefix, entry):
         ),
         start=1,
     ):
-        spectrum_frame_name = row.nmr_spectrum_id
-        if spectrum_frame_name in entry.frame_dict.keys():
-            spectrum_frame = entry.get_saveframe_by_name(spectrum_frame_name)
+        spectrum_frame = entry_index.get(row.nmr_spectrum_id)
+        if spectrum_frame is not None:
             spectrum_frames.append(spectrum_frame)
 
     return spectrum_frames
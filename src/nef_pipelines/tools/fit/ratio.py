@@ -1,20 +1,24 @@
+from math import hypot
 from pathlib import Path
-from typing import List
+from random import Random
+from statistics import stdev
+from typing import Dict, List, Tuple
 
 import typer
 from pynmrstar import Entry, Loop, Saveframe
-from uncertainties import ufloat
 
 from nef_pipelines.lib.nef_lib import (
     NEF_PIPELINES_PREFIX,
     NEF_RELAXATION_VERSION,
     UNUSED,
+    LoopBuilder,
     create_nef_save_frame,
     get_frame_id,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.shift_lib import IntensityMeasurementType
-from nef_pipelines.lib.util import parse_comma_separated_options
+from nef_pipelines.lib.util import exit_error, parse_comma_separated_options
 from nef_pipelines.tools.fit import fit_app
 from nef_pipelines.tools.fit.fit_lib import (
     _build_spectrum_peak_id_to_axis_atoms,
@@ -52,6 +56,16 @@ def ratio(
     data_type: IntensityMeasurementType = typer.Option(
         IntensityMeasurementType.HEIGHT, "-d", "--data-type", help="data type to fit"
     ),
+    cycles: int = typer.Option(
+        0,
+        "-c",
+        "--cycles",
+        min=0,
+        help="number of monte carlo cycles to estimate errors with, 0 propagates the noise level instead",
+    ),
+    seed: int = typer.Option(
+        42, "-s", "--seed", help="seed for random number generator"
+    ),
     frames_selectors: List[str] = typer.Argument(None, help="select frames to fit"),
 ):
     """- calculate ratio of peak intensities with error propagation" [alpha]"""
@@ -73,9 +87,9 @@ def ratio(
 
     _exit_if_no_series_frames_selected(series_frames, frame_selectors)
 
-    entry = pipe(entry, series_frames, noise_level, data_type)
+    entry = pipe(entry, series_frames, noise_level, data_type, cycles, seed)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -83,6 +97,8 @@ def pipe(
     series_frames: List[Saveframe],
     noise_level,
     intensity_measurement_type: IntensityMeasurementType,
+    cycles: int = 0,
+    seed: int = 42,
 ) -> Entry:
 
     for series_frame in series_frames:
@@ -95,10 +111,10 @@ def pipe(
             for id, series_datum in id_series_data.items()
         }
 
-        results = _ratio_calculation(id_xy_data, noise_level)
+        results = _ratio_calculation(id_xy_data, noise_level, cycles, seed)
 
         ratios = {id: result[0] for id, result in results.items()}
-        errors = {id: result[0] for id, result in results.items()}
+        errors = {id: result[1] for id, result in results.items()}
 
         results_frame = _ratio_results_as_frame(
             series_frame, NEF_PIPELINES_PREFIX, entry, ratios, errors, noise_level
@@ -109,26 +125,102 @@ def pipe(
     return entry
 
 
-def _ratio_calculation(id_xy_data, error):
+def _ratio_calculation(
+    id_xy_data, error: float, cycles: int = 0, seed: int = 42
+) -> Dict[int, Tuple[float, float]]:
+    """
+    calculate the ratio of the on [x is true] and off [x is false] values of each series with its error, all the
+    series are calculated together as columns of on and off values
+
+    :param id_xy_data: data ids mapped to the x and y values of their series
+    :param error: the error [noise level] of each value
+    :param cycles: the number of monte carlo cycles to estimate the errors with, 0 propagates the error directly
+    :param seed: the seed for the random number generator used by monte carlo cycles
+    :return: data ids mapped to their ratio and its error
+    """
 
-    result = {}
-    for id, xy_data in id_xy_data.items():
-        xy_data = id_xy_data[id]
+    if cycles == 1:
+        exit_error("at least 2 monte carlo cycles are needed to estimate errors")
 
-        x_data = xy_data[0]
-        y_data = xy_data[1]
+    ids = list(id_xy_data)
 
-        on_index = [i for i, val in enumerate(x_data) if bool(val)][0]
-        off_index = [i for i, val in enumerate(x_data) if not bool(val)][0]
+    on_values, off_values = _series_to_on_and_off_values(id_xy_data)
 
-        on_value = ufloat(y_data[on_index], error)
-        off_value = ufloat(y_data[off_index], error)
+    _exit_if_off_values_are_zero(ids, off_values)
 
-        ratio = on_value / off_value
+    ratios = [
+        on_value / off_value for on_value, off_value in zip(on_values, off_values)
+    ]
 
-        result[id] = ratio.nominal_value, ratio.std_dev
+    if cycles:
+        errors = _monte_carlo_ratio_errors(on_values, off_values, error, cycles, seed)
+    else:
+        # first order propagation for independent on and off values with the same error, d(on/off) is
+        # error/off * sqrt(1 + ratio^2)
+        errors = [
+            error * hypot(1.0, ratio) / abs(off_value)
+            for ratio, off_value in zip(ratios, off_values)
+        ]
+
+    return {id: (ratio, error) for id, ratio, error in zip(ids, ratios, errors)}
+
+
+def _series_to_on_and_off_values(id_xy_data) -> Tuple[List[float], List[float]]:
+
+    on_values = []
+    off_values = []
+    for id, (x_data, y_data) in id_xy_data.items():
+        on_value = off_value = None
+        for x, y in zip(x_data, y_data):
+            if x and on_value is None:
+                on_value = y
+            elif not x and off_value is None:
+                off_value = y
+
+        if on_value is None or off_value is None:
+            msg = f"""
+                the series with data id {id} doesn't have both an on [true] and off [false] value
+                the series values were {', '.join(str(x) for x in x_data)}
+            """
+            exit_error(msg)
+
+        on_values.append(on_value)
+        off_values.append(off_value)
+
+    return on_values, off_values
+
+
+def _exit_if_off_values_are_zero(ids, off_values):
+    zero_ids = [str(id) for id, off_value in zip(ids, off_values) if off_value == 0]
+    if zero_ids:
+        msg = f"""
+            can't calculate a ratio for the series with the data ids {', '.join(zero_ids)}
+            as their off [false] values are 0
+        """
+        exit_error(msg)
+
+
+def _monte_carlo_ratio_errors(
+    on_values: List[float],
+    off_values: List[float],
+    error: float,
+    cycles: int,
+    seed: int,
+) -> List[float]:
+
+    random = Random(seed)
+
+    cycle_ratios = []
+    for _ in range(cycles):
+        cycle_ratios.append(
+            [
+                (on_value + random.gauss(0.0, error))
+                / (off_value + random.gauss(0.0, error))
+                for on_value, off_value in zip(on_values, off_values)
+            ]
+        )
 
-    return result
+    return [stdev(ratios) for ratios in zip(*cycle_ratios)]
 
 
 def _ratio_results_as_frame(
@@ -199,9 +291,8 @@ def _ratio_results_as_frame(
     for axis in range(1, len(isotope_axes) + 1):
         all_tags.append(RELAXATION_LOOP_ATOM_TAGS.format(axis=axis).split())
 
-    relaxation_loop.add_tag(all_tags)
+    builder = LoopBuilder(relaxation_loop, all_tags)
 
-    data = []
     for index, (data_id, ratio) in enumerate(ratios.items(), start=1):
         data_row = {"index": index, "data_id": index, "data_combination_id": UNUSED}
 
@@ -220,15 +311,15 @@ def _ratio_results_as_frame(
                     f"atom_name_{i}": atom.atom_name,
                 }
             )
-        data.append(data_row)
         data_row.update(
             {
                 "value": f"{ratio:.20f}",
                 "value_error": f"{errors[data_id]:.20f}",
             }
         )
+        builder.add_row(data_row)
 
-    relaxation_loop.add_data(data)
+    builder.build()
 
     return result_frame
 
@@ -4,7 +4,11 @@ from typing import List
 
 import typer
 
-from nef_pipelines.lib.nef_lib import read_entry_from_file_or_stdin_or_exit_error
+from nef_pipelines.lib.nef_stream_lib import (
+    EntryStart,
+    EntryStreamWriter,
+    iter_entry_items_from_file_or_stdin_or_exit_error,
+)
 from nef_pipelines.tools.frames import frames_app
 
 UNDERSCORE = "_"
@@ -29,6 +33,10 @@ def delete(
     exact: bool = typer.Option(
         False, "-e", "--exact", help="don't treat name as a wild card"
     ),
+    validate: bool = typer.Option(
+        False,
+        help="parse the frames to check they are valid before writing them, otherwise they are copied unchecked",
+    ),
     selectors: List[str] = typer.Argument(
         ...,
         help="a list of frames to delete by type or name,  names can be wildcards, names have lead _'s removed and "
@@ -37,26 +45,32 @@ def delete(
 ):
     """- delete frames in the current input by type or name"""
 
-    entry = read_entry_from_file_or_stdin_or_exit_error(input_path)
+    # frames are streamed and the frames that aren't deleted are written unparsed unless they are validated
+
+    with EntryStreamWriter(validate=validate) as writer:
+        for item in iter_entry_items_from_file_or_stdin_or_exit_error(input_path):
+            if isinstance(item, EntryStart):
+                writer.start_entry(item.entry_id)
+            elif not _frame_selected(item, selectors, use_categories, exact):
+                writer.write_frame(item)
+
 
-    to_delete = []
-    for name in selectors:
-        for frame in entry:
-            frame_full_name = frame.name
-            frame_category = frame.category
-            frame_name = frame_full_name[len(frame_category) :].lstrip("_").strip("`")
+def _frame_selected(frame, selectors, use_categories, exact):
+    frame_full_name = frame.name
+    frame_category = frame.category
+    frame_name = frame_full_name[len(frame_category) :].lstrip("_").strip("`")
 
-            for selector in selectors:
-                if not exact:
-                    selector = f"*{selector}*"
+    result = False
+    for selector in selectors:
+        if not exact:
+            selector = f"*{selector}*"
 
-                if use_categories:
-                    if fnmatch(frame_category, selector):
-                        to_delete.append(frame)
-                else:
-                    if fnmatch(frame_name, selector):
-                        to_delete.append(frame)
+        if use_categories:
+            result = fnmatch(frame_category, selector)
+        else:
+            result = fnmatch(frame_name, selector)
 
-    entry.remove_saveframe(to_delete)
+        if result:
+            break
 
-    print(entry)
+    return result
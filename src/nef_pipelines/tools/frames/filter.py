@@ -7,6 +7,7 @@ from pynmrstar import Entry
 from nef_pipelines.lib.nef_lib import (
     UNUSED,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import sequence_from_entry_or_exit
 from nef_pipelines.lib.structures import Residue
@@ -45,7 +46,7 @@ def filter(
 
     entry = pipe(entry, frame_selectors, unassigned)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 # def _update_spectra_with_groups(spectra):
@@ -9,6 +9,10 @@ import typer
 from pynmrstar import Entry
 from strenum import LowercaseStrEnum
 
+from nef_pipelines.lib.nef_lib import (
+    entry_from_stdin_without_parsing_or_none,
+    write_entry_to_stdout,
+)
 from nef_pipelines.lib.util import (
     exit_error,
     parse_comma_separated_options,
@@ -93,7 +97,7 @@ def insert(
                 else:
                     stream_entry.add_saveframe(external_frame)
 
-    print(stream_entry)
+    write_entry_to_stdout(stream_entry)
 
 
 def current_function():
@@ -118,6 +122,10 @@ def _create_entry_from_stdin_or_exit(command_name: str):
         if running_in_pycharm():
             exit_error("you can't build read fron stdin in pycharm...")
 
+        entry = entry_from_stdin_without_parsing_or_none()
+        if entry is not None:
+            return entry
+
         result = sys.stdin.readlines()
 
         # result is an iterable as well as an iter, but may have been read already making the iter empty?
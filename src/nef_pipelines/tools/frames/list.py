@@ -13,6 +13,7 @@ from nef_pipelines.lib.nef_lib import (
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
 )
+from nef_pipelines.lib.nef_stream_lib import parse_lazy_frames
 from nef_pipelines.lib.sequence_lib import chains_from_frames, count_residues
 from nef_pipelines.lib.typer_utils import get_args
 from nef_pipelines.lib.util import (
@@ -102,13 +103,18 @@ def list(
         else:
             exit_error("couldn't read a nef stream from stdin")
 
-    lines = str(entry)
+    # the checksum is of the formatted entry not the text that was read, parsing before anything is listed
+    # means a bad frame is reported before any output
+    if verbose:
+        parse_lazy_frames(entry)
+
     with contextlib.redirect_stdout(sys.stderr):
         print(f"entry {entry.entry_id}")
         if verbose:
 
             import hashlib
 
+            lines = str(entry)
             md5 = hashlib.md5(lines.encode("ascii")).hexdigest()
             num_lines = len(lines.split("\n"))
             print(f"    lines: {num_lines} frames: {len(entry)} checksum: {md5} [md5]")
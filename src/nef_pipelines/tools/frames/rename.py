@@ -10,8 +10,10 @@ from fyeah import f
 from tabulate import tabulate
 
 from nef_pipelines.lib.nef_lib import (
+    get_entry_index,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.util import (
     FOUR_SPACES,
@@ -135,7 +137,10 @@ def rename(
                 target_frame.category = new_name
                 target_frame.name = new_full_name
 
-    print(entry)
+        # the entry index doesn't see renames and the next pair may select the renamed frames
+        get_entry_index(entry).invalidate()
+
+    write_entry_to_stdout(entry)
 
 
 def _exit_error_mutiple_frames_selected(
@@ -2,7 +2,7 @@ import itertools
 import string
 import sys
 from copy import copy
-from dataclasses import dataclass, replace
+from dataclasses import dataclass
 from datetime import time
 from enum import auto
 from itertools import product
@@ -23,9 +23,10 @@ from nef_pipelines.lib.nef_lib import (
     loop_row_dict_iter,
     read_or_create_entry_exit_error_on_bad_file,
     select_frames,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import atom_sort_key
-from nef_pipelines.lib.structures import AtomLabel, Residue
+from nef_pipelines.lib.structures import AtomLabel, Residue, replace_fields
 from nef_pipelines.lib.util import (
     STDIN,
     chunks,
@@ -298,7 +299,7 @@ def unassign(
         use_residue_offsets,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 # noinspection PyUnusedLocal
@@ -565,23 +566,23 @@ def _map_assignments(
                 if assignment.residue.chain_code in chain_mappings:
                     new_chain_code = chain_mappings[target_chain_code]
 
-            new_residue = replace(assignment.residue, chain_code=new_chain_code)
-            new_assignment = replace(assignment, residue=new_residue)
+            new_residue = replace_fields(assignment.residue, chain_code=new_chain_code)
+            new_assignment = replace_fields(assignment, residue=new_residue)
 
             assignment_map[assignment] = new_assignment
 
     if Targets.RESIDUE_NAME in targets:
         for assignment, new_assignment in assignment_map.items():
 
-            new_residue = replace(new_assignment.residue, residue_name=UNUSED)
-            new_assignment = replace(new_assignment, residue=new_residue)
+            new_residue = replace_fields(new_assignment.residue, residue_name=UNUSED)
+            new_assignment = replace_fields(new_assignment, residue=new_residue)
 
             assignment_map[assignment] = new_assignment
 
     if Targets.ATOM_NAME in targets:
         for assignment, new_assignment in assignment_map.items():
 
-            new_assignment = replace(new_assignment, atom_name=UNUSED)
+            new_assignment = replace_fields(new_assignment, atom_name=UNUSED)
 
             assignment_map[assignment] = new_assignment
 
@@ -713,14 +714,14 @@ def _map_assignments(
             elif offset is not None:
                 new_sequence_code = f"{new_sequence_code}-{offset}"
 
-            updated_residue = replace(
+            updated_residue = replace_fields(
                 new_assignment.residue, sequence_code=new_sequence_code
             )
 
             if updated_residue.sequence_code == UNUSED:
-                updated_residue = replace(updated_residue, chain_code=UNUSED)
+                updated_residue = replace_fields(updated_residue, chain_code=UNUSED)
 
-            updated_atom_label = replace(new_assignment, residue=updated_residue)
+            updated_atom_label = replace_fields(new_assignment, residue=updated_residue)
 
             assignment_map[assignment] = updated_atom_label
 
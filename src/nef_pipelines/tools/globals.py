@@ -10,6 +10,7 @@ from nef_pipelines.lib.nef_lib import (
     _parse_globals,
     create_entry_from_stdin,
     create_nef_save_frame,
+    write_entry_to_stdout,
 )
 
 VERBOSE_HELP = """\
@@ -60,7 +61,7 @@ if nef_app:
         entry = _create_or_update_globals_frame(entry)
 
         if entry:
-            print(entry)
+            write_entry_to_stdout(entry)
         else:
             print()
 
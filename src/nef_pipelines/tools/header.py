@@ -4,6 +4,7 @@ from pynmrstar import Entry
 from nef_pipelines import nef_app
 from nef_pipelines.lib.constants import NEF_PIPELINES
 from nef_pipelines.lib.header_lib import create_header_frame
+from nef_pipelines.lib.nef_lib import write_entry_to_stdout
 from nef_pipelines.lib.typer_utils import get_args
 from nef_pipelines.lib.util import get_version, script_name
 
@@ -18,7 +19,7 @@ def header(
 
     entry = build_meta_data(args)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def build_meta_data(args):
@@ -2,10 +2,10 @@ import string
 from dataclasses import dataclass
 from enum import auto
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 import typer
-from pynmrstar import Entry
+from pynmrstar import Entry, Saveframe
 from strenum import LowercaseStrEnum
 from typer import Argument, Option
 
@@ -16,6 +16,7 @@ from nef_pipelines.lib.nef_lib import (
     loop_row_dict_iter,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     chains_from_frames,
@@ -120,7 +121,7 @@ def trim(
 
     entry = pipe(entry, frame_selectors, selector_type, chain_bounds)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -132,14 +133,25 @@ def pipe(
 
     frames = select_frames(entry, frame_selectors, frame_selector_type)
 
+    trim_frames(frames, chain_bounds)
+
+    return entry
+
+
+def trim_frames(frames: List[Saveframe], chain_bounds: Dict[str, List[ChainBound]]):
+    """
+    trim the loops of frames to the bounds of their chains, rows with residues outside the bounds are removed
+
+    :param frames: the frames to trim
+    :param chain_bounds: the bounds of each chain to trim by chain code
+    """
+
     target_chains = chain_bounds.keys()
 
     _exit_if_selected_chain_not_in_frames("chain to trim", frames, input, target_chains)
 
     _trim_chains_in_frames(frames, chain_bounds)
 
-    return entry
-
 
 def _find_reference_frames(entry, chain_bounds, reference_selector_type):
     return select_frames(entry, chain_bounds, reference_selector_type)
@@ -1,27 +1,57 @@
 import sys
-from math import sqrt
-from typing import Dict, List
+from math import hypot, inf
+from typing import Dict, List, Optional, Tuple
 
 import typer
-from pynmrstar import Saveframe
+from pynmrstar import Entry, Loop, Saveframe
 from tabulate import tabulate
 
+from nef_pipelines.lib.assignment_lib import min_cost_assignment
 from nef_pipelines.lib.nef_lib import (
+    NEF_PIPELINES_PREFIX,
+    UNUSED,
+    add_frames_to_entry,
+    create_nef_save_frame,
+    get_frame_id,
     loop_row_dict_iter,
     read_entry_from_stdin_or_exit,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
+from nef_pipelines.lib.spatial_lib import GridIndex
 from nef_pipelines.lib.structures import AtomLabel, NewPeak, SequenceResidue, ShiftData
-from nef_pipelines.lib.util import exit_error
+from nef_pipelines.lib.util import exit_error, is_float, parse_comma_separated_options
 from nef_pipelines.tools.peaks import peaks_app
 
+WEIGHTS = {"H": 1.0, "N": 7.0, "C": 2.0, ".": 1.0}
+
+# the default search radius for global matching in weighted ppm [H 0.2, N 1.4, C 0.4 ppm]
+GLOBAL_SEARCH_RADIUS = 0.2
+
+PEAK_MATCHES_CATEGORY = f"{NEF_PIPELINES_PREFIX}_peak_matches"
+
+SEARCH_RADII_HELP = """
+the largest difference in ppm allowed between matched peaks for the dimensions of a nucleus given as
+<NUCLEUS>:<PPM> e.g. H:0.2,N:1.4 [the nucleus is the first letter of the dimensions atom name], dimensions
+of nuclei without a search radius aren't limited [or use 0.2 ppm scaled by the nuclei's weight with --global
+H 0.2, N 1.4, C 0.4], can be repeated or comma separated
+"""
+
+GLOBAL_HELP = """
+match the peaks one to one so the total distance between matched peaks is as small as possible rather
+than picking the closest peaks for each peak, the matches are added to the entry as a nefpls_peak_matches
+frame rather than being printed as a table
+"""
+
 
 @peaks_app.command()
 def match(
     # ignore_amide_shifts: bool = typer.Option(False, help='ignore amides when matching'),
     # amide_weight: float = typer.Option(1.0, help='weight for the amide shifts'),
-    # amide_search_region: Tuple[float,float] = typer.Option((0.2, 0.2*7), help='region to search for amide shifts in
-    # the order H N'),
+    search_radii: List[str] = typer.Option(
+        [], "-r", "--search-radius", help=SEARCH_RADII_HELP
+    ),
+    global_matching: bool = typer.Option(False, "--global", help=GLOBAL_HELP),
     names: List[str] = typer.Argument(
         ..., help="pairs of shift frame names for the chemical shifts to compare"
     ),
@@ -36,6 +66,8 @@ def match(
     if len(names) != 2:
         exit_error("i currently need pairs of peaks")
 
+    search_radii = _parse_search_radii_or_exit_error(search_radii)
+
     entry = read_entry_from_stdin_or_exit()
 
     name_1, name_2 = names
@@ -43,9 +75,89 @@ def match(
     frame_1 = _select_single_frame_or_exit(entry, name_1)
     frames_2 = _select_single_frame_or_exit(entry, name_2)
 
-    # amide_search_region = {'H': amide_search_region[0], 'N': amide_search_region[1]}
+    if global_matching:
+        entry = pipe(entry, frame_1, frames_2, search_radii)
+
+        write_entry_to_stdout(entry)
+    else:
+        match_peaks(frame_1, frames_2, search_radii)
+
+
+def pipe(
+    entry: Entry,
+    peak_frame_1: Saveframe,
+    peak_frame_2: Saveframe,
+    search_radii: Optional[Dict[str, float]] = None,
+) -> Entry:
+    """
+    match two peak lists one to one and add the matches to the entry as a nefpls_peak_matches frame
+
+    :param entry: the entry to add the matches to
+    :param peak_frame_1: the peaks to match
+    :param peak_frame_2: the peaks to match against
+    :param search_radii: the largest difference in ppm allowed for the dimensions of each nucleus
+    :return: the entry with the matches added
+    """
+
+    shifts_1 = _nef_frames_to_peak_shifts(peak_frame_1)
+    shifts_2 = _nef_frames_to_peak_shifts(peak_frame_2)
+
+    matches = find_global_matches(shifts_1, shifts_2, search_radii)
+
+    frame = _peak_matches_to_frame(peak_frame_1, peak_frame_2, matches)
+
+    return add_frames_to_entry(entry, [frame])
+
+
+def _peak_matches_to_frame(
+    peak_frame_1: Saveframe,
+    peak_frame_2: Saveframe,
+    matches: Dict[int, Optional[Tuple[int, float]]],
+) -> Saveframe:
+
+    frame_id = f"{get_frame_id(peak_frame_1)}_{get_frame_id(peak_frame_2)}"
+    frame = create_nef_save_frame(PEAK_MATCHES_CATEGORY, frame_id)
+
+    frame.add_tag("peak_list_1", peak_frame_1.name)
+    frame.add_tag("peak_list_2", peak_frame_2.name)
+
+    loop = Loop.from_scratch(f"{NEF_PIPELINES_PREFIX}_peak_match")
+    frame.add_loop(loop)
+    loop.add_tag(["index", "peak_id_1", "peak_id_2", "distance"])
+
+    loop_data = []
+    for index, (peak_id_1, match) in enumerate(matches.items(), start=1):
+        peak_id_2, distance = match if match else (UNUSED, UNUSED)
+        loop_data.append(
+            {
+                "index": index,
+                "peak_id_1": peak_id_1,
+                "peak_id_2": peak_id_2,
+                "distance": round(distance, 6) if match else UNUSED,
+            }
+        )
+
+    loop.add_data(loop_data)
+
+    return frame
+
+
+def _parse_search_radii_or_exit_error(search_radii: List[str]) -> Dict[str, float]:
+
+    result = {}
+    for search_radius in parse_comma_separated_options(search_radii):
+        fields = search_radius.split(":")
 
-    match_peaks(frame_1, frames_2)
+        if len(fields) != 2 or not is_float(fields[1]):
+            msg = f"""
+                search radii must be in the form <NUCLEUS>:<PPM> e.g. H:0.2, i got {search_radius}
+            """
+            exit_error(msg)
+
+        nucleus, radius = fields
+        result[nucleus.strip().upper()] = float(radius)
+
+    return result
 
 
 def _nef_frames_to_peak_shifts(frame: Saveframe) -> Dict[str, Dict[str, float]]:
@@ -70,45 +182,173 @@ def _nef_frames_to_peak_shifts(frame: Saveframe) -> Dict[str, Dict[str, float]]:
     return peak_atom_shifts
 
 
-def _find_best_match(
-    shifts: Dict[str, float],
-    match_shifts: Dict[str, Dict[str, float]],
-    weights=Dict[str, float],
-):
+PeakIndices = Dict[Tuple[str, ...], Tuple[List[int], GridIndex]]
+
+
+def _build_peak_indices(
+    peak_shifts: Dict[int, Dict[str, float]], weights: Dict[str, float]
+) -> PeakIndices:
+    """
+    build spatial indices of the weighted peak positions, peaks can only match peaks with the same atom names so
+    there is an index for each set of atom names
 
-    weight_values_1 = _get_weighted_terms(shifts, weights)
+    :param peak_shifts: the shifts of each peak by peak id
+    :param weights: weights for the shifts of each nucleus
+    :return: the peak ids and index of the weighted peak positions for each set of atom names [sorted]
+    """
+
+    peak_ids_by_names = {}
+    for peak_id, shifts in peak_shifts.items():
+        peak_ids_by_names.setdefault(tuple(sorted(shifts)), []).append(peak_id)
 
     result = {}
+    for names, peak_ids in peak_ids_by_names.items():
+        points = [
+            _get_weighted_position(peak_shifts[peak_id], names, weights)
+            for peak_id in peak_ids
+        ]
+        result[names] = peak_ids, GridIndex(points)
 
-    for peak_id, match_shifts in match_shifts.items():
-        weight_values_2 = _get_weighted_terms(match_shifts, weights)
+    return result
 
-        len_values_1 = len(weight_values_1)
-        len_values_2 = len(weight_values_2)
 
-        if len_values_1 != len_values_2:
-            continue
+def _find_best_match(
+    shifts: Dict[str, float],
+    peak_indices: PeakIndices,
+    weights: Dict[str, float],
+    search_radii: Optional[Dict[str, float]] = None,
+) -> Dict[float, List[int]]:
+    """
+    find the closest peaks with the same atom names as a peak using the weighted distance between the peaks
+
+    :param shifts: the shifts of the peak to match
+    :param peak_indices: indices of the peaks to match against from _build_peak_indices
+    :param weights: weights for the shifts of each nucleus
+    :param search_radii: the largest difference in ppm allowed for the dimensions of each nucleus
+    :return: the peak ids of the closest peaks keyed by their distance, empty if there are no peaks to match
+    """
+
+    names = tuple(sorted(shifts))
+
+    if names not in peak_indices:
+        return {}
+
+    peak_ids, index = peak_indices[names]
+    position = _get_weighted_position(shifts, names, weights)
+
+    if search_radii:
+        tolerances = _get_weighted_tolerances(names, weights, search_radii)
+        matches = index.within(position, tolerances)
+        if matches:
+            best_distance = matches[0][0]
+            matches = [match for match in matches if match[0] == best_distance]
+    else:
+        matches = index.nearest(position)
 
-        names_1 = set(weight_values_1.keys())
-        names_2 = set(weight_values_2.keys())
+    result = {}
+    for distance, point_index in matches:
+        result.setdefault(distance, []).append(peak_ids[point_index])
 
-        if names_1 != names_2:
+    return result
+
+
+def find_best_matches(
+    peak_shifts_1: Dict[int, Dict[str, float]],
+    peak_shifts_2: Dict[int, Dict[str, float]],
+    search_radii: Optional[Dict[str, float]] = None,
+) -> Dict[int, Dict[float, List[int]]]:
+    """
+    find the closest peaks in a second peak list for each peak in a first peak list, each peak is matched
+    independently so a peak in the second list can be the closest peak to more than one peak in the first list
+
+    :param peak_shifts_1: the shifts of each peak to match by peak id
+    :param peak_shifts_2: the shifts of each peak to match against by peak id
+    :param search_radii: the largest difference in ppm allowed for the dimensions of each nucleus
+    :return: the closest peaks keyed by their distance for each peak in the first list
+    """
+
+    peak_indices_2 = _build_peak_indices(peak_shifts_2, WEIGHTS)
+
+    return {
+        peak_id: _find_best_match(shifts, peak_indices_2, WEIGHTS, search_radii)
+        for peak_id, shifts in peak_shifts_1.items()
+    }
+
+
+def find_global_matches(
+    peak_shifts_1: Dict[int, Dict[str, float]],
+    peak_shifts_2: Dict[int, Dict[str, float]],
+    search_radii: Optional[Dict[str, float]] = None,
+) -> Dict[int, Optional[Tuple[int, float]]]:
+    """
+    match the peaks in two peak lists one to one so the total weighted distance between matched peaks is as
+    small as possible. Only peaks with the same atom names within the search radii are candidates and leaving
+    a peak unmatched costs as much as a match at the corner of the search region
+
+    :param peak_shifts_1: the shifts of each peak to match by peak id
+    :param peak_shifts_2: the shifts of each peak to match against by peak id
+    :param search_radii: the largest difference in ppm allowed for the dimensions of each nucleus, nuclei
+                         without a radius use GLOBAL_SEARCH_RADIUS scaled by their weight
+    :return: the matched peak id and distance for each peak in the first list or None if it wasn't matched
+    """
+
+    search_radii = search_radii if search_radii else {}
+
+    peak_indices_2 = _build_peak_indices(peak_shifts_2, WEIGHTS)
+
+    peak_ids_by_names = {}
+    for peak_id, shifts in peak_shifts_1.items():
+        peak_ids_by_names.setdefault(tuple(sorted(shifts)), []).append(peak_id)
+
+    matches = {}
+    for names, peak_ids_1 in peak_ids_by_names.items():
+        if names not in peak_indices_2:
             continue
 
-        axis_distances = []
+        peak_ids_2, index = peak_indices_2[names]
+        tolerances = _get_weighted_tolerances(
+            names, WEIGHTS, search_radii, GLOBAL_SEARCH_RADIUS
+        )
 
-        for atom_name in names_1:
-            axis_distances.append(
-                (weight_values_1[atom_name] - weight_values_2[atom_name]) ** 2
+        candidates = []
+        for peak_id in peak_ids_1:
+            position = _get_weighted_position(peak_shifts_1[peak_id], names, WEIGHTS)
+            candidates.append(
+                [
+                    (point_index, distance)
+                    for distance, point_index in index.within(position, tolerances)
+                ]
             )
-        distance = sqrt(sum(axis_distances))
 
-        result.setdefault(distance, []).append(peak_id)
+        assignments = min_cost_assignment(candidates, hypot(*tolerances))
+
+        for peak_id, peak_candidates, point_index in zip(
+            peak_ids_1, candidates, assignments
+        ):
+            if point_index is not None:
+                distance = dict(peak_candidates)[point_index]
+                matches[peak_id] = peak_ids_2[point_index], distance
+
+    return {peak_id: matches.get(peak_id) for peak_id in peak_shifts_1}
+
+
+def _get_weighted_tolerances(
+    names: Tuple[str, ...],
+    weights: Dict[str, float],
+    search_radii: Dict[str, float],
+    default_radius: float = inf,
+) -> List[float]:
+    return [
+        search_radii.get(name[0], default_radius * weights[name[0]]) / weights[name[0]]
+        for name in names
+    ]
 
-    return result
-    #     distances = []
-    #     value_2
-    #     distances.append(value_1**2)
+
+def _get_weighted_position(
+    shifts: Dict[str, float], names: Tuple[str, ...], weights: Dict[str, float]
+) -> List[float]:
+    weighted_terms = _get_weighted_terms(shifts, weights)
+    return [weighted_terms[name] for name in names]
 
 
 def _get_weighted_terms(shifts, weights):
@@ -177,7 +417,11 @@ def _get_assignment_string(peak: NewPeak):
     return "-".join(result)
 
 
-def match_peaks(peak_frame_1: Saveframe, peak_frame_2: Saveframe):
+def match_peaks(
+    peak_frame_1: Saveframe,
+    peak_frame_2: Saveframe,
+    search_radii: Optional[Dict[str, float]] = None,
+):
 
     num_dimensions = int(peak_frame_1.get_tag("num_dimensions")[0])
 
@@ -187,13 +431,11 @@ def match_peaks(peak_frame_1: Saveframe, peak_frame_2: Saveframe):
     peaks_by_id_1 = _nef_frames_to_peak_by_id(peak_frame_1)
     peaks_by_id_2 = _nef_frames_to_peak_by_id(peak_frame_2)
 
+    best_matches = find_best_matches(shifts_1, shifts_2, search_radii)
+
     info_by_assignment = {}
     no_matches = []
-    for peak_1, target_shifts in shifts_1.items():
-        matches = _find_best_match(
-            target_shifts, shifts_2, weights={"H": 1.0, "N": 7.0, "C": 2.0, ".": 1.0}
-        )
-
+    for peak_1, matches in best_matches.items():
         if len(matches) > 0:
             best_match = sorted(matches)[0]
             peak_2 = matches[best_match]
@@ -0,0 +1,162 @@
+import shlex
+import sys
+from pathlib import Path
+from typing import List
+
+import typer
+from typer import Context
+
+from nef_pipelines import nef_app
+from nef_pipelines.lib.nef_lib import EntryStream, read_entry_from_file_or_exit_error
+from nef_pipelines.lib.util import exit_error, read_from_file_or_exit
+
+STAGE_SEPARATOR = "|"
+NEF_COMMAND = "nef"
+COMMENT = "#"
+
+STAGES_HELP = """
+    the stages of the pipeline, each stage is a nef command with its arguments as a single quoted string e.g.
+    'frames delete test' and stages can also be separated by | inside a string. A leading nef is optional
+"""
+
+PIPELINE_HELP = """
+    read the stages of the pipeline from a file, one stage per line [or | separated], lines starting with # are
+    comments. Stages from the file are run before stages on the command line
+"""
+
+
+# noinspection PyUnusedLocal
+@nef_app.app.command()
+def run(
+    context: Context,
+    input: Path = typer.Option(
+        None,
+        "-i",
+        "--in",
+        metavar="NEF-FILE",
+        help="read NEF data from a file instead of stdin",
+    ),
+    pipeline_file: Path = typer.Option(
+        None, "-p", "--pipeline", metavar="PIPELINE-FILE", help=PIPELINE_HELP
+    ),
+    raw_stages: List[str] = typer.Argument(
+        None, metavar="<STAGE>", help=STAGES_HELP, show_default=False
+    ),
+):
+    """- run a pipeline of nef commands in a single process without re-reading NEF between stages [alpha]"""
+
+    stages = []
+    if pipeline_file:
+        pipeline_text = read_from_file_or_exit(pipeline_file, "pipeline")
+        stages.extend(parse_pipeline_stages(pipeline_text.split("\n"), comments=True))
+
+    stages.extend(parse_pipeline_stages(raw_stages if raw_stages else []))
+
+    _exit_if_no_stages(stages)
+    _exit_if_stage_is_run(stages)
+
+    entry = read_entry_from_file_or_exit_error(input) if input else None
+
+    root = context.find_root()
+
+    output = run_pipeline(root.command, root.info_name, stages, entry)
+
+    sys.stdout.write(output.getvalue())
+
+
+def run_pipeline(root_command, prog_name, stages, entry=None) -> EntryStream:
+    """
+    run a list of nef command lines in this process, each stage reads its input from the previous stage's
+    output. Entries written by a stage using write_entry_to_stdout are handed directly to the next stage and
+    are only converted to text if a stage reads its input as text
+
+    :param root_command: the click command at the root of the nef command tree
+    :param prog_name: the name of the root program [nef]
+    :param stages: a list of stages each of which is a list of arguments for a nef command
+    :param entry: an entry to feed to the first stage, if this is None the first stage reads stdin
+    :return: the output of the last stage
+    """
+
+    stage_input = EntryStream(entry) if entry is not None else sys.stdin
+
+    original_stdin = sys.stdin
+    original_stdout = sys.stdout
+
+    try:
+        for stage in stages:
+            stage_output = EntryStream()
+
+            sys.stdin = stage_input
+            sys.stdout = stage_output
+
+            root_command.main(args=stage, prog_name=prog_name, standalone_mode=False)
+
+            stage_input = _output_to_input(stage_output)
+
+    finally:
+        sys.stdin = original_stdin
+        sys.stdout = original_stdout
+
+    return stage_input if isinstance(stage_input, EntryStream) else EntryStream()
+
+
+def _output_to_input(stage_output: EntryStream) -> EntryStream:
+    if stage_output.carries_only_entry():
+        result = EntryStream(stage_output.entry)
+    else:
+        result = EntryStream(text=stage_output.getvalue())
+
+    return result
+
+
+def parse_pipeline_stages(lines: List[str], comments: bool = False) -> List[List[str]]:
+    """
+    split lines of text into pipeline stages, stages are separated by new lines and |'s and each stage is
+    split into arguments using shell quoting rules, a leading nef command is removed
+
+    :param lines: the lines to parse
+    :param comments: ignore lines starting with #
+    :return: a list of stages, each of which is a list of arguments
+    """
+
+    result = []
+    for line in lines:
+        if comments and line.strip().startswith(COMMENT):
+            continue
+
+        lexer = shlex.shlex(line, posix=True, punctuation_chars=STAGE_SEPARATOR)
+        lexer.whitespace_split = True
+        lexer.commenters = ""
+
+        stage = []
+        for token in lexer:
+            if token == STAGE_SEPARATOR:
+                result.append(stage)
+                stage = []
+            else:
+                stage.append(token)
+        result.append(stage)
+
+    result = [stage for stage in result if stage]
+
+    return [
+        stage[1:] if stage[0] == NEF_COMMAND and len(stage) > 1 else stage
+        for stage in result
+    ]
+
+
+def _exit_if_no_stages(stages):
+    if not stages:
+        msg = """
+            no stages were provided for the pipeline, provide them as arguments or with --pipeline
+        """
+        exit_error(msg)
+
+
+def _exit_if_stage_is_run(stages):
+    for i, stage in enumerate(stages, start=1):
+        if stage[0] == "run":
+            msg = f"""
+                the stage {i} [{' '.join(stage)}] is a run command, pipelines can't be nested
+            """
+            exit_error(msg)
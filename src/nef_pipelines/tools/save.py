@@ -1,14 +1,24 @@
-import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from itertools import zip_longest
 from pathlib import Path
-from typing import List, Tuple
+from typing import List
 
 import typer
 from fyeah import f
-from pynmrstar import Entry, cnmrstar
+from pynmrstar import Entry
 
 from nef_pipelines import nef_app
+from nef_pipelines.lib.nef_lib import (
+    BadNefFileException,
+    entries_from_stdin_without_parsing_or_none,
+    write_entry_to_stdout,
+)
+from nef_pipelines.lib.nef_stream_lib import (
+    LazySaveframe,
+    iter_lazy_entries,
+    iter_raw_entry_items,
+)
 from nef_pipelines.lib.util import (
     STDIN,
     STDOUT,
@@ -49,6 +59,17 @@ if nef_app:
             False, "--no-globals-cleanup", help="do not remove the globals frame"
         ),
         no_header: bool = typer.Option(False, help="do not write a header"),
+        validate: bool = typer.Option(
+            False,
+            help="parse the entries to check they are valid before writing them, otherwise they are only split",
+        ),
+        jobs: int = typer.Option(
+            1,
+            "-j",
+            "--jobs",
+            min=1,
+            help="the number of files to write at the same time when writing entries to separate files",
+        ),
         file_paths: List[str] = typer.Argument(None, help=FILE_PATHS_HELP),
     ):
         """- save the entries in the stream to a file / files or stdout with delimiters"""
@@ -74,18 +95,23 @@ if nef_app:
         else:
             file_paths = [Path(file_path).resolve() for file_path in file_paths]
 
-        entries = list(_entry_list_from_stdin_or_exit_error_if_none(input))
+        entries = _entry_list_from_stdin_or_exit_error_if_none(input)
+
+        if validate:
+            _exit_if_entries_are_not_valid(entries)
 
         if not no_globals_cleanup:
             for entry in entries:
                 for save_frame in entry.get_saveframes_by_category("nefpls_globals"):
                     entry.remove_saveframe(save_frame)
 
-        entries = pipe(entries, file_paths, template, no_header, single_file, force)
+        entries = pipe(
+            entries, file_paths, template, no_header, single_file, force, jobs
+        )
 
         if entries:
             for entry in entries:
-                print(entry)
+                write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -95,6 +121,7 @@ def pipe(
     no_header: bool,
     single_file: bool,
     force: bool,
+    jobs: int = 1,
 ):
 
     _exit_if_no_file_paths(file_paths)
@@ -150,6 +177,11 @@ def pipe(
     if single_file:
         file_paths = file_paths * len(entries)
 
+    if jobs > 1 and not single_file:
+        _write_entries_concurrently(entries, file_paths, force, jobs)
+
+        return entries
+
     for i, (entry, file_path, append_mode) in enumerate(
         zip_longest(entries, file_paths, append_modes, fillvalue=None)
     ):
@@ -193,6 +225,27 @@ def pipe(
     return None if write_stdout else entries
 
 
+def _write_entries_concurrently(entries, file_paths, force, jobs):
+
+    # all the file paths are checked before any are written as the writes finish in any order
+    for entry, file_path in zip_longest(entries, file_paths, fillvalue=None):
+
+        _exit_if_we_ran_out_of_entries(entry, file_path)
+
+        _exit_if_we_ran_out_of_file_paths(entry, file_path)
+
+        _exit_if_file_exists_and_no_append_or_force(file_path, False, force)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for _ in executor.map(_write_entry, entries, file_paths):
+            pass
+
+
+def _write_entry(entry: Entry, file_path: Path):
+    with open(file_path, "w") as file_h:
+        print(entry, file=file_h)
+
+
 def _exit_if_file_exists_and_no_append_or_force(file_path, append_mode, force):
 
     if file_path != STDOUT and file_path.exists() and not (force or append_mode):
@@ -224,62 +277,42 @@ def _exit_if_we_ran_out_of_entries(entry, file_path):
         exit_error(msg)
 
 
-# stolen from pynmrstar parser
-def _load_data(data: str) -> None:
-    """Loads data in preparation of parsing and cleans up newlines
-    and massages the data to make parsing work properly when multi-line
-    values aren't as expected. Useful for manually getting tokens from
-    the parser."""
-
-    # Fix DOS line endings
-    data = data.replace("\r\n", "\n").replace("\r", "\n")
-    # Change '\n; data ' started multi-lines to '\n;\ndata'
-    data = re.sub(r"\n;([^\n]+?)\n", r"\n;\n\1\n", data)
-
-    cnmrstar.load_string(data)
-
-
-def _get_token() -> str:
-    """Returns the next token in the parsing process."""
-
-    try:
-        token, line_number, delimiter = cnmrstar.get_token_full()
-    except ValueError as err:
-        raise Exception(str(err))
-
-    return token, line_number, delimiter
-
-
-def _iterate_tokens() -> Tuple[str, int, str]:
-    while token := _get_token():
-        if token[0] is None:
-            break
-        yield token
-
-
-def _entry_list_from_stdin_or_exit_error_if_none(file_name):
+def _entry_list_from_stdin_or_exit_error_if_none(file_name) -> List[Entry]:
 
     file_path = Path(file_name)
 
-    text = read_from_file_or_exit(file_path)
+    if file_path == STDIN:
+        try:
+            entries = entries_from_stdin_without_parsing_or_none()
+        except BadNefFileException as e:
+            exit_error(f"failed to read nef entries from stdin because {e}", e)
 
-    _load_data(text)
+        if entries is not None:
+            return entries
 
-    entry_strings = []
-    tokens = None
-    for token in _iterate_tokens():
+    text = read_from_file_or_exit(file_path)
 
-        if token[0].startswith("data_"):
-            if tokens:
-                entry_strings.append(" ".join(tokens))
-            tokens = []
+    # the entries are split at their data_ blocks by a light scan and their frames are only parsed if they are
+    # used, so entries are written with the text they were read with
+    try:
+        entries = list(
+            iter_lazy_entries(iter_raw_entry_items(text.splitlines(keepends=True)))
+        )
+    except BadNefFileException as e:
+        exit_error(f"failed to read nef entries from {file_name} because {e}", e)
 
-        tokens.append(f"\n{token[2]}{token[0]}\n{token[2]}")
+    return entries
 
-    if tokens:
-        entry_strings.append(" ".join(tokens))
 
-    return [Entry.from_string(entry_string) for entry_string in entry_strings]
+def _exit_if_entries_are_not_valid(entries: List[Entry]):
+    for entry in entries:
+        for frame in entry:
+            if isinstance(frame, LazySaveframe):
+                try:
+                    frame.validate()
+                except BadNefFileException as e:
+                    msg = f"the frame {frame.name} in the entry {entry.entry_id} isn't valid because {e}"
+                    exit_error(msg, e)
 
 
 def _exit_if_single_file_and_out_is_multiple_files(file_paths, single_file):
@@ -21,6 +21,7 @@ from nef_pipelines.lib.nef_lib import (
     create_nef_save_frame,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.util import (
     exit_error,
@@ -205,7 +206,7 @@ def build(
 
     entry = pipe(entry, frames_and_timings, unit, name, experiment_type)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
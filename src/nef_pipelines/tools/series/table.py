@@ -10,10 +10,12 @@ from nef_pipelines.lib.nef_lib import (
     NEF_PIPELINES_PREFIX,
     NEF_RELAXATION_VERSION,
     UNUSED,
+    LoopBuilder,
     SelectionType,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import frame_to_peaks
 from nef_pipelines.lib.shift_lib import IntensityMeasurementType
@@ -93,7 +95,7 @@ def table(
         add_atom_names,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 # TODO: add checks if there are peaks with duplicate atom names and exit as error
@@ -187,7 +189,7 @@ def _build_series_data_loop(
         ]
     tags.extend(additional_tags)
 
-    series_data_loop.add_tag(tags)
+    builder = LoopBuilder(series_data_loop, tags)
 
     for group_index, (atoms, values) in enumerate(atoms_and_values.items(), start=1):
         zipper = zip_longest(
@@ -222,13 +224,9 @@ def _build_series_data_loop(
                         }
                     )
 
-            series_data_loop.add_data(
-                [
-                    data,
-                ]
-            )
+            builder.add_row(data)
 
-    return series_data_loop
+    return builder.build()
 
 
 def _select_series_frames(
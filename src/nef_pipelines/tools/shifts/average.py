@@ -15,6 +15,7 @@ from nef_pipelines.lib.nef_lib import (
     get_frame_ids,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import frame_to_peaks
 from nef_pipelines.lib.util import STDIN, exit_error
@@ -53,7 +54,7 @@ def average(
 
     entry = pipe(entry, frames, frame_name, force)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(entry: Entry, frames: List[Saveframe], frame_name: str, force: bool) -> Entry:
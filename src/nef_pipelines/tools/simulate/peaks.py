@@ -1,5 +1,4 @@
 from collections import Counter
-from dataclasses import replace
 from pathlib import Path
 from textwrap import dedent, indent
 from typing import List
@@ -17,6 +16,7 @@ from nef_pipelines.lib.nef_lib import (
     UNUSED,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import peaks_to_frame
 from nef_pipelines.lib.shift_lib import nef_frames_to_shifts
@@ -29,7 +29,7 @@ from nef_pipelines.lib.spectra_lib import (
     ExperimentType,
     PeakInfo,
 )
-from nef_pipelines.lib.structures import NewPeak, ShiftData
+from nef_pipelines.lib.structures import NewPeak, ShiftData, replace_fields
 from nef_pipelines.lib.util import (
     FOUR_SPACES,
     STDIN,
@@ -111,7 +111,7 @@ def peaks(
         entry, shift_frames, exact, spectra, name_template, spectrometer_frequency
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -252,13 +252,13 @@ def _make_spectrum(
                     sequence_code_int = sequence_code_int - offset_int
 
                 residue = shift.atom.residue
-                residue = replace(residue, sequence_code=sequence_code_int)
-                residue = replace(residue, offset=offset_int)
+                residue = replace_fields(residue, sequence_code=sequence_code_int)
+                residue = replace_fields(residue, offset=offset_int)
                 if prefix:
-                    residue = replace(residue, sequence_code_prefix=prefix)
+                    residue = replace_fields(residue, sequence_code_prefix=prefix)
 
-                atom = replace(shift.atom, residue=residue)
-                shift = replace(shift, atom=atom)
+                atom = replace_fields(shift.atom, residue=residue)
+                shift = replace_fields(shift, atom=atom)
                 updated_shifts.append(shift)
                 found_separator = True
 
@@ -270,10 +270,10 @@ def _make_spectrum(
                 if is_int(sequence_code):
                     sequence_code = int(sequence_code)
                     residue = shift.atom.residue
-                    residue = replace(residue, sequence_code=sequence_code)
-                    residue = replace(residue, sequence_code_prefix=prefix)
-                    atom = replace(shift.atom, residue=residue)
-                    shift = replace(shift, atom=atom)
+                    residue = replace_fields(residue, sequence_code=sequence_code)
+                    residue = replace_fields(residue, sequence_code_prefix=prefix)
+                    atom = replace_fields(shift.atom, residue=residue)
+                    shift = replace_fields(shift, atom=atom)
             updated_shifts.append(shift)
 
     shifts = updated_shifts
@@ -337,11 +337,11 @@ def _make_spectrum(
                 if sequence_code_prefix:
                     sequence_code = f"{sequence_code_prefix}{sequence_code}"
                     residue = shift.atom.residue
-                    residue = replace(
+                    residue = replace_fields(
                         residue, sequence_code=sequence_code, sequence_code_prefix=""
                     )
-                    atom = replace(shift.atom, residue=residue)
-                    shift = replace(shift, atom=atom)
+                    atom = replace_fields(shift.atom, residue=residue)
+                    shift = replace_fields(shift, atom=atom)
                     atom_set_shifts[i] = shift
 
             if len(atom_set_shifts) == len(info.dimensions):
@@ -21,6 +21,7 @@ from nef_pipelines.lib.nef_lib import (
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import frame_to_peaks, peaks_to_frame
 from nef_pipelines.lib.sequence_lib import sequences_from_frames
@@ -688,7 +689,7 @@ def unlabelling(
         output_residue_typing=residue_types,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
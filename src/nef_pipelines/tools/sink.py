@@ -8,5 +8,7 @@ if nef_app:
     def sink():
         """- read the current stream and don't write anything"""
         if not sys.stdin.isatty():
-            for line in sys.stdin:
+            # the stream may be in the binary stream format so read it as bytes if we can
+            stream = getattr(sys.stdin, "buffer", sys.stdin)
+            for line in stream:
                 pass
@@ -1,8 +1,15 @@
+import shutil
+import sys
 from pathlib import Path
 
 import typer
 
 from nef_pipelines import nef_app
+from nef_pipelines.lib.nef_lib import (
+    entries_from_stdin_without_parsing_or_none,
+    write_entry_to_stdout,
+)
+from nef_pipelines.lib.util import STDIN, exit_error
 
 if nef_app:
     # noinspection PyUnusedLocal
@@ -13,6 +20,21 @@ if nef_app:
         )
     ):
         "- stream a nef file"
-        with open(file_name) as file_h:
-            for line in file_h:
-                print(line, end="")
+
+        if file_name == STDIN:
+            _stream_stdin()
+        else:
+            try:
+                with open(file_name) as file_h:
+                    shutil.copyfileobj(file_h, sys.stdout)
+            except IOError as e:
+                exit_error(f"couldn't read from the file {file_name}", e)
+
+
+def _stream_stdin():
+    entries = entries_from_stdin_without_parsing_or_none()
+    if entries is not None:
+        for entry in entries:
+            write_entry_to_stdout(entry)
+    elif not sys.stdin.isatty():
+        shutil.copyfileobj(sys.stdin, sys.stdout)
@@ -18,6 +18,7 @@ from nef_pipelines.lib.nef_lib import (
     UNUSED,
     add_frames_to_entry,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import peaks_to_frame
 from nef_pipelines.lib.sequence_lib import (
@@ -185,7 +186,7 @@ def peaks(
     except CSVPeakListException as e:
         exit_error(str(e))
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def _exit_bad_sequence(e, entry_input, sequence_table=None):
@@ -15,6 +15,7 @@ from nef_pipelines.lib.nef_lib import (
     UNUSED,
     add_frames_to_entry,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     get_residue_name_from_lookup,
@@ -149,7 +150,7 @@ def rdcs(
         sequence_table = _tabulate_sequence(entry) if verbose else None
         _exit_bad_sequence(e, entry_input, sequence_table)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -14,12 +14,15 @@ from nef_pipelines.lib.isotope_lib import CODE_TO_ISOTOPE, GAMMA_RATIOS
 from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.util import (
+    JOBS_HELP,
     NEWLINE,
     STDIN,
     exit_error,
     is_float,
+    parallel_map_or_exit_error,
     parse_comma_separated_options,
 )
 from nef_pipelines.transcoders.deep import import_app
@@ -56,6 +59,7 @@ def peaks(
     entry_name: str = typer.Option(
         "nmrpipe", "-e", "--entry", help="entry name", metavar="<entry-name>"
     ),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help=JOBS_HELP),
     file_names: List[Path] = typer.Argument(
         ..., help="input peak files", metavar="<peak-file.xpk>"
     ),
@@ -88,9 +92,9 @@ def peaks(
 
     entry = read_or_create_entry_exit_error_on_bad_file(in_file, entry_name=entry_name)
 
-    entry = pipe(entry, file_names, chain_codes, spectrometer_frequencies)
+    entry = pipe(entry, file_names, chain_codes, spectrometer_frequencies, jobs=jobs)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -98,10 +102,17 @@ def pipe(
     file_names: List[Path],
     chain_codes: List[str],
     spectrometer_frequencies: List[float],
+    jobs: int = 1,
 ) -> Entry:
 
-    gdb_files = _read_gdb_files(file_names)
-    peak_list_map = _read_deep_peaks(gdb_files, chain_codes)
+    gdb_files_and_peak_lists = parallel_map_or_exit_error(
+        _read_deep_file, file_names, chain_codes, jobs=jobs
+    )
+
+    gdb_files = [gdb_file for gdb_file, _ in gdb_files_and_peak_lists]
+    peak_list_map = {
+        gdb_file.name: peak_list for gdb_file, peak_list in gdb_files_and_peak_lists
+    }
 
     deep_sweep_widths_map, deep_isotopes_map = _read_deep_sweep_widths_and_isotopes(
         gdb_files
@@ -197,26 +208,13 @@ def _create_entry_names_from_template_if_required(
     return _disambiguate_names(new_entry_names)
 
 
-def _read_gdb_files(file_names):
-    results = []
-    for file_name in file_names:
-        with open(file_name) as file_h:
-            gdb_file = read_db_file_records(file_h, file_name=file_name)
-
-        _check_is_peak_file_or_exit(gdb_file)
-
-        results.append(gdb_file)
-
-    return results
-
-
-def _read_deep_peaks(gdb_files, chain_codes):
-    results = {}
-    for gdb_file, chain_code in zip(gdb_files, chain_codes):
+def _read_deep_file(file_name, chain_code):
+    with open(file_name) as file_h:
+        gdb_file = read_db_file_records(file_h, file_name=file_name)
 
-        results[gdb_file.name] = read_peak_file(gdb_file, chain_code)
+    _check_is_peak_file_or_exit(gdb_file)
 
-    return results
+    return gdb_file, read_peak_file(gdb_file, chain_code)
 
 
 def _check_is_peak_file_or_exit(gdb_file):
@@ -14,6 +14,7 @@ from nef_pipelines.lib.nef_lib import (
     read_or_create_entry_exit_error_on_bad_file,
     set_column,
     set_column_to_value,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import MoleculeTypes, sequence_from_entry
 from nef_pipelines.lib.util import (  # STDIN,; exit_error,; parse_comma_separated_options,
@@ -359,7 +360,7 @@ def peaks(
             merit_function=merit_function,
         )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def is_iterable(target):
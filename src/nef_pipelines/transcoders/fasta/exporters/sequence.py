@@ -9,6 +9,7 @@ from pynmrstar import Entry
 from nef_pipelines.lib.nef_lib import (
     molecular_system_from_entry_or_exit,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     make_chunked_sequence_1let,
@@ -70,7 +71,7 @@ def sequence(
     entry = pipe(entry, chain_codes, Path(output_file), force)
 
     if entry:
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def pipe(entry: Entry, chain_codes: List[str], output_file: Path, force: bool):
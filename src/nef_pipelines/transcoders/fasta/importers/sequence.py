@@ -12,6 +12,7 @@ from pynmrstar import Entry
 from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     BadResidue,
@@ -24,10 +25,12 @@ from nef_pipelines.lib.sequence_lib import (
 )
 from nef_pipelines.lib.structures import SequenceResidue
 from nef_pipelines.lib.util import (
+    JOBS_HELP,
     NEWLINE,
     STDIN,
     exit_error,
     is_int,
+    parallel_map_or_exit_error,
     parse_comma_separated_options,
 )
 from nef_pipelines.transcoders.fasta import import_app
@@ -89,6 +92,7 @@ def sequence(
         help="molecule type one of protein, dna, rna or  carbohydrate",
     ),
     no_header: bool = typer.Option(False, "--no-header", help=NO_HEADER_HELP),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help=JOBS_HELP),
     file_names: List[Path] = typer.Argument(
         ..., help="the file to read", metavar="<FASTA-FILE>"
     ),
@@ -139,9 +143,10 @@ def sequence(
         no_header,
         file_names,
         entry_name,
+        jobs=jobs,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -154,11 +159,12 @@ def pipe(
     no_header: bool,
     file_names,
     entry_name: str,
+    jobs: int = 1,
 ):
     fasta_frames = []
 
     fasta_residues, read_entry_name = _read_sequences(
-        file_names, chain_codes, molecule_types, not no_header
+        file_names, chain_codes, molecule_types, not no_header, jobs=jobs
     )
 
     if read_entry_name and not entry_name:
@@ -304,25 +310,13 @@ def _read_sequences(
     chain_codes: Iterable[str],
     molecule_types: List[MoleculeType],
     parse_header=False,
+    jobs=1,
 ) -> List[SequenceResidue]:
 
-    sequence_records = []
-
-    for file_path in file_paths:
-        try:
-            with open(file_path) as handle:
-                try:
-                    reader = Reader(handle)
-                    for fasta_sequence in reader:
-                        sequence_records.append(
-                            _parse_fasta(fasta_sequence, parse_header)
-                        )
-
-                except Exception as e:
-                    # check if relative to os.getcwd
-                    exit_error(f"Error reading fasta file {str(file_path)}", e)
-        except IOError as e:
-            exit_error(f"couldn't open {file_path} because:\n{e}", e)
+    file_sequence_records = parallel_map_or_exit_error(
+        _read_fasta_file, file_paths, [parse_header] * len(file_paths), jobs=jobs
+    )
+    sequence_records = list(chain.from_iterable(file_sequence_records))
 
     number_sequences = len(sequence_records)
     number_molecule_types = len(molecule_types)
@@ -398,6 +392,25 @@ def _read_sequences(
     return residues, entry_names
 
 
+def _read_fasta_file(file_path, parse_header):
+
+    sequence_records = []
+    try:
+        with open(file_path) as handle:
+            try:
+                reader = Reader(handle)
+                for fasta_sequence in reader:
+                    sequence_records.append(_parse_fasta(fasta_sequence, parse_header))
+
+            except Exception as e:
+                # check if relative to os.getcwd
+                exit_error(f"Error reading fasta file {str(file_path)}", e)
+    except IOError as e:
+        exit_error(f"couldn't open {file_path} because:\n{e}", e)
+
+    return sequence_records
+
+
 def _exit_if_there_are_replicate_chain_codes_from_files(
     file_chain_codes, input_chain_codes, file_paths
 ):
@@ -9,6 +9,7 @@ from tabulate import tabulate
 from nef_pipelines.lib.nef_lib import (
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.shift_lib import (
     frames_to_assigned_and_unassigned_shift_lists,
@@ -75,7 +76,7 @@ def fixed(
     entry = pipe(entry, shift_frame_selectors, target_chain, output_file, force)
 
     if entry:
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -11,6 +11,7 @@ from tabulate import tabulate
 from nef_pipelines.lib.nef_lib import (
     loop_row_namespace_iter,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.structures import LineInfo
 from nef_pipelines.lib.util import (
@@ -76,7 +77,7 @@ def fragments(
     entry = pipe(entry, Path(output_file), force)
 
     if entry:
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def pipe(entry: Entry, output_file: Path, force: bool) -> Entry:
@@ -5,6 +5,7 @@ import typer
 from nef_pipelines.lib.nef_lib import (
     molecular_system_from_entry_or_exit,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import chains_from_frames
 from nef_pipelines.lib.util import STDIN, exit_error
@@ -51,7 +52,7 @@ def sequence(
     entry = fasta_pipe(entry, chain_code, Path(output_file), force)
 
     if entry:
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def _get_single_chain_code_or_exit(chain_code_selector, molecular_system, input_file):
@@ -13,6 +13,7 @@ from tabulate import tabulate
 from nef_pipelines.lib.nef_lib import (
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     exit_if_chain_not_in_entrys_sequence,
@@ -132,7 +133,7 @@ def shifts(
     entry = pipe(entry, shift_frame_selectors, target_chain, Path(output_file), force)
 
     if entry:
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def _assigned_shifts_filter_non_numeric_sequence_codes(assigned_shifts):
@@ -12,6 +12,7 @@ from nef_pipelines.lib.nef_lib import (
     UNUSED,
     add_frames_to_entry,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import peaks_to_frame
 from nef_pipelines.lib.sequence_lib import (
@@ -105,7 +106,7 @@ def peaks(
         sort_peaks=not dont_sort_peaks,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -9,6 +9,7 @@ from nef_pipelines.lib.nef_lib import (
     UNUSED,
     add_frames_to_entry,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     TRANSLATIONS_3_1_PROTEIN,
@@ -161,7 +162,7 @@ def pipe(
 
     entry = add_frames_to_entry(entry, sparky_frames)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def _convert_residue_type_to_3_let_or_exit(residue_type, line_info):
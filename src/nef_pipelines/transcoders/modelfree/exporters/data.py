@@ -15,6 +15,7 @@ from nef_pipelines.lib.nef_lib import (
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import translate_3_to_1
 from nef_pipelines.lib.util import (
@@ -75,7 +76,7 @@ def data(
     entry = pipe(entry, frame_selectors, exact, Path(output_file), force)
 
     if entry:
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 @dataclass
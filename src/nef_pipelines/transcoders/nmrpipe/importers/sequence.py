@@ -10,6 +10,7 @@ from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     read_file_or_exit,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     get_chain_starts,
@@ -73,7 +74,7 @@ def sequence(
         entry, lines, chain_code, no_chain_start, no_chain_end, start, file_name
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -8,6 +8,7 @@ from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     read_file_or_exit,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import translate_1_to_3
 from nef_pipelines.lib.shift_lib import shifts_to_nef_frame
@@ -52,7 +53,7 @@ def shifts(
 
     entry = pipe(entry, lines, chain_code, frame_name, file_name)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(entry, lines, chain_code, frame_name, file_name):
@@ -1,13 +1,12 @@
 import string
 import sys
 
-import requests
 from fyeah import f
 from pynmrstar import Entry
-from requests.exceptions import HTTPError
 from tabulate import tabulate
 
 from nef_pipelines.lib.util import exit_error, is_int
+from nef_pipelines.lib.web_lib import ONE_DAY, WebCache, WebRequestException
 from nef_pipelines.transcoders.nmrstar.importers.project_shortcuts import (
     SHORTCUT_URLS,
     SHORTCUTS,
@@ -15,6 +14,9 @@ from nef_pipelines.transcoders.nmrstar.importers.project_shortcuts import (
 from nef_pipelines.transcoders.nmrstar.importers.sequence import pipe as sequence_pipe
 from nef_pipelines.transcoders.nmrstar.importers.shifts import pipe as shift_pipe
 
+# bmrb entries are occasionally revised so cached copies are refreshed weekly
+BMRB_ENTRY_TTL = 7 * ONE_DAY
+
 
 def pipe(
     nef_entry,
@@ -79,21 +81,24 @@ def _parse_text_to_star_or_none(possible_entry):
     return nmrstar_entry
 
 
-def _get_bmrb_entry_from_web_or_none(url, exit_on_error=True):
+def _get_bmrb_entry_from_web_or_none(url, exit_on_error=True, web_cache=None):
+    web_cache = web_cache if web_cache else WebCache()
     possible_entry = None
     error = False
     exception = None
     if url:
         try:
-            response = requests.get(url)
+            response = web_cache.get(url, ttl=BMRB_ENTRY_TTL)
             response.raise_for_status()
             possible_entry = response.content
-        except HTTPError as http_err:
+        except WebRequestException as http_err:
             msg = f"while trying to download the url {url} there was an http error {http_err}"
             exception = http_err
+            error = True
         except Exception as err:
             msg = f"while trying to download the url {url} there was an error {err}"
             exception = err
+            error = True
 
     if error:
         if exit_on_error:
@@ -9,9 +9,11 @@ from strenum import LowercaseStrEnum
 from nef_pipelines.lib.nef_lib import (
     read_entry_from_file_or_exit_error,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import get_chain_code_iter
 from nef_pipelines.lib.util import STDIN, exit_error, parse_comma_separated_options
+from nef_pipelines.lib.web_lib import NO_CACHE_HELP, OFFLINE_HELP, WebCache
 from nef_pipelines.transcoders.nmrstar import import_app
 from nef_pipelines.transcoders.nmrstar.importers.project_shortcuts import (
     BMRB_URL_TEMPLATE,
@@ -95,6 +97,8 @@ def project(
     list_shortcuts: bool = typer.Option(
         False, "--list-shortcuts", help="list the available shortcuts and exit"
     ),
+    offline: bool = typer.Option(False, "--offline", help=OFFLINE_HELP),
+    no_cache: bool = typer.Option(False, "--no-cache", help=NO_CACHE_HELP),
     file_paths: List[str] = typer.Argument(None, help=FILE_PATH_HELP),
 ):
     """- convert as much as possible from an NMR-STAR file to NEF [shifts & sequences] [alpha]"""
@@ -112,6 +116,8 @@ def project(
         typer.echo(ctx.get_help())
         exit_error("missing file path argument")
 
+    web_cache = WebCache(offline=offline, enabled=not no_cache)
+
     for file_path in file_paths:
         chain_codes = parse_comma_separated_options(chain_codes)
         chain_codes = get_chain_code_iter(chain_codes)
@@ -132,7 +138,7 @@ def project(
 
             exit_on_error = True if source == EntrySource.WEB else False
             possible_entry = project_module._get_bmrb_entry_from_web_or_none(
-                url, exit_on_error
+                url, exit_on_error, web_cache
             )
 
             nmrstar_entry = project_module._parse_text_to_star_or_none(possible_entry)
@@ -163,4 +169,4 @@ def project(
             file_path,
         )
 
-        print(entry)
+        write_entry_to_stdout(entry)
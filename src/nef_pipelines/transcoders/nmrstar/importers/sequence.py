@@ -11,6 +11,7 @@ from nef_pipelines.lib.nef_lib import (
     loop_row_namespace_iter,
     read_entry_from_file_or_exit_error,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     get_chain_code_iter,
@@ -110,7 +111,7 @@ def sequence(
         use_author,
     )
 
-    print(nef_entry)
+    write_entry_to_stdout(nef_entry)
 
 
 def pipe(
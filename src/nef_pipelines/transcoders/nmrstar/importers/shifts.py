@@ -19,6 +19,7 @@ from nef_pipelines.lib.nef_lib import (
     loop_row_namespace_iter,
     read_entry_from_file_or_exit_error,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     get_chain_code_iter,
@@ -103,7 +104,7 @@ def shifts(
         stereo_mode,
     )
 
-    print(nef_entry)
+    write_entry_to_stdout(nef_entry)
 
 
 def pipe(
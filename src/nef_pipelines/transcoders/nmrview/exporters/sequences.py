@@ -10,6 +10,7 @@ from nef_pipelines.lib.nef_lib import (
     molecular_system_from_entry,
     molecular_system_from_entry_or_exit,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     chains_from_frames,
@@ -119,7 +120,7 @@ def pipe(entry, output_to_stdout, file_name_template, chain_selectors):
 
     stdout_is_atty = stdout.isatty() if not in_pytest() else True
     if not output_to_stdout and not stdout_is_atty:
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def _make_file_name_banners(chains_to_filenames):
@@ -25,6 +25,7 @@ from nef_pipelines.lib.isotope_lib import GAMMA_RATIOS
 from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     MoleculeType,
@@ -160,7 +161,7 @@ def peaks(
         residue_handling,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -4,6 +4,7 @@ from typing import List
 
 import typer
 
+from nef_pipelines.lib.nef_lib import write_entry_to_stdout
 from nef_pipelines.lib.sequence_lib import get_chain_code_iter, sequence_to_nef_frame
 from nef_pipelines.lib.typer_utils import get_args
 from nef_pipelines.lib.util import (
@@ -72,7 +73,7 @@ def process_sequence(args: Namespace):
 
     entry = process_stream_and_add_frames(nmrview_frames, args)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 if __name__ == "__main__":
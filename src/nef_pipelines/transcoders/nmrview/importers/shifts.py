@@ -5,7 +5,10 @@ import typer
 from pynmrstar import Entry, Saveframe
 
 from nef_pipelines.lib.constants import NEF_PIPELINES
-from nef_pipelines.lib.nef_lib import read_entry_from_file_or_stdin_or_exit_error
+from nef_pipelines.lib.nef_lib import (
+    read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
+)
 from nef_pipelines.lib.sequence_lib import (
     get_chain_code_iter,
     sequence_from_entry_or_exit,
@@ -87,7 +90,7 @@ def pipe(entry, chain_codes, sequence, entry_name, file_names):
 
     entry = add_frames_to_entry(entry, nmrview_frames)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def add_frames_to_entry(entry: Entry, frames: List[Saveframe]) -> Entry:
@@ -1,5 +1,7 @@
+import functools
+import re
 from textwrap import dedent
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from pyparsing import (
     Forward,
@@ -24,6 +26,18 @@ from nef_pipelines.lib.structures import (
 )
 from nef_pipelines.lib.util import exit_error
 
+# the characters of tcl words as understood by get_tcl_parser: printable ascii excluding " { and }
+_TCL_WORD_CHARACTERS = "!#-z|~"
+_TCL_WHITESPACE_CHARACTERS = r" \t\r\n"
+
+# a line of words and flat {...} lists with no quotes or nested lists, each alternative starts with a
+# different character so matching is linear
+_FLAT_TCL = re.compile(
+    rf"(?:[{_TCL_WHITESPACE_CHARACTERS}{_TCL_WORD_CHARACTERS}]"
+    rf"|\{{[{_TCL_WHITESPACE_CHARACTERS}{_TCL_WORD_CHARACTERS}]*\}})*"
+)
+_FLAT_TCL_TOKEN = re.compile(rf"\{{([^}}]*)\}}|([{_TCL_WORD_CHARACTERS}]+)")
+
 
 def _process_emptys_and_singles(value: ParseResults) -> ParseResults:
     """
@@ -45,10 +59,10 @@ def _process_emptys_and_singles(value: ParseResults) -> ParseResults:
     return value
 
 
-# @functools.cache
+@functools.lru_cache(maxsize=None)
 def get_tcl_parser() -> ParserElement:
     """
-    build a simple tcl parser suitable for nmrview files and cach it
+    build a simple tcl parser suitable for nmrview files, the parser is built once and cached
 
     Returns:
         pyparsing parser
@@ -89,9 +103,41 @@ def get_tcl_parser() -> ParserElement:
     return top_level
 
 
-def parse_tcl(in_str, file_name="unknown", line_no=0) -> ParseResults:
+def _parse_flat_tcl(in_str: str) -> Optional[List[Union[str, List[str]]]]:
+    """
+    parse a line of tcl containing only words and flat {...} lists without using pyparsing, this is the
+    common case for nmrview peak files and is much faster. The result matches the result from the tcl parser
+
+    Args:
+        in_str (str): tcl source
+
+    Returns:
+        Optional[List[Union[str, List[str]]]]: the words and lists or None if the input isn't flat tcl
+    """
+
+    if not _FLAT_TCL.fullmatch(in_str):
+        return None
+
+    result = []
+    for tcl_list, word in _FLAT_TCL_TOKEN.findall(in_str):
+        if word:
+            result.append(word)
+        else:
+            # empty lists are replaced by empty strings as in _process_emptys_and_singles
+            result.append(tcl_list.split() or "")
+
+    if len(result) == 1 and isinstance(result[0], list):
+        result = result[0]
+
+    return result
+
+
+def parse_tcl(
+    in_str, file_name="unknown", line_no=0
+) -> Union[ParseResults, List[Union[str, List[str]]]]:
     """
-    parse a tcl data file or fragment using pyparsing
+    parse a tcl data file or fragment, flat input [words and {...} lists] is parsed directly anything else
+    [quotes or nested lists] using pyparsing
 
     Args:
         in_str (str):  tcl source
@@ -99,9 +145,14 @@ def parse_tcl(in_str, file_name="unknown", line_no=0) -> ParseResults:
         line_no (str):  base line number for error reporting, the line no reported by py parsing will be added to this
 
     Returns:
-        ParseResults: pyparsing parse result
+        Union[ParseResults, List[Union[str, List[str]]]]: the parse result, lists for flat input and pyparsing
+        parse results otherwise
     """
 
+    result = _parse_flat_tcl(in_str)
+    if result is not None:
+        return result
+
     parser = get_tcl_parser()
 
     result = None
@@ -140,7 +191,7 @@ def parse_float_list(line: str, line_no: int) -> List[float]:
     raw_fields = []
     parsed_tcl = parse_tcl(line)
     for field in parsed_tcl:
-        if isinstance(field, ParseResults):
+        if isinstance(field, (ParseResults, list)):
             raw_fields.extend(field)
         elif isinstance(field, str):
             raw_fields.append(field)
@@ -168,7 +219,6 @@ def read_sequence(
     chain_code: str = "A",
     sequence_file_name: str = "unknown",
 ) -> List[SequenceResidue]:
-
     """
     read an nmrview sequence from a file
 
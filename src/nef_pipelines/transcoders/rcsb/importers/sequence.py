@@ -4,21 +4,19 @@ from typing import List
 
 import typer
 
+from nef_pipelines.lib.nef_lib import write_entry_to_stdout
 from nef_pipelines.lib.sequence_lib import sequence_to_nef_frame
 from nef_pipelines.lib.structures import SequenceResidue
 from nef_pipelines.lib.typer_utils import get_args
 from nef_pipelines.lib.util import (
+    JOBS_HELP,
     exit_error,
+    parallel_map_or_exit_error,
     parse_comma_separated_options,
     process_stream_and_add_frames,
 )
 from nef_pipelines.transcoders.rcsb import import_app
-from nef_pipelines.transcoders.rcsb.rcsb_lib import (
-    RCSBFileType,
-    guess_cif_or_pdb,
-    parse_cif,
-    parse_pdb,
-)
+from nef_pipelines.transcoders.rcsb.rcsb_lib import read_structure
 
 app = typer.Typer()
 
@@ -30,6 +28,7 @@ NO_CHAIN_START_HELP = """don't include the start chain link type on a chain for
 NO_CHAIN_END_HELP = """don't include the end chain link type on a chain for the last residue [linkage will be
                        middle] for the named chains. Either use a comma joined list of chains [e.g. A,B] or call this
                        option multiple times to set chain ends for multiple chains"""
+NO_CACHE_HELP = "don't use or update the cache of parsed structures"
 
 
 # noinspection PyUnusedLocal
@@ -48,9 +47,13 @@ def sequence(
     entry_name: str = typer.Option(
         "pdb", help="a name for the nef entry if not updating an existing entry"
     ),
-    file_name: Path = typer.Argument(..., help="input pdb file", metavar="<PDB-FILE>"),
+    no_cache: bool = typer.Option(False, "--no-cache", help=NO_CACHE_HELP),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help=JOBS_HELP),
+    file_names: List[Path] = typer.Argument(
+        ..., help="input pdb or mmcif files", metavar="<PDB-FILE>"
+    ),
 ):
-    """extracts a sequence from a pdb file"""
+    """extracts sequences from pdb or mmcif files"""
 
     chain_codes = parse_comma_separated_options(chain_codes)
     no_chain_starts = parse_comma_separated_options(no_chain_starts)
@@ -67,12 +70,17 @@ def sequence(
 
 def process_sequence(args: Namespace):
 
-    pdb_sequences = read_sequences(
-        args.file_name, args.chain_codes, use_segids=args.use_segids
+    pdb_sequences = read_sequences_from_files(
+        args.file_names,
+        args.chain_codes,
+        use_segids=args.use_segids,
+        use_cache=not args.no_cache,
+        jobs=args.jobs,
     )
 
     if len(pdb_sequences) == 0:
-        exit_error(f"no chains read from {args.file_name}")
+        file_names = ", ".join(str(file_name) for file_name in args.file_names)
+        exit_error(f"no chains read from {file_names}")
 
     pdb_frame = sequence_to_nef_frame(
         pdb_sequences, set(args.no_chain_starts), set(args.no_chain_ends)
@@ -86,27 +94,81 @@ def process_sequence(args: Namespace):
         args,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
+
+
+def read_sequences_from_files(
+    paths: List[Path],
+    target_chain_codes: List[str],
+    use_segids: bool = False,
+    use_cache: bool = True,
+    jobs: int = 1,
+) -> List[SequenceResidue]:
+    """
+    read the sequences of several pdb or mmcif files, each file is read in a separate process if jobs > 1
+
+    :param paths: the files to read
+    :param target_chain_codes: the chains to read from each file, all chains are read if this is empty
+    :param use_segids: use segids rather than chain codes
+    :param use_cache: use and update the cache of parsed structures
+    :param jobs: the number of files to read at the same time
+    :return: the residues of the sequences in the order of the files
+    """
+
+    file_sequences = parallel_map_or_exit_error(
+        read_sequences,
+        paths,
+        [target_chain_codes] * len(paths),
+        [use_segids] * len(paths),
+        [use_cache] * len(paths),
+        jobs=jobs,
+    )
 
+    _exit_if_chain_codes_in_more_than_one_file(paths, file_sequences)
 
-def read_sequences(path: Path, target_chain_codes: List[str], use_segids: bool = False):
+    return [residue for sequences in file_sequences for residue in sequences]
 
-    with open(path) as fh:
-        lines = fh.readlines()
-    file_lines = list(lines)
-    file_type = guess_cif_or_pdb(file_lines, str(path))
 
+def _exit_if_chain_codes_in_more_than_one_file(
+    paths: List[Path], file_sequences: List[List[SequenceResidue]]
+):
+
+    chain_code_files = {}
+    for path, sequences in zip(paths, file_sequences):
+        for chain_code in {residue.chain_code for residue in sequences}:
+            chain_code_files.setdefault(chain_code, []).append(str(path))
+
+    clashes = {
+        chain_code: chain_paths
+        for chain_code, chain_paths in chain_code_files.items()
+        if len(chain_paths) > 1
+    }
+
+    if clashes:
+        clash_strings = [
+            f"{chain_code}: {', '.join(chain_paths)}"
+            for chain_code, chain_paths in clashes.items()
+        ]
+        clash_strings = "\n".join(clash_strings)
+        msg = f"""
+            the following chain codes were read from more than one file, select different chains from each
+            file with --chains or import them separately and rename them
+
+            {clash_strings}
+        """
+        exit_error(msg)
+
+
+def read_sequences(
+    path: Path,
+    target_chain_codes: List[str],
+    use_segids: bool = False,
+    use_cache: bool = True,
+) -> List[SequenceResidue]:
+
+    # only the sequences and the residues of the first model are needed so the file is streamed
     try:
-        if file_type is RCSBFileType.PDB:
-            model = parse_pdb(file_lines, source=str(path))[0]
-        elif file_type is RCSBFileType.CIF:
-            model = parse_cif(file_lines, source=str(path))[0]
-        else:
-            msg = f"""
-                Couldn't determine if the file {path} was a cif or pdb file...
-                are you sure the file has the right format?
-            """
-            exit_error(msg)
+        model = read_structure(path, sequence_only=True, use_cache=use_cache)[0]
     except Exception as e:
         exit_error(f"failed to parse {path} because {e}")
 
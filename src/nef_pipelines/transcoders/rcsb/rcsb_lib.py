@@ -1,12 +1,19 @@
+import functools
+import gzip
+import hashlib
+import itertools
+import os
+import pickle
 import random
 import re
 import string
 from collections import Counter
+from contextlib import contextmanager, suppress
 from dataclasses import dataclass, field
 from enum import Enum, IntEnum, auto
 from pathlib import Path
 from textwrap import dedent
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 
 from fyeah import f
 from pdbx import DataContainer
@@ -14,7 +21,13 @@ from pdbx.reader import PdbxReader
 from strenum import LowercaseStrEnum
 
 from nef_pipelines.lib.structures import LineInfo
-from nef_pipelines.lib.util import exit_error
+from nef_pipelines.lib.util import (
+    exit_error,
+    get_version,
+    mark_cache_used,
+    remove_stale_caches,
+    user_cache_dir,
+)
 
 
 class Atom: ...  # noqa: E701
@@ -147,12 +160,14 @@ class StructureParseException(Exception):
     pass
 
 
-current_structure: Optional[Structure] = None
-current_model: Optional[Model] = None
-current_chain: Optional[Chain] = None
-current_residue: Optional[Residue] = None
-current_indices: Dict[str, int] = {}
-current_lines: List[str]
+@dataclass
+class _ParseState:
+    # what is currently being read, passed between the parsing functions rather than held in globals so
+    # several structures can be parsed at the same time
+    structure: Structure
+    model: Optional[Model] = None
+    chain: Optional[Chain] = None
+    residue: Optional[Residue] = None
 
 
 def _pad_line_to_80(line):
@@ -250,32 +265,23 @@ def _exit_if_no_chain_code_and_no_segment_id(chain_code, segment_id, line_info):
         exit_error(msg)
 
 
-def _parse_atom(line, line_info):
-    global current_residue, current_chain, current_model
+def _parse_atom(line, line_info, state: _ParseState):
 
     serial = line[6:11]
     name = line[12:16]
     alternative_location = line[16]
-    residue_name = line[17:20]
-    chain_code = line[21]
-    sequence_code = line[22:26]
     x = line[30:38]
     y = line[38:46]
     z = line[46:54]
-    segment_id = line[72:76]
     element = line[76:78]
     temp_fact = line[60:66]
 
     serial = _convert_to_int_or_exit(serial, line_info, "serial")
-    sequence_code = _convert_to_int_or_exit(sequence_code, line_info, "sequence_code")
 
     x = _convert_to_float_or_exit(x, line_info, "x")
     y = _convert_to_float_or_exit(y, line_info, "y")
     z = _convert_to_float_or_exit(z, line_info, "z")
 
-    segment_id = _as_string_or_none(segment_id)
-    chain_code = _as_string_or_none(chain_code)
-
     element = _as_string_or_none(element)
 
     temp_fact = _convert_to_float_or_exit(temp_fact, line_info, "temperature factor")
@@ -284,9 +290,7 @@ def _parse_atom(line, line_info):
 
     alternative_location = _as_string_or_none(alternative_location)
 
-    residue_name = _as_continuous_string_or_exit(
-        residue_name, line_info, "residue name"
-    )
+    residue = _parse_atom_residue(line, line_info, state)
 
     current_atom = Atom(
         serial=serial,
@@ -297,47 +301,66 @@ def _parse_atom(line, line_info):
         z=z,
         element=element,
         temp_fact=temp_fact,
+        residue=residue,
+    )
+
+    residue.atoms.append(current_atom)
+
+
+def _parse_atom_residue(line, line_info, state: _ParseState) -> Residue:
+
+    residue_name = line[17:20]
+    chain_code = line[21]
+    sequence_code = line[22:26]
+    segment_id = line[72:76]
+
+    sequence_code = _convert_to_int_or_exit(sequence_code, line_info, "sequence_code")
+
+    segment_id = _as_string_or_none(segment_id)
+    chain_code = _as_string_or_none(chain_code)
+
+    residue_name = _as_continuous_string_or_exit(
+        residue_name, line_info, "residue name"
     )
 
     _exit_if_chain_code_and_segid_are_mismatched(
-        current_chain, chain_code, segment_id, line_info
+        state.chain, chain_code, segment_id, line_info
     )
 
     _exit_if_no_chain_code_and_no_segment_id(chain_code, segment_id, line_info)
 
-    if current_chain:
+    if state.chain:
         new_chain = False
         if (
-            current_chain.chain_code and chain_code
-        ) and current_chain.chain_code != chain_code:
+            state.chain.chain_code and chain_code
+        ) and state.chain.chain_code != chain_code:
             new_chain = True
 
         if (
-            current_chain.segment_id
+            state.chain.segment_id
             and segment_id
-            and current_chain.segment_id != segment_id
+            and state.chain.segment_id != segment_id
         ):
             new_chain = True
 
         if new_chain:
-            current_chain = None
+            state.chain = None
 
-    if not current_chain:
+    if not state.chain:
         chain_segment_key = chain_code if chain_code else segment_id
-        current_chain = Chain(chain_code=chain_code, segment_id=segment_id)
-        current_model.chains[chain_segment_key] = current_chain
+        state.chain = Chain(chain_code=chain_code, segment_id=segment_id)
+        state.model.chains[chain_segment_key] = state.chain
 
-    if current_residue and current_residue.sequence_code != sequence_code:
-        current_residue = None
+    if state.residue and state.residue.sequence_code != sequence_code:
+        state.residue = None
 
-    if not current_residue:
-        current_residue = Residue(
-            sequence_code=sequence_code, residue_name=residue_name, chain=current_chain
+    if not state.residue:
+        state.residue = Residue(
+            sequence_code=sequence_code, residue_name=residue_name, chain=state.chain
         )
-        current_chain.residues.append(current_residue)
+        state.chain.residues.append(state.residue)
 
-    current_atom.residue = current_residue
-    current_residue.atoms.append(current_atom)
+    return state.residue
 
 
 def _exit_if_chain_code_and_segid_are_mismatched(
@@ -383,12 +406,11 @@ def _exit_if_chain_code_and_segid_are_mismatched(
         exit_error(msg)
 
 
-def _parse_sequence(line: str, _: PDBLineInfo):
-    global current_structure
+def _parse_sequence(line: str, _: PDBLineInfo, structure: Structure):
     chain_code = line[11]
     chain_code = _as_string_or_none(chain_code)
 
-    sequence = current_structure.sequences.setdefault(
+    sequence = structure.sequences.setdefault(
         chain_code,
         Sequence(id=None, start_sequence_code=1, source=SequenceSource.SEQRES),
     )
@@ -403,8 +425,7 @@ def _parse_sequence(line: str, _: PDBLineInfo):
         sequence.residues.append(target_residue)
 
 
-def _parse_helix(line: str, line_info: PDBLineInfo):
-    global current_structure
+def _parse_helix(line: str, line_info: PDBLineInfo, structure: Structure):
 
     chain_code = line[19]
     alternative_location = line[25]
@@ -431,13 +452,12 @@ def _parse_helix(line: str, line_info: PDBLineInfo):
         secondary_structure_type,
     )
 
-    current_structure.secondary_structure.setdefault(chain_code, []).append(
+    structure.secondary_structure.setdefault(chain_code, []).append(
         secondary_structure_element
     )
 
 
-def _parse_sheet(line, line_info):
-    global current_structure
+def _parse_sheet(line, line_info, structure: Structure):
 
     chain_code = line[21]
     first_sequence_code = line[22:26]
@@ -460,7 +480,7 @@ def _parse_sheet(line, line_info):
         PdbSecondaryStructureType.SHEET,
     )
 
-    current_structure.secondary_structure.setdefault(chain_code, []).append(
+    structure.secondary_structure.setdefault(chain_code, []).append(
         secondary_structure_element
     )
 
@@ -554,31 +574,54 @@ def _sequence_from_residues_if_no_seqres(structure):
                         chain.sequence = sequence
 
 
-def parse_pdb(lines: Iterable[str], source: str = "unknown"):
-    global current_model, current_chain, current_residue, current_structure
+def parse_pdb(
+    lines: Iterable[str], source: str = "unknown", sequence_only: bool = False
+) -> Structure:
+    """
+    parse a pdb file into a structure
 
-    current_structure = Structure(source)
+    :param lines: the lines of the file, they are read as a stream
+    :param source: the name of the file for error messages
+    :param sequence_only: only read what is needed for sequences: SEQRES records and the residues of the first
+                          model, the residues have no atoms, secondary structure isn't read and reading stops
+                          after the first model
+    :return: the structure
+    """
 
+    state = _ParseState(Structure(source))
+
+    residue_key = None
     for line_no, line in enumerate(lines, start=1):
 
+        record_type = line[0:6].strip()
+
+        if sequence_only and record_type == "ATOM":
+            # most atoms are in the same residue as the previous atom, these don't need to be read
+            previous_residue_key = residue_key
+            residue_key = line[17:27], line[72:76]
+            if state.residue and residue_key == previous_residue_key:
+                continue
+
         line = line.rstrip("\n")
 
         line = _pad_line_to_80(line)
 
-        record_type = line[0:6].strip()
-
         line_info = PDBLineInfo(
             source, line_no=line_no, line=line, record_type=record_type
         )
 
         if record_type == "ATOM":
-            if not current_model:
-                current_model = Model(1)
-                current_structure.models.append(current_model)
-            _parse_atom(line, line_info)
+            if not state.model:
+                state.model = Model(1)
+                state.structure.models.append(state.model)
+
+            if sequence_only:
+                _parse_atom_residue(line, line_info, state)
+            else:
+                _parse_atom(line, line_info, state)
 
         if record_type == "TER":
-            if not current_chain:
+            if not state.chain:
                 msg = f"""
                     at line {line_info.line_no} in {line_info.file_name}
                     there was a termination line when no chain was bein read
@@ -590,18 +633,18 @@ def parse_pdb(lines: Iterable[str], source: str = "unknown"):
 
                 exit_error(msg)
 
-            current_chain = None
-            current_residue = None
+            state.chain = None
+            state.residue = None
 
         if record_type == "MODEL":
             model_number = line[10:14]
             model_number = _convert_to_int_or_exit(model_number, line_info, "MODEL")
 
-            if current_model:
+            if state.model:
                 msg = f"""
                     at line {line_info.line_no} in the file {line_info.file_name}
                     a new model started when a model was already open
-                    the new model number was {model_number} the old model_numbers was {current_model.serial}
+                    the new model number was {model_number} the old model_numbers was {state.model.serial}
 
                     the line was
 
@@ -612,50 +655,39 @@ def parse_pdb(lines: Iterable[str], source: str = "unknown"):
 
                 exit_error(msg)
 
-            current_model = Model(model_number)
-            current_structure.models.append(current_model)
+            state.model = Model(model_number)
+            state.structure.models.append(state.model)
 
         if record_type == "ENDMDL":
-            current_model = None
-            current_chain = None
-            current_residue = None
+            if sequence_only:
+                break
 
-        if record_type == "SEQRES":
-            _parse_sequence(line, line_info)
+            state.model = None
+            state.chain = None
+            state.residue = None
 
-        if record_type == "HELIX":
-            _parse_helix(line, line_info)
+        if record_type == "SEQRES":
+            _parse_sequence(line, line_info, state.structure)
 
-        if record_type == "SHEET":
-            _parse_sheet(line, line_info)
+        if record_type == "HELIX" and not sequence_only:
+            _parse_helix(line, line_info, state.structure)
 
-    _sequence_from_residues_if_no_seqres(current_structure)
+        if record_type == "SHEET" and not sequence_only:
+            _parse_sheet(line, line_info, state.structure)
 
-    _fixup_sequences(current_structure)
-    _fixup_secondary_structure(current_structure)
+    structure = state.structure
 
-    _match_sequences_and_set_offsets(current_structure)
+    _sequence_from_residues_if_no_seqres(structure)
 
-    for secondary_structure_list in current_structure.secondary_structure.values():
-        secondary_structure_list.sort(key=lambda x: x.start_sequence_code)
-
-    result = current_structure
-    current_structure = None
-    current_model = None
-    current_chain = None
-    current_residue = None
-
-    return result
+    _fixup_sequences(structure)
+    _fixup_secondary_structure(structure)
 
+    _match_sequences_and_set_offsets(structure)
 
-def _find_last_row_indices(lines, targets):
-    result = {}
-    for i, line in enumerate(lines):
-        for target in targets:
-            if target in line:
-                result[target] = i
+    for secondary_structure_list in structure.secondary_structure.values():
+        secondary_structure_list.sort(key=lambda x: x.start_sequence_code)
 
-    return result
+    return structure
 
 
 def _attibute_index_to_name(items, target_index):
@@ -757,8 +789,9 @@ class ComputedLineInfo:
         self._search_terms = list(args)
 
 
-def _parse_cif_atoms(data: DataContainer, line_info: ComputedLineInfo) -> Structure:
-    global current_structure, current_model, current_chain, current_residue
+def _parse_cif_atoms(
+    data: DataContainer, line_info: ComputedLineInfo, structure: Structure
+) -> Structure:
 
     atoms = data.get_object("atom_site")
     line_info.set_container("atom_site")
@@ -782,6 +815,8 @@ def _parse_cif_atoms(data: DataContainer, line_info: ComputedLineInfo) -> Struct
     B_iso_or_equiv_index = atoms.get_attribute_index("B_iso_or_equiv")
 
     current_model = None
+    current_chain = None
+    current_residue = None
     for i, row in enumerate(atoms, start=1):
         line_info.set_container_row(i)
         line_info.set_search_terms(*row)
@@ -827,8 +862,8 @@ def _parse_cif_atoms(data: DataContainer, line_info: ComputedLineInfo) -> Struct
                 )
 
             if not current_model or model_number != current_model.serial:
-                current_model = Model(model_number, structure=current_structure)
-                current_structure.models.append(current_model)
+                current_model = Model(model_number, structure=structure)
+                structure.models.append(current_model)
                 current_chain = None
 
             if current_chain and current_chain.chain_code != chain_code:
@@ -836,8 +871,8 @@ def _parse_cif_atoms(data: DataContainer, line_info: ComputedLineInfo) -> Struct
                 current_residue = None
 
             sequence = (
-                current_structure.sequences[sequence_code]
-                if sequence_code in current_structure.sequences
+                structure.sequences[sequence_code]
+                if sequence_code in structure.sequences
                 else None
             )
 
@@ -871,14 +906,7 @@ def _parse_cif_atoms(data: DataContainer, line_info: ComputedLineInfo) -> Struct
 
             current_residue.atoms.append(current_atom)
 
-    current_model = None
-    current_chain = None
-    current_residue = None
-
-    result = current_structure
-    current_structure = None
-
-    return result
+    return structure
 
 
 def _get_attribute_index_favour_auth(atoms, attribute_template):
@@ -892,8 +920,7 @@ def _get_attribute_index_favour_auth(atoms, attribute_template):
     return result
 
 
-def _parse_cif_helix(data, line_info):
-    global current_structure
+def _parse_cif_helix(data, line_info, structure: Structure):
 
     if helices := data.get_object("struct_conf"):
         line_info.set_container("struct_conf")
@@ -940,16 +967,15 @@ def _parse_cif_helix(data, line_info):
                 last_sequence_code,
                 alternative_location,
                 secondary_structure_type,
-                structure=current_structure,
+                structure=structure,
             )
 
-            current_structure.secondary_structure.setdefault(chain_code, []).append(
+            structure.secondary_structure.setdefault(chain_code, []).append(
                 secondary_structure_element
             )
 
 
-def _parse_cif_sheet(data, line_info):
-    global current_structure
+def _parse_cif_sheet(data, line_info, structure: Structure):
 
     if sheets := data.get_object("struct_sheet_range"):
         line_info.set_container("struct_sheet_range")
@@ -989,36 +1015,44 @@ def _parse_cif_sheet(data, line_info):
                 PdbSecondaryStructureType.SHEET,
             )
 
-            current_structure.secondary_structure.setdefault(chain_code, []).append(
+            structure.secondary_structure.setdefault(chain_code, []).append(
                 secondary_structure_element
             )
 
 
-def parse_cif(lines: Iterable[str], source: str = "unknown") -> Structure:
-    global current_structure, current_indices
+def parse_cif(
+    lines: Iterable[str], source: str = "unknown", sequence_only: bool = False
+) -> Structure:
+    """
+    parse a mmcif file into a structure
 
-    current_lines = [line for line in lines]
+    :param lines: the lines of the file
+    :param source: the name of the file for error messages
+    :param sequence_only: only read what is needed for sequences: the entity_poly_seq category and the residues of
+                          the first model from atom_site, the lines are streamed rather than being read into a
+                          complete mmcif data container, the residues have no atoms, secondary structure isn't read
+                          and reading stops after the first model
+    :return: the structure
+    """
 
-    current_indices = _find_last_row_indices(
-        current_lines,
-        [
-            "_atom_site",
-        ],
-    )
+    if sequence_only:
+        structure = _parse_cif_sequences_and_residues(lines, source)
+    else:
+        current_lines = [line for line in lines]
 
-    current_structure = Structure(source)
+        structure = Structure(source)
 
-    reader = PdbxReader(current_lines)
-    data = []
-    reader.read(data)
-    data = data[0]
+        reader = PdbxReader(current_lines)
+        data = []
+        reader.read(data)
+        data = data[0]
 
-    line_info = ComputedLineInfo(current_lines, file_name=source)
+        line_info = ComputedLineInfo(current_lines, file_name=source)
 
-    _parse_cif_sequence(data, line_info)
-    _parse_cif_helix(data, line_info)
-    _parse_cif_sheet(data, line_info)
-    structure = _parse_cif_atoms(data, line_info)
+        _parse_cif_sequence(data, line_info, structure)
+        _parse_cif_helix(data, line_info, structure)
+        _parse_cif_sheet(data, line_info, structure)
+        _parse_cif_atoms(data, line_info, structure)
 
     _fixup_cif_sequences(structure)
 
@@ -1030,6 +1064,254 @@ def parse_cif(lines: Iterable[str], source: str = "unknown") -> Structure:
     return structure
 
 
+def _parse_cif_sequences_and_residues(lines: Iterable[str], source: str) -> Structure:
+
+    # this follows _parse_cif_sequence and _parse_cif_atoms but only keeps the residues of the first model
+
+    structure = Structure(source)
+
+    model = None
+    model_number = None
+    chain = None
+    residue = None
+    residue_key = None
+    first_model_read = False
+
+    for category, tags, row, line_no, line in _iter_cif_rows(
+        lines, {"entity_poly_seq", "atom_site"}
+    ):
+
+        if category == "entity_poly_seq":
+            entity_id = row[tags["entity_id"]]
+            structure.sequences.setdefault(
+                entity_id,
+                Sequence(
+                    entity_id,
+                    None,
+                    structure=structure,
+                    source=SequenceSource.SEQRES,
+                ),
+            ).residues.append(row[tags["mon_id"]])
+            continue
+
+        if first_model_read:
+            # entity_poly_seq normally comes before atom_site if it doesn't the rest of the file has to be read
+            if structure.sequences:
+                break
+            continue
+
+        if row[tags["group_pdb"]] != "ATOM":
+            continue
+
+        row_model_number = (
+            row[tags["pdbx_pdb_model_num"]] if "pdbx_pdb_model_num" in tags else "1"
+        )
+        if model_number is not None and row_model_number != model_number:
+            first_model_read = True
+            continue
+
+        chain_code = row[_tag_index_favour_auth(tags, "{source}_asym_id")]
+        sequence_code = row[_tag_index_favour_auth(tags, "{source}_seq_id")]
+        residue_name = row[_tag_index_favour_auth(tags, "{source}_comp_id")]
+
+        # most atoms are in the same residue as the previous atom, these don't need to be read
+        if (chain_code, sequence_code, residue_name) == residue_key:
+            continue
+        residue_key = chain_code, sequence_code, residue_name
+
+        line_info = PDBLineInfo(source, line_no, line, record_type="atom_site")
+
+        if not model:
+            model_number = row_model_number
+            model_serial = _convert_to_int_or_exit(model_number, line_info, "model")
+            model = Model(model_serial, structure=structure)
+            structure.models.append(model)
+
+        sequence_code = _convert_to_int_or_exit(
+            sequence_code, line_info, "sequence code"
+        )
+
+        if chain and chain.chain_code != chain_code:
+            chain = None
+            residue = None
+
+        if not chain:
+            chain = Chain(chain_code=chain_code, model=model)
+            model.chains[chain_code] = chain
+
+        if residue and residue.sequence_code != sequence_code:
+            residue = None
+
+        if not residue:
+            residue = Residue(sequence_code, residue_name, chain=chain)
+            chain.residues.append(residue)
+
+    return structure
+
+
+def _tag_index_favour_auth(tags: Dict[str, int], tag_template: str) -> int:
+    auth_tag = tag_template.format(source="auth").lower()
+    label_tag = tag_template.format(source="label").lower()
+
+    return tags[auth_tag] if auth_tag in tags else tags[label_tag]
+
+
+CIF_RESERVED_WORDS = ("data_", "loop_", "save_", "global_", "stop_")
+
+# a cif value is a single or double quoted string, where quotes only close strings when they are followed
+# by whitespace, or a run of non whitespace characters
+_CIF_TOKEN = re.compile(
+    r"""'(?:[^']|'(?=\S))*'(?=\s|$)|"(?:[^"]|"(?=\S))*"(?=\s|$)|\S+"""
+)
+
+
+def _tokenise_cif_line(line: str) -> List[Tuple[str, bool]]:
+
+    # returns the tokens in the line as (value, is_quoted) pairs without any comment
+    if "'" in line or '"' in line or "#" in line:
+        result = []
+        for token in _CIF_TOKEN.findall(line):
+            if token[0] in "'\"":
+                result.append((token[1:-1], True))
+            elif token[0] == "#":
+                break
+            else:
+                result.append((token, False))
+    else:
+        result = [(token, False) for token in line.split()]
+
+    return result
+
+
+def _is_cif_keyword(token: str, is_quoted: bool) -> bool:
+    return not is_quoted and (
+        token[0] == "_" or token.lower().startswith(CIF_RESERVED_WORDS)
+    )
+
+
+def _iter_cif_rows(
+    lines: Iterable[str], categories: Set[str]
+) -> Iterator[Tuple[str, Dict[str, int], List[str], int, str]]:
+
+    # stream the rows of some categories in the first data block of a cif file without building a data container,
+    # yields the category, a map from lower case item names to column indices, the values of the row and the
+    # number and text of the line the row ends on. Categories which aren't loops are yielded as a single row
+
+    mode = None
+
+    loop_category = None
+    loop_tags = {}
+    loop_values = []
+
+    item_category = None
+    item_tags = {}
+    item_values = []
+
+    data_blocks = 0
+    text_field = None
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.rstrip("\n")
+
+        if text_field is not None:
+            if not line.startswith(";"):
+                text_field.append(line)
+                continue
+            tokens = [("\n".join(text_field), True), *_tokenise_cif_line(line[1:])]
+            text_field = None
+        elif line.startswith(";"):
+            text_field = [line[1:]]
+            continue
+        else:
+            tokens = _tokenise_cif_line(line)
+
+        # the common case, a line of loop values, all cif keywords contain an _
+        if mode == _CifMode.LOOP_VALUES and "_" not in line:
+            if loop_category in categories:
+                loop_values.extend([token for token, _ in tokens])
+                number_tags = len(loop_tags)
+                while len(loop_values) >= number_tags:
+                    yield loop_category, loop_tags, loop_values[
+                        :number_tags
+                    ], line_no, line
+                    del loop_values[:number_tags]
+            continue
+
+        for token, is_quoted in tokens:
+
+            if mode == _CifMode.ITEM_VALUE:
+                item_values.append(token)
+                mode = None
+                continue
+
+            is_keyword = _is_cif_keyword(token, is_quoted)
+
+            if mode == _CifMode.LOOP_TAGS:
+                if is_keyword and token[0] == "_":
+                    category, item = _cif_tag_to_category_and_item(token)
+                    loop_category = category if loop_category is None else loop_category
+                    loop_tags[item] = len(loop_tags)
+                    continue
+                mode = _CifMode.LOOP_VALUES
+
+            if mode == _CifMode.LOOP_VALUES and not is_keyword:
+                if loop_category in categories:
+                    loop_values.append(token)
+                    if len(loop_values) == len(loop_tags):
+                        yield loop_category, loop_tags, loop_values, line_no, line
+                        loop_values = []
+                continue
+
+            if not is_keyword:
+                # a value without a tag, the file is badly formed but there is nothing to read
+                continue
+
+            mode = None
+
+            if token[0] == "_":
+                category, item = _cif_tag_to_category_and_item(token)
+                if category != item_category:
+                    if item_category in categories and item_tags:
+                        yield item_category, item_tags, item_values, line_no, line
+                    item_category = category
+                    item_tags = {}
+                    item_values = []
+                item_tags[item] = len(item_tags)
+                mode = _CifMode.ITEM_VALUE
+                continue
+
+            if item_category in categories and item_tags:
+                yield item_category, item_tags, item_values, line_no, line
+            item_category = None
+            item_tags = {}
+            item_values = []
+
+            lower_token = token.lower()
+            if lower_token.startswith("data_"):
+                data_blocks += 1
+                if data_blocks > 1:
+                    return
+            elif lower_token == "loop_":
+                mode = _CifMode.LOOP_TAGS
+                loop_category = None
+                loop_tags = {}
+                loop_values = []
+
+    if item_category in categories and item_tags:
+        yield item_category, item_tags, item_values, line_no, line
+
+
+class _CifMode(Enum):
+    ITEM_VALUE = auto()
+    LOOP_TAGS = auto()
+    LOOP_VALUES = auto()
+
+
+def _cif_tag_to_category_and_item(tag: str) -> Tuple[str, str]:
+    category, _, item = tag[1:].partition(".")
+    return category.lower(), item.lower()
+
+
 def _fixup_cif_sequences(structure):
     sequence_id_map = {}
     for new_sequence_id, (original_sequence_id, sequence) in enumerate(
@@ -1063,6 +1345,19 @@ def _match_sequences_and_set_offsets(structure):
         chain_matches = {}
         chain_offsets = {}
         chain_sequence_starts = {}
+
+        # the padded sequences are the same for every chain so they are only built once
+        padded_sequences = [
+            (
+                sequence,
+                "".join(
+                    residue.ljust(max_residue_name_length, "-")
+                    for residue in sequence.residues
+                ),
+            )
+            for sequence in structure.sequences.values()
+        ]
+
         for chain in structure.models[0].chains.values():
             chain_segment_id_key = chain.chain_code, chain.segment_id
 
@@ -1087,18 +1382,13 @@ def _match_sequences_and_set_offsets(structure):
                     else wildcard
                 )
                 match_residues.append(match_residue)
-            match_residues = "".join(match_residues)
+            match_residues = re.compile("".join(match_residues))
 
-            for index, sequence in structure.sequences.items():
-                sequence_residues = [
-                    residue.ljust(max_residue_name_length, "-")
-                    for residue in sequence.residues
-                ]
-                sequence_residues = "".join(sequence_residues)
+            chain_key = chain.chain_code, chain.segment_id
+            for sequence, sequence_residues in padded_sequences:
 
-                match = re.search(match_residues, sequence_residues)
+                match = match_residues.search(sequence_residues)
 
-                chain_key = chain.chain_code, chain.segment_id
                 if match:
                     chain_offsets[chain_key] = int(
                         match.start() / max_residue_name_length
@@ -1121,7 +1411,10 @@ def _match_sequences_and_set_offsets(structure):
             if len(sequence_starts) > 1:
                 bad_chains = [
                     chain_key
-                    for chain_key, (chain_sequence_id, _) in chain_sequence_id_and_start
+                    for chain_key, (
+                        chain_sequence_id,
+                        _,
+                    ) in chain_sequence_id_and_start.items()
                     if sequence_id == chain_sequence_id
                 ]
                 bad_chains = [
@@ -1152,8 +1445,7 @@ def _match_sequences_and_set_offsets(structure):
             chain.sequence = sequence
 
 
-def _parse_cif_sequence(data, line_info):
-    global current_structure, current_indices
+def _parse_cif_sequence(data, line_info, structure: Structure):
 
     sequence = data.get_object("entity_poly_seq")
     line_info.set_container("entity_poly_seq")
@@ -1167,17 +1459,17 @@ def _parse_cif_sequence(data, line_info):
 
         entity_id = row[entity_id_index]
         monomer_id = row[monomer_id_index]
-        current_structure.sequences.setdefault(
+        structure.sequences.setdefault(
             entity_id,
             Sequence(
                 entity_id,
                 None,
-                structure=current_structure,
+                structure=structure,
                 source=SequenceSource.SEQRES,
             ),
         )
 
-        current_structure.sequences[entity_id].residues.append(monomer_id)
+        structure.sequences[entity_id].residues.append(monomer_id)
 
 
 PDB_RECORD_IDS = set(
@@ -1234,6 +1526,53 @@ class RCSBFileType(LowercaseStrEnum):
     UNKNOWN = auto()
 
 
+GZIP_MAGIC = b"\x1f\x8b"
+
+GUESS_TEST_LENGTH = 100
+
+
+@contextmanager
+def open_structure_file(file_path: Path) -> Iterator[TextIO]:
+    """
+    open a pdb or mmcif file for reading as text, gzip compressed files are decompressed as they are read
+
+    :param file_path: the file to open
+    :return: the open file
+    """
+
+    with open(file_path, "rb") as fh:
+        is_gzipped = fh.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+    opener = gzip.open if is_gzipped else open
+    with opener(file_path, "rt") as fh:
+        yield fh
+
+
+def guess_cif_or_pdb_from_stream(
+    lines: Iterable[str], file_name: str = "", test_length: int = GUESS_TEST_LENGTH
+) -> Tuple[RCSBFileType, Iterator[str]]:
+    """
+    guess if a stream of lines is from a cif or pdb file without losing the lines read to make the guess,
+    a .gz on the end of the file name is ignored
+
+    :param lines: the lines of the file
+    :param file_name: the name of the file
+    :param test_length: how many lines to read to make the guess
+    :return: the file type and the stream of lines to read from
+    """
+
+    lines = iter(lines)
+    first_lines = list(itertools.islice(lines, test_length))
+
+    file_path = Path(file_name)
+    if file_path.suffix.lower() == ".gz":
+        file_path = file_path.with_suffix("")
+
+    file_type = guess_cif_or_pdb(first_lines, str(file_path), test_length)
+
+    return file_type, itertools.chain(first_lines, lines)
+
+
 def guess_cif_or_pdb(lines: Iterable[str], file_name: str = "", test_length: int = 100):
 
     pdb = 0
@@ -1248,6 +1587,8 @@ def guess_cif_or_pdb(lines: Iterable[str], file_name: str = "", test_length: int
     else:
         for line in lines[:test_length]:
             fields = line.strip().split()
+            if not fields:
+                continue
             if fields[0] in PDB_RECORD_IDS:
                 pdb += 1
             if (
@@ -1267,6 +1608,144 @@ def guess_cif_or_pdb(lines: Iterable[str], file_name: str = "", test_length: int
     return result
 
 
+STRUCTURE_CACHE_VERSION = 1
+STRUCTURE_CACHE_DIRECTORY = "structures"
+
+# how many characters of the parser's digest name the directory its structures are cached in
+PARSER_DIGEST_LENGTH = 16
+
+# how much of a file is hashed at a time when building its cache key
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def read_structure(
+    file_path: Path, sequence_only: bool = False, use_cache: bool = True
+) -> Structure:
+    """
+    read a pdb or mmcif file [optionally gzip compressed] into a structure. Parsed structures are cached in
+    the user's nef pipelines cache directory keyed by a hash of the file's contents so reading the same
+    structure again, from any path, doesn't parse it again
+
+    :param file_path: the file to read
+    :param sequence_only: only read the sequences and the residues of the first model, see parse_pdb
+    :param use_cache: use and update the cache of parsed structures
+    :return: the structure
+    :raises StructureParseException: if the file isn't a pdb or mmcif file
+    """
+
+    cache_path = _structure_cache_path(file_path, sequence_only) if use_cache else None
+
+    structure = _read_cached_structure_or_none(cache_path) if use_cache else None
+
+    if structure is None:
+        with open_structure_file(file_path) as fh:
+            file_type, lines = guess_cif_or_pdb_from_stream(fh, str(file_path))
+
+            if file_type is RCSBFileType.PDB:
+                structure = parse_pdb(
+                    lines, source=str(file_path), sequence_only=sequence_only
+                )
+            elif file_type is RCSBFileType.CIF:
+                structure = parse_cif(
+                    lines, source=str(file_path), sequence_only=sequence_only
+                )
+            else:
+                msg = f"""
+                    Couldn't determine if the file {file_path} was a cif or pdb file...
+                    are you sure the file has the right format?
+                """
+                raise StructureParseException(dedent(msg))
+
+        if use_cache:
+            _write_cached_structure(cache_path, structure)
+
+    # the same contents may have been cached from a different file
+    structure.source = str(file_path)
+
+    return structure
+
+
+@functools.lru_cache(maxsize=1)
+def _parser_digest() -> str:
+
+    # structures are only reused by the parser that made them, a change to the parser or the structures it
+    # builds [this module] or a new release gives new keys without STRUCTURE_CACHE_VERSION being changed by hand
+    digest = hashlib.sha256(f"{STRUCTURE_CACHE_VERSION} {get_version()}".encode())
+    digest.update(Path(__file__).read_bytes())
+
+    return digest.hexdigest()[:PARSER_DIGEST_LENGTH]
+
+
+def _structure_cache_path(file_path: Path, sequence_only: bool) -> Path:
+
+    digest = hashlib.sha256(f"{sequence_only}".encode())
+    with open(file_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    return (
+        user_cache_dir()
+        / STRUCTURE_CACHE_DIRECTORY
+        / _parser_digest()
+        / f"{digest.hexdigest()}.pickle"
+    )
+
+
+def _read_cached_structure_or_none(cache_path: Path) -> Optional[Structure]:
+
+    result = None
+    try:
+        with open(cache_path, "rb") as fh:
+            version, structure = pickle.load(fh)
+        if version == STRUCTURE_CACHE_VERSION:
+            result = structure
+            mark_cache_used(cache_path.parent)
+    except (
+        OSError,
+        EOFError,
+        ValueError,
+        TypeError,
+        AttributeError,
+        pickle.UnpicklingError,
+    ):
+        pass
+
+    return result
+
+
+def _write_cached_structure(cache_path: Path, structure: Structure):
+
+    # as with the chem comp cache failing to write isn't an error and the structure is written to a temporary
+    # file and renamed so concurrent processes never see a partial structure
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as fh:
+            pickle.dump(
+                (STRUCTURE_CACHE_VERSION, structure),
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, cache_path)
+    except (OSError, RecursionError, pickle.PicklingError):
+        with suppress(OSError):
+            temp_path.unlink()
+
+    _remove_stale_structures_cached_by_other_parsers(cache_path.parent)
+
+
+def _remove_stale_structures_cached_by_other_parsers(parser_directory: Path):
+
+    # as with the chem comp cache, structures from other versions of the parser may still be used by other
+    # installs so they are only removed once they haven't been used for a while
+    with suppress(OSError):
+        remove_stale_caches(
+            other_directory
+            for other_directory in parser_directory.parent.iterdir()
+            if other_directory.is_dir() and other_directory != parser_directory
+        )
+
+
 if __name__ == "__main__":
     root = Path(
         "/Users/garythompson/Dropbox/nef_pipelines/nef_pipelines/src/nef_pipelines/tests/rcsb/test_data/"
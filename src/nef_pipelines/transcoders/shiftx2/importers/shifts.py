@@ -2,31 +2,43 @@ import os
 import re
 import sys
 import tempfile
+import time
 from dataclasses import dataclass
 from enum import Enum, auto
 from pathlib import Path
 from textwrap import dedent
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 from urllib.parse import urlsplit
 
-import requests
 import typer
 from bs4 import BeautifulSoup
 from bs4.element import Comment
-from pynmrstar import Entry
+from pynmrstar import Entry, Saveframe
 from tabulate import tabulate
 
 from nef_pipelines.lib.nef_lib import (
     UNUSED,
-    SelectionType,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import sequences_from_frames, translate_1_to_3
 from nef_pipelines.lib.shift_lib import shifts_to_nef_frame
 from nef_pipelines.lib.structures import AtomLabel, Residue, ShiftData, ShiftList
-from nef_pipelines.lib.util import STDIN, exit_error, is_int
-from nef_pipelines.tools.loops.trim import ChainBound
-from nef_pipelines.tools.loops.trim import pipe as trim
+from nef_pipelines.lib.util import (
+    STDIN,
+    exit_error,
+    is_int,
+    jobs_help,
+    parallel_map_or_exit_error,
+)
+from nef_pipelines.lib.web_lib import (
+    NO_CACHE_HELP,
+    OFFLINE_HELP,
+    NotInCacheException,
+    ThrottledTransport,
+    WebCache,
+)
+from nef_pipelines.tools.loops.trim import ChainBound, trim_frames
 from nef_pipelines.transcoders.shiftx2 import import_app
 
 NETWORK_200_OK = 200
@@ -41,6 +53,16 @@ ALPHA_FOLD_URL_TEMPLATE = (
 
 SHIFTX2_RETRY_COUNT = 10
 
+# delays in seconds between retries of a prediction which doubles for each retry up to a maximum
+SHIFTX2_RETRY_BACKOFF = 0.5
+SHIFTX2_MAX_RETRY_BACKOFF = 8.0
+
+# limits on the load put on each server when predicting many structures at once
+SHIFTX2_CONNECTIONS_PER_HOST = 4
+SHIFTX2_MIN_REQUEST_INTERVAL = 0.2
+
+JOBS_HELP = jobs_help("predictions to run", threads=True)
+
 
 @dataclass
 class NetworkResult:
@@ -116,9 +138,10 @@ app = typer.Typer()
 # noinspection PyUnusedLocal
 @import_app.command(no_args_is_help=True)
 def shifts(
-    code_or_file_name: str = typer.Argument(
+    codes_or_file_names: List[str] = typer.Argument(
         None,
-        help="file name to read shift data from or alphafold / pdb code to fetch data for",
+        help="""file names to read shift data from or alphafold / pdb codes to fetch data for, each input is
+                added as a separate shift list""",
     ),
     source_chain: str = typer.Option(
         None, help="chain in the source coordinate file to predict shift data for"
@@ -136,22 +159,134 @@ def shifts(
         "--in",
         help="input to read NEF data from [- is stdin]",
     ),
+    offline: bool = typer.Option(False, "--offline", help=OFFLINE_HELP),
+    no_cache: bool = typer.Option(False, "--no-cache", help=NO_CACHE_HELP),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help=JOBS_HELP),
 ):
-    """- read a shiftx2 chemical shift prediction [alpha]"""
+    """- read shiftx2 chemical shift predictions [alpha]"""
     entry = read_or_create_entry_exit_error_on_bad_file(in_file, "shiftx2")
-    entry = pipe(entry, code_or_file_name, source_chain, chain, alphafold, verbose)
-    print(entry)
+
+    web_cache = shiftx2_web_cache(offline=offline, enabled=not no_cache)
+    try:
+        entry = pipe(
+            entry,
+            codes_or_file_names,
+            source_chain,
+            chain,
+            alphafold,
+            verbose,
+            web_cache,
+            jobs=jobs,
+        )
+    except NotInCacheException as e:
+        msg = f"""
+            couldn't get a shiftx2 prediction for {', '.join(codes_or_file_names)} offline
+            {e}
+        """
+        exit_error(msg)
+
+    write_entry_to_stdout(entry)
+
+
+def shiftx2_web_cache(offline: bool = False, enabled: bool = True) -> WebCache:
+    """
+    a web cache which limits the load put on the shiftx2, pdbe and alphafold servers by concurrent predictions
+
+    :param offline: only use cached responses
+    :param enabled: use and update the cache
+    :return: the web cache
+    """
+    transport = ThrottledTransport(
+        connections_per_host=SHIFTX2_CONNECTIONS_PER_HOST,
+        min_interval=SHIFTX2_MIN_REQUEST_INTERVAL,
+    )
+    return WebCache(offline=offline, enabled=enabled, transport=transport)
 
 
 def pipe(
     entry: Entry,
-    code_or_filename: str,
+    codes_or_filenames: Union[str, List[str]],
     source_chain: str,
     chain: str,
     alphafold: bool,
     verbose: bool,
+    web_cache: Optional[WebCache] = None,
+    jobs: int = 1,
 ) -> Entry:
 
+    if isinstance(codes_or_filenames, str):
+        codes_or_filenames = [codes_or_filenames]
+
+    web_cache = web_cache if web_cache else shiftx2_web_cache()
+
+    frame_names = _frame_names_or_exit_error(codes_or_filenames)
+
+    number_inputs = len(codes_or_filenames)
+    predictions = parallel_map_or_exit_error(
+        _predict_shifts,
+        codes_or_filenames,
+        [source_chain] * number_inputs,
+        [chain] * number_inputs,
+        [alphafold] * number_inputs,
+        [verbose] * number_inputs,
+        [web_cache] * number_inputs,
+        jobs=jobs,
+        threads=True,
+    )
+
+    if not chain and source_chain:
+        chain = source_chain
+
+    if not chain and not source_chain:
+        chain = "A"
+
+    for frame_name, (shifts, pdb_file_info) in zip(frame_names, predictions):
+
+        shift_list = ShiftList(shifts)
+        frame = shifts_to_nef_frame(shift_list, frame_name)
+
+        entry.add_saveframe(frame)
+
+        if alphafold:
+            _trim_to_alphafold_structure(frame, chain, pdb_file_info)
+
+    return entry
+
+
+def _frame_names_or_exit_error(codes_or_filenames: List[str]) -> List[str]:
+
+    # a single prediction keeps the original frame name, batches are named by their inputs
+    if len(codes_or_filenames) == 1:
+        result = ["shiftx2"]
+    else:
+        result = []
+        for code_or_filename in codes_or_filenames:
+            file_path = Path(code_or_filename)
+            name = file_path.stem if file_path.exists() else code_or_filename
+            result.append(f"shiftx2_{name}")
+
+    duplicates = sorted({name for name in result if result.count(name) > 1})
+    if duplicates:
+        msg = f"""
+            the inputs {', '.join(codes_or_filenames)} would give shift lists with the same names:
+            {', '.join(duplicates)}
+        """
+        exit_error(msg)
+
+    return result
+
+
+def _predict_shifts(
+    code_or_filename: str,
+    source_chain: str,
+    chain: str,
+    alphafold: bool,
+    verbose: bool,
+    web_cache: WebCache,
+) -> Tuple[List[ShiftData], Optional[PDBDownloadResult]]:
+
+    pdb_file_info = None
+
     file_path = Path(code_or_filename)
     if file_path.exists():
         shifts = _read_shifts_from_file(file_path, chain)
@@ -159,7 +294,7 @@ def pipe(
 
         if alphafold:
             pdb_file_info = _pdb_code_to_alphafold_pdb_file(
-                code_or_filename, source_chain, verbose
+                code_or_filename, source_chain, verbose, web_cache
             )
             code_or_filename = pdb_file_info.pdb_file_path
             use_file = True
@@ -171,66 +306,57 @@ def pipe(
 
         for i in range(1, SHIFTX2_RETRY_COUNT + 1):
             shifts = _get_shifts_from_server(
-                code_or_filename, source_chain, chain, use_file=use_file
+                code_or_filename, source_chain, chain, web_cache, use_file=use_file
             )
             if shifts:
                 break
             elif verbose:
                 print(f"retrying shiftx2 ...[{i}]", file=sys.stderr)
 
+            if i < SHIFTX2_RETRY_COUNT:
+                time.sleep(
+                    min(SHIFTX2_RETRY_BACKOFF * 2 ** (i - 1), SHIFTX2_MAX_RETRY_BACKOFF)
+                )
+
         _exit_if_too_many_attempted_connections(
             shifts, code_or_filename, SHIFTX2_RETRY_COUNT
         )
 
-    shift_list = ShiftList(shifts)
-    frame = shifts_to_nef_frame(shift_list, "shiftx2")
-
-    entry.add_saveframe(frame)
-
-    if not chain and source_chain:
-        chain = source_chain
+    return shifts, pdb_file_info
 
-    if not chain and not source_chain:
-        chain = "A"
 
-    if alphafold:
-        sequence = sequences_from_frames(frame, chain)
-        shiftx2_uniprot_start = min(
-            [
-                residue.sequence_code
-                for residue in sequence
-                if is_int(residue.sequence_code)
-            ]
-        )
-        shiftx2_uniprot_end = max(
-            [
-                residue.sequence_code
-                for residue in sequence
-                if is_int(residue.sequence_code)
-            ]
-        )
+def _trim_to_alphafold_structure(
+    frame: Saveframe, chain: str, pdb_file_info: PDBDownloadResult
+):
 
-        run_trim = False
-        if pdb_file_info.pdb_uniprot_start > shiftx2_uniprot_start:
-            start = pdb_file_info.pdb_uniprot_start
-            run_trim = True
-        else:
-            start = shiftx2_uniprot_start
+    sequence = sequences_from_frames(frame, chain)
+    shiftx2_uniprot_start = min(
+        [residue.sequence_code for residue in sequence if is_int(residue.sequence_code)]
+    )
+    shiftx2_uniprot_end = max(
+        [residue.sequence_code for residue in sequence if is_int(residue.sequence_code)]
+    )
 
-        if pdb_file_info.pdb_uniprot_start < shiftx2_uniprot_end:
-            end = pdb_file_info.pdb_uniprot_end
-            run_trim = True
-        else:
-            end = shiftx2_uniprot_end
+    run_trim = False
+    if pdb_file_info.pdb_uniprot_start > shiftx2_uniprot_start:
+        start = pdb_file_info.pdb_uniprot_start
+        run_trim = True
+    else:
+        start = shiftx2_uniprot_start
 
-        if run_trim:
-            chain_bounds = [ChainBound(chain, start, end)]
+    if pdb_file_info.pdb_uniprot_start < shiftx2_uniprot_end:
+        end = pdb_file_info.pdb_uniprot_end
+        run_trim = True
+    else:
+        end = shiftx2_uniprot_end
 
-            chain_bounds = {chain: chain_bounds}
+    if run_trim:
+        chain_bounds = [ChainBound(chain, start, end)]
 
-            entry = trim(entry, "shiftx2", SelectionType.NAME, chain_bounds)
+        chain_bounds = {chain: chain_bounds}
 
-    return entry
+        # the frame is trimmed directly as selecting it by name would also match frames whose names contain it
+        trim_frames([frame], chain_bounds)
 
 
 def _exit_if_too_many_attempted_connections(shifts, code_or_filename, RETRY_COUNT):
@@ -415,7 +541,7 @@ def _tabular_lines_to_csv_layout(lines):
 
 
 def _get_shifts_from_server(
-    pdb_file_or_code, chain_code, cli_chain_code, use_file=False
+    pdb_file_or_code, chain_code, cli_chain_code, web_cache, use_file=False
 ):
 
     data = {
@@ -429,44 +555,51 @@ def _get_shifts_from_server(
         "pdbid": "",
         "nonoverlap": 1,
     }
-    files = {}
-    fh = None
+    files = None
     if use_file:
-        fh = open(pdb_file_or_code, "rb")
-        files = {"file": fh}
+        files = {"file": Path(pdb_file_or_code)}
     else:
         pdb_file_or_code = (
             f"{pdb_file_or_code}{chain_code}" if chain_code else pdb_file_or_code
         )
         data["pdbid"] = pdb_file_or_code
 
-    if use_file:
-        r = requests.request("POST", CGI_URL, data=data, files=files)
-
-    else:
-        r = requests.request("POST", CGI_URL, data=data)
-
-    if fh:
-        fh.close()
+    # the server sometimes replies without a link to the predictions, these replies aren't cached so retries work
+    r = web_cache.request(
+        "POST",
+        CGI_URL,
+        data=data,
+        files=files,
+        is_cacheable=lambda response: _find_predictions_link_or_none(response)
+        is not None,
+    )
 
     _exit_if_bad_html_request(pdb_file_or_code, r)
 
     _exit_if_error_calculating_shifts(pdb_file_or_code, r)
 
-    soup = BeautifulSoup(r.text, features="html.parser")
     shifts = ""
-    putative_links = soup.find_all("a", href=True, string="download predictions")
-    if putative_links:
-        link = putative_links[0]["href"]
+    link = _find_predictions_link_or_none(r)
+    if link:
         data_url = f"{ROOT_URL}/{link}"
-        data_r = requests.get(data_url)
-        text = data_r.text
+        data_r = web_cache.get(data_url)
 
-        shifts = _parse_text_to_shifts(text, cli_chain_code, CGI_URL)
+        if data_r.status_code == NETWORK_200_OK:
+            shifts = _parse_text_to_shifts(data_r.text, cli_chain_code, CGI_URL)
+        else:
+            # predictions are only kept on the server for a while so a cached link may be out of date,
+            # forget the submission so retries submit the structure again
+            web_cache.forget("POST", CGI_URL, data=data, files=files)
 
     return shifts
 
 
+def _find_predictions_link_or_none(response) -> Optional[str]:
+    soup = BeautifulSoup(response.text, features="html.parser")
+    putative_links = soup.find_all("a", href=True, string="download predictions")
+    return putative_links[0]["href"] if putative_links else None
+
+
 def _exit_if_bad_html_request(pdb_code, r):
     if r.status_code != 200:
         msg = f"""
@@ -573,24 +706,24 @@ def _exit_if_pdb_download_bad(pdb_file_data: PDBDownloadResult):
         exit_error(msg)
 
 
-def _pdb_code_to_alphafold_pdb_file(code_or_filename, source_chain, verbose):
+def _pdb_code_to_alphafold_pdb_file(code_or_filename, source_chain, verbose, web_cache):
     msg = [f"# alphafold: {code_or_filename}->"]
 
-    mapping = _convert_pdb_code_to_uniprot_id(code_or_filename, source_chain)
+    mapping = _convert_pdb_code_to_uniprot_id(code_or_filename, source_chain, web_cache)
 
     _exit_if_pdb_to_uniprot_network_failure(mapping)
     _exit_if_pdb_to_uniprot_mapping_fails(mapping)
 
     msg.append(f"{mapping.uniprot_id}->")
 
-    alphafold_result = _get_alphafold_pdb_url_from_uniprot_id(mapping)
+    alphafold_result = _get_alphafold_pdb_url_from_uniprot_id(mapping, web_cache)
 
     _exit_if_alphafold_network_bad(alphafold_result)
     _exit_if_alphafold_uniprot_to_pdb_url_fails(alphafold_result)
 
     msg.append(alphafold_result.alphafold_id)
 
-    pdb_file_data = _download_pdb_file(alphafold_result)
+    pdb_file_data = _download_pdb_file(alphafold_result, web_cache)
 
     _exit_if_pdb_download_bad(pdb_file_data)
 
@@ -605,9 +738,11 @@ def _pdb_code_to_alphafold_pdb_file(code_or_filename, source_chain, verbose):
     return pdb_file_data
 
 
-def _download_pdb_file(alphafold_result: AlphafoldResult) -> PDBDownloadResult:
+def _download_pdb_file(
+    alphafold_result: AlphafoldResult, web_cache: WebCache
+) -> PDBDownloadResult:
 
-    response = requests.get(alphafold_result.pdb_url)
+    response = web_cache.get(alphafold_result.pdb_url)
 
     network_ok = response.status_code == NETWORK_200_OK
 
@@ -637,14 +772,14 @@ def _download_pdb_file(alphafold_result: AlphafoldResult) -> PDBDownloadResult:
 
 
 def _get_alphafold_pdb_url_from_uniprot_id(
-    mapping: PdbUniprotMapping,
+    mapping: PdbUniprotMapping, web_cache: WebCache
 ) -> AlphafoldResult:
 
     alphafold_url = ALPHA_FOLD_URL_TEMPLATE.format(
         uniprot_id=mapping.uniprot_id, alphafold_key=ALPHA_FOLD_KEY
     )
 
-    response = requests.get(alphafold_url)
+    response = web_cache.get(alphafold_url)
 
     network_ok = response.status_code == NETWORK_200_OK
 
@@ -686,10 +821,10 @@ def _exit_if_alphafold_uniprot_to_pdb_url_fails(alphafold_result):
 
 
 def _convert_pdb_code_to_uniprot_id(
-    code_or_filename, source_chain
+    code_or_filename, source_chain, web_cache
 ) -> PdbUniprotMapping:
 
-    response = requests.get(
+    response = web_cache.get(
         PDB_UNIPROT_MAPPING_URL_TEMPLATE.format(code_or_filename=code_or_filename)
     )
 
@@ -10,6 +10,7 @@ from tabulate import tabulate
 from nef_pipelines.lib.nef_lib import (
     read_entry_from_stdin_or_exit,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     TRANSLATIONS_3_1_PROTEIN,
@@ -103,7 +104,7 @@ def shifts(
     entry = pipe(entry, shift_frames, chain_code, infill, sequence_lookup, output_file)
 
     if not (sys.stdout.isatty() or output_file == STDOUT):
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -15,6 +15,7 @@ from nef_pipelines.lib.nef_lib import (
     UNUSED,
     read_entry_from_file_or_stdin_or_exit_error,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import frame_to_peaks
 from nef_pipelines.lib.sequence_lib import TRANSLATIONS_3_1_PROTEIN
@@ -173,7 +174,7 @@ def peaks(
 def _output_entry_if_required(entry, output_to_files):
 
     if (not sys.stdout.isatty()) and output_to_files:
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def _write_output_tables(sparky_lines, output_to_files):
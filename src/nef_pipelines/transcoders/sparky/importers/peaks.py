@@ -12,12 +12,19 @@ from nef_pipelines.lib.nef_lib import (
     UNUSED,
     add_frames_to_entry,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import peaks_to_frame
 from nef_pipelines.lib.sequence_lib import MoleculeTypes, sequence_from_entry
 from nef_pipelines.lib.structures import NewPeak
 from nef_pipelines.lib.translation_lib import translate_new_peak
-from nef_pipelines.lib.util import STDIN, exit_error, parse_comma_separated_options
+from nef_pipelines.lib.util import (
+    JOBS_HELP,
+    STDIN,
+    exit_error,
+    parallel_map_or_exit_error,
+    parse_comma_separated_options,
+)
 from nef_pipelines.transcoders.sparky import import_app
 from nef_pipelines.transcoders.sparky.importers.shifts import (
     _exit_if_number_chain_codes_and_file_names_dont_match,
@@ -85,6 +92,7 @@ def peaks(
     spectrometer_frequency: float = typer.Option(
         600.123456789, help="spectrometer frequency in MHz"
     ),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help=JOBS_HELP),
 ):
     """convert sparky peaks file <SPARKY-PEAKS>.txt to NEF"""
 
@@ -135,9 +143,10 @@ def peaks(
         input_dimensions=nuclei,
         spectrometer_frequency=spectrometer_frequency,
         molecule_type=molecule_type,
+        jobs=jobs,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -149,27 +158,26 @@ def pipe(
     input_dimensions,
     spectrometer_frequency,
     molecule_type=MoleculeTypes.PROTEIN,
+    jobs=1,
 ):
 
     sparky_frames = []
 
-    for file_name, lines in file_names_and_lines.items():
-
-        sparky_peaks = parse_peaks(
-            lines,
-            file_name=file_name,
-            molecule_type=molecule_type,
-            chain_code=chain_code,
-            sequence=sequence,
-        )
-
-        sparky_peaks = [translate_new_peak(peak) for peak in sparky_peaks]
-
-        dimensions = _guess_dimensions_if_not_defined_or_throw(
-            sparky_peaks, input_dimensions
-        )
+    number_files = len(file_names_and_lines)
+    peaks_and_dimensions = parallel_map_or_exit_error(
+        _read_sparky_peaks,
+        file_names_and_lines.keys(),
+        file_names_and_lines.values(),
+        [molecule_type] * number_files,
+        [chain_code] * number_files,
+        [sequence] * number_files,
+        [input_dimensions] * number_files,
+        jobs=jobs,
+    )
 
-        dimensions = [{"axis_code": dimension} for dimension in dimensions]
+    for file_name, (sparky_peaks, dimensions) in zip(
+        file_names_and_lines, peaks_and_dimensions
+    ):
 
         file_name = Path(file_name).stem  # used in f method...
 
@@ -184,6 +192,29 @@ def pipe(
     return add_frames_to_entry(entry, sparky_frames)
 
 
+def _read_sparky_peaks(
+    file_name, lines, molecule_type, chain_code, sequence, input_dimensions
+):
+
+    sparky_peaks = parse_peaks(
+        lines,
+        file_name=file_name,
+        molecule_type=molecule_type,
+        chain_code=chain_code,
+        sequence=sequence,
+    )
+
+    sparky_peaks = [translate_new_peak(peak) for peak in sparky_peaks]
+
+    dimensions = _guess_dimensions_if_not_defined_or_throw(
+        sparky_peaks, input_dimensions
+    )
+
+    dimensions = [{"axis_code": dimension} for dimension in dimensions]
+
+    return sparky_peaks, dimensions
+
+
 def _guess_dimensions_if_not_defined_or_throw(
     peaks: List[NewPeak], input_dimensions: List[str]
 ) -> List[str]:
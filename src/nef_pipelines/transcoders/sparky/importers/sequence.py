@@ -6,7 +6,10 @@ import typer
 from ordered_set import OrderedSet
 from pynmrstar import Entry
 
-from nef_pipelines.lib.nef_lib import read_or_create_entry_exit_error_on_bad_file
+from nef_pipelines.lib.nef_lib import (
+    read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
+)
 from nef_pipelines.lib.sequence_lib import (
     MoleculeType,
     get_chain_code_iter,
@@ -106,7 +109,7 @@ def sequence(
         molecule_types,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -18,6 +18,7 @@ from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     read_file_or_exit,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     get_residue_name_from_lookup,
@@ -107,7 +108,7 @@ def restraints(
 
     entry = pipe(entry, lines, file_name, chain_code, frame_name, class_to_merit)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def _parse_merits_and_merge(merits):
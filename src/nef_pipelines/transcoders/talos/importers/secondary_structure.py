@@ -11,6 +11,7 @@ from nef_pipelines.lib.nef_lib import (
     create_nef_save_frame,
     read_file_or_exit,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     exit_if_chain_not_in_entrys_sequence,
@@ -64,7 +65,7 @@ def secondary_structure(
 
     entry = pipe(entry, lines, chain_code, frame_name, file_name, include_predictions)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
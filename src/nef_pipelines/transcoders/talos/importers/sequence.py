@@ -7,6 +7,7 @@ from pynmrstar import Entry
 from nef_pipelines.lib.nef_lib import (
     read_file_or_exit,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.transcoders.nmrpipe.importers.sequence import pipe as nmrpipe_pipe
 from nef_pipelines.transcoders.talos import import_app
@@ -52,7 +53,7 @@ def sequence(
 
     entry = pipe(entry, lines, chain_code, no_chain_start, no_chain_end, file_name)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
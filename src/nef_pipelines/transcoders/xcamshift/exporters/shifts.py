@@ -10,6 +10,7 @@ from nef_pipelines.lib.nef_lib import (
     UNUSED,
     read_entry_from_stdin_or_exit,
     select_frames_by_name,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.shift_lib import nef_frames_to_shifts
 from nef_pipelines.lib.util import STDOUT, exit_error, is_int
@@ -54,7 +55,7 @@ def shifts(
     entry = pipe(entry, shift_frames, output_file)
 
     if not (sys.stdout.isatty() or output_file == STDOUT):
-        print(entry)
+        write_entry_to_stdout(entry)
 
 
 def pipe(entry: Entry, shift_frames: List[Saveframe], output_file: Path) -> Entry:
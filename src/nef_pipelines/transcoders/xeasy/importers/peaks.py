@@ -7,13 +7,14 @@ from fyeah import f
 from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.peak_lib import peaks_to_frame
 from nef_pipelines.lib.sequence_lib import (
     sequence_from_entry_or_exit,
     sequence_to_residue_name_lookup,
 )
-from nef_pipelines.lib.util import STDIN
+from nef_pipelines.lib.util import JOBS_HELP, STDIN, parallel_map_or_exit_error
 from nef_pipelines.transcoders.sparky.importers.peaks import (
     _guess_dimensions_if_not_defined_or_throw,
 )
@@ -60,6 +61,7 @@ def peaks(
     spectrometer_frequency: float = typer.Option(
         600.123456789, help="spectrometer frequency in MHz"
     ),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help=JOBS_HELP),
 ):
     """convert xeasy peaks file <XEASY-PEAKS>.peaks to NEF"""
 
@@ -73,9 +75,10 @@ def peaks(
         file_names,
         sequence,
         spectrometer_frequency=spectrometer_frequency,
+        jobs=jobs,
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
@@ -84,32 +87,46 @@ def pipe(
     file_names,
     sequence,
     spectrometer_frequency,
+    jobs=1,
 ):
 
     xeasy_frames = []
 
     residue_type_lookup = sequence_to_residue_name_lookup(sequence)
-    for file_name in file_names:
 
-        with file_name.open() as fh:
-            lines = fh.readlines()
-
-        spectrum_type, dimension_info, peaks = parse_peaks(
-            lines, file_name, residue_type_lookup
-        )
-
-        dimensions = _guess_dimensions_if_not_defined_or_throw(peaks, dimension_info)
+    peaks_and_dimensions = parallel_map_or_exit_error(
+        _read_xeasy_peaks,
+        file_names,
+        [residue_type_lookup] * len(file_names),
+        jobs=jobs,
+    )
 
-        dimensions = [{"axis_code": dimension.axis_code} for dimension in dimensions]
+    for file_name, (peaks, dimensions) in zip(file_names, peaks_and_dimensions):
 
         file_name = Path(file_name).stem  # used in f method...
 
-        frame_name = f(frame_name)
+        frame_code = f(frame_name)
 
         frame = peaks_to_frame(
-            peaks, dimensions, spectrometer_frequency, frame_code=frame_name
+            peaks, dimensions, spectrometer_frequency, frame_code=frame_code
         )
 
         xeasy_frames.append(frame)
 
     return add_frames_to_entry(entry, xeasy_frames)
+
+
+def _read_xeasy_peaks(file_name, residue_type_lookup):
+
+    with file_name.open() as fh:
+        lines = fh.readlines()
+
+    spectrum_type, dimension_info, peaks = parse_peaks(
+        lines, file_name, residue_type_lookup
+    )
+
+    dimensions = _guess_dimensions_if_not_defined_or_throw(peaks, dimension_info)
+
+    dimensions = [{"axis_code": dimension.axis_code} for dimension in dimensions]
+
+    return peaks, dimensions
@@ -4,7 +4,10 @@ from typing import List
 import typer
 from pynmrstar import Entry
 
-from nef_pipelines.lib.nef_lib import read_or_create_entry_exit_error_on_bad_file
+from nef_pipelines.lib.nef_lib import (
+    read_or_create_entry_exit_error_on_bad_file,
+    write_entry_to_stdout,
+)
 from nef_pipelines.lib.sequence_lib import sequence_to_nef_frame
 from nef_pipelines.lib.structures import SequenceResidue
 from nef_pipelines.lib.util import STDIN, parse_comma_separated_options
@@ -55,7 +58,7 @@ def sequence(
 
     entry = pipe(entry, no_chain_starts, no_chain_ends, file_names)
 
-    print(entry)
+    write_entry_to_stdout(entry)
 
 
 def pipe(
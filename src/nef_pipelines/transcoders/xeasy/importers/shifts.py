@@ -6,6 +6,7 @@ import typer
 from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     sequence_from_entry_or_exit,
@@ -66,4 +67,4 @@ def pipe(entry, sequence, entry_name, file_names):
 
     entry = add_frames_to_entry(entry, xeasy_frames)
 
-    print(entry)
+    write_entry_to_stdout(entry)
@@ -5,7 +5,10 @@ from typing import List
 
 import typer
 
-from nef_pipelines.lib.nef_lib import file_name_path_to_frame_name
+from nef_pipelines.lib.nef_lib import (
+    file_name_path_to_frame_name,
+    write_entry_to_stdout,
+)
 from nef_pipelines.lib.sequence_lib import (
     ANY_CHAIN,
     get_sequence_or_exit,
@@ -80,4 +83,4 @@ def dihedrals(
         [nef_restraints], Namespace(pipe=None, entry_name="xplor_dihedral_restraints")
     )
 
-    print(entry)
+    write_entry_to_stdout(entry)
@@ -8,6 +8,7 @@ from nef_pipelines.lib.nef_lib import (
     add_frames_to_entry,
     file_name_path_to_frame_name,
     read_entry_from_file_or_stdin_or_exit_error,
+    write_entry_to_stdout,
 )
 from nef_pipelines.lib.sequence_lib import (
     ANY_CHAIN,
@@ -80,4 +81,4 @@ def distances(
 
     entry = add_frames_to_entry(entry, [nef_restraints])
 
-    print(entry)
+    write_entry_to_stdout(entry)